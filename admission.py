@@ -0,0 +1,83 @@
+import threading
+from typing import Dict, Optional, Tuple, TYPE_CHECKING
+
+from automators.data_structs import Config
+from automators.utils.rate_limiter import TokenBucket
+
+if TYPE_CHECKING:
+    from automators.device_manager import DeviceManager
+    from data_structs import CallbackableQueue
+
+
+class AdmissionController:
+    """Decides whether inbound work is accepted. Applies per-user and global rate limits on inbound messages,
+    a cap on queued requests, and rejects requests whose estimated wait would exceed the configured SLA.
+    All limits are disabled with a value of 0."""
+    GLOBAL_RATE = 0 # requests per second, every request of a bulk message counts
+    GLOBAL_BURST = 0
+    USER_RATE = 0 # requests per second, per user
+    USER_BURST = 0
+    MAX_QUEUE_SIZE = 0 # maximum requests waiting in the request queue
+    MAX_ESTIMATED_WAIT = 0 # seconds, the SLA
+    CONFIG: Config
+
+    def __init__(self, device_manager: 'DeviceManager', out_queue: 'CallbackableQueue'):
+        cls = self.__class__
+        self.device_manager = device_manager
+        self.out_queue = out_queue
+        self.global_bucket = TokenBucket(cls.GLOBAL_RATE, cls.GLOBAL_BURST)
+        self.user_buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, config: Config):
+        cls.CONFIG = config
+        cls.GLOBAL_RATE = config.get('global_rate', cls.GLOBAL_RATE)
+        cls.GLOBAL_BURST = config.get('global_burst', cls.GLOBAL_BURST)
+        cls.USER_RATE = config.get('user_rate', cls.USER_RATE)
+        cls.USER_BURST = config.get('user_burst', cls.USER_BURST)
+        cls.MAX_QUEUE_SIZE = config.get('max_queue_size', cls.MAX_QUEUE_SIZE)
+        cls.MAX_ESTIMATED_WAIT = config.get('max_estimated_wait', cls.MAX_ESTIMATED_WAIT)
+
+    def get_user_bucket(self, user_identifier: str):
+        with self.lock:
+            if user_identifier not in self.user_buckets:
+                self.user_buckets[user_identifier] = TokenBucket(self.__class__.USER_RATE, self.__class__.USER_BURST)
+            return self.user_buckets[user_identifier]
+
+    def admit_message(self, user_identifier: str) -> Tuple[bool, Optional[str]]:
+        """Rate limits an inbound message carrying a single request. Returns (admitted, rejection_reason)."""
+        admitted_count, reason = self.admit_requests(user_identifier, 1)
+        return (admitted_count == 1, reason)
+
+    def admit_requests(self, user_identifier: str, request_count: int) -> Tuple[int, Optional[str]]:
+        """Rate limits the requests of an inbound message one by one, so a message larger than the burst is admitted in part 
+        instead of never. Returns (admitted_count, rejection_reason), the first admitted_count requests are admitted."""
+        user_bucket = self.get_user_bucket(user_identifier)
+        user_count = user_bucket.try_acquire_up_to(request_count)
+        admitted_count = self.global_bucket.try_acquire_up_to(user_count)
+        if admitted_count < user_count:
+            user_bucket.refund(user_count - admitted_count)
+            return (admitted_count, 'global_rate_limited')
+        return (admitted_count, 'user_rate_limited' if admitted_count < request_count else None)
+
+    def get_queue_depth(self, automator_name: str):
+        default = self.device_manager.DEVICE_CLS.DEFAULT_AUTOMATOR
+        automator_name = automator_name or default
+        with self.out_queue.mutex:
+            return len([req for req in self.out_queue.queue if (req.automator or default) == automator_name])
+
+    def estimate_wait(self, automator_name: str):
+        return self.device_manager.estimate_wait(automator_name, self.get_queue_depth(automator_name))
+
+    def admit_request(self, automator_name: str) -> Tuple[bool, Optional[str], float]:
+        """Checks whether a request for the automator can be enqueued. Returns (admitted, rejection_reason, estimated_wait)."""
+        cls = self.__class__
+        if cls.MAX_QUEUE_SIZE > 0 and len(self.out_queue.queue) >= cls.MAX_QUEUE_SIZE:
+            return (False, 'queue_full', float('inf'))
+        if cls.MAX_ESTIMATED_WAIT <= 0:
+            return (True, None, 0)
+        estimated_wait = self.estimate_wait(automator_name)
+        if estimated_wait > cls.MAX_ESTIMATED_WAIT:
+            return (False, 'sla_exceeded', estimated_wait)
+        return (True, None, estimated_wait)
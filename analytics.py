@@ -0,0 +1,177 @@
+"""Columnar export of the transactions and vectorized reports over it, for offline analysis of throughput, success rates
+and execution durations per device, automator and product. Columns are NumPy arrays, string columns are dictionary encoded
+(int32 codes into a dictionary of their distinct values). Saved as .npz, or as Arrow IPC when pyarrow is installed."""
+from array import array
+import io
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+from rollups import parse_time
+
+
+DICTIONARY_COLUMNS = ('automator', 'product_spec', 'device', 'error')
+NUMERIC_COLUMNS = ('id', 'time', 'execution_duration') # int64, time in epoch seconds
+
+
+class DictionaryEncoder:
+    def __init__(self):
+        self.codes = array('i')
+        self.values: Dict[str, int] = {}
+
+    def append(self, value: Optional[str]):
+        value = value or ''
+        code = self.values.get(value)
+        if code is None:
+            code = self.values[value] = len(self.values)
+        self.codes.append(code)
+
+    def get_dictionary(self):
+        return np.array(list(self.values.keys()), dtype=str)
+
+
+class TransactionColumns:
+    """The transactions as columns. success is a bool column, error is '' for successful transactions."""
+
+    def __init__(self, columns: Dict[str, np.ndarray], dictionaries: Dict[str, np.ndarray]):
+        self.columns = columns
+        self.dictionaries = dictionaries
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]):
+        """Builds the columns from rows of the transactions table, e.g: TransactionPager.iterate(), appending to compact arrays as rows stream in."""
+        numeric = {name: array('q') for name in NUMERIC_COLUMNS}
+        encoders = {name: DictionaryEncoder() for name in DICTIONARY_COLUMNS}
+        success = array('b')
+        for row in rows:
+            numeric['id'].append(row['id'])
+            numeric['time'].append(int(parse_time(row['time']).timestamp()))
+            numeric['execution_duration'].append(row['execution_duration'] if row.get('execution_duration') is not None else -1)
+            for name, encoder in encoders.items():
+                encoder.append(row.get(name))
+            success.append(row.get('error') is None and row.get('refID') is not None)
+        columns = {name: np.frombuffer(values, dtype=np.int64).copy() if len(values) else np.zeros(0, dtype=np.int64) for name, values in numeric.items()}
+        columns.update({name: np.frombuffer(encoder.codes, dtype=np.int32).copy() if len(encoder.codes) else np.zeros(0, dtype=np.int32) for name, encoder in encoders.items()})
+        columns['success'] = np.frombuffer(success, dtype=np.int8).astype(bool) if len(success) else np.zeros(0, dtype=bool)
+        return cls(columns, {name: encoder.get_dictionary() for name, encoder in encoders.items()})
+
+    def decode(self, name: str) -> np.ndarray:
+        """The values of a dictionary encoded column."""
+        return self.dictionaries[name][self.columns[name]]
+
+    def to_npz(self, f: Union[str, BinaryIO]):
+        np.savez_compressed(f, **self.columns, **{'dictionary_' + name: values for name, values in self.dictionaries.items()})
+
+    @classmethod
+    def from_npz(cls, f: Union[str, BinaryIO]):
+        with np.load(f) as data:
+            columns = {name: data[name] for name in data.files if not name.startswith('dictionary_')}
+            dictionaries = {name[len('dictionary_'):]: data[name] for name in data.files if name.startswith('dictionary_')}
+        return cls(columns, dictionaries)
+
+    def to_arrow(self, f: BinaryIO):
+        """Writes an Arrow IPC file, with the string columns as dictionary arrays. Requires pyarrow."""
+        if pyarrow is None:
+            raise RuntimeError("pyarrow is not installed, export as npz instead.")
+        fields = {name: pyarrow.array(self.columns[name]) for name in NUMERIC_COLUMNS + ('success',)}
+        fields.update({name: pyarrow.DictionaryArray.from_arrays(self.columns[name], pyarrow.array(self.dictionaries[name].tolist(), type=pyarrow.string())) for name in DICTIONARY_COLUMNS})
+        table = pyarrow.table(fields)
+        with pyarrow.ipc.new_file(f, table.schema) as writer:
+            writer.write_table(table)
+
+    def to_bytes(self, format: str = 'npz') -> bytes:
+        buffer = io.BytesIO()
+        self.to_arrow(buffer) if format == 'arrow' else self.to_npz(buffer)
+        return buffer.getvalue()
+
+
+def group_codes(columns: TransactionColumns, by: Sequence[str]):
+    """Combines the dictionary codes of the by columns into one group code per row. Returns the group codes and the groups' values."""
+    if not len(by):
+        return np.zeros(len(columns), dtype=np.int64), [()]
+    combined = np.zeros(len(columns), dtype=np.int64)
+    for name in by:
+        combined = combined*len(columns.dictionaries[name]) + columns[name]
+    groups, codes = np.unique(combined, return_inverse=True)
+    values = []
+    for group in groups:
+        key = []
+        for name in reversed(by):
+            size = len(columns.dictionaries[name])
+            key.append(str(columns.dictionaries[name][group % size]))
+            group //= size
+        values.append(tuple(reversed(key)))
+    return codes.reshape(-1), values
+
+
+def hourly_throughput(columns: TransactionColumns, by: Sequence[str] = ()) -> List[dict]:
+    """Transactions and successes per hour (epoch seconds of the hour's start), per group of the by columns."""
+    codes, groups = group_codes(columns, by)
+    hours = columns['time'] // 3600
+    keys = codes.astype(np.int64) * (int(hours.max()) + 1 if len(hours) else 1) + hours
+    unique, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse, minlength=len(unique))
+    successes = np.bincount(inverse, weights=columns['success'], minlength=len(unique)).astype(np.int64)
+    first = np.zeros(len(unique), dtype=np.int64)
+    first[inverse[::-1]] = np.arange(len(inverse))[::-1] # a row of each key, for its group and hour
+    return [{**dict(zip(by, groups[codes[row]])), 'hour': int(hours[row])*3600, 'count': int(count), 'success_count': int(success),
+             'success_rate': float(success)/float(count)} for row, count, success in zip(first, counts, successes)]
+
+
+def duration_percentiles(columns: TransactionColumns, by: Sequence[str] = ('automator',), q: Sequence[float] = (50, 95, 99)) -> List[dict]:
+    """Execution duration percentiles per group, of the transactions which ran (execution_duration >= 0)."""
+    ran = columns['execution_duration'] >= 0
+    codes, groups = group_codes(columns, by)
+    codes, durations = codes[ran], columns['execution_duration'][ran]
+    order = np.argsort(codes, kind='stable')
+    codes, durations = codes[order], durations[order]
+    if not len(durations):
+        return []
+    boundaries = np.flatnonzero(np.diff(codes)) + 1 # where each group's sorted run starts
+    starts = np.concatenate([[0], boundaries])
+    return [{**dict(zip(by, groups[codes[start]])), 'count': int(len(group_durations)), 'mean': float(group_durations.mean()),
+             **{'p{:g}'.format(p): float(value) for p, value in zip(q, np.percentile(group_durations, q))}}
+            for start, group_durations in zip(starts, np.split(durations, boundaries))]
+
+
+def failure_breakdown(columns: TransactionColumns, by: Sequence[str] = ('automator',)) -> List[dict]:
+    """Failed transactions per group and error, most frequent first."""
+    failed = ~columns['success']
+    codes, groups = group_codes(columns, by)
+    if not failed.any():
+        return []
+    errors = len(columns.dictionaries['error'])
+    keys = codes[failed].astype(np.int64)*errors + columns['error'][failed]
+    unique, counts = np.unique(keys, return_counts=True)
+    totals = np.bincount(codes, minlength=len(groups))
+    order = np.argsort(-counts, kind='stable')
+    return [{**dict(zip(by, groups[key // errors])), 'error': str(columns.dictionaries['error'][key % errors]), 'count': int(count),
+             'share': float(count)/float(totals[key // errors])} for key, count in zip(unique[order], counts[order])]
+
+
+if __name__ == '__main__':
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Reports over a columnar transaction export (/database/transactions/columnar).")
+    parser.add_argument('filename', help='The .npz export.')
+    parser.add_argument('report', choices=['throughput', 'durations', 'failures'])
+    parser.add_argument('--by', dest='by', default='automator', help='Comma separated columns to group by, of {}.'.format(', '.join(DICTIONARY_COLUMNS[:-1])))
+    args = parser.parse_args()
+
+    columns = TransactionColumns.from_npz(args.filename)
+    by = [name.strip() for name in args.by.split(',') if name.strip()]
+    report = {'throughput': hourly_throughput, 'durations': duration_percentiles, 'failures': failure_breakdown}[args.report](columns, by)
+    for entry in report:
+        print(json.dumps(entry))
@@ -1,8 +1,8 @@
-from .database_router import DatabaseRouter
-from .server_router import ServerRouter
-from .device_router import DeviceRouter
-from .middleware_router import MiddlewareRouter
-from .configuration_router import ConfigurationRouter
-from .translator_router import TranslatorRouter
-from .product_router import ProductRouter
-from .utilities_router import UtilitiesRouter
+from .database_router import DatabaseRouter
+from .server_router import ServerRouter
+from .device_router import DeviceRouter
+from .middleware_router import MiddlewareRouter
+from .configuration_router import ConfigurationRouter
+from .translator_router import TranslatorRouter
+from .product_router import ProductRouter
+from .utilities_router import UtilitiesRouter
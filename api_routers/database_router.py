@@ -1,106 +1,254 @@
-from typing import List
-
-from fastapi_class.decorators import get, post, delete
-
-from api_template.base.database.models.base import Model
-from database import SynapsisDB, Transaction, User
-
-from .base import BaseAPIRouter
-from .models import GenericResponse, UserInModel, UserModel, TransactionModel
-from .tags import tags
-
-
-class DatabaseRouter(BaseAPIRouter):
-    ROUTE_PREFIX = '/database'
-    TAGS = [tags.DATABASE]
-    def __init__(self, api, app):
-        super().__init__(api, app)
-        self.db_manager: 'SynapsisDB' = self.app.database_manager
-    
-    def to_dict(self, obj: Model):
-        if isinstance(obj, Transaction):
-            dct = obj.to_dict()
-            dct['time'] = obj.time.timestamp() #type:ignore # it is there, just not detectable
-            return dct
-        elif isinstance(obj, User):
-            return obj.to_dict()
-    
-    @post('/query', summary="Executes query", description="Executes query. Returns data from fetchall (Really Unsafe).", tags=[tags.DANGEROUS])
-    def execute_query(self, query: str):
-        self.db_manager.execute(query)
-        return {'data': list(self.db_manager.cursor.fetchall())}
-    
-    @post('/query/select', summary="Executes a select query and returns all result", description="Executes a select query and returns all result.", response_model=List[dict], tags=[tags.DANGEROUS])
-    def query_select(self, query: str):
-        return list(self.db_manager.select(query))
-    
-    @post('/query/delete', summary="Executes a delete query", description="Executes a delete query.", response_model=GenericResponse, tags=[tags.DANGEROUS])
-    def query_delete(self, query: str):
-        try:
-            self.db_manager.execute(query)
-            return {'status': True, 'detail': "Delete query executed."}
-        except Exception:
-            return {'status': False, 'detail': "Failed to execute query."}
-    
-    @post('/commit', summary="Commits changes to the database", description="Commits changes to the database, like conn.commit()", response_model=GenericResponse, tags=[tags.DANGEROUS])
-    def database_commit(self):
-        try:
-            self.db_manager.commit()
-            return {'status': True, 'detail': 'Committed changes to db.'}
-        except:
-            return {'status': False, 'detail': 'Failed to commit changes to db.'}
-    
-    @get('/transactions', summary="Gets all transaction", description="Gets all transaction", response_model=List[TransactionModel])
-    def get_transactions_all(self):
-        return [self.to_dict(t) for t in Transaction.get_all()]
-    
-    @get('/transactions/recent', summary="Gets recent transaction", description="Gets recent transaction", response_model=List[TransactionModel])
-    def get_transactions_recent(self, limit: int = 100, offset: int = 0):
-        limit = min(limit, 1000)
-        return [self.to_dict(t) for t in Transaction.get(orderby=Transaction.id.DESC, limit=(limit, offset))]
-    
-    @delete('/transactions/{id}', summary="Deletes transaction entry", description="Deletes transaction entry with given id", response_model=GenericResponse, tags=[tags.DANGEROUS])
-    def delete_transaction(self, id: int):
-        try:
-            transactions = list(Transaction.get(Transaction.id==id, limit=1))
-            if len(transactions) <= 0:
-                return {'status': False, 'detail': "No transaction found with id={}.".format(id)}
-            Transaction.delete(Transaction.id==id)
-            return {'status': True, 'detail': "Removed transaction.", 'detail_extra': {'transaction': transactions[0]}}
-        except Exception:
-            return {'status': False, 'detail': "Cannot remove transaction."}
-    
-    @get('/users', summary="Gets all users", description="Gets all users", response_model=List[UserModel])
-    def get_users_all(self, limit: int = 10, offset: int = 0):
-        limit = min(limit, 100)
-        return [self.to_dict(u) for u in User.get(limit=(limit, offset))]
-    
-    @get('/users/get', summary="Gets all users with given criteria", description="Gets all users with given criteria", response_model=List[UserModel])
-    def get_users(self, server: str, limit: int = 10, offset: int = 0):
-        limit = min(limit, 100)
-        return [self.to_dict(u) for u in User.get(User.server==server, limit=(limit, offset))]
-    
-    @post('/users/create', summary="Creates a user entry", description="Creates a user entry", response_model=GenericResponse)
-    def create_user(self, user: UserInModel):
-        try:
-            if len(list(User.get(User.server==user.server, User.identifier==user.identifier))) > 0:
-                return {'status': False, 'detail': "User already exists."}
-            self.db_manager.insert(User(user.dict()))
-            users = list(User.get(User.server==user.server, User.identifier==user.identifier))
-            data = {'status': True, 'detail':'Created a user entry'}
-            if len(users) > 0:
-                data.update({'detail_extra': {'user': users[0].to_dict()}})
-            return data
-        except Exception:
-            return {'status': False, 'detail': "User creation failed."}
-    
-    @delete('/users/{id}', summary="Deletes user entry", description="Deletes user entry with given id", response_model=GenericResponse, tags=[tags.DANGEROUS])
-    def delete_user(self, id: int):
-        try:
-            users = list(User.get(User.id==id, limit=1))
-            if len(users) <= 0:
-                return {'status': False, 'detail': "No user found with id={}.".format(id)}
-            User.delete(User.id==id)
-            return {'status': True, 'detail': "Removed user.", 'detail_extra': {'user': users[0]}}
-        except Exception:
-            return {'status': False, 'detail': "Cannot remove user."}
+from datetime import datetime
+from typing import List, Literal, Optional
+import csv
+import io
+from itertools import islice
+import json
+
+from fastapi import HTTPException, status
+from fastapi.responses import Response, StreamingResponse
+from fastapi_class.decorators import get, post, put, delete
+
+from api_template.base.database.models.base import Model
+import analytics
+from search import SEARCH_COLUMNS, TransactionSearch
+from database import SynapsisDB, Transaction, TransactionFilter, TransactionPager, User
+
+from .base import BaseAPIRouter
+from .models import GenericResponse, UserInModel, UserModel, TransactionModel, TransactionPageModel, TransactionSearchModel
+from .tags import tags
+
+
+class DatabaseRouter(BaseAPIRouter):
+    ROUTE_PREFIX = '/database'
+    TAGS = [tags.DATABASE]
+    def __init__(self, api, app):
+        super().__init__(api, app)
+        self.db_manager: 'SynapsisDB' = self.app.database_manager
+    
+    def to_dict(self, obj: Model):
+        if isinstance(obj, Transaction):
+            dct = obj.to_dict()
+            dct['time'] = obj.time.timestamp() #type:ignore # it is there, just not detectable
+            return dct
+        elif isinstance(obj, User):
+            return obj.to_dict()
+    
+    @post('/query', summary="Executes query", description="Executes query. Returns data from fetchall (Really Unsafe).", tags=[tags.DANGEROUS])
+    def execute_query(self, query: str):
+        self.db_manager.execute(query)
+        return {'data': list(self.db_manager.cursor.fetchall())}
+    
+    @post('/query/select', summary="Executes a select query and returns all result", description="Executes a select query and returns all result, on a read-only connection in the split storage mode. Archived months are not in the database, pass partition as 'YYYY-MM' to query the archived month instead.", response_model=List[dict], tags=[tags.DANGEROUS])
+    def query_select(self, query: str, partition: Optional[str] = None):
+        if partition is not None:
+            try:
+                reader = self.app.archive.get_partition(datetime.strptime(partition, '%Y-%m')) if self.app.archive is not None else None
+            except ValueError:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="partition must be 'YYYY-MM'.")
+            if reader is None:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="{} is not archived.".format(partition))
+            return reader.select(query)
+        if self.db_manager.reader is not None:
+            return self.db_manager.reader.select(query)
+        return list(self.db_manager.select(query))
+    
+    @post('/query/delete', summary="Executes a delete query", description="Executes a delete query.", response_model=GenericResponse, tags=[tags.DANGEROUS])
+    def query_delete(self, query: str):
+        try:
+            self.db_manager.execute(query)
+            return {'status': True, 'detail': "Delete query executed."}
+        except Exception:
+            return {'status': False, 'detail': "Failed to execute query."}
+    
+    @post('/commit', summary="Commits changes to the database", description="Commits changes to the database, like conn.commit()", response_model=GenericResponse, tags=[tags.DANGEROUS])
+    def database_commit(self):
+        try:
+            self.db_manager.commit()
+            return {'status': True, 'detail': 'Committed changes to db.'}
+        except:
+            return {'status': False, 'detail': 'Failed to commit changes to db.'}
+    
+    @get('/storage', summary="Gets the storage mode and read pool statistics", description="Gets the storage mode, and the read pool's query count, average duration and recent slow queries.", response_model=dict)
+    def get_storage_info(self):
+        return self.db_manager.get_info()
+    
+    @get('/stats', summary="Gets transaction stats", description="Gets the count, success count and execution durations (sum, min, max, average, approximate p50/p95) of the transactions, grouped by a comma separated subset of day, hour, automator, product_spec and device. Days are 'YYYY-MM-DD', inclusive, start_day defaults to the last database.rollups.default_stats_days days. Percentiles can be left out, they are slower to compute. Read from the rollups, not the transactions.", response_model=List[dict])
+    def get_stats(self, group_by: str = 'automator', start_day: Optional[str] = None, end_day: Optional[str] = None, 
+                  automator: Optional[str] = None, product_spec: Optional[str] = None, device: Optional[str] = None, percentiles: bool = True):
+        if self.app.rollups is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction rollups are disabled.")
+        try:
+            return self.app.rollups.get_stats([dimension.strip() for dimension in group_by.split(',') if dimension.strip()], start_day, end_day, automator, product_spec, device, percentiles)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+    
+    @put('/stats/rebuild', summary="Rebuilds the transaction stats", description="Recomputes the rollups from every transaction. Holds the database's write lock until done.", response_model=GenericResponse, tags=[tags.DANGEROUS])
+    def rebuild_stats(self):
+        if self.app.rollups is None:
+            return {'status': False, 'detail': "Transaction rollups are disabled."}
+        total = self.app.rollups.rebuild(self.app.archive.get_filenames() if self.app.archive is not None else ())
+        return {'status': True, 'detail': "Rebuilt the stats from {} transactions.".format(total)}
+    
+    @get('/archive', summary="Gets the archived months", description="Gets the months of transactions moved out of the transactions table into monthly partition files.", response_model=dict)
+    def get_archive_info(self):
+        if self.app.archive is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="The transaction archive is disabled.")
+        return self.app.archive.get_info()
+    
+    @put('/archive/rollover', summary="Rolls the transactions over into the archive", description="Moves the transactions older than the hot months into their monthly partitions now, instead of at the next check.", response_model=GenericResponse, tags=[tags.DANGEROUS])
+    def rollover_archive(self):
+        if self.app.archive is None:
+            return {'status': False, 'detail': "The transaction archive is disabled."}
+        return {'status': True, 'detail': "Moved {} transactions into the archive.".format(self.app.archive.rollover())}
+    
+    @get('/retention', summary="Gets the retention state", description="Gets the retention rules, the size and free space of the database file, and the rows deleted and bytes reclaimed so far and by the last pass.", response_model=dict)
+    def get_retention_info(self):
+        if self.app.retention is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Retention is disabled.")
+        return self.app.retention.get_info()
+    
+    @put('/retention/run', summary="Runs a retention pass", description="Deletes the expired rows and vacuums now, instead of at the next check. Deletes in small batches, so results keep being written meanwhile.", response_model=dict, tags=[tags.DANGEROUS])
+    def run_retention(self):
+        if self.app.retention is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Retention is disabled.")
+        return self.app.retention.run_once()
+    
+    @get('/transactions', summary="Gets all transaction", description="Gets all transaction, archived months included. Prefer /transactions/export, which streams them.", response_model=List[TransactionModel])
+    def get_transactions_all(self):
+        return [self.to_dict(Transaction.from_row(row)) for row in self.get_pager('id', False, None, None, None, None, None).iterate()]
+    
+    @get('/transactions/recent', summary="Gets recent transaction", description="Gets recent transaction, newest first, archived months included.", response_model=List[TransactionModel])
+    def get_transactions_recent(self, limit: int = 100, offset: int = 0):
+        limit = min(limit, 1000)
+        pager = self.get_pager('id', True, None, None, None, None, None)
+        return [self.to_dict(Transaction.from_row(row)) for row in islice(pager.iterate(min(limit + offset, 1000)), offset, offset + limit)]
+    
+    def get_pager(self, order_by: str, descending: bool, start: Optional[float], end: Optional[float], automator: Optional[str], number: Optional[str], success: Optional[bool]):
+        filters = TransactionFilter(start=start, end=end, automator=automator, number=number, success=success)
+        partitions = self.app.archive.get_partitions(start, end) if self.app.archive is not None else ()
+        return TransactionPager(self.db_manager.get_read_pool(), filters, order_by=order_by, descending=descending, partitions=partitions)
+    
+    @get('/transactions/page', summary="Gets a page of transactions", description="Gets a page of the transactions matching the filters, paginated by the key of the last row instead of an offset. Pass the returned next cursor as after to get the next page.", response_model=TransactionPageModel)
+    def get_transactions_page(self, after: Optional[str] = None, limit: int = 100, order_by: Literal['id', 'time'] = 'id', descending: bool = False, 
+                              start: Optional[float] = None, end: Optional[float] = None, automator: Optional[str] = None, number: Optional[str] = None, success: Optional[bool] = None):
+        pager = self.get_pager(order_by, descending, start, end, automator, number, success)
+        try:
+            rows, cursor = pager.page(after, min(limit, 1000))
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        return {'transactions': [self.to_dict(Transaction.from_row(row)) for row in rows], 'next': cursor}
+    
+    @get('/transactions/export', summary="Exports transactions as NDJSON or CSV", description="Streams every transaction matching the filters as NDJSON or CSV, read page by page, so exports of any size run in constant memory.")
+    def export_transactions(self, format: Literal['ndjson', 'csv'] = 'ndjson', order_by: Literal['id', 'time'] = 'id', descending: bool = False, 
+                            start: Optional[float] = None, end: Optional[float] = None, automator: Optional[str] = None, number: Optional[str] = None, success: Optional[bool] = None):
+        pager = self.get_pager(order_by, descending, start, end, automator, number, success)
+        fields = list(TransactionModel.__fields__.keys())
+        
+        def ndjson():
+            for row in pager.iterate():
+                yield json.dumps(self.to_dict(Transaction.from_row(row))) + '\n'
+        
+        def csv_rows():
+            buffer = io.StringIO()
+            writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            for row in pager.iterate():
+                writer.writerow(self.to_dict(Transaction.from_row(row)))
+                if buffer.tell() >= 64*1024:
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue()
+        
+        if format == 'csv':
+            return StreamingResponse(csv_rows(), media_type='text/csv', headers={'Content-Disposition': 'attachment; filename="transactions.csv"'})
+        return StreamingResponse(ndjson(), media_type='application/x-ndjson')
+    
+    @get('/transactions/search', summary="Searches transactions", description="Searches the refID, number, description and error of transactions, archived months included, for every whitespace separated term as a substring of at least 3 characters. Results are ranked best first, each month against its own term statistics, pass the returned next as offset for the next page.", response_model=TransactionSearchModel)
+    def search_transactions(self, query: str, fields: str = ','.join(SEARCH_COLUMNS), limit: int = 50, offset: int = 0):
+        partitions = self.app.archive.get_partitions() if self.app.archive is not None else ()
+        try:
+            rows, next_offset = TransactionSearch(self.db_manager.get_read_pool(), partitions).search(query, [f.strip() for f in fields.split(',') if f.strip()], min(limit, 1000), offset)
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        return {'transactions': [{**self.to_dict(Transaction.from_row(row)), 'rank': rank} for row, rank in ((row, row.pop('rank')) for row in rows)], 'next': next_offset}
+    
+    @get('/transactions/lookup', summary="Looks up transactions by refID or number", description="Gets the transactions with exactly the given refID or number, archived months included, newest first.", response_model=List[TransactionModel])
+    def lookup_transactions(self, refID: Optional[str] = None, number: Optional[str] = None, limit: int = 50):
+        partitions = self.app.archive.get_partitions() if self.app.archive is not None else ()
+        try:
+            rows = TransactionSearch(self.db_manager.get_read_pool(), partitions).lookup(refID, number, min(limit, 1000))
+        except ValueError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc))
+        return [self.to_dict(Transaction.from_row(row)) for row in rows]
+    
+    @get('/transactions/columnar', summary="Exports transactions in a columnar format", description="Exports the transactions matching the filters as NumPy arrays (.npz) or an Arrow IPC file, with automator, product_spec, device and error dictionary encoded and time as epoch seconds. Loaded by analytics.TransactionColumns for reports.")
+    def export_transactions_columnar(self, format: Literal['npz', 'arrow'] = 'npz', start: Optional[float] = None, end: Optional[float] = None, 
+                                     automator: Optional[str] = None, number: Optional[str] = None, success: Optional[bool] = None):
+        if format == 'arrow' and analytics.pyarrow is None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="pyarrow is not installed, export as npz instead.")
+        pager = self.get_pager('id', False, start, end, automator, number, success)
+        columns = analytics.TransactionColumns.from_rows(pager.iterate())
+        media_type = 'application/vnd.apache.arrow.file' if format == 'arrow' else 'application/octet-stream'
+        return Response(columns.to_bytes(format), media_type=media_type, headers={'Content-Disposition': 'attachment; filename="transactions.{}"'.format(format)})
+    
+    @get('/transactions/report', summary="Reports on transactions", description="Computes a report over the transactions matching the filters: hourly throughput and success rate, execution duration percentiles or failures per error, grouped by comma separated columns of automator, product_spec and device.")
+    def get_transactions_report(self, report: Literal['throughput', 'durations', 'failures'] = 'throughput', by: str = 'automator', start: Optional[float] = None, end: Optional[float] = None, 
+                                automator: Optional[str] = None, number: Optional[str] = None, success: Optional[bool] = None):
+        by = [name.strip() for name in by.split(',') if name.strip()]
+        if any(name not in analytics.DICTIONARY_COLUMNS[:-1] for name in by):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Can only group by {}.".format(', '.join(analytics.DICTIONARY_COLUMNS[:-1])))
+        columns = analytics.TransactionColumns.from_rows(self.get_pager('id', False, start, end, automator, number, success).iterate())
+        return {'throughput': analytics.hourly_throughput, 'durations': analytics.duration_percentiles, 'failures': analytics.failure_breakdown}[report](columns, by)
+    
+    @delete('/transactions/{id}', summary="Deletes transaction entry", description="Deletes transaction entry with given id. Archived transactions are read-only, their ids get a 404.", response_model=GenericResponse, tags=[tags.DANGEROUS])
+    def delete_transaction(self, id: int):
+        try:
+            transactions = list(Transaction.get(Transaction.id==id, limit=1))
+            if len(transactions) <= 0:
+                partition = self.app.archive.find(id) if self.app.archive is not None else None
+                if partition is not None:
+                    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Transaction id={} is archived in {}, archived transactions are read-only.".format(id, partition))
+                return {'status': False, 'detail': "No transaction found with id={}.".format(id)}
+            Transaction.delete(Transaction.id==id)
+            return {'status': True, 'detail': "Removed transaction.", 'detail_extra': {'transaction': transactions[0]}}
+        except HTTPException:
+            raise
+        except Exception:
+            return {'status': False, 'detail': "Cannot remove transaction."}
+    
+    @get('/users', summary="Gets all users", description="Gets all users", response_model=List[UserModel])
+    def get_users_all(self, limit: int = 10, offset: int = 0):
+        limit = min(limit, 100)
+        return [self.to_dict(u) for u in User.get(limit=(limit, offset))]
+    
+    @get('/users/get', summary="Gets all users with given criteria", description="Gets all users with given criteria", response_model=List[UserModel])
+    def get_users(self, server: str, limit: int = 10, offset: int = 0):
+        limit = min(limit, 100)
+        return [self.to_dict(u) for u in User.get(User.server==server, limit=(limit, offset))]
+    
+    @post('/users/create', summary="Creates a user entry", description="Creates a user entry", response_model=GenericResponse)
+    def create_user(self, user: UserInModel):
+        try:
+            if len(list(User.get(User.server==user.server, User.identifier==user.identifier))) > 0:
+                return {'status': False, 'detail': "User already exists."}
+            self.db_manager.insert(User(user.dict()))
+            users = list(User.get(User.server==user.server, User.identifier==user.identifier))
+            data = {'status': True, 'detail':'Created a user entry'}
+            if len(users) > 0:
+                data.update({'detail_extra': {'user': users[0].to_dict()}})
+            return data
+        except Exception:
+            return {'status': False, 'detail': "User creation failed."}
+    
+    @delete('/users/{id}', summary="Deletes user entry", description="Deletes user entry with given id", response_model=GenericResponse, tags=[tags.DANGEROUS])
+    def delete_user(self, id: int):
+        try:
+            users = list(User.get(User.id==id, limit=1))
+            if len(users) <= 0:
+                return {'status': False, 'detail': "No user found with id={}.".format(id)}
+            User.delete(User.id==id)
+            return {'status': True, 'detail': "Removed user.", 'detail_extra': {'user': users[0]}}
+        except Exception:
+            return {'status': False, 'detail': "Cannot remove user."}
@@ -1,95 +1,132 @@
-from typing import Dict, List, Literal
-import io
-
-from fastapi import HTTPException, status
-from fastapi.responses import StreamingResponse
-from fastapi_class.decorators import get, post, put
-
-from automators.device_manager import DeviceManager, RequestableDevice
-
-from .base import BaseAPIRouter
-from .models import GenericResponse, RequestModel, DeviceModel
-from .utils import recursive_auto_resolve
-from .tags import tags
-
-
-class DeviceRouter(BaseAPIRouter):
-    ROUTE_PREFIX = '/devices'
-    TAGS = [tags.DEVICE]
-    def __init__(self, api, app):
-        super().__init__(api, app)
-        self.device_manager: 'DeviceManager' = self.app.device_manager
-    
-    def get_device_or_raise_error(self, device_serial: str) -> RequestableDevice:
-        device = self.device_manager.get_device(device_serial)
-        if device is None:
-            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No such device is found.")
-        return device
-    
-    @get("/list", summary="Lists all connected devices", description="Lists all connected devices")
-    def get_devices(self):
-        return [device.serial for device in self.device_manager.devices]
-    
-    @get("/list_processing", summary="Lists all connected devices currently processing a request with the request", description="Lists all connected devices currently processing a request. Returns a dict object {device:request}.", response_model=Dict[str, RequestModel])
-    def get_processing(self):
-        return {d.serial:d.current_request.dict for d in self.device_manager.devices if d.current_request is not None}
-    
-    @get("/current_requests", summary="Lists all requests currently being processed", description="Lists all requests currently being processed", response_model=List[RequestModel])
-    def get_current_requests(self):
-        return [req.dict for req in self.device_manager.current_requests]
-    
-    @put("/adb", summary="Executes a command to adb", description="Executes a command to adb", response_model=GenericResponse, tags=[tags.DANGEROUS])
-    def execute_adb_command(self, command: str):
-        result = self.device_manager.adb_command(*command.split(' '))
-        if result.returncode == 0:
-            return {'status': True, 'detail': "Successfully executed given adb command.", 'detail_extra': result.__dict__}
-        return {'status': False, 'detail': "Failed to execute given adb command.", 'detail_extra': result.__dict__}
-    
-    @get("/{device}", summary="Gets information about given device", description="Gets information about given device", response_model=DeviceModel)
-    def get_device_info(self, device: str, detailed: bool = False):
-        device_obj = self.get_device_or_raise_error(device)
-        return recursive_auto_resolve(device_obj.get_info(detailed=detailed))
-    
-    @get("/{device}/screencap", summary="Gets the screen capture of the device in png", description="Gets the screen capture of the device in png")
-    def get_device_screencap(self, device: str):
-        device_obj = self.get_device_or_raise_error(device)
-        return StreamingResponse(io.BytesIO(device_obj.screencap()), media_type="image/png")
-    
-    @get("/{device}/hierarchy", summary="Gets the UI Hierarchy of the device", description="Gets the UI Hierarchy of the device")
-    def get_device_ui_hierarchy(self, device:str, compressed: bool = False):
-        device_obj = self.get_device_or_raise_error(device)
-        return StreamingResponse(io.StringIO(device_obj.getUI(compressed=compressed, return_str=True)), media_type="text/xml")
-    
-    @post("/{device}/shell", summary="Executes shell in device, like adb shell", description="Executes shell in device, like adb shell", tags=[tags.DANGEROUS])
-    def device_shell(self, device: str, command: str):
-        device_obj = self.get_device_or_raise_error(device)
-        return {'output': device_obj.shell(command)}
-    
-    @put("/{device}/toggle_stop", summary="Toggles the device stop flag", description="Toggles the device stop flag", response_model=DeviceModel)
-    def stop_device(self, device: str):
-        device_obj = self.get_device_or_raise_error(device)
-        data = {'running': device_obj.stop}
-        if not device_obj.stop:
-            data.update(device_obj.get_info())
-        device_obj.stop^=True
-        if not device_obj.stop:
-            data.update(device_obj.get_info())
-        return recursive_auto_resolve(data)
-    
-    @put("/{device}/uiautomator2", summary="Modify the uiautomator2 of given device with an action", description="Modify the uiautomator2 of given device with an action", response_model=GenericResponse, tags=[tags.DANGEROUS])
-    def modify_device_u2(self, device: str, action: Literal['install', 'uninstall', 'start', 'stop']):
-        device_obj = self.get_device_or_raise_error(device)
-        detail = {}
-        if action == 'install':
-            device_obj.u2_install()
-            detail['u2_installed'] = device_obj.refresh_u2_installed()
-        elif action == 'uninstall':
-            device_obj.u2_uninstall()
-            detail['u2_installed'] = device_obj.refresh_u2_installed()
-        elif action == 'start':
-            device_obj.u2_start()
-        elif action == 'stop':
-            device_obj.u2_stop()
-        else:
-            return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Action does not exist.")
-        return {'status': True, 'detail': "'{}' Action completed successfully.".format(action), 'detail_extra': detail}
+from typing import Dict, List, Literal
+import io
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from fastapi_class.decorators import get, post, put
+
+from automators.device_manager import DeviceManager, RequestableDevice
+from automators.plugins.base import AutomatorPlugin
+
+from .base import BaseAPIRouter
+from .models import GenericResponse, RequestModel, DeviceModel
+from .utils import recursive_auto_resolve
+from .tags import tags
+
+
+class DeviceRouter(BaseAPIRouter):
+    ROUTE_PREFIX = '/devices'
+    TAGS = [tags.DEVICE]
+    def __init__(self, api, app):
+        super().__init__(api, app)
+        self.device_manager: 'DeviceManager' = self.app.device_manager
+    
+    def get_device_or_raise_error(self, device_serial: str) -> RequestableDevice:
+        device = self.device_manager.get_device(device_serial)
+        if device is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No such device is found.")
+        return device
+    
+    @get("/list", summary="Lists all connected devices", description="Lists all connected devices")
+    def get_devices(self):
+        return [device.serial for device in self.device_manager.devices]
+    
+    @get("/list_processing", summary="Lists all connected devices currently processing a request with the request", description="Lists all connected devices currently processing a request. Returns a dict object {device:request}.", response_model=Dict[str, RequestModel])
+    def get_processing(self):
+        return {d.serial:d.current_request.dict for d in self.device_manager.devices if d.current_request is not None}
+    
+    @get("/registry", summary="Lists known devices with their lifecycle states", description="Lists every device known to the device registry, including disconnected ones, with their lifecycle states")
+    def get_registry(self):
+        return [{**entry, 'endpoint': endpoint.name} for endpoint in self.device_manager.endpoints for entry in endpoint.client.registry.get_info()]
+    
+    @get("/endpoints", summary="Lists ADB endpoints with their health", description="Lists every ADB server devices are pooled from, with its health, consecutive failures and device count")
+    def get_endpoints(self):
+        return [endpoint.get_info() for endpoint in self.device_manager.endpoints]
+    
+    @put("/endpoints/{endpoint}/restart", summary="Restarts the ADB server of an endpoint", description="Restarts the ADB server of an endpoint, subject to its restart cooldown", response_model=GenericResponse, tags=[tags.DANGEROUS])
+    def restart_endpoint(self, endpoint: str):
+        endpoint_obj = self.device_manager.get_endpoint(endpoint)
+        if endpoint_obj is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No such endpoint is found.")
+        if endpoint_obj.restart():
+            self.device_manager.devices_changed.set()
+            return {'status': True, 'detail': "Restarted ADB endpoint '{}'.".format(endpoint), 'detail_extra': endpoint_obj.get_info()}
+        return {'status': False, 'detail': "Failed to restart ADB endpoint '{}', it may be remote without a restart command or in its restart cooldown.".format(endpoint), 'detail_extra': endpoint_obj.get_info()}
+    
+    @get("/rate_controllers", summary="Lists provider rate controllers", description="Lists the adaptive dispatch rate of every (automator, account)")
+    def get_rate_controllers(self):
+        return AutomatorPlugin.RATE_CONTROLLERS.get_info()
+    
+    @get("/supervisor", summary="Lists device workers and their restart backoffs", description="Lists whether each device worker is running, its consecutive failures and the seconds left until it may be restarted")
+    def get_supervisor(self):
+        return self.device_manager.supervisor.get_info()
+    
+    @get("/worker_processes", summary="Lists worker processes", description="Lists the worker processes and their devices, empty unless the device manager runs in process worker mode")
+    def get_worker_processes(self):
+        return self.device_manager.worker_pool.get_info() if self.device_manager.worker_pool is not None else []
+    
+    @get("/current_requests", summary="Lists all requests currently being processed", description="Lists all requests currently being processed", response_model=List[RequestModel])
+    def get_current_requests(self):
+        return [req.dict for req in self.device_manager.current_requests]
+    
+    @put("/adb", summary="Executes a command to adb", description="Executes a command to adb", response_model=GenericResponse, tags=[tags.DANGEROUS])
+    def execute_adb_command(self, command: str):
+        result = self.device_manager.adb_command(*command.split(' '))
+        if result.returncode == 0:
+            return {'status': True, 'detail': "Successfully executed given adb command.", 'detail_extra': result.__dict__}
+        return {'status': False, 'detail': "Failed to execute given adb command.", 'detail_extra': result.__dict__}
+    
+    @get("/{device}", summary="Gets information about given device", description="Gets information about given device", response_model=DeviceModel)
+    def get_device_info(self, device: str, detailed: bool = False):
+        device_obj = self.get_device_or_raise_error(device)
+        return recursive_auto_resolve(device_obj.get_info(detailed=detailed))
+    
+    @get("/{device}/screencap", summary="Gets the screen capture of the device in png", description="Gets the screen capture of the device in png")
+    def get_device_screencap(self, device: str):
+        device_obj = self.get_device_or_raise_error(device)
+        return StreamingResponse(io.BytesIO(device_obj.screencap()), media_type="image/png")
+    
+    @get("/{device}/hierarchy", summary="Gets the UI Hierarchy of the device", description="Gets the UI Hierarchy of the device")
+    def get_device_ui_hierarchy(self, device:str, compressed: bool = False):
+        device_obj = self.get_device_or_raise_error(device)
+        return StreamingResponse(io.StringIO(device_obj.getUI(compressed=compressed, return_str=True)), media_type="text/xml")
+    
+    @post("/{device}/shell", summary="Executes shell in device, like adb shell", description="Executes shell in device, like adb shell", tags=[tags.DANGEROUS])
+    def device_shell(self, device: str, command: str):
+        device_obj = self.get_device_or_raise_error(device)
+        return {'output': device_obj.shell(command)}
+    
+    @put("/{device}/toggle_stop", summary="Toggles the device stop flag", description="Toggles the device stop flag", response_model=DeviceModel)
+    def stop_device(self, device: str):
+        device_obj = self.get_device_or_raise_error(device)
+        data = {'running': device_obj.stop}
+        if not device_obj.stop:
+            data.update(device_obj.get_info())
+        device_obj.stop^=True
+        if not device_obj.stop:
+            data.update(device_obj.get_info())
+        return recursive_auto_resolve(data)
+    
+    @put("/{device}/reset_backoff", summary="Resets the restart backoff of a device", description="Forgets the consecutive failures of a device, so it is restarted on the next device refresh", response_model=GenericResponse)
+    def reset_device_backoff(self, device: str):
+        self.device_manager.supervisor.reset(device)
+        self.device_manager.devices_changed.set()
+        return {'status': True, 'detail': "Reset the restart backoff of device '{}'.".format(device), 'detail_extra': None}
+    
+    @put("/{device}/uiautomator2", summary="Modify the uiautomator2 of given device with an action", description="Modify the uiautomator2 of given device with an action", response_model=GenericResponse, tags=[tags.DANGEROUS])
+    def modify_device_u2(self, device: str, action: Literal['install', 'uninstall', 'start', 'stop']):
+        device_obj = self.get_device_or_raise_error(device)
+        detail = {}
+        if action == 'install':
+            device_obj.u2_install()
+            detail['u2_installed'] = device_obj.refresh_u2_installed()
+        elif action == 'uninstall':
+            device_obj.u2_uninstall()
+            detail['u2_installed'] = device_obj.refresh_u2_installed()
+        elif action == 'start':
+            device_obj.u2_start()
+        elif action == 'stop':
+            device_obj.u2_stop()
+        else:
+            return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Action does not exist.")
+        return {'status': True, 'detail': "'{}' Action completed successfully.".format(action), 'detail_extra': detail}
@@ -1,54 +1,108 @@
-
-from typing import List
-
-from fastapi_class.decorators import get, post, put
-
-from data_structs import InteractibleRequest
-from server.dummy import DummyServer
-
-from .base import BaseAPIRouter
-from .models import RequestModel, GenericResponse
-from .tags import tags
-
-
-class MiddlewareRouter(BaseAPIRouter):
-    ROUTE_PREFIX = '/middleware'
-    TAGS = [tags.MIDDLEWARE]
-    def __init__(self, api, app):
-        super().__init__(api, app)
-        self.request_middleware = self.app.request_middleware
-        self.result_middleware = self.app.result_middleware
-        self.dummy_server = DummyServer()
-    
-    @get("/request/list", summary="Gets pending requests", description="Gets pending requests", response_model=List[RequestModel])
-    def list_request(self):
-        q = self.request_middleware.out_queue
-        return [req.dict for req in q.queue]
-    
-    @post("/request/create", summary="Creates a request", description="Creates a request", response_model=GenericResponse)
-    def create_request(self, request:RequestModel):
-        try:
-            q = self.request_middleware.out_queue
-            dummy_req = self.dummy_server.create_request()
-            new_request = InteractibleRequest(request.number, request.product_spec, request.automator, device='', server_request=dummy_req)
-            duplicate_status, opt_transaction = self.request_middleware.check_duplicate(new_request)
-            if duplicate_status == 'in_queue':
-                return {'status': False, 'detail': 'An existing request with the same parameters already exists.'}
-            elif duplicate_status == 'in_process':
-                return {'status': False, 'detail': 'An existing request with the same parameters is being processed.'}
-            elif duplicate_status == 'in_cached_result':
-                return {'status': False, 'detail': 'An existing request has been completed today.', 'detail_extra': {'transaction': opt_transaction.to_dict()}} # type: ignore
-            else:
-                self.request_middleware.out_queue.put(new_request)
-                return {'status': True, 'detail': 'Request {} created.'.format(new_request)}
-        except Exception as exc:
-            return {'status': False, 'detail': 'Exception<{}{}> caught when trying to create request.'.format(exc.__class__, exc.args)}
-    
-    @put("/request/delete", summary="Deletes the request given", description="Deletes the request given", response_model=GenericResponse)
-    def remove_request(self, request: RequestModel):
-        try:
-            q = self.request_middleware.out_queue
-            q.queue.remove(InteractibleRequest(request.number, request.product_spec, request.automator))
-            return {'status': True, 'detail': 'Removed corresponding request from request queue.'}
-        except ValueError:
-            return {'status': False, 'detail': 'Given request is not found in the request queue.'}
+
+from typing import List
+
+from fastapi_class.decorators import get, post, put
+
+from data_structs import InteractibleRequest
+from server.dummy import DummyServer
+
+from .base import BaseAPIRouter
+from .models import QuarantinedRequestModel, QueuedRequestModel, RequestModel, GenericResponse, UserScheduleModel
+from .tags import tags
+
+
+class MiddlewareRouter(BaseAPIRouter):
+    ROUTE_PREFIX = '/middleware'
+    TAGS = [tags.MIDDLEWARE]
+    def __init__(self, api, app):
+        super().__init__(api, app)
+        self.request_middleware = self.app.request_middleware
+        self.result_middleware = self.app.result_middleware
+        self.quarantine_queue = self.app.device_manager.quarantine_queue
+        self.dummy_server = DummyServer()
+    
+    @get("/request/list", summary="Gets pending requests", description="Gets pending requests in the order they would be dispatched", response_model=List[QueuedRequestModel])
+    def list_request(self):
+        q = self.request_middleware.out_queue
+        with q.mutex:
+            requests = list(q.queue)
+        get_policy = getattr(q, 'get_policy', None)
+        data = []
+        for position, req in enumerate(requests):
+            user_identifier = req.server_request.user_identifier if req.server_request is not None else ''
+            priority = get_policy(user_identifier).priority if get_policy is not None else 0
+            data.append({**req.dict, 'user_identifier': user_identifier, 'priority': priority, 'position': position})
+        return data
+    
+    @get("/request/schedule", summary="Gets per user scheduling state", description="Gets queued and in-flight counts, weights and priorities of users in the request queue", response_model=List[UserScheduleModel])
+    def get_schedule(self):
+        q = self.request_middleware.out_queue
+        if not hasattr(q, 'get_stats'):
+            return []
+        return [{'user_identifier': user, **stats} for user, stats in q.get_stats().items()]
+    
+    @post("/request/create", summary="Creates a request", description="Creates a request", response_model=GenericResponse)
+    def create_request(self, request:RequestModel):
+        try:
+            q = self.request_middleware.out_queue
+            dummy_req = self.dummy_server.create_request()
+            new_request = InteractibleRequest(request.number, request.product_spec, request.automator, device='', server_request=dummy_req)
+            duplicate_status, opt_transaction = self.request_middleware.check_duplicate(new_request)
+            if duplicate_status == 'in_queue':
+                return {'status': False, 'detail': 'An existing request with the same parameters already exists.'}
+            elif duplicate_status == 'in_process':
+                return {'status': False, 'detail': 'An existing request with the same parameters is being processed.'}
+            elif duplicate_status == 'in_cached_result':
+                return {'status': False, 'detail': 'An existing request has been completed today.', 'detail_extra': {'transaction': opt_transaction.to_dict()}} # type: ignore
+            else:
+                self.request_middleware.out_queue.put(new_request)
+                return {'status': True, 'detail': 'Request {} created.'.format(new_request)}
+        except Exception as exc:
+            return {'status': False, 'detail': 'Exception<{}{}> caught when trying to create request.'.format(exc.__class__, exc.args)}
+    
+    @put("/request/delete", summary="Deletes the request given", description="Deletes the request given", response_model=GenericResponse)
+    def remove_request(self, request: RequestModel):
+        try:
+            q = self.request_middleware.out_queue
+            q.queue.remove(InteractibleRequest(request.number, request.product_spec, request.automator))
+            return {'status': True, 'detail': 'Removed corresponding request from request queue.'}
+        except ValueError:
+            return {'status': False, 'detail': 'Given request is not found in the request queue.'}
+    
+    def pop_quarantined(self, request: RequestModel):
+        q = self.quarantine_queue
+        with q.mutex:
+            for req in list(q.queue):
+                if (req.number, req.product_spec, req.automator) == (request.number, request.product_spec, request.automator):
+                    q.queue.remove(req)
+                    return req
+        return None
+    
+    @get("/cluster", summary="Gets the cluster state", description="Gets the nodes, server leases and shared work queue counts of the cluster, null unless cluster mode is enabled")
+    def get_cluster(self):
+        return self.request_middleware.cluster.get_info() if self.request_middleware.cluster is not None else None
+    
+    @get("/quarantine/list", summary="Gets quarantined requests", description="Gets requests quarantined after failing too many times, with their exception history", response_model=List[QuarantinedRequestModel])
+    def list_quarantine(self):
+        q = self.quarantine_queue
+        with q.mutex:
+            requests = list(q.queue)
+        return [{**req.dict, 'user_identifier': req.server_request.user_identifier if req.server_request is not None else '', 
+                 'attempts': req.attempts, 'errors': req.errors} for req in requests]
+    
+    @put("/quarantine/retry", summary="Retries a quarantined request", description="Resets the attempts of a quarantined request and puts it back into the request queue", response_model=GenericResponse)
+    def retry_quarantined(self, request: RequestModel):
+        req = self.pop_quarantined(request)
+        if req is None:
+            return {'status': False, 'detail': 'Given request is not found in quarantine.'}
+        req.reset_attempts()
+        self.request_middleware.out_queue.put(req)
+        return {'status': True, 'detail': 'Request {} is put back into the request queue.'.format(req)}
+    
+    @put("/quarantine/delete", summary="Deletes a quarantined request", description="Deletes a quarantined request, which is then finished as failed", response_model=GenericResponse)
+    def remove_quarantined(self, request: RequestModel):
+        req = self.pop_quarantined(request)
+        if req is None:
+            return {'status': False, 'detail': 'Given request is not found in quarantine.'}
+        self.app.device_manager.discard_quarantined(req)
+        return {'status': True, 'detail': 'Removed corresponding request from quarantine.'}
@@ -1,69 +1,113 @@
-from typing import Dict, List, Union
-from pydantic import BaseModel
-
-from automators.data_structs import ExecFlag
-
-
-class GenericResponse(BaseModel):
-    status: bool
-    detail: str
-    detail_extra: Union[dict, None]
-
-
-class ConfigWrapper(BaseModel):
-    config: Union[dict, list, set, tuple, int, float, bool, None]
-
-
-class RequestModel(BaseModel):
-    number: str
-    product_spec: str
-    automator: str
-
-
-class TransactionModel(BaseModel):
-    id: int
-    number: str
-    product_spec: str
-    refID: str
-    time: float
-    description: Union[str, None]
-    error: Union[str, None]
-    automator: str
-    execution_duration: int
-
-
-class UserModel(BaseModel):
-    id: int
-    server: str
-    identifier: str
-
-
-class UserInModel(BaseModel):
-    server: str
-    identifier: str
-
-
-class DeviceModel(BaseModel):
-    serial: str
-    current_app: dict
-    battery_level: int
-    running: bool = True
-    current_request: Union[RequestModel, None]
-    u2_installed: bool
-    u2_info: Union[dict, None]
-
-
-class ProductMatcherModel(BaseModel):
-    name: str
-    description: Union[str, None]
-    price: str
-    exec_flag: ExecFlag
-
-
-class ProductModel(BaseModel):
-    matchers: List[ProductMatcherModel]
-    confirmation: Union[List[ProductMatcherModel], None]
-    location_near_bottom: bool = False
-
-
-ProductList = Dict[str, ProductModel]
+from typing import Dict, List, Union
+from pydantic import BaseModel
+
+from automators.data_structs import ExecFlag
+
+
+class GenericResponse(BaseModel):
+    status: bool
+    detail: str
+    detail_extra: Union[dict, None]
+
+
+class ConfigWrapper(BaseModel):
+    config: Union[dict, list, set, tuple, int, float, bool, None]
+
+
+class RequestModel(BaseModel):
+    number: str
+    product_spec: str
+    automator: str
+
+
+class QueuedRequestModel(RequestModel):
+    user_identifier: str
+    priority: int
+    position: int
+
+
+class QuarantinedRequestModel(RequestModel):
+    user_identifier: str
+    attempts: int
+    errors: List[dict]
+
+
+class UserScheduleModel(BaseModel):
+    user_identifier: str
+    queued: int
+    in_flight: int
+    virtual_time: float
+    eligible: bool
+    weight: int
+    priority: int
+    max_in_flight: int
+
+
+class TransactionModel(BaseModel):
+    id: int
+    number: str
+    product_spec: str
+    refID: str
+    time: float
+    description: Union[str, None]
+    error: Union[str, None]
+    automator: str
+    execution_duration: int
+    device: str = ''
+
+
+class TransactionPageModel(BaseModel):
+    transactions: List[TransactionModel]
+    next: Union[str, None]
+
+
+class TransactionSearchResultModel(TransactionModel):
+    rank: float
+
+
+class TransactionSearchModel(BaseModel):
+    transactions: List[TransactionSearchResultModel]
+    next: Union[int, None]
+
+
+class UserModel(BaseModel):
+    id: int
+    server: str
+    identifier: str
+    weight: int = 1
+    priority: int = 0
+    max_in_flight: int = 0
+
+
+class UserInModel(BaseModel):
+    server: str
+    identifier: str
+    weight: int = 1
+    priority: int = 0
+    max_in_flight: int = 0
+
+
+class DeviceModel(BaseModel):
+    serial: str
+    current_app: dict
+    battery_level: int
+    running: bool = True
+    current_request: Union[RequestModel, None]
+    u2_installed: bool
+    u2_info: Union[dict, None]
+
+
+class ProductMatcherModel(BaseModel):
+    name: str
+    description: Union[str, None]
+    price: str
+    exec_flag: ExecFlag
+
+
+class ProductModel(BaseModel):
+    matchers: List[ProductMatcherModel]
+    confirmation: Union[List[ProductMatcherModel], None]
+    location_near_bottom: bool = False
+
+
+ProductList = Dict[str, ProductModel]
@@ -1,111 +1,158 @@
-
-import time
-from queue import Queue
-from threading import Thread
-import logging
-
-from automators.data_structs import Config
-from automators.device_manager import DeviceManager
-from server.server_manager import ServerManager
-
-from api import API
-from database import SynapsisDB
-from data_structs import CallbackableQueue
-from middlewares import RequestMiddleware, ResultMiddleware
-
-logger = logging.getLogger(__name__)
-
-
-class App:
-    DATABASE_FILENAME = 'database.db'
-    KEEP_ALIVE_SLEEP_DURATION = 10
-    DUMMY_RUNTIME = 0
-    
-    CONFIG: Config
-    API_CLS = API
-    DEVICE_MANAGER_CLS = DeviceManager
-    SERVER_MANAGER_CLS = ServerManager
-    DATABASE_MANAGER_CLS = SynapsisDB # No configure method
-    REQUEST_MIDDLEWARE_CLS = RequestMiddleware
-    RESULT_MIDDLEWARE_CLS = ResultMiddleware
-    
-    def __init__(self):
-        self.requests_in = Queue()
-        self.requests_out = CallbackableQueue()
-        self.results_out = Queue()
-        self._stop = False
-        
-        cls = self.__class__
-        
-        logger.info("Initializing App...")
-        self.server_manager = cls.SERVER_MANAGER_CLS(self.requests_in)
-        self.device_manager = cls.DEVICE_MANAGER_CLS(self.requests_out, self.results_out)
-        self.database_manager = cls.DATABASE_MANAGER_CLS(self.__class__.DATABASE_FILENAME)
-        
-        self.request_middleware = cls.REQUEST_MIDDLEWARE_CLS(self.device_manager, self.requests_in, self.requests_out)
-        self.result_middleware = cls.RESULT_MIDDLEWARE_CLS(self.database_manager, self.results_out)
-        self.api = cls.API_CLS(self)
-        
-        self.runner_threads = { 'api': Thread(target=self.api.run, name='API-Thread', daemon=True), 
-                                'server_manager': Thread(target=self.server_manager.run, name='ServerManager-Thread', daemon=True),
-                                'device_manager': Thread(target=self.device_manager.run, name='DeviceManager-Thread', daemon=True), 
-                                'request_middleware': Thread(target=self.request_middleware.run, name='RequestMiddleware-Thread', daemon=True),
-                                'result_middleware': Thread(target=self.result_middleware.run, name='ResultMiddleware-Thread', daemon=True)}
-        logger.info("App Initialized.")
-    
-    @property
-    def stop(self):
-        return self._stop
-    
-    @stop.setter
-    def stop(self, value):
-        self._stop = value
-        [setattr(obj, 'stop', value) for obj in [self.server_manager, self.device_manager]]
-    
-    @classmethod
-    def configure(cls, config: Config):
-        logger.info("Configuring App...")
-        cls.CONFIG = config
-        cls.DATABASE_FILENAME = config.get('database_filename', cls.DATABASE_FILENAME)
-        cls.KEEP_ALIVE_SLEEP_DURATION = config.get('keep_alive_sleep_duration', cls.KEEP_ALIVE_SLEEP_DURATION)
-        cls.DUMMY_RUNTIME = config.get('dummy_runtime', cls.DUMMY_RUNTIME)
-        cls.API_CLS.configure(config['api'])
-        cls.SERVER_MANAGER_CLS.configure(config['server_manager'])
-        cls.DEVICE_MANAGER_CLS.configure(config['device_manager'])
-        cls.REQUEST_MIDDLEWARE_CLS.configure(config['middlewares'])
-        cls.RESULT_MIDDLEWARE_CLS.configure(config['middlewares'])
-    
-    def dummy_runner(self, runtime: int):
-        logger.info("Setting up dummy server.".format(runtime))
-        dummy_queue = Queue()
-        dummy_server = self.__class__.SERVER_MANAGER_CLS(dummy_queue)
-        dummy_runner_thread = Thread(target=dummy_server.run, name='DummyServer-Thread', daemon=True)
-        print("Starting dummy server manager.")
-        logger.info("Dummy server has been set up. Running dummy server...")
-        dummy_runner_thread.start()
-        time.sleep(runtime)
-        print("Stopping dummy server manager.")
-        logger.info("Dummy runtime fulfilled. Stopping dummy server...")
-        return
-    
-    def run_dummy(self, runtime: int):
-        Thread(self.dummy_runner(runtime)).run()
-    
-    def run(self):
-        if self.__class__.DUMMY_RUNTIME > 0:
-            logger.info("Dummy Runtime={} is greater than 0. Initializing dummy.".format(self.__class__.DUMMY_RUNTIME))
-            self.run_dummy(self.__class__.DUMMY_RUNTIME)
-        logger.info("Starting app...")
-        
-        for comp_name, thread in self.runner_threads.items():
-            logger.info("Starting runner thread for Component<'{}'>".format(comp_name))
-            thread.start()
-        logger.info("All component has been started, starting keep alive.")
-        while True: # Keep alive loop
-            try:
-                time.sleep(self.__class__.KEEP_ALIVE_SLEEP_DURATION)
-                if self.stop:
-                    logger.info("App is stopped by signal.")
-                    return
-            except KeyboardInterrupt:
-                return
+
+import time
+from queue import Queue
+from threading import Thread
+import logging
+
+from automators.data_structs import Config
+from automators.device_manager import DeviceManager
+from server.server_manager import ServerManager
+
+from api import API
+from archive import TransactionArchive
+from history import HistoryLog
+from cluster import ClusterBridge
+from database import SynapsisDB
+import migrations
+from data_structs import FairQueue
+from middlewares import RequestMiddleware, ResultMiddleware
+from rollups import TransactionRollups
+from retention import RetentionEngine, enable_incremental_vacuum
+from search import TransactionSearch
+
+logger = logging.getLogger(__name__)
+
+
+class App:
+    DATABASE_FILENAME = 'database.db'
+    KEEP_ALIVE_SLEEP_DURATION = 10
+    DUMMY_RUNTIME = 0
+    REQUESTS_IN_MAXSIZE = 0 # 0 for an unbounded queue
+    
+    CONFIG: Config
+    API_CLS = API
+    DEVICE_MANAGER_CLS = DeviceManager
+    SERVER_MANAGER_CLS = ServerManager
+    DATABASE_MANAGER_CLS = SynapsisDB # No configure method
+    REQUEST_MIDDLEWARE_CLS = RequestMiddleware
+    RESULT_MIDDLEWARE_CLS = ResultMiddleware
+    CLUSTER_BRIDGE_CLS = ClusterBridge
+    ROLLUPS_CLS = TransactionRollups
+    ARCHIVE_CLS = TransactionArchive
+    SEARCH_CLS = TransactionSearch
+    RETENTION_CLS = RetentionEngine
+    HISTORY_CLS = HistoryLog
+    
+    def __init__(self):
+        self.requests_in = Queue(self.__class__.REQUESTS_IN_MAXSIZE)
+        self.requests_out = FairQueue()
+        self.results_out = Queue()
+        self._stop = False
+        
+        cls = self.__class__
+        
+        logger.info("Initializing App...")
+        self.device_manager = cls.DEVICE_MANAGER_CLS(self.requests_out, self.results_out)
+        self.cluster = cls.CLUSTER_BRIDGE_CLS(self.device_manager, self.requests_out) if cls.CLUSTER_BRIDGE_CLS.ENABLED else None
+        self.server_manager = cls.SERVER_MANAGER_CLS(self.requests_in, coordinator=self.cluster.coordinator if self.cluster is not None else None)
+        self.database_manager = cls.DATABASE_MANAGER_CLS(self.__class__.DATABASE_FILENAME) # on shared storage in cluster mode, the transactions are shared
+        self.database_manager.flush() # tables are created, migrations run on their own connection
+        migrations.migrate(cls.DATABASE_FILENAME, cls.DATABASE_MANAGER_CLS.TABLES)
+        if cls.RETENTION_CLS.ENABLED and cls.RETENTION_CLS.ENABLE_INCREMENTAL_VACUUM:
+            enable_incremental_vacuum(cls.DATABASE_FILENAME, cls.RETENTION_CLS.BUSY_TIMEOUT) # once, rewrites the file
+        self.archive = cls.ARCHIVE_CLS(cls.DATABASE_FILENAME) if cls.ARCHIVE_CLS.ENABLED else None
+        self.history = cls.HISTORY_CLS() if cls.HISTORY_CLS.ENABLED else None
+        self.retention = cls.RETENTION_CLS(cls.DATABASE_FILENAME, self.archive, cls.CONFIG.get('logging', Config()).get('filename', None)) if cls.RETENTION_CLS.ENABLED else None
+        self.rollups = cls.ROLLUPS_CLS(cls.DATABASE_FILENAME) if cls.ROLLUPS_CLS.ENABLED else None
+        if self.rollups is not None and self.rollups.created: # backfills the history from before the rollups
+            self.rollups.rebuild(self.archive.get_filenames() if self.archive is not None else ())
+        
+        self.request_middleware = cls.REQUEST_MIDDLEWARE_CLS(self.device_manager, self.requests_in, self.requests_out, cluster=self.cluster)
+        self.result_middleware = cls.RESULT_MIDDLEWARE_CLS(self.database_manager, self.results_out, cluster=self.cluster, rollups=self.rollups, history=self.history)
+        self.api = cls.API_CLS(self)
+        
+        self.runner_threads = { 'api': Thread(target=self.api.run, name='API-Thread', daemon=True), 
+                                'server_manager': Thread(target=self.server_manager.run, name='ServerManager-Thread', daemon=True),
+                                'device_manager': Thread(target=self.device_manager.run, name='DeviceManager-Thread', daemon=True), 
+                                'request_middleware': Thread(target=self.request_middleware.run, name='RequestMiddleware-Thread', daemon=True),
+                                'result_middleware': Thread(target=self.result_middleware.run, name='ResultMiddleware-Thread', daemon=True)}
+        if self.cluster is not None:
+            self.runner_threads['cluster'] = Thread(target=self.cluster.run, name='Cluster-Thread', daemon=True)
+        if self.archive is not None:
+            self.runner_threads['archive'] = Thread(target=self.archive.run, name='Archive-Thread', daemon=True)
+        if self.retention is not None:
+            self.runner_threads['retention'] = Thread(target=self.retention.run, name='Retention-Thread', daemon=True)
+        logger.info("App Initialized.")
+    
+    @property
+    def stop(self):
+        return self._stop
+    
+    @stop.setter
+    def stop(self, value):
+        self._stop = value
+        [setattr(obj, 'stop', value) for obj in [self.server_manager, self.device_manager]]
+        if self.cluster is not None:
+            self.cluster.stop = value
+        if self.archive is not None:
+            self.archive.stop = value
+        if self.retention is not None:
+            self.retention.stop = value
+    
+    @classmethod
+    def configure(cls, config: Config):
+        logger.info("Configuring App...")
+        cls.CONFIG = config
+        cls.DATABASE_FILENAME = config.get('database_filename', cls.DATABASE_FILENAME)
+        cls.KEEP_ALIVE_SLEEP_DURATION = config.get('keep_alive_sleep_duration', cls.KEEP_ALIVE_SLEEP_DURATION)
+        cls.DUMMY_RUNTIME = config.get('dummy_runtime', cls.DUMMY_RUNTIME)
+        cls.REQUESTS_IN_MAXSIZE = config.get('requests_in_maxsize', cls.REQUESTS_IN_MAXSIZE)
+        cls.API_CLS.configure(config['api'])
+        cls.SERVER_MANAGER_CLS.configure(config['server_manager'])
+        cls.DEVICE_MANAGER_CLS.configure(config['device_manager'])
+        cls.REQUEST_MIDDLEWARE_CLS.configure(config['middlewares'])
+        cls.RESULT_MIDDLEWARE_CLS.configure(config['middlewares'])
+        cls.DATABASE_MANAGER_CLS.configure(config.get('database', Config()))
+        cls.ROLLUPS_CLS.configure(config.get('database', Config()).get('rollups', Config()))
+        cls.ARCHIVE_CLS.configure(config.get('database', Config()).get('archive', Config()))
+        cls.SEARCH_CLS.configure(config.get('database', Config()).get('search', Config()))
+        cls.RETENTION_CLS.configure(config.get('database', Config()).get('retention', Config()))
+        cls.HISTORY_CLS.configure(config.get('history', Config()))
+        cls.CLUSTER_BRIDGE_CLS.configure(config.get('cluster', Config()))
+        if cls.CLUSTER_BRIDGE_CLS.ENABLED and cls.DATABASE_MANAGER_CLS.STORAGE_MODE == 'split':
+            logger.warning("database.storage_mode is 'split' in cluster mode. WAL journaling does not work on network filesystems, use 'single' if '{}' is shared by the nodes.".format(cls.DATABASE_FILENAME))
+    
+    def dummy_runner(self, runtime: int):
+        logger.info("Setting up dummy server.".format(runtime))
+        dummy_queue = Queue()
+        dummy_server = self.__class__.SERVER_MANAGER_CLS(dummy_queue)
+        dummy_runner_thread = Thread(target=dummy_server.run, name='DummyServer-Thread', daemon=True)
+        print("Starting dummy server manager.")
+        logger.info("Dummy server has been set up. Running dummy server...")
+        dummy_runner_thread.start()
+        time.sleep(runtime)
+        print("Stopping dummy server manager.")
+        logger.info("Dummy runtime fulfilled. Stopping dummy server...")
+        return
+    
+    def run_dummy(self, runtime: int):
+        Thread(self.dummy_runner(runtime)).run()
+    
+    def run(self):
+        if self.__class__.DUMMY_RUNTIME > 0:
+            logger.info("Dummy Runtime={} is greater than 0. Initializing dummy.".format(self.__class__.DUMMY_RUNTIME))
+            self.run_dummy(self.__class__.DUMMY_RUNTIME)
+        logger.info("Starting app...")
+        
+        for comp_name, thread in self.runner_threads.items():
+            logger.info("Starting runner thread for Component<'{}'>".format(comp_name))
+            thread.start()
+        logger.info("All component has been started, starting keep alive.")
+        while True: # Keep alive loop
+            try:
+                time.sleep(self.__class__.KEEP_ALIVE_SLEEP_DURATION)
+                if self.stop:
+                    logger.info("App is stopped by signal.")
+                    return
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,171 @@
+from datetime import datetime
+import logging
+import os
+import re
+import sqlite3
+from threading import Event, Lock
+import time
+from typing import Dict, List, Optional
+
+from automators.data_structs import Config
+
+from database import ReadConnectionPool
+from search import create_search_index
+
+logger = logging.getLogger(__name__)
+
+
+PARTITION_FORMAT = 'transactions_%Y_%m.db'
+PARTITION_PATTERN = re.compile(r'^transactions_(\d{4})_(\d{2})\.db$')
+
+
+def month_start(time_: datetime, months_back: int = 0):
+    """The first moment of the month, months_back months before the month of time_."""
+    index = time_.year*12 + time_.month-1 - months_back
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+class TransactionArchive:
+    """Monthly partitions of the transactions. The transactions table only keeps the last HOT_MONTHS months,
+    older months are moved into a SQLite file per month in DIRECTORY, attached while rolling over.
+    Reads through get_partitions skip the months outside the queried time range."""
+    ENABLED = False
+    DIRECTORY = 'archive'
+    HOT_MONTHS = 1 # the current month
+    CHECK_INTERVAL = 60*60 # seconds
+    BATCH_SIZE = 5000 # rows moved per transaction, so the writer is never blocked for long
+    BUSY_TIMEOUT = 30 # seconds
+    READ_CONNECTION_POOL_CLS = ReadConnectionPool
+    
+    def __init__(self, filename: str, directory: Optional[str] = None):
+        cls = self.__class__
+        self.filename = filename
+        self.directory = directory or cls.DIRECTORY
+        os.makedirs(self.directory, exist_ok=True)
+        self.readers: Dict[str, ReadConnectionPool] = {}
+        self.lock = Lock()
+        self.stop_event = Event()
+        self.last_rollover: Optional[float] = None
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.ENABLED = config.get('enabled', cls.ENABLED)
+        cls.DIRECTORY = config.get('directory', cls.DIRECTORY)
+        cls.HOT_MONTHS = config.get('hot_months', cls.HOT_MONTHS)
+        cls.CHECK_INTERVAL = config.get('check_interval', cls.CHECK_INTERVAL)
+        cls.BATCH_SIZE = config.get('batch_size', cls.BATCH_SIZE)
+        cls.BUSY_TIMEOUT = config.get('busy_timeout', cls.BUSY_TIMEOUT)
+    
+    @property
+    def stop(self):
+        return self.stop_event.is_set()
+    
+    @stop.setter
+    def stop(self, value):
+        self.stop_event.set() if value else self.stop_event.clear()
+    
+    def get_months(self) -> List[datetime]:
+        """The start of every archived month, oldest first."""
+        months = []
+        for name in os.listdir(self.directory):
+            match = PARTITION_PATTERN.match(name)
+            if match is not None:
+                months.append(datetime(int(match.group(1)), int(match.group(2)), 1))
+        return sorted(months)
+    
+    def get_partition_filename(self, month: datetime):
+        return os.path.join(self.directory, month.strftime(PARTITION_FORMAT))
+    
+    def get_filenames(self) -> List[str]:
+        return [self.get_partition_filename(month) for month in self.get_months()]
+    
+    def get_partitions(self, start: Optional[float] = None, end: Optional[float] = None) -> List[ReadConnectionPool]:
+        """Readers of the archived months overlapping [start, end), timestamps, every month if unbounded."""
+        partitions = []
+        for month in self.get_months():
+            if start is not None and month_start(month, -1).timestamp() <= start:
+                continue
+            if end is not None and month.timestamp() >= end:
+                continue
+            partitions.append(self.get_partition(month))
+        return partitions
+    
+    def get_partition(self, month: datetime) -> Optional[ReadConnectionPool]:
+        """The reader of the archived month, None if it is not archived."""
+        filename = self.get_partition_filename(month_start(month))
+        if not os.path.exists(filename):
+            return None
+        with self.lock:
+            if filename not in self.readers:
+                self.readers[filename] = self.__class__.READ_CONNECTION_POOL_CLS(filename)
+            return self.readers[filename]
+    
+    def find(self, transaction_id: int) -> Optional[str]:
+        """The filename of the partition the transaction was archived into, None if it is not archived."""
+        for partition in self.get_partitions():
+            if len(partition.select("SELECT id FROM transactions WHERE id = ?", (transaction_id,))):
+                return partition.filename
+        return None
+    
+    def create_partition(self, connection: sqlite3.Connection):
+        """Creates the transactions table of the attached partition, with the schema of the main one, its indexes and search index."""
+        schema = connection.execute("SELECT sql FROM main.sqlite_master WHERE type='table' AND name='transactions'").fetchone()[0]
+        schema = re.sub(r'^CREATE TABLE\s+["`\[]?transactions["`\]]?', 'CREATE TABLE IF NOT EXISTS archived.transactions', schema)
+        connection.execute("PRAGMA archived.auto_vacuum = INCREMENTAL") # only takes effect on a new partition, see retention
+        connection.execute(schema)
+        connection.execute("CREATE INDEX IF NOT EXISTS archived.transactions_time ON transactions (time)")
+        connection.execute("CREATE INDEX IF NOT EXISTS archived.transactions_number ON transactions (number)")
+        connection.execute("CREATE INDEX IF NOT EXISTS archived.transactions_refid ON transactions (refID)")
+        create_search_index(connection, 'archived')
+    
+    def rollover(self, now: Optional[datetime] = None) -> int:
+        """Moves the transactions older than the hot months into their monthly partitions, in batches. Returns the number of moved rows.
+        The newest transaction always stays, so the ids of new transactions keep increasing."""
+        cls = self.__class__
+        cutoff = month_start(now or datetime.now(), cls.HOT_MONTHS-1)
+        connection = sqlite3.connect(self.filename, timeout=cls.BUSY_TIMEOUT, isolation_level=None)
+        moved = 0
+        try:
+            months = [row[0] for row in connection.execute("SELECT DISTINCT substr(time, 1, 7) FROM transactions WHERE time < ?", (cutoff,)).fetchall()]
+            for month in sorted(months):
+                month = datetime.strptime(month, '%Y-%m')
+                connection.execute("ATTACH DATABASE ? AS archived", (self.get_partition_filename(month),))
+                try:
+                    self.create_partition(connection)
+                    while True:
+                        connection.execute("BEGIN IMMEDIATE")
+                        try:
+                            ids = [row[0] for row in connection.execute("SELECT id FROM main.transactions WHERE time >= ? AND time < ? AND id < (SELECT max(id) FROM main.transactions) "
+                                                                        "ORDER BY id LIMIT ?", (month, min(month_start(month, -1), cutoff), cls.BATCH_SIZE)).fetchall()]
+                            if len(ids):
+                                marks = ', '.join('?'*len(ids))
+                                connection.execute("INSERT OR IGNORE INTO archived.transactions SELECT * FROM main.transactions WHERE id IN ({})".format(marks), ids)
+                                connection.execute("DELETE FROM main.transactions WHERE id IN ({})".format(marks), ids)
+                            connection.execute("COMMIT")
+                        except BaseException:
+                            connection.execute("ROLLBACK")
+                            raise
+                        moved += len(ids)
+                        if len(ids) < cls.BATCH_SIZE:
+                            break
+                finally:
+                    connection.execute("DETACH DATABASE archived")
+                logger.info("Archived the transactions of {} into {}.".format(month.strftime('%b %Y'), self.get_partition_filename(month)))
+        finally:
+            connection.close()
+        self.last_rollover = time.time()
+        return moved
+    
+    def run(self):
+        while not self.stop:
+            try:
+                moved = self.rollover()
+                if moved:
+                    logger.info("Rolled over {} transactions into the archive.".format(moved))
+            except Exception as exc:
+                logger.warning("Failed to roll the transactions over: {}".format(exc))
+            self.stop_event.wait(self.__class__.CHECK_INTERVAL)
+    
+    def get_info(self):
+        return {'enabled': self.__class__.ENABLED, 'directory': self.directory, 'hot_months': self.__class__.HOT_MONTHS,
+                'months': [month.strftime('%Y-%m') for month in self.get_months()], 'last_rollover': self.last_rollover}
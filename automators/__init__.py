@@ -1,10 +1,10 @@
-from .plugins import *
-from .ui import *
-from .utils import *
-from .client import Client
-from .data_structs import *
-from .device import Device
-from .plugabble_device import PluggableDevice
-from .request import Request as AutomatorRequest
-from .result import Result
-from .xpath import XPathMap
+from .plugins import *
+from .ui import *
+from .utils import *
+from .client import Client
+from .data_structs import *
+from .device import Device
+from .plugabble_device import PluggableDevice
+from .request import Request as AutomatorRequest
+from .result import Result
+from .xpath import XPathMap
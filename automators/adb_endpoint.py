@@ -0,0 +1,104 @@
+import subprocess
+import sys
+import time
+from typing import List, Optional
+
+from automators.client import Client
+from automators.data_structs import Config
+from automators.device_watcher import DeviceWatcher
+from automators.utils.logger import Logging
+
+logger = Logging.get_logger(__name__)
+
+
+class AdbEndpoint:
+    """An ADB server devices are listed from, with its own client, device watcher and health. 
+    An endpoint is unhealthy after MAX_FAILURES consecutive failed listings, its devices are then not scheduled. 
+    Local servers are restarted with adb kill-server/start-server, remote ones only if a restart_command is configured (e.g: over ssh)."""
+    MAX_FAILURES = 3 # consecutive failed listings before the endpoint is unhealthy
+    RESTART_COOLDOWN = 30 # seconds between restarts of the same endpoint
+    LOCAL_HOSTS = ['127.0.0.1', 'localhost', '::1']
+    
+    def __init__(self, name: str, client: Client, adb_path: str = 'adb', restart_command: Optional[List[str]] = None, device_watcher: Optional[DeviceWatcher] = None):
+        self.name = name
+        self.client = client
+        self.adb_path = adb_path
+        self.restart_command = restart_command
+        self.device_watcher = device_watcher
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self.last_success = 0.0
+        self.last_restart = 0.0
+        self.device_count = 0
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.MAX_FAILURES = config.get('max_failures', cls.MAX_FAILURES)
+        cls.RESTART_COOLDOWN = config.get('restart_cooldown', cls.RESTART_COOLDOWN)
+        cls.LOCAL_HOSTS = config.get('local_hosts', cls.LOCAL_HOSTS)
+    
+    @property
+    def host(self):
+        return self.client.host
+    
+    @property
+    def port(self):
+        return self.client.port
+    
+    @property
+    def is_local(self):
+        return self.host in self.__class__.LOCAL_HOSTS
+    
+    @property
+    def healthy(self):
+        return self.failures < self.__class__.MAX_FAILURES
+    
+    def devices(self):
+        """Lists the devices of the endpoint, recording the outcome for its health."""
+        try:
+            devices = self.client.devices()
+        except Exception as exc:
+            self.record_failure(exc)
+            raise
+        self.record_success(len(devices))
+        return devices
+    
+    def record_success(self, device_count: int):
+        if not self.healthy:
+            logger.info("ADB endpoint '{}' is healthy again.".format(self.name))
+        self.failures = 0
+        self.last_success = time.time()
+        self.device_count = device_count
+    
+    def record_failure(self, exc: Exception):
+        self.failures += 1
+        self.last_error = "{}: {}".format(type(exc).__name__, exc)
+        if self.failures == self.__class__.MAX_FAILURES:
+            logger.warning("ADB endpoint '{}' is unhealthy after {} consecutive failures. Last error: {}".format(self.name, self.failures, self.last_error))
+    
+    def adb_command(self, *args):
+        return subprocess.run([self.adb_path, '-H', str(self.host), '-P', str(self.port), *args], capture_output=True)
+    
+    def restart(self):
+        """Restarts the ADB server of the endpoint, at most once per RESTART_COOLDOWN. Returns whether it was restarted."""
+        if time.time() - self.last_restart < self.__class__.RESTART_COOLDOWN:
+            return False
+        self.last_restart = time.time()
+        try:
+            if self.restart_command:
+                logger.info("Restarting ADB endpoint '{}' with its restart command...".format(self.name))
+                return subprocess.run(self.restart_command, capture_output=True).returncode == 0
+            if not self.is_local:
+                logger.info("ADB endpoint '{}' is remote and has no restart command, waiting for it to recover.".format(self.name))
+                return False
+            logger.info("Restarting ADB endpoint '{}'...".format(self.name))
+            self.adb_command("kill-server")
+            return self.adb_command("start-server").returncode == 0
+        except OSError:
+            logger.exception("Failed to restart ADB endpoint '{}'.".format(self.name), exc_info=sys.exc_info())
+            return False
+    
+    def get_info(self):
+        return {'name': self.name, 'host': self.host, 'port': self.port, 'healthy': self.healthy, 'failures': self.failures, 'last_error': self.last_error, 
+                'last_success': self.last_success, 'device_count': self.device_count, 
+                'watcher_connected': self.device_watcher.connected.is_set() if self.device_watcher is not None else False}
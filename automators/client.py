@@ -1,36 +1,54 @@
-
-from functools import lru_cache
-
-from ppadb.client import Client as ppadbClient
-from automators.device import UnauthorizedError
-from automators.device import Device
-
-
-class Client(ppadbClient):
-    def __init__(self, *args, device_cls=Device, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.device_cls = device_cls
-
-    @lru_cache(maxsize=10)
-    def get_device(self, serial: str):
-        return self.device_cls(self, serial)
-
-    def devices(self, state=None):
-        cmd = "host:devices"
-        result = self._execute_cmd(cmd)
-        assert(result is not None)
-        
-        devices = []
-        
-        for line in result.split('\n'):
-            if not line:
-                break
-            tokens = line.split()
-            if state and len(tokens) > 1 and tokens[1] != state:
-                continue
-            try:
-                device = self.get_device(tokens[0])
-                devices.append(device)
-            except UnauthorizedError:
-                print('Connection to {} is unauthorized.'.format(tokens[0]), end='\r')
-        return devices
+
+from concurrent.futures import ThreadPoolExecutor
+
+from ppadb.client import Client as ppadbClient
+from automators.device import UnauthorizedError
+from automators.device import Device
+from automators.device_registry import DeviceRegistry
+
+
+class Client(ppadbClient):
+    def __init__(self, *args, device_cls=Device, onboarding_workers=8, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.device_cls = device_cls
+        self.registry = DeviceRegistry(self.create_device)
+        self.onboarding_executor = ThreadPoolExecutor(max_workers=max(onboarding_workers, 1), thread_name_prefix='device_onboarding')
+
+    def create_device(self, serial: str):
+        return self.device_cls(self, serial)
+
+    def get_device(self, serial: str):
+        return self.registry.get_or_create(serial)
+
+    def devices(self, state=None):
+        cmd = "host:devices"
+        result = self._execute_cmd(cmd)
+        assert(result is not None)
+        
+        serials = []
+        wanted = []
+        
+        for line in result.split('\n'):
+            if not line:
+                break
+            tokens = line.split()
+            serials.append(tokens[0])
+            if state and len(tokens) > 1 and tokens[1] != state:
+                continue
+            wanted.append(tokens[0])
+        self.registry.sync(serials)
+        
+        # New devices are constructed concurrently on the bounded onboarding pool, known ones are returned from the registry.
+        futures = [(serial, self.onboarding_executor.submit(self.get_device, serial)) for serial in wanted]
+        devices = []
+        error = None
+        for serial, future in futures:
+            try:
+                devices.append(future.result())
+            except UnauthorizedError:
+                print('Connection to {} is unauthorized.'.format(serial), end='\r')
+            except Exception as exc:
+                error = error or exc
+        if error is not None:
+            raise error
+        return devices
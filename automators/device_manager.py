@@ -1,132 +1,255 @@
-import subprocess
-import sys
-from queue import Queue
-from threading import Thread
-import time
-
-import adbutils
-
-from automators.client import Client as BaseClient, lru_cache
-from automators.data_structs import Config
-from automators.requestable_device import RequestableDevice
-from automators.utils.logger import Logging
-
-logger = Logging.get_logger(__name__)
-
-
-class Client(BaseClient):
-    def __init__(self, *args, device_cls=RequestableDevice, request_queue: Queue = Queue(), results_queue: Queue = Queue(), **kwargs):
-        super().__init__(*args, device_cls=device_cls, **kwargs)
-        self.request_queue = request_queue
-        self.results_queue = results_queue
-
-    @lru_cache(maxsize=10)
-    def get_device(self, serial: str):
-        if issubclass(self.device_cls, RequestableDevice):
-            return self.device_cls(self, serial, request_queue=self.request_queue, results_queue=self.results_queue)
-        return super().get_device(serial)
-
-
-
-class DeviceManager:
-    CONFIG: Config
-    
-    ADB_PATH = 'adb'
-    ADB_HOST = '127.0.0.1'
-    ADB_PORT = 5037
-    
-    DEVICE_POLLING_RATE = 5
-    DEVICE_CLS = RequestableDevice
-    
-    USE_INTERRUPTIBLE_RUNNER = False
-    INTERRUPTIBLE_RUNNER_POLLING_RATE = 0.1
-    
-    def __init__(self, request_queue: Queue, results_queue: Queue):
-        self.client = Client(self.__class__.ADB_HOST, self.__class__.ADB_PORT, device_cls=self.__class__.DEVICE_CLS, request_queue=request_queue, results_queue=results_queue)
-        self.runner_threads = {} # serial:thread
-        self.devices = [] # device objects
-        self._stop = False
-    
-    @property
-    def stop(self):
-        return self._stop
-    
-    @stop.setter
-    def stop(self, value):
-        self._stop = value
-        [setattr(device, 'stop', value) for device in self.devices]
-    
-    @classmethod
-    def configure(cls, config: Config):
-        cls.CONFIG = config
-        cls.ADB_PATH = config.get('adb_path', cls.ADB_PATH)
-        cls.ADB_HOST = config.get('adb_host', cls.ADB_HOST)
-        cls.ADB_PORT = config.get('adb_port', cls.ADB_PORT)
-        cls.DEVICE_POLLING_RATE = config.get('device_polling_rate', cls.DEVICE_POLLING_RATE)
-        cls.USE_INTERRUPTIBLE_RUNNER = config.get('use_interruptible_runner', cls.USE_INTERRUPTIBLE_RUNNER)
-        cls.INTERRUPTIBLE_RUNNER_POLLING_RATE = config.get('interruptible_runner_polling_rate', cls.INTERRUPTIBLE_RUNNER_POLLING_RATE)
-        cls.DEVICE_CLS.configure(config['device']) # must exist
-    
-    @property
-    def current_requests(self):
-        return [d.current_request for d in self.devices if d.current_request is not None]
-    
-    @property
-    def current_processing(self):
-        return [d.serial for d in self.devices if d.current_request is not None]
-    
-    def adb_command(self, *args):
-        return subprocess.run(["{}".format(self.__class__.ADB_PATH), *args], capture_output=True, shell=True)
-    
-    def restart_adb(self):
-        self.adb_command("kill-server")
-        return self.adb_command("start-server").returncode == 0
-    
-    def get_device(self, serial: str):
-        return ([device for device in self.devices if device.serial == serial] + [None])[0]
-    
-    def _handle_device(self, device: RequestableDevice):
-        """Wrapper for device.run"""
-        device.run()
-    
-    def handle_device(self, device: RequestableDevice):
-        """Wrapper for _handle_device, adds support for interruptible runner."""
-        if self.__class__.USE_INTERRUPTIBLE_RUNNER:
-            thread = Thread(target=self._handle_device, args=(device,))
-            thread.start()
-            while not (device.stop or device.is_offline):
-                time.sleep(self.__class__.INTERRUPTIBLE_RUNNER_POLLING_RATE)
-        else:
-            self._handle_device(device)
-        self.runner_threads.pop(device.serial)
-        logger.info("Handler for device '{}' has been stopped.".format(device.serial))
-    
-    def run(self):
-        while True:
-            try:
-                self.devices=self.client.devices()
-                if self.stop:
-                    logger.info("DeviceManager is stopped by signal.")
-                    return
-                for device in self.devices:
-                    if device.serial in self.runner_threads:
-                        continue
-                    if device.stop:
-                        continue
-                    device.refresh_plugins()
-                    device.is_offline = False
-                    thread = Thread(target=self.handle_device, args=(device,), daemon=True)
-                    self.runner_threads[device.serial] = thread
-                    logger.info("Handler for device '{}' has been started.".format(device.serial))
-                    thread.start()
-                time.sleep(self.__class__.DEVICE_POLLING_RATE)
-            except RuntimeError as exc:
-                logger.info("Catched a runtime error. Restarting ADB server...")
-                logger.exception("Exception: {}{}".format(exc.__class__, exc.args), exc_info=sys.exc_info())
-                self.restart_adb()
-            except adbutils.AdbError as exc:
-                logger.info("Catched an ADB error. Restarting ADB server...")
-                self.restart_adb()
-            except Exception as exc:
-                logger.exception("Catched an exception of type=<{}>.".format(exc.__class__), exc_info=sys.exc_info())
-                time.sleep(1)
+import subprocess
+import sys
+from queue import Queue
+from threading import Event
+import time
+from typing import List, Optional
+
+import adbutils
+
+from automators.adb_endpoint import AdbEndpoint
+from automators.client import Client as BaseClient
+from automators.data_structs import Config
+from automators.device_registry import DeviceRegistry, DeviceState
+from automators.device_supervisor import DeviceSupervisor
+from automators.device_watcher import DeviceWatcher
+from automators.requestable_device import RequestableDevice
+from automators.utils.logger import Logging
+from automators.worker_process import WorkerProcessPool
+
+logger = Logging.get_logger(__name__)
+
+
+class Client(BaseClient):
+    def __init__(self, *args, device_cls=RequestableDevice, request_queue: Queue = Queue(), results_queue: Queue = Queue(), quarantine_queue: Optional[Queue] = None, endpoint: str = '', **kwargs):
+        super().__init__(*args, device_cls=device_cls, **kwargs)
+        self.request_queue = request_queue
+        self.results_queue = results_queue
+        self.quarantine_queue = quarantine_queue
+        self.endpoint = endpoint
+
+    def create_device(self, serial: str):
+        if issubclass(self.device_cls, RequestableDevice):
+            device = self.device_cls(self, serial, request_queue=self.request_queue, results_queue=self.results_queue, quarantine_queue=self.quarantine_queue)
+            device.endpoint = self.endpoint
+            return device
+        return super().create_device(serial)
+
+
+
+class DeviceManager:
+    CONFIG: Config
+    
+    ADB_PATH = 'adb'
+    ADB_HOST = '127.0.0.1'
+    ADB_PORT = 5037
+    ADB_ENDPOINTS: List[Config] = [] # [{name, host, port, restart_command}], devices of every endpoint are pooled. Empty for only adb_host:adb_port
+    ADB_ENDPOINT_CLS = AdbEndpoint
+    
+    DEVICE_POLLING_RATE = 5
+    DEVICE_CLS = RequestableDevice
+    
+    DEVICE_SUPERVISOR_CLS = DeviceSupervisor
+    WORKER_MODE = 'thread' # thread/process, process runs the plugins of devices in worker processes to escape GIL contention
+    WORKER_PROCESS_POOL_CLS = WorkerProcessPool
+    
+    DEFAULT_EXECUTION_DURATION = 60 # Assumed execution duration in seconds of automators without any record yet
+    
+    USE_DEVICE_WATCHER = True # Refresh devices on ADB track-devices events, polling is kept as the fallback
+    WATCHED_POLLING_RATE = 60 # Polling rate while the device watcher is connected
+    DEVICE_WATCHER_CLS = DeviceWatcher
+    ONBOARDING_WORKERS = 8 # Devices constructed concurrently, e.g: after an ADB server restart
+    
+    def __init__(self, request_queue: Queue, results_queue: Queue, quarantine_queue: Optional[Queue] = None):
+        cls = self.__class__
+        self.results_queue = results_queue
+        self.quarantine_queue = quarantine_queue if quarantine_queue is not None else Queue()
+        self.devices = [] # device objects
+        self._stop = False
+        self.devices_changed = Event()
+        self.supervisor = cls.DEVICE_SUPERVISOR_CLS(on_change=self.devices_changed.set)
+        self.worker_pool = None
+        if cls.WORKER_MODE == 'process':
+            self.worker_pool = cls.WORKER_PROCESS_POOL_CLS(cls.DEVICE_CLS, cls.CONFIG['device'])
+        self.endpoints: List[AdbEndpoint] = []
+        for endpoint_config in cls.ADB_ENDPOINTS or [Config(host=cls.ADB_HOST, port=cls.ADB_PORT)]:
+            host, port = endpoint_config.get('host', cls.ADB_HOST), endpoint_config.get('port', cls.ADB_PORT)
+            name = endpoint_config.get('name', "{}:{}".format(host, port))
+            client = Client(host, port, device_cls=cls.DEVICE_CLS, onboarding_workers=cls.ONBOARDING_WORKERS, endpoint=name, 
+                            request_queue=request_queue, results_queue=results_queue, quarantine_queue=self.quarantine_queue)
+            device_watcher = None
+            if cls.USE_DEVICE_WATCHER:
+                device_watcher = cls.DEVICE_WATCHER_CLS(host, port, on_attach=self.on_device_attached, on_detach=self.on_device_detached)
+            self.endpoints.append(cls.ADB_ENDPOINT_CLS(name, client, adb_path=cls.ADB_PATH, restart_command=endpoint_config.get('restart_command'), device_watcher=device_watcher))
+    
+    @property
+    def client(self):
+        """Client of the first endpoint."""
+        return self.endpoints[0].client
+    
+    def get_endpoint(self, name: str):
+        return ([endpoint for endpoint in self.endpoints if endpoint.name == name] + [None])[0]
+    
+    @property
+    def stop(self):
+        return self._stop
+    
+    @stop.setter
+    def stop(self, value):
+        self._stop = value
+        [setattr(device, 'stop', value) for device in self.devices]
+        [setattr(endpoint.device_watcher, 'stop', value) for endpoint in self.endpoints if endpoint.device_watcher is not None]
+        self.supervisor.stop = value
+        self.supervisor.wake()
+        self.devices_changed.set() # wakes up run
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.CONFIG = config
+        cls.ADB_PATH = config.get('adb_path', cls.ADB_PATH)
+        cls.ADB_HOST = config.get('adb_host', cls.ADB_HOST)
+        cls.ADB_PORT = config.get('adb_port', cls.ADB_PORT)
+        cls.ADB_ENDPOINTS = config.get('adb_endpoints', cls.ADB_ENDPOINTS)
+        cls.ADB_ENDPOINT_CLS.configure(config.get('adb_endpoint', Config()))
+        cls.DEVICE_POLLING_RATE = config.get('device_polling_rate', cls.DEVICE_POLLING_RATE)
+        cls.DEFAULT_EXECUTION_DURATION = config.get('default_execution_duration', cls.DEFAULT_EXECUTION_DURATION)
+        cls.USE_DEVICE_WATCHER = config.get('use_device_watcher', cls.USE_DEVICE_WATCHER)
+        cls.ONBOARDING_WORKERS = config.get('onboarding_workers', cls.ONBOARDING_WORKERS)
+        cls.WATCHED_POLLING_RATE = config.get('watched_polling_rate', cls.WATCHED_POLLING_RATE)
+        cls.DEVICE_WATCHER_CLS.configure(config.get('device_watcher', Config()))
+        DeviceRegistry.configure(config.get('device_registry', Config()))
+        cls.DEVICE_SUPERVISOR_CLS.configure(config.get('device_supervisor', Config()))
+        cls.WORKER_MODE = config.get('worker_mode', cls.WORKER_MODE)
+        cls.WORKER_PROCESS_POOL_CLS.configure(config.get('worker_process', Config()))
+        cls.DEVICE_CLS.configure(config['device']) # must exist
+    
+    @property
+    def current_requests(self):
+        return [d.current_request for d in self.devices if d.current_request is not None]
+    
+    @property
+    def current_processing(self):
+        return [d.serial for d in self.devices if d.current_request is not None]
+    
+    @property
+    def quarantined_requests(self):
+        """Quarantined requests, still pending until they are retried or discarded."""
+        with self.quarantine_queue.mutex:
+            return list(self.quarantine_queue.queue)
+    
+    def discard_quarantined(self, request):
+        """Gives up on a request taken out of quarantine, it is finished with a failed result."""
+        self.results_queue.put(self.__class__.DEVICE_CLS.make_quarantined_result(request))
+    
+    def get_capable_devices(self, automator_name: str):
+        """Devices which are online, not stopped, on a healthy endpoint and have the automator's plugin."""
+        automator_name = automator_name or self.__class__.DEVICE_CLS.DEFAULT_AUTOMATOR
+        unhealthy = [endpoint.name for endpoint in self.endpoints if not endpoint.healthy]
+        return [d for d in self.devices if automator_name in d.plugins and not (d.stop or d.is_offline) and d.endpoint not in unhealthy]
+    
+    def get_throughput(self, automator_name: str):
+        """Estimated requests per second the devices can complete for the given automator."""
+        automator_name = automator_name or self.__class__.DEVICE_CLS.DEFAULT_AUTOMATOR
+        default = self.__class__.DEFAULT_EXECUTION_DURATION
+        return sum([1/max(d.get_average_execution_duration(automator_name, default), 1) for d in self.get_capable_devices(automator_name)])
+    
+    def get_failure_rate(self, automator_name: str):
+        """Average recent failure rate of the automator across capable devices, 0 if unknown."""
+        automator_name = automator_name or self.__class__.DEVICE_CLS.DEFAULT_AUTOMATOR
+        devices = self.get_capable_devices(automator_name)
+        if not len(devices):
+            return 0
+        return sum([d.get_failure_rate(automator_name) for d in devices]) / len(devices)
+    
+    def estimate_wait(self, automator_name: str, queue_depth: int):
+        """Estimated seconds until a request enqueued behind queue_depth requests of the same automator is completed. 
+        Returns infinity if no device can serve the automator."""
+        throughput = self.get_throughput(automator_name)
+        if throughput <= 0:
+            return float('inf')
+        return (queue_depth + 1) / throughput
+    
+    def adb_command(self, *args):
+        return subprocess.run(["{}".format(self.__class__.ADB_PATH), *args], capture_output=True, shell=True)
+    
+    def restart_adb(self):
+        """Restarts the ADB server of every endpoint, returns whether all of them were restarted."""
+        return all([endpoint.restart() for endpoint in self.endpoints])
+    
+    def get_device(self, serial: str):
+        return ([device for device in self.devices if device.serial == serial] + [None])[0]
+    
+    def on_device_attached(self, serial: str):
+        self.devices_changed.set()
+    
+    def on_device_detached(self, serial: str):
+        self.devices_changed.set()
+    
+    @property
+    def polling_rate(self):
+        if all([endpoint.device_watcher is not None and endpoint.device_watcher.connected.is_set() for endpoint in self.endpoints]):
+            return self.__class__.WATCHED_POLLING_RATE
+        return self.__class__.DEVICE_POLLING_RATE
+    
+    def list_devices(self):
+        """Devices of every endpoint. The devices of a failing endpoint are left out, it is restarted once it is unhealthy, 
+        a serial listed by several endpoints (e.g: emulators) is kept on the first one."""
+        devices = []
+        for endpoint in self.endpoints:
+            try:
+                endpoint_devices = endpoint.devices()
+            except (RuntimeError, adbutils.AdbError, OSError) as exc:
+                logger.info("Failed to list the devices of ADB endpoint '{}': {}{}.".format(endpoint.name, exc.__class__, exc.args))
+                if not endpoint.healthy: # a single failure (e.g: a timeout) does not take the devices of a working server down
+                    endpoint.restart()
+                continue
+            serials = [device.serial for device in devices]
+            for device in endpoint_devices:
+                if device.serial in serials:
+                    logger.warning("Device '{}' of ADB endpoint '{}' is also on another endpoint, ignoring it.".format(device.serial, endpoint.name))
+                    continue
+                devices.append(device)
+        return devices
+    
+    def handle_device(self, device: RequestableDevice):
+        """Worker of a device, run by the supervisor."""
+        try:
+            device.refresh_plugins() # in the worker, so devices onboard concurrently
+            if self.worker_pool is not None:
+                device.remote = self.worker_pool.acquire(device.serial, device.client.host, device.client.port)
+            device.run()
+        finally:
+            if self.worker_pool is not None:
+                device.remote = None
+                self.worker_pool.release(device.serial)
+            device.client.registry.set_state(device.serial, DeviceState.OFFLINE if device.is_offline else DeviceState.STOPPED)
+            logger.info("Handler for device '{}' has been stopped.".format(device.serial))
+    
+    def run(self):
+        [endpoint.device_watcher.start() for endpoint in self.endpoints if endpoint.device_watcher is not None]
+        self.supervisor.start()
+        while True:
+            try:
+                self.devices_changed.clear() # before listing, so changes while listing are not missed
+                self.devices=self.list_devices()
+                if self.stop:
+                    logger.info("DeviceManager is stopped by signal.")
+                    return
+                for device in self.devices:
+                    if device.stop or not self.supervisor.can_start(device.serial):
+                        continue
+                    device.is_offline = False
+                    device.client.registry.set_state(device.serial, DeviceState.RUNNING)
+                    if self.supervisor.spawn(device, self.handle_device):
+                        logger.info("Handler for device '{}' has been started.".format(device.serial))
+                self.devices_changed.wait(self.polling_rate)
+            except RuntimeError as exc:
+                logger.info("Catched a runtime error. Restarting ADB server...")
+                logger.exception("Exception: {}{}".format(exc.__class__, exc.args), exc_info=sys.exc_info())
+                self.restart_adb()
+            except adbutils.AdbError as exc:
+                logger.info("Catched an ADB error. Restarting ADB server...")
+                self.restart_adb()
+            except Exception as exc:
+                logger.exception("Catched an exception of type=<{}>.".format(exc.__class__), exc_info=sys.exc_info())
+                time.sleep(1)
@@ -0,0 +1,130 @@
+
+from dataclasses import dataclass, field
+from enum import Enum
+from threading import Lock, RLock
+from typing import Callable, Dict, Iterable, List, Optional
+import time
+
+from automators.device import Device
+from automators.utils.exception import UnauthorizedError
+from automators.utils.logger import Logging
+
+logger = Logging.get_logger(__name__)
+
+
+class DeviceState(str, Enum):
+    INITIALIZING = 'initializing' # device object is being constructed
+    READY = 'ready' # connected, not handled yet
+    RUNNING = 'running' # a handler is processing requests with it
+    STOPPED = 'stopped' # handler stopped by signal
+    OFFLINE = 'offline' # not listed by the ADB server, or its handler stopped because it went offline
+    UNAUTHORIZED = 'unauthorized'
+    FAILED = 'failed' # device object construction failed
+
+
+@dataclass
+class DeviceEntry:
+    serial: str
+    state: DeviceState = DeviceState.INITIALIZING
+    device: Optional[Device] = None
+    first_seen: float = field(default_factory=time.time)
+    last_seen: float = field(default_factory=time.time)
+    last_state_change: float = field(default_factory=time.time)
+    connections: int = 0 # times the device has (re)connected
+    error: Optional[str] = None
+    creation_lock: Lock = field(default_factory=Lock, repr=False)
+    
+    @property
+    def dict(self):
+        return {'serial': self.serial, 'state': self.state.value, 'first_seen': self.first_seen, 'last_seen': self.last_seen, 
+                'last_state_change': self.last_state_change, 'connections': self.connections, 'error': self.error}
+
+
+class DeviceRegistry:
+    """Device objects keyed by serial, with their lifecycle states. Device objects are expensive to construct, 
+    so an entry keeps its device object across disconnects and reconnects, with its state (current_request, stop, etc.). 
+    Entries are only evicted after being offline for EVICT_OFFLINE_AFTER seconds."""
+    EVICT_OFFLINE_AFTER = 7*24*60*60 # seconds, 0 to never evict
+    INITIALIZING_TIMEOUT = 5*60 # seconds a construction may take before a device gone from the ADB server is marked as failed
+    
+    def __init__(self, factory: Callable[[str], Device]):
+        self.factory = factory
+        self.entries: Dict[str, DeviceEntry] = {}
+        self.lock = RLock()
+    
+    @classmethod
+    def configure(cls, config):
+        cls.EVICT_OFFLINE_AFTER = config.get('evict_offline_after', cls.EVICT_OFFLINE_AFTER)
+        cls.INITIALIZING_TIMEOUT = config.get('initializing_timeout', cls.INITIALIZING_TIMEOUT)
+    
+    def get_entry(self, serial: str):
+        with self.lock:
+            return self.entries.get(serial)
+    
+    def get(self, serial: str):
+        entry = self.get_entry(serial)
+        return entry.device if entry is not None else None
+    
+    def set_state(self, serial: str, state: DeviceState, error: Optional[str] = None):
+        with self.lock:
+            entry = self.entries.get(serial)
+            if entry is None or (entry.state == state and error is None):
+                return
+            logger.debug("Device '{}' state {} -> {}".format(serial, entry.state.value, state.value))
+            entry.state = state
+            entry.last_state_change = time.time()
+            entry.error = error
+    
+    def get_or_create(self, serial: str) -> Device:
+        """Returns the device object of the serial, constructing it only if the registry does not have one yet. 
+        Construction of different serials may run concurrently, but a serial is only constructed once at a time."""
+        with self.lock:
+            entry = self.entries.setdefault(serial, DeviceEntry(serial))
+        with entry.creation_lock:
+            with self.lock:
+                entry.last_seen = time.time()
+                if entry.device is not None:
+                    if entry.state in (DeviceState.OFFLINE, DeviceState.UNAUTHORIZED, DeviceState.FAILED):
+                        entry.connections += 1
+                        self.set_state(serial, DeviceState.READY)
+                    return entry.device
+                entry.state = DeviceState.INITIALIZING
+                entry.last_state_change = time.time()
+            try:
+                device = self.factory(serial)
+            except UnauthorizedError as exc:
+                self.set_state(serial, DeviceState.UNAUTHORIZED, str(exc))
+                raise
+            except Exception as exc:
+                self.set_state(serial, DeviceState.FAILED, "{}: {}".format(type(exc).__name__, exc))
+                raise
+            with self.lock:
+                entry.device = device
+                entry.connections += 1
+                self.set_state(serial, DeviceState.READY)
+            return device
+    
+    def sync(self, serials: Iterable[str]):
+        """Marks devices missing from serials, the serials currently listed by the ADB server, as offline, and evicts stale entries. 
+        A missing device still initializing is left alone while it is being constructed, unless that takes longer than INITIALIZING_TIMEOUT."""
+        serials = set(serials)
+        now = time.time()
+        evict_after = self.__class__.EVICT_OFFLINE_AFTER
+        with self.lock:
+            for serial, entry in list(self.entries.items()):
+                if serial in serials:
+                    continue
+                if entry.state == DeviceState.INITIALIZING:
+                    if not entry.creation_lock.locked(): # its construction was abandoned
+                        self.set_state(serial, DeviceState.OFFLINE)
+                    elif now - entry.last_state_change > self.__class__.INITIALIZING_TIMEOUT:
+                        self.set_state(serial, DeviceState.FAILED, "Initialization did not finish in {}s.".format(self.__class__.INITIALIZING_TIMEOUT))
+                elif entry.state != DeviceState.OFFLINE:
+                    self.set_state(serial, DeviceState.OFFLINE)
+                if evict_after > 0 and entry.state == DeviceState.OFFLINE and now - entry.last_seen > evict_after:
+                    logger.info("Evicting device '{}', offline since {}.".format(serial, entry.last_seen))
+                    self.entries.pop(serial)
+    
+    def get_info(self) -> List[dict]:
+        with self.lock:
+            return [entry.dict for entry in self.entries.values()]
@@ -0,0 +1,156 @@
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass
+import sys
+from threading import Lock, Thread
+from typing import Callable, Dict, Optional
+import time
+
+from automators.data_structs import Config
+from automators.utils.logger import Logging
+
+logger = Logging.get_logger(__name__)
+
+
+@dataclass
+class Worker:
+    device: object
+    future: Future
+    started: float
+
+
+@dataclass
+class RestartRecord:
+    failures: int = 0 # consecutive failed runs
+    next_start: float = 0.0 # earliest time the device may be started again
+    last_error: Optional[str] = None
+
+
+class DeviceSupervisor:
+    """Runs a worker per device, and reaps finished workers in a single thread waiting on their futures, instead of a thread polling each device. 
+    A worker failed if it raised, or the device went offline before HEALTHY_RUN_DURATION. RESTART_POLICY decides when a failed device may be started again: 
+    on_failure backs it off exponentially, always restarts it right away and never keeps it down until reset is called."""
+    RESTART_POLICY = 'on_failure'
+    BACKOFF_BASE = 2 # seconds
+    BACKOFF_MAX = 300 # seconds
+    HEALTHY_RUN_DURATION = 60 # seconds a worker must run for its exit to not count as a failure
+    
+    def __init__(self, on_change: Callable[[], None] = lambda:None):
+        self.on_change = on_change # called when a worker is reaped or a backoff expires, so the owner can start devices again
+        self.workers: Dict[str, Worker] = {} # serial:worker
+        self.records: Dict[str, RestartRecord] = {} # serial:record
+        self.lock = Lock()
+        self.wakeup: Future = Future()
+        self.stop = False
+        self.reaper = Thread(target=self.reap, name='device_reaper', daemon=True)
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.RESTART_POLICY = config.get('restart_policy', cls.RESTART_POLICY)
+        cls.BACKOFF_BASE = config.get('backoff_base', cls.BACKOFF_BASE)
+        cls.BACKOFF_MAX = config.get('backoff_max', cls.BACKOFF_MAX)
+        cls.HEALTHY_RUN_DURATION = config.get('healthy_run_duration', cls.HEALTHY_RUN_DURATION)
+    
+    def start(self):
+        self.reaper.start()
+    
+    def wake(self):
+        """Wakes the reaper up, e.g: to pick up a new worker."""
+        with self.lock:
+            wakeup = self.wakeup
+        if not wakeup.done():
+            wakeup.set_result(None)
+    
+    def signal(self):
+        """Called by devices when their stop or offline flag changes."""
+        self.wake()
+        self.on_change()
+    
+    def can_start(self, serial: str):
+        cls = self.__class__
+        with self.lock:
+            if serial in self.workers:
+                return False
+            record = self.records.get(serial)
+        if record is None or record.failures == 0 or cls.RESTART_POLICY == 'always':
+            return True
+        if cls.RESTART_POLICY == 'never':
+            return False
+        return time.time() >= record.next_start
+    
+    def _run_worker(self, future: Future, target: Callable, device):
+        try:
+            future.set_result(target(device))
+        except BaseException as exc:
+            future.set_exception(exc)
+    
+    def spawn(self, device, target: Callable):
+        """Starts target (the device worker) unless the device is running or backed off. Returns whether it was started."""
+        if not self.can_start(device.serial):
+            return False
+        device.on_signal = self.signal
+        future = Future()
+        future.set_running_or_notify_cancel()
+        with self.lock:
+            self.workers[device.serial] = Worker(device, future, time.time())
+        # daemon threads rather than an executor, so a stuck device never holds the interpreter up at exit
+        Thread(target=self._run_worker, args=(future, target, device), name='device_worker-{}'.format(device.serial), daemon=True).start()
+        self.wake()
+        return True
+    
+    def reset(self, serial: str):
+        with self.lock:
+            self.records.pop(serial, None)
+    
+    def get_info(self):
+        now = time.time()
+        with self.lock:
+            serials = set(self.workers) | set(self.records)
+            return {serial: {'running': serial in self.workers, 
+                             'failures': self.records[serial].failures if serial in self.records else 0, 
+                             'backoff': max(self.records[serial].next_start - now, 0) if serial in self.records else 0, 
+                             'last_error': self.records[serial].last_error if serial in self.records else None} for serial in serials}
+    
+    def record_exit(self, serial: str, worker: Worker):
+        cls = self.__class__
+        device = worker.device
+        exc = worker.future.exception()
+        ran_for = time.time() - worker.started
+        failed = exc is not None or (getattr(device, 'is_offline', False) and ran_for < cls.HEALTHY_RUN_DURATION)
+        with self.lock:
+            record = self.records.setdefault(serial, RestartRecord())
+            if not failed:
+                record.failures = 0
+                record.next_start = 0
+                return
+            record.failures += 1
+            record.last_error = "{}: {}".format(type(exc).__name__, exc) if exc is not None else 'offline'
+            record.next_start = time.time() + min(cls.BACKOFF_BASE * 2**(record.failures-1), cls.BACKOFF_MAX)
+        if exc is not None:
+            logger.error("Worker of device '{}' failed ({} consecutive failures).".format(serial, record.failures), exc_info=(type(exc), exc, exc.__traceback__))
+        else:
+            logger.info("Device '{}' went offline after {:.1f}s ({} consecutive failures).".format(serial, ran_for, record.failures))
+    
+    def reap(self):
+        while not self.stop:
+            with self.lock:
+                if self.wakeup.done():
+                    self.wakeup = Future()
+                wakeup = self.wakeup
+                futures = {worker.future: serial for serial, worker in self.workers.items()}
+                next_starts = [record.next_start for record in self.records.values() if record.next_start > time.time()]
+            timeout = max(min(next_starts) - time.time(), 0) if len(next_starts) else None
+            done, _ = wait(list(futures) + [wakeup], timeout=timeout, return_when=FIRST_COMPLETED)
+            reaped = False
+            for future in done:
+                if future is wakeup:
+                    continue
+                serial = futures[future]
+                with self.lock:
+                    worker = self.workers.pop(serial)
+                try:
+                    self.record_exit(serial, worker)
+                except Exception as exc:
+                    logger.exception("Catched an exception of type=<{}> while reaping.".format(exc.__class__), exc_info=sys.exc_info())
+                reaped = True
+            if reaped or not len(done): # not len(done) means a backoff has expired
+                self.on_change()
@@ -0,0 +1,102 @@
+
+import sys
+from threading import Event, Lock, Thread, Timer
+from typing import Callable, Dict, Iterator, Optional, Tuple
+import time
+
+import adbutils
+
+from automators.data_structs import Config
+from automators.utils.logger import Logging
+
+logger = Logging.get_logger(__name__)
+
+
+class DeviceWatcher:
+    """Watches the ADB server's track-devices stream and calls on_attach(serial) or on_detach(serial) 
+    once a device has kept its new state for DEBOUNCE seconds, so a flapping USB connection only fires once it settles. 
+    Reconnects to the ADB server after RECONNECT_DELAY seconds when the stream breaks, e.g: the server was restarted."""
+    DEBOUNCE = 1.0 # seconds
+    RECONNECT_DELAY = 5 # seconds
+    STOP_CHECK_INTERVAL = 1 # seconds, the stream is read with this timeout so stop is noticed while no device changes
+    
+    def __init__(self, host: str, port: int, on_attach: Callable[[str], None] = lambda *_:None, on_detach: Callable[[str], None] = lambda *_:None):
+        self.host = host
+        self.port = port
+        self.on_attach = on_attach
+        self.on_detach = on_detach
+        self.states: Dict[str, bool] = {} # serial:attached, states which have been reported through the callbacks
+        self.timers: Dict[str, Timer] = {} # serial:pending debounce timer
+        self.lock = Lock()
+        self.connected = Event() # set while the track-devices stream is up
+        self.stop = False
+        self.thread = Thread(target=self.run, daemon=True)
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.DEBOUNCE = config.get('debounce', cls.DEBOUNCE)
+        cls.RECONNECT_DELAY = config.get('reconnect_delay', cls.RECONNECT_DELAY)
+        cls.STOP_CHECK_INTERVAL = config.get('stop_check_interval', cls.STOP_CHECK_INTERVAL)
+    
+    def start(self):
+        self.thread.start()
+    
+    def handle_event(self, serial: str, attached: bool):
+        """Restarts the debounce timer of the device, only its last state within DEBOUNCE is reported."""
+        with self.lock:
+            if serial in self.timers:
+                self.timers.pop(serial).cancel()
+            if self.states.get(serial, False) == attached:
+                return # flapped back to the reported state
+            timer = Timer(self.__class__.DEBOUNCE, self.settle, args=(serial, attached))
+            timer.daemon = True
+            self.timers[serial] = timer
+            timer.start()
+    
+    def settle(self, serial: str, attached: bool):
+        with self.lock:
+            self.timers.pop(serial, None)
+            if self.states.get(serial, False) == attached:
+                return
+            self.states[serial] = attached
+        logger.info("Device '{}' has been {}.".format(serial, 'attached' if attached else 'detached'))
+        try:
+            (self.on_attach if attached else self.on_detach)(serial)
+        except Exception as exc:
+            logger.exception("Catched an exception of type=<{}> in device watcher callback.".format(exc.__class__), exc_info=sys.exc_info())
+    
+    def track_devices(self) -> Iterator[Optional[Tuple[str, bool]]]:
+        """Yields (serial, attached) for every change of the track-devices stream, 
+        or None after STOP_CHECK_INTERVAL seconds without any. Raises AdbError when the stream breaks."""
+        client = adbutils.AdbClient(host=self.host, port=self.port)
+        with client.make_connection(timeout=self.__class__.STOP_CHECK_INTERVAL) as connection:
+            connection.send_command("host:track-devices")
+            connection.check_okay()
+            self.connected.set()
+            previous: Dict[str, bool] = {}
+            while True:
+                try:
+                    output = connection.read_string_block()
+                except adbutils.AdbTimeout:
+                    yield None
+                    continue
+                current = {line.split('\t')[0]: line.split('\t')[-1] == 'device' for line in output.splitlines() if '\t' in line}
+                for serial in sorted(set(previous) | set(current)):
+                    if previous.get(serial, False) != current.get(serial, False):
+                        yield (serial, current.get(serial, False))
+                previous = current
+    
+    def run(self):
+        while not self.stop:
+            try:
+                for event in self.track_devices():
+                    if self.stop:
+                        return
+                    if event is not None:
+                        self.handle_event(*event)
+            except adbutils.AdbError as exc:
+                logger.info("Device watcher lost the ADB server: {}. Reconnecting in {}s.".format(exc, self.__class__.RECONNECT_DELAY))
+            except Exception as exc:
+                logger.exception("Catched an exception of type=<{}> in device watcher.".format(exc.__class__), exc_info=sys.exc_info())
+            self.connected.clear()
+            time.sleep(self.__class__.RECONNECT_DELAY)
@@ -1,25 +1,58 @@
-
-from automators.data_structs import Config
-from automators.plugins.base import BasePlugin
-from automators.device import Device
-from automators.utils.logger import Logging
-
-logger = Logging.get_logger(__name__)
-
-
-class PluggableDevice(Device):
-    CONFIG: Config
-    PLUGINS = {'__base__': BasePlugin} # Dummy plugin data, change this for use.
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        app_list = self.u2_device.app_list()
-        self.plugins = {name: plugin(self) for name, plugin in self.__class__.PLUGINS.items() if len(plugin.PACKAGE) and plugin.PACKAGE in app_list}
-    
-    def refresh_plugins(self):
-        app_list = self.u2_device.app_list()
-        self.plugins = {name: plugin(self) for name, plugin in self.__class__.PLUGINS.items() if len(plugin.PACKAGE) and plugin.PACKAGE in app_list}
-    
-    @classmethod
-    def configure(cls, config: Config):
-        cls.CONFIG = config
-        [plugin_cls.configure(config.get('automators', {}).get(name, {})) for name, plugin_cls in cls.PLUGINS.items()]
+
+import time
+from typing import Optional, Set
+
+from automators.data_structs import Config
+from automators.plugins.base import BasePlugin
+from automators.device import Device
+from automators.utils.logger import Logging
+
+logger = Logging.get_logger(__name__)
+
+
+class PluggableDevice(Device):
+    CONFIG: Config
+    PLUGINS = {'__base__': BasePlugin} # Dummy plugin data, change this for use.
+    PACKAGE_INVENTORY_TTL = 60*60 # seconds, the installed packages are re-listed at least this often
+    PACKAGE_FINGERPRINT_COMMAND = "stat -c %Y /data/app 2>/dev/null || ls -ld /data/app" # changes when a package is installed, updated or removed
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.package_inventory: Optional[Set[str]] = None
+        self.package_fingerprint = ''
+        self.package_inventory_time = 0.0
+        self.plugins = {}
+        self.refresh_plugins()
+    
+    def get_package_fingerprint(self):
+        try:
+            return self.shell(self.__class__.PACKAGE_FINGERPRINT_COMMAND).strip()
+        except Exception as exc:
+            logger.debug("get_package_fingerprint: {}: {}".format(type(exc).__name__, exc))
+            return ''
+    
+    def invalidate_package_inventory(self):
+        self.package_inventory = None
+    
+    def get_installed_packages(self) -> Set[str]:
+        """Installed packages, cached until the package fingerprint changes or PACKAGE_INVENTORY_TTL passes. 
+        Without a fingerprint (e.g: the command is not permitted) only the TTL applies."""
+        fingerprint = self.get_package_fingerprint()
+        expired = time.time() - self.package_inventory_time > self.__class__.PACKAGE_INVENTORY_TTL
+        if self.package_inventory is None or expired or fingerprint != self.package_fingerprint:
+            self.package_inventory = set(self.u2_device.app_list())
+            self.package_fingerprint = fingerprint
+            self.package_inventory_time = time.time()
+        return self.package_inventory
+    
+    def refresh_plugins(self):
+        """Instantiates plugins of newly installed apps and drops the ones uninstalled. Existing plugin objects are kept."""
+        app_list = self.get_installed_packages()
+        self.plugins = {name: self.plugins.get(name) or plugin(self) for name, plugin in self.__class__.PLUGINS.items() if len(plugin.PACKAGE) and plugin.PACKAGE in app_list}
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.CONFIG = config
+        cls.PACKAGE_INVENTORY_TTL = config.get('package_inventory_ttl', cls.PACKAGE_INVENTORY_TTL)
+        cls.PACKAGE_FINGERPRINT_COMMAND = config.get('package_fingerprint_command', cls.PACKAGE_FINGERPRINT_COMMAND)
+        [plugin_cls.configure(config.get('automators', {}).get(name, {})) for name, plugin_cls in cls.PLUGINS.items()]
@@ -1,4 +1,4 @@
-from .base import BasePlugin
-from .linkaja import LinkajaAutomator
-from .digipos import DigiposAutomator
-from .mitra_tokopedia import MitraTokopediaAutomator
+from .base import BasePlugin
+from .linkaja import LinkajaAutomator
+from .digipos import DigiposAutomator
+from .mitra_tokopedia import MitraTokopediaAutomator
@@ -1,52 +1,68 @@
-
-from automators.device import Device
-from automators.data_structs import Config, ProductList
-from automators.xpath import XPathMap
-from automators.request import Request
-from automators.result import Result
-from automators.utils.translator import Translator
-
-
-class AutomatorPlugin:
-    CONFIG: Config
-    PACKAGE: str # Required package to run.
-    XPATH: XPathMap
-    PRODUCTS: ProductList
-    TRANSLATOR: Translator
-    APP_PIN: str
-    
-    def __init__(self, device: Device):
-        self.device=device
-        self.state=None
-        self.watchers=[] # should only have the watchers of currect active automator
-    
-    @classmethod
-    def configure(cls, config: Config):
-        """Configure the class variables. Must call super().configure(config)"""
-        cls.CONFIG = config
-    
-    @property
-    def xpath(self):
-        return self.__class__.XPATH
-    
-    @property
-    def products(self):
-        return self.__class__.PRODUCTS
-
-    @property
-    def translator(self):
-        return self.__class__.TRANSLATOR
-    
-    @property
-    def t(self):
-        return self.__class__.TRANSLATOR
-    
-    @property
-    def app_pin(self):
-        return self.__class__.APP_PIN
-    
-    def processRequest(self, request: Request):
-        return Result(request.number, request.product_spec)
-
-
-BasePlugin = AutomatorPlugin
+
+from automators.device import Device
+from automators.data_structs import Config, ProductList
+from automators.xpath import XPathMap
+from automators.request import Request
+from automators.result import Result
+from automators.utils.rate_limiter import RateControllerRegistry
+from automators.utils.translator import Translator
+
+
+class AutomatorPlugin:
+    CONFIG: Config
+    PACKAGE: str # Required package to run.
+    XPATH: XPathMap
+    PRODUCTS: ProductList
+    TRANSLATOR: Translator
+    APP_PIN: str
+    NAME = '' # Automator name, the key of rate controllers
+    ACCOUNT = '' # Provider account the app is logged in as, devices sharing an account share a rate controller
+    RATE_CONTROLLERS = RateControllerRegistry() # Shared by every plugin class
+    
+    def __init__(self, device: Device):
+        self.device=device
+        self.state=None
+        self.watchers=[] # should only have the watchers of currect active automator
+    
+    @classmethod
+    def configure(cls, config: Config):
+        """Configure the class variables. Must call super().configure(config)"""
+        cls.CONFIG = config
+        cls.ACCOUNT = config.get('account', cls.ACCOUNT)
+    
+    @property
+    def xpath(self):
+        return self.__class__.XPATH
+    
+    @property
+    def products(self):
+        return self.__class__.PRODUCTS
+
+    @property
+    def translator(self):
+        return self.__class__.TRANSLATOR
+    
+    @property
+    def t(self):
+        return self.__class__.TRANSLATOR
+    
+    @property
+    def app_pin(self):
+        return self.__class__.APP_PIN
+    
+    @property
+    def rate_controller(self):
+        return AutomatorPlugin.RATE_CONTROLLERS.get(self.__class__.NAME, self.__class__.ACCOUNT)
+    
+    def report_busy(self):
+        """Signals the provider is busy or throttling, so every device slows down dispatching to it."""
+        self.rate_controller.on_busy()
+    
+    def report_success(self):
+        self.rate_controller.on_success()
+    
+    def processRequest(self, request: Request):
+        return Result(request.number, request.product_spec)
+
+
+BasePlugin = AutomatorPlugin
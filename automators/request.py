@@ -1,24 +1,61 @@
-
-
-class Request:
-    """Request object to interface with inside automators."""
-    def __init__(self, number, product_spec, automator='', device=''):
-        self.number = number
-        self.product_spec = product_spec
-        self.automator = automator
-        self.device = device
-
-    @property
-    def dict(self):
-        return {'number': self.number, 'product_spec': self.product_spec, 'automator': self.automator, 'device': self.device}
-
-    def __eq__(self, other: object):
-        if isinstance(other, self.__class__):
-            return ((self.number == other.number) and (self.product_spec == other.product_spec) and (self.automator == other.automator))
-        return False
-    
-    def __repr__(self):
-        return "<Request number='{}' product_spec='{}' automator='{}'>".format(self.number, self.product_spec, self.automator)
-    
-    def __str__(self):
-        return "Request for number='{}' with product_spec='{}' and automator='{}'".format(self.number, self.product_spec, self.automator)
+import time
+from typing import List, Optional, Tuple, Union
+
+
+class Request:
+    """Request object to interface with inside automators."""
+    MAX_ERRORS = 10 # exception history entries kept
+    def __init__(self, number, product_spec, automator='', device='', deadline: Optional[float] = None):
+        self.number = number
+        self.product_spec = product_spec
+        self.automator = automator
+        self.device = device
+        self.deadline = deadline # unix timestamp after which the request should not be processed, None for no deadline
+        self.attempts = 0 # failed attempts, not counting the ones failed by an offline device
+        self.errors: List[dict] = [] # exception history, {'time', 'device', 'error'}
+        self.excluded_device = '' # serial of the device which failed the last attempt, see RequestableDevice.REQUEUE_POLICY
+        self.last_attempt_time = 0.0
+        self.alternatives: List[Tuple[str, str]] = [] # (automator, product_spec) to fail over to, best first
+    
+    def record_error(self, device_serial: str, error: Union[Exception, str], count_attempt=True):
+        error = "{}: {}".format(type(error).__name__, error) if isinstance(error, Exception) else error
+        self.errors = (self.errors + [{'time': time.time(), 'device': device_serial, 'automator': self.automator, 'error': error}])[-self.MAX_ERRORS:]
+        self.last_attempt_time = time.time()
+        if count_attempt:
+            self.attempts += 1
+    
+    def fail_over(self):
+        """Switches to the next alternative automator and product_spec. Returns False if there are none left."""
+        if not len(self.alternatives):
+            return False
+        self.automator, self.product_spec = self.alternatives.pop(0)
+        self.excluded_device = ''
+        return True
+    
+    def reset_attempts(self):
+        self.attempts = 0
+        self.excluded_device = ''
+    
+    @property
+    def remaining_time(self):
+        """Seconds left until the deadline, None if the request has no deadline."""
+        return None if self.deadline is None else self.deadline - time.time()
+    
+    @property
+    def expired(self):
+        return self.deadline is not None and time.time() >= self.deadline
+
+    @property
+    def dict(self):
+        return {'number': self.number, 'product_spec': self.product_spec, 'automator': self.automator, 'device': self.device}
+
+    def __eq__(self, other: object):
+        if isinstance(other, self.__class__):
+            return ((self.number == other.number) and (self.product_spec == other.product_spec) and (self.automator == other.automator))
+        return False
+    
+    def __repr__(self):
+        return "<Request number='{}' product_spec='{}' automator='{}'>".format(self.number, self.product_spec, self.automator)
+    
+    def __str__(self):
+        return "Request for number='{}' with product_spec='{}' and automator='{}'".format(self.number, self.product_spec, self.automator)
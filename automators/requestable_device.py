@@ -1,104 +1,269 @@
-
-import cProfile
-import pstats
-import time
-from queue import Empty, Queue
-from typing import Optional
-
-from automators.plugabble_device import PluggableDevice
-from automators.data_structs import Config
-from automators.plugins import *
-from automators.request import Request
-from automators.result import Result
-from automators.utils.logger import Logging
-
-logger = Logging.get_logger(__name__)
-
-
-class RequestableDevice(PluggableDevice): # not a good name but ok.
-    PLUGINS = {'linkaja': LinkajaAutomator, 'digipos': DigiposAutomator, 'mitra_tokopedia': MitraTokopediaAutomator}
-    DEFAULT_AUTOMATOR = 'linkaja'
-    REQUEST_POLLING_RATE = 0.5
-    ENABLE_PROFILER = False # For testing
-    
-    def __init__(self, *args, request_queue: Queue[Request], results_queue: Queue[Result], **kwargs):
-        super().__init__(*args, **kwargs)
-        self.request_queue = request_queue
-        self.results_queue = results_queue
-        self.current_request: Optional[Request] = None
-        self.is_offline = False
-        self.stop = False
-    
-    @classmethod
-    def configure(cls, config: Config):
-        super().configure(config)
-        cls.REQUEST_POLLING_RATE = config.get('request_polling_rate', cls.REQUEST_POLLING_RATE)
-        cls.DEFAULT_AUTOMATOR = config.get('default_automator', cls.DEFAULT_AUTOMATOR)
-        cls.ENABLE_PROFILER = config.get('enable_profiler', cls.ENABLE_PROFILER)
-    
-    def get_info(self, detailed=False):
-        data = super().get_info(detailed=detailed)
-        data['current_request'] = self.current_request
-        return data
-    
-    def processRequest(self, request:Request):
-        automator = self.plugins.get(request.automator or self.__class__.DEFAULT_AUTOMATOR) # defaults to LinkajaAutomator
-        assert(automator) # assert it is not None
-        self.current_request = request
-        try:
-            self.wakeUp()
-            if self.__class__.ENABLE_PROFILER: # only for testing purposes
-                start=time.time()
-                with cProfile.Profile() as profiler:
-                    res = automator.processRequest(request)
-                end=time.time()
-                res.execution_duration=int(end-start)
-                pstats.Stats(profiler).dump_stats(filename=time.strftime("%b_%d_%H_%M")+'.prof')
-            else:
-                start=time.time()
-                res = automator.processRequest(request)
-                end=time.time()
-                res.execution_duration=int(end-start)
-            self.sleep()
-        except Exception as exc:
-            self.current_request=None
-            raise exc
-        self.current_request=None
-        return res
-    
-    def run(self):
-        """A while true loop, waiting for requests to be fulfilled and put result into the result queue."""
-        self.is_offline = False
-        while True:
-            try:
-                time.sleep(self.__class__.REQUEST_POLLING_RATE)
-                if self.stop:
-                    break
-                if self.request_queue.empty():
-                    continue
-                req: 'Request' = self.request_queue.queue[0]
-                if (req.automator or self.__class__.DEFAULT_AUTOMATOR) not in self.plugins:
-                    continue
-                if len(req.device) > 0 and req.device != self.serial:
-                    continue
-                request = self.request_queue.get()
-            except (Empty, IndexError): # Empty from Queue.get, IndexError from Queue.queue[0]
-                continue
-            
-            try:
-                result = self.processRequest(request)
-                self.results_queue.put(result)
-            except Exception as exc:
-                device_offline = isinstance(exc, RuntimeError) and 'offline' in (exc.args+('',))[0]
-                if device_offline:
-                    logger.info("Device %s is offline" % self.serial)
-                else:
-                    logger.debug("Unexpected exception: {}: {}".format(type(exc), str(exc)))
-                    logger.exception(exc)
-                if self.processing_request: # so if device is processing then its requeue-able.
-                    logger.info("Re-queueing an unfulfilled request. Request={}".format(request))
-                    print("A transaction is not processed yet, putting it back into queue.")
-                    self.request_queue.put(request)
-                if device_offline:
-                    self.is_offline = True
-                    return # stops the device handler.
+
+import cProfile
+from datetime import datetime
+import pstats
+import time
+from queue import Empty, Queue
+from threading import Event
+from typing import Callable, Dict, Optional, TYPE_CHECKING
+
+from automators.plugabble_device import PluggableDevice
+from automators.data_structs import Config
+from automators.plugins import *
+from automators.request import Request
+from automators.result import Result
+from automators.utils.logger import Logging
+from automators.utils.rate_limiter import AIMDRateController
+
+if TYPE_CHECKING:
+    from automators.worker_process import WorkerProcess
+
+logger = Logging.get_logger(__name__)
+
+
+class RequestableDevice(PluggableDevice): # not a good name but ok.
+    PLUGINS = {'linkaja': LinkajaAutomator, 'digipos': DigiposAutomator, 'mitra_tokopedia': MitraTokopediaAutomator}
+    DEFAULT_AUTOMATOR = 'linkaja'
+    REQUEST_POLLING_RATE = 0.5
+    ENABLE_PROFILER = False # For testing
+    EXECUTION_DURATION_SMOOTHING = 0.2 # Weight of the newest execution duration in the moving average
+    REQUEUE_POLICY = 'back' # back/front/other_device, where unfulfilled requests are put back
+    OTHER_DEVICE_GRACE_PERIOD = 30 # seconds other devices get to pick a request up before the failing device may retry it
+    MAX_ATTEMPTS = 3 # failed attempts before a request is quarantined, 0 for unlimited
+    FAILURE_RATE_SMOOTHING = 0.2 # Weight of the newest outcome in the moving average of failures
+    FAILOVER_ERRORS = ['server_busy_error', 'product_out_of_stock', 'denom_unavailable', 'max_recursion_error', 'transaction_timed_out'] # translation keys
+    
+    def __init__(self, *args, request_queue: Queue[Request], results_queue: Queue[Result], quarantine_queue: Optional[Queue[Request]] = None, **kwargs):
+        self.stop_event = Event()
+        self.offline_event = Event()
+        self.on_signal: Callable[[], None] = lambda:None # called when stop or is_offline is set, e.g: to wake up a supervisor
+        super().__init__(*args, **kwargs)
+        self.request_queue = request_queue
+        self.results_queue = results_queue
+        self.quarantine_queue = quarantine_queue
+        self.current_request: Optional[Request] = None
+        self.execution_durations: Dict[str, float] = {} # automator:exponential moving average of execution duration
+        self.failure_rates: Dict[str, float] = {} # automator:exponential moving average of failures, 1 for failed and 0 for success
+        self.endpoint = '' # name of the ADB endpoint the device is attached to
+        self.remote: Optional['WorkerProcess'] = None # set in worker process mode, processRequest is then executed by it
+    
+    @property
+    def stop(self):
+        return self.stop_event.is_set()
+    
+    @stop.setter
+    def stop(self, value: bool):
+        if value == self.stop:
+            return
+        self.stop_event.set() if value else self.stop_event.clear()
+        self.on_signal()
+    
+    @property
+    def is_offline(self):
+        return self.offline_event.is_set()
+    
+    @is_offline.setter
+    def is_offline(self, value: bool):
+        if value == self.is_offline:
+            return
+        self.offline_event.set() if value else self.offline_event.clear()
+        self.on_signal()
+    
+    @classmethod
+    def configure(cls, config: Config):
+        super().configure(config)
+        cls.REQUEST_POLLING_RATE = config.get('request_polling_rate', cls.REQUEST_POLLING_RATE)
+        cls.DEFAULT_AUTOMATOR = config.get('default_automator', cls.DEFAULT_AUTOMATOR)
+        cls.ENABLE_PROFILER = config.get('enable_profiler', cls.ENABLE_PROFILER)
+        cls.EXECUTION_DURATION_SMOOTHING = config.get('execution_duration_smoothing', cls.EXECUTION_DURATION_SMOOTHING)
+        cls.REQUEUE_POLICY = config.get('requeue_policy', cls.REQUEUE_POLICY)
+        cls.OTHER_DEVICE_GRACE_PERIOD = config.get('other_device_grace_period', cls.OTHER_DEVICE_GRACE_PERIOD)
+        cls.MAX_ATTEMPTS = config.get('max_attempts', cls.MAX_ATTEMPTS)
+        cls.FAILURE_RATE_SMOOTHING = config.get('failure_rate_smoothing', cls.FAILURE_RATE_SMOOTHING)
+        cls.FAILOVER_ERRORS = config.get('failover_errors', cls.FAILOVER_ERRORS)
+        AIMDRateController.configure(config.get('rate_control', Config()))
+    
+    def record_execution_duration(self, automator_name: str, duration: float):
+        alpha = self.__class__.EXECUTION_DURATION_SMOOTHING
+        previous = self.execution_durations.get(automator_name)
+        self.execution_durations[automator_name] = duration if previous is None else (alpha*duration + (1-alpha)*previous)
+    
+    def get_average_execution_duration(self, automator_name: str, default: float):
+        return self.execution_durations.get(automator_name, default)
+    
+    def record_outcome(self, automator_name: str, success: bool):
+        alpha = self.__class__.FAILURE_RATE_SMOOTHING
+        self.failure_rates[automator_name] = alpha*(not success) + (1-alpha)*self.failure_rates.get(automator_name, 0)
+    
+    def get_failure_rate(self, automator_name: str):
+        return self.failure_rates.get(automator_name, 0)
+    
+    def get_info(self, detailed=False):
+        data = super().get_info(detailed=detailed)
+        data['current_request'] = self.current_request
+        return data
+    
+    def processRequest(self, request:Request):
+        automator_name = request.automator or self.__class__.DEFAULT_AUTOMATOR
+        automator = self.plugins.get(automator_name) # defaults to LinkajaAutomator
+        assert(automator) # assert it is not None
+        self.current_request = request
+        if self.remote is not None: # the worker process' device does the rest, including waking up and rate control signals
+            self.processing_request = True # how far the worker process got is unknown, so a failed request is always requeue-able
+            try:
+                res = self.remote.process_request(self.serial, request)
+            finally:
+                self.current_request = None
+            self.processing_request = False
+            self.record_execution_duration(automator_name, res.execution_duration)
+            self.record_outcome(automator_name, res.success)
+            res.update(device=self.serial)
+            return res
+        try:
+            self.wakeUp()
+            if self.__class__.ENABLE_PROFILER: # only for testing purposes
+                start=time.time()
+                with cProfile.Profile() as profiler:
+                    res = automator.processRequest(request)
+                end=time.time()
+                res.execution_duration=int(end-start)
+                pstats.Stats(profiler).dump_stats(filename=time.strftime("%b_%d_%H_%M")+'.prof')
+            else:
+                start=time.time()
+                res = automator.processRequest(request)
+                end=time.time()
+                res.execution_duration=int(end-start)
+            self.record_execution_duration(automator_name, res.execution_duration)
+            self.record_outcome(automator_name, res.success)
+            res.update(device=self.serial)
+            if res.success:
+                automator.report_success()
+            self.sleep()
+        except Exception as exc:
+            self.current_request=None
+            raise exc
+        self.current_request=None
+        return res
+    
+    def can_process(self, request: Request):
+        if (request.automator or self.__class__.DEFAULT_AUTOMATOR) not in self.plugins:
+            return False
+        if len(request.device) > 0 and request.device not in (self.serial, self.endpoint): # a device or an ADB endpoint
+            return False
+        if request.excluded_device == self.serial and time.time() - request.last_attempt_time < self.__class__.OTHER_DEVICE_GRACE_PERIOD:
+            return False
+        return self.plugins[request.automator or self.__class__.DEFAULT_AUTOMATOR].rate_controller.is_available() # taken in get_request
+    
+    @classmethod
+    def make_quarantined_result(cls, request: Request):
+        """The failed result of a quarantined request which is given up on."""
+        result = Result.from_request(request)
+        result.update(refID=None, time=datetime.now(), error=cls.PLUGINS[request.automator or cls.DEFAULT_AUTOMATOR].TRANSLATOR('request_quarantined'), 
+                      description=request.errors[-1]['error'] if len(request.errors) else None, quarantined=True)
+        return result
+    
+    def requeue(self, request: Request):
+        """Puts an unfulfilled request back into the queue according to REQUEUE_POLICY, 
+        or into the quarantine queue once it has failed MAX_ATTEMPTS times. A quarantined request has no result 
+        until it is retried or discarded, see DeviceManager.discard_quarantined."""
+        cls = self.__class__
+        if cls.MAX_ATTEMPTS > 0 and request.attempts >= cls.MAX_ATTEMPTS and self.quarantine_queue is not None:
+            logger.info("Quarantining a request which failed {} times. Request={}".format(request.attempts, request))
+            print("A transaction failed {} times, putting it into quarantine.".format(request.attempts))
+            self.quarantine_queue.put(request)
+            return
+        logger.info("Re-queueing an unfulfilled request. Request={}".format(request))
+        print("A transaction is not processed yet, putting it back into queue.")
+        if cls.REQUEUE_POLICY == 'other_device':
+            request.excluded_device = self.serial
+        if cls.REQUEUE_POLICY in ('front', 'other_device') and hasattr(self.request_queue, 'put_front'):
+            self.request_queue.put_front(request) # type: ignore
+        else:
+            self.request_queue.put(request)
+    
+    def should_fail_over(self, result: Result):
+        """Whether the failed result is caused by the provider rather than the request, so an equivalent automator may succeed."""
+        if result.success:
+            return False
+        automator = self.plugins.get(result.automator or self.__class__.DEFAULT_AUTOMATOR)
+        if automator is None:
+            return False
+        return (result.error or result.description) in [automator.t(key) for key in self.__class__.FAILOVER_ERRORS]
+    
+    def fail_over(self, request: Request):
+        """Puts the request back into the queue for its next alternative automator. Returns False if it has none."""
+        previous_automator = request.automator
+        if not request.fail_over():
+            return False
+        logger.info("Failing over a request from {} to {}. Request={}".format(previous_automator, request.automator, request))
+        print("A transaction failed on {}, failing over to {}.".format(previous_automator, request.automator))
+        if hasattr(self.request_queue, 'put_front'):
+            self.request_queue.put_front(request) # type: ignore
+        else:
+            self.request_queue.put(request)
+        return True
+    
+    def get_request(self):
+        """Gets a request this device can process, or raises Empty/IndexError if there is none."""
+        if hasattr(self.request_queue, 'get_matching'): # scheduling queues can skip requests meant for other devices
+            request = self.request_queue.get_matching(self.can_process, block=False)
+        else:
+            if self.request_queue.empty():
+                raise Empty
+            if not self.can_process(self.request_queue.queue[0]):
+                raise Empty
+            request = self.request_queue.get()
+        if not self.acquire_dispatch_slot(request): # stopped while waiting, the request goes back to the front for another device
+            if hasattr(self.request_queue, 'put_front'):
+                self.request_queue.put_front(request) # type: ignore
+            else:
+                self.request_queue.put(request)
+            getattr(self.request_queue, 'done', lambda *_:None)(request)
+            raise Empty
+        return request
+    
+    def acquire_dispatch_slot(self, request: Request) -> bool:
+        """Takes a dispatch slot of the request's rate controller, outside of the queue's lock. If a device sharing the controller 
+        took the slot can_process saw, waits for the next one rather than putting the request back. Returns False if the device was stopped meanwhile."""
+        rate_controller = self.plugins[request.automator or self.__class__.DEFAULT_AUTOMATOR].rate_controller
+        while not rate_controller.try_acquire():
+            if self.stop_event.wait(max(rate_controller.time_until_available(), 0.01)):
+                return False
+        return True
+    
+    def run(self):
+        """A while true loop, waiting for requests to be fulfilled and put result into the result queue."""
+        self.is_offline = False
+        while True:
+            try:
+                if self.stop_event.wait(self.__class__.REQUEST_POLLING_RATE): # returns as soon as the device is stopped
+                    break
+                request = self.get_request()
+            except (Empty, IndexError): # Empty from Queue.get, IndexError from Queue.queue[0]
+                continue
+            
+            try:
+                result = self.processRequest(request)
+                if self.should_fail_over(result) and len(request.alternatives):
+                    request.record_error(self.serial, result.error or result.description, count_attempt=False)
+                    self.fail_over(request)
+                else:
+                    self.results_queue.put(result)
+            except Exception as exc:
+                device_offline = isinstance(exc, RuntimeError) and 'offline' in (exc.args+('',))[0]
+                if device_offline:
+                    logger.info("Device %s is offline" % self.serial)
+                else:
+                    logger.debug("Unexpected exception: {}: {}".format(type(exc), str(exc)))
+                    logger.exception(exc)
+                request.record_error(self.serial, exc, count_attempt=not device_offline)
+                if not device_offline:
+                    self.record_outcome(request.automator or self.__class__.DEFAULT_AUTOMATOR, False)
+                if self.processing_request: # so if device is processing then its requeue-able.
+                    if device_offline or not self.fail_over(request):
+                        self.requeue(request)
+                if device_offline:
+                    self.is_offline = True
+                    return # stops the device handler.
+            finally:
+                getattr(self.request_queue, 'done', lambda *_:None)(request)
@@ -1,2 +1,2 @@
-from .bounds import Bounds
-from .element import Element
+from .bounds import Bounds
+from .element import Element
@@ -1,6 +1,7 @@
-from .delay import Delay
-from .exception import *
-from .helper import *
-from .logger import Logging
-from .translator import Translator
-from .ext import *
\ No newline at end of file
+from .delay import Delay
+from .exception import *
+from .helper import *
+from .logger import Logging
+from .translator import Translator
+from .ext import *
+from .rate_limiter import *
\ No newline at end of file
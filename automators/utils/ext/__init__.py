@@ -1,3 +1,3 @@
-from .match import BaseMatch, MatchAll, MatchAny
-from .number import Number
-from .product import Macros as ProductMacros
+from .match import BaseMatch, MatchAll, MatchAny
+from .number import Number
+from .product import Macros as ProductMacros
@@ -0,0 +1,151 @@
+import threading
+import time
+from typing import Dict, Tuple
+
+
+__all__ = ['TokenBucket', 'AIMDRateController', 'RateControllerRegistry']
+
+
+class TokenBucket:
+    """Thread-safe token bucket. A rate of 0 or less disables the limit, every acquire succeeds."""
+    def __init__(self, rate: float, burst: float = 0):
+        self.rate = rate
+        self.burst = max(burst, 1) if burst > 0 else max(rate, 1)
+        self.tokens = self.burst
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.rate > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def try_acquire(self, tokens: float = 1):
+        """Takes tokens if available, returns whether it did or not. Never blocks."""
+        if not self.enabled:
+            return True
+        with self.lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
+
+    def try_acquire_up_to(self, tokens: int) -> int:
+        """Takes as many whole tokens as available, up to tokens. Returns how many it took. Never blocks."""
+        if not self.enabled:
+            return tokens
+        with self.lock:
+            self._refill()
+            taken = min(tokens, int(self.tokens))
+            self.tokens -= taken
+            return taken
+
+    def refund(self, tokens: float = 1):
+        """Gives back tokens taken by try_acquire, e.g: when another limit rejected the same work."""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.tokens = min(self.burst, self.tokens + tokens)
+
+    def time_until_available(self, tokens: float = 1):
+        """Seconds until tokens can be acquired, 0 if they are available now."""
+        if not self.enabled:
+            return 0
+        with self.lock:
+            self._refill()
+            return max(0, (tokens - self.tokens) / self.rate)
+
+
+class AIMDRateController:
+    """Token bucket with an adaptive rate, shared by every device using the same provider account. 
+    The rate increases additively on successes and decreases multiplicatively on busy/throttle signals, 
+    at most once per DECREASE_COOLDOWN, since devices hitting the same storm report it at once."""
+    ENABLED = False
+    INITIAL_RATE = 0.5 # requests per second
+    MIN_RATE = 0.02
+    MAX_RATE = 2.0
+    ADDITIVE_INCREASE = 0.05 # requests per second, per success
+    MULTIPLICATIVE_DECREASE = 0.5
+    DECREASE_COOLDOWN = 10 # seconds
+    
+    def __init__(self):
+        cls = self.__class__
+        self.bucket = TokenBucket(cls.INITIAL_RATE, 1)
+        self.last_decrease = 0.0
+        self.lock = threading.Lock()
+    
+    @classmethod
+    def configure(cls, config):
+        cls.ENABLED = config.get('enabled', cls.ENABLED)
+        cls.INITIAL_RATE = config.get('initial_rate', cls.INITIAL_RATE)
+        cls.MIN_RATE = config.get('min_rate', cls.MIN_RATE)
+        cls.MAX_RATE = config.get('max_rate', cls.MAX_RATE)
+        cls.ADDITIVE_INCREASE = config.get('additive_increase', cls.ADDITIVE_INCREASE)
+        cls.MULTIPLICATIVE_DECREASE = config.get('multiplicative_decrease', cls.MULTIPLICATIVE_DECREASE)
+        cls.DECREASE_COOLDOWN = config.get('decrease_cooldown', cls.DECREASE_COOLDOWN)
+    
+    @property
+    def rate(self):
+        return self.bucket.rate
+    
+    def set_rate(self, rate: float):
+        cls = self.__class__
+        with self.bucket.lock:
+            self.bucket._refill() # tokens until now accrue at the previous rate
+            self.bucket.rate = min(max(rate, cls.MIN_RATE), cls.MAX_RATE)
+    
+    def try_acquire(self):
+        """Takes a dispatch slot if available. Never blocks."""
+        if not self.__class__.ENABLED:
+            return True
+        return self.bucket.try_acquire()
+    
+    def time_until_available(self):
+        """Seconds until a dispatch slot is available, 0 if one is available now. Does not take it."""
+        if not self.__class__.ENABLED:
+            return 0
+        return self.bucket.time_until_available()
+    
+    def is_available(self):
+        return self.time_until_available() <= 0
+    
+    def on_success(self):
+        with self.lock:
+            self.set_rate(self.rate + self.__class__.ADDITIVE_INCREASE)
+    
+    def on_busy(self):
+        """Slows down and takes the saved up tokens away, so every device backs off together."""
+        now = time.monotonic()
+        with self.lock:
+            if now - self.last_decrease < self.__class__.DECREASE_COOLDOWN:
+                return
+            self.last_decrease = now
+            self.set_rate(self.rate * self.__class__.MULTIPLICATIVE_DECREASE)
+            with self.bucket.lock:
+                self.bucket.tokens = 0
+    
+    def get_info(self):
+        return {'enabled': self.__class__.ENABLED, 'rate': self.rate, 'time_until_available': self.bucket.time_until_available()}
+
+
+class RateControllerRegistry:
+    """AIMDRateControllers keyed by (automator, account)."""
+    def __init__(self, controller_cls=AIMDRateController):
+        self.controller_cls = controller_cls
+        self.controllers: Dict[Tuple[str, str], AIMDRateController] = {}
+        self.lock = threading.Lock()
+    
+    def get(self, automator: str, account: str = '') -> AIMDRateController:
+        with self.lock:
+            if (automator, account) not in self.controllers:
+                self.controllers[(automator, account)] = self.controller_cls()
+            return self.controllers[(automator, account)]
+    
+    def get_info(self):
+        with self.lock:
+            return [{'automator': automator, 'account': account, **controller.get_info()} for (automator, account), controller in self.controllers.items()]
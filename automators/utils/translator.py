@@ -1 +1 @@
-from i18n import TranslatorGroup as Translator
+from i18n import TranslatorGroup as Translator
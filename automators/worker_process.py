@@ -0,0 +1,252 @@
+import logging
+from logging.handlers import QueueHandler
+import multiprocessing
+from queue import Empty, Queue
+import sys
+from threading import Lock, Thread
+from typing import Dict, List
+
+from automators.client import Client
+from automators.data_structs import Config
+from automators.plugins.base import AutomatorPlugin
+from automators.request import Request
+from automators.result import Result
+from automators.utils.logger import Logging
+
+logger = Logging.get_logger(__name__)
+
+
+class WorkerProcessError(Exception):
+    """An exception raised inside a worker process, carried over by name and message."""
+
+
+class RemoteRateController:
+    """Stands in for an AIMDRateController inside a worker process. The parent took the dispatch slot already, 
+    success and busy signals are forwarded to the parent's shared controller."""
+    def __init__(self, outbox, automator: str, account: str):
+        self.outbox = outbox
+        self.automator = automator
+        self.account = account
+    
+    def try_acquire(self):
+        return True
+    
+    def time_until_available(self):
+        return 0
+    
+    def is_available(self):
+        return True
+    
+    def on_success(self):
+        self.outbox.put(('rate', self.automator, self.account, 'on_success'))
+    
+    def on_busy(self):
+        self.outbox.put(('rate', self.automator, self.account, 'on_busy'))
+    
+    def get_info(self):
+        return {}
+
+
+class RemoteRateControllerRegistry:
+    def __init__(self, outbox):
+        self.outbox = outbox
+    
+    def get(self, automator: str, account: str = ''):
+        return RemoteRateController(self.outbox, automator, account)
+    
+    def get_info(self):
+        return []
+
+
+def strip_request(request: Request):
+    """A picklable copy of the request, without the server objects subclasses may carry."""
+    stripped = Request(request.number, request.product_spec, request.automator, request.device, request.deadline)
+    stripped.attempts = request.attempts
+    stripped.errors = list(request.errors)
+    return stripped
+
+
+def worker_main(device_cls: type, device_config: Config, log_level: int, inbox, outbox):
+    """Entry point of a worker process. Creates a device on ('attach', serial, host, port), then processes (serial, request) from the inbox on a thread per device, 
+    putting ('result', serial, result) or ('error', serial, name, args, is_runtime_error) into the outbox. Log records are forwarded too."""
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(outbox)]
+    root.setLevel(log_level)
+    device_cls.configure(device_config)
+    AutomatorPlugin.RATE_CONTROLLERS = RemoteRateControllerRegistry(outbox)
+    clients: Dict[tuple, Client] = {} # (host, port):client
+    pending: Dict[str, Queue] = {} # serial:requests
+    
+    def serve(serial: str, client: Client):
+        try:
+            device = device_cls(client, serial, request_queue=Queue(), results_queue=Queue())
+        except Exception as exc:
+            logger.exception("Failed to create device '{}' in worker process.".format(serial), exc_info=sys.exc_info())
+            device = None
+            error = exc
+        while True:
+            request = pending[serial].get()
+            if request is None:
+                return
+            try:
+                if device is None:
+                    raise RuntimeError("Device '{}' is offline, it could not be created: {}".format(serial, error))
+                result = device.processRequest(request)
+                result.request = None # the parent puts its own request back
+                outbox.put(('result', serial, result))
+            except Exception as exc:
+                outbox.put(('error', serial, type(exc).__name__, tuple(str(arg) for arg in exc.args), isinstance(exc, RuntimeError)))
+    
+    while True:
+        message = inbox.get()
+        if message is None:
+            break
+        kind, serial = message[:2]
+        if kind == 'attach':
+            host, port = message[2:]
+            client = clients.setdefault((host, port), Client(host, port, device_cls=device_cls))
+            pending[serial] = Queue()
+            Thread(target=serve, args=(serial, client), name='device_worker-{}'.format(serial), daemon=True).start()
+        elif kind == 'detach':
+            pending.pop(serial, Queue()).put(None)
+        elif kind == 'request':
+            pending[serial].put(message[2])
+    [requests.put(None) for requests in pending.values()]
+
+
+class WorkerProcess:
+    """A subprocess running the plugins of one or more devices, so their parsing and matching do not contend for the GIL of the main process. 
+    The main process keeps the scheduling, requeueing and rate control, only processRequest crosses over."""
+    def __init__(self, device_cls: type, device_config: Config, start_method: str = 'spawn'):
+        context = multiprocessing.get_context(start_method)
+        self.inbox = context.Queue()
+        self.outbox = context.Queue()
+        self.replies: Dict[str, Queue] = {} # serial:replies
+        self.process = context.Process(target=worker_main, args=(device_cls, device_config, logging.getLogger().level, self.inbox, self.outbox), daemon=True)
+        self.reader = Thread(target=self.read, name='worker_process_reader', daemon=True)
+    
+    @property
+    def serials(self):
+        return list(self.replies)
+    
+    def start(self):
+        self.process.start()
+        self.reader.start()
+    
+    def is_alive(self):
+        return self.process.is_alive()
+    
+    def attach(self, serial: str, host: str, port: int):
+        self.replies[serial] = Queue()
+        self.inbox.put(('attach', serial, host, port))
+    
+    def detach(self, serial: str):
+        self.replies.pop(serial, None)
+        self.inbox.put(('detach', serial))
+    
+    def process_request(self, serial: str, request: Request) -> Result:
+        """Processes the request on the worker process, blocking until it is done. 
+        Raises a RuntimeError marking the device offline if the process died, so the request is requeued."""
+        replies = self.replies[serial]
+        self.inbox.put(('request', serial, strip_request(request)))
+        while True:
+            try:
+                reply = replies.get(timeout=1)
+            except Empty:
+                if not self.is_alive():
+                    raise RuntimeError("Worker process of device '{}' exited with code {}, device is offline.".format(serial, self.process.exitcode))
+                continue
+            if reply[0] == 'result':
+                result = reply[1]
+                result.request = request
+                return result
+            name, args, is_runtime_error = reply[1:]
+            raise RuntimeError(*args) if is_runtime_error else WorkerProcessError("{}: {}".format(name, ', '.join(args)))
+    
+    def read(self):
+        """Routes replies to the waiting devices, applies forwarded rate control signals and handles forwarded log records."""
+        while True:
+            try:
+                message = self.outbox.get()
+            except (EOFError, OSError):
+                return
+            if message is None:
+                return
+            if isinstance(message, logging.LogRecord):
+                logging.getLogger(message.name).handle(message)
+                continue
+            if message[0] == 'rate':
+                _, automator, account, signal = message
+                getattr(AutomatorPlugin.RATE_CONTROLLERS.get(automator, account), signal)()
+                continue
+            replies = self.replies.get(message[1])
+            if replies is not None:
+                replies.put((message[0],) + tuple(message[2:]))
+    
+    def stop(self, timeout: float = 5):
+        self.inbox.put(None)
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.outbox.put(None) # stops the reader
+
+
+class WorkerProcessPool:
+    """Assigns devices to worker processes, DEVICES_PER_PROCESS at most per process. 
+    Processes are started on demand and stopped once their last device is released."""
+    DEVICES_PER_PROCESS = 1
+    START_METHOD = 'spawn' # fork is unsafe with the threads of the main process
+    STOP_TIMEOUT = 5 # seconds
+    WORKER_PROCESS_CLS = WorkerProcess
+    
+    def __init__(self, device_cls: type, device_config: Config):
+        self.device_cls = device_cls
+        self.device_config = device_config
+        self.processes: List[WorkerProcess] = []
+        self.assignments: Dict[str, WorkerProcess] = {} # serial:process
+        self.lock = Lock()
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.DEVICES_PER_PROCESS = config.get('devices_per_process', cls.DEVICES_PER_PROCESS)
+        cls.START_METHOD = config.get('start_method', cls.START_METHOD)
+        cls.STOP_TIMEOUT = config.get('stop_timeout', cls.STOP_TIMEOUT)
+    
+    def acquire(self, serial: str, host: str, port: int) -> WorkerProcess:
+        cls = self.__class__
+        with self.lock:
+            for process in [process for process in self.processes if not process.is_alive()]:
+                logger.info("Dropping a dead worker process of devices {}.".format(process.serials))
+                self.processes.remove(process)
+                [self.assignments.pop(s, None) for s in process.serials]
+            if serial in self.assignments:
+                return self.assignments[serial]
+            process = ([process for process in self.processes if len(process.serials) < max(cls.DEVICES_PER_PROCESS, 1)] + [None])[0]
+            if process is None:
+                process = cls.WORKER_PROCESS_CLS(self.device_cls, self.device_config, cls.START_METHOD)
+                process.start()
+                self.processes.append(process)
+            process.attach(serial, host, port)
+            self.assignments[serial] = process
+            return process
+    
+    def release(self, serial: str):
+        with self.lock:
+            process = self.assignments.pop(serial, None)
+            if process is None:
+                return
+            process.detach(serial)
+            if len(process.serials) or process not in self.processes:
+                return
+            self.processes.remove(process)
+        process.stop(self.__class__.STOP_TIMEOUT)
+    
+    def stop(self):
+        with self.lock:
+            processes, self.processes = self.processes, []
+            self.assignments.clear()
+        [process.stop(self.__class__.STOP_TIMEOUT) for process in processes]
+    
+    def get_info(self):
+        with self.lock:
+            return [{'pid': process.process.pid, 'alive': process.is_alive(), 'devices': process.serials} for process in self.processes]
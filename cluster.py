@@ -0,0 +1,314 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import sys
+from threading import Lock
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from automators.data_structs import Config
+from server.request import Request as ServerRequest
+
+from data_structs import InteractibleRequest
+
+if TYPE_CHECKING:
+    from automators.device_manager import DeviceManager
+    from data_structs import CallbackableQueue
+    from middlewares import RequestMiddleware
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS nodes (node_id TEXT PRIMARY KEY, heartbeat REAL NOT NULL, info TEXT NOT NULL DEFAULT '{}')",
+    "CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, owner TEXT NOT NULL, expires REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS work (id INTEGER PRIMARY KEY AUTOINCREMENT, dedup_key TEXT NOT NULL, automator TEXT NOT NULL, device TEXT NOT NULL DEFAULT '', "
+    "payload TEXT NOT NULL, origin TEXT NOT NULL, owner TEXT, state TEXT NOT NULL, created REAL NOT NULL, updated REAL NOT NULL)",
+    # one active work per dedup key across the cluster, the shared duplicate and in-flight index
+    "CREATE UNIQUE INDEX IF NOT EXISTS work_active_key ON work(dedup_key) WHERE state IN ('queued', 'claimed', 'executing')",
+    "CREATE INDEX IF NOT EXISTS work_state ON work(state, id)",
+    "CREATE TABLE IF NOT EXISTS messages (id INTEGER PRIMARY KEY AUTOINCREMENT, work_id INTEGER NOT NULL, node_id TEXT NOT NULL, kind TEXT NOT NULL, body TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS messages_node ON messages(node_id, id)",
+]
+
+
+class ClusterCoordinator:
+    """Coordination state shared by every node, in an SQLite file on shared storage. SQLite's file locks serialize the writers.
+    Work moves through queued -> claimed -> executing -> done. Claimed work of a dead node is queued again since it never started,
+    executing work of a dead node becomes lost instead of being retried, so a customer message is executed at most once, and exactly once while nodes are alive."""
+    DATABASE_FILENAME = 'cluster.db'
+    NODE_ID = '' # defaults to <hostname>-<pid>
+    NODE_TIMEOUT = 30 # seconds without a heartbeat before a node is dead
+    LEASE_DURATION = 30 # seconds
+    BUSY_TIMEOUT = 10 # seconds to wait on the locks of other nodes
+    RETENTION = 24*60*60 # seconds finished work is kept
+    
+    def __init__(self, filename: Optional[str] = None, node_id: Optional[str] = None):
+        cls = self.__class__
+        self.filename = filename or cls.DATABASE_FILENAME
+        self.node_id = node_id or cls.NODE_ID or "{}-{}".format(socket.gethostname(), os.getpid())
+        self.connection = sqlite3.connect(self.filename, timeout=cls.BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self.lock = Lock()
+        with self.lock:
+            [self.connection.execute(statement) for statement in SCHEMA]
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.DATABASE_FILENAME = config.get('database_filename', cls.DATABASE_FILENAME)
+        cls.NODE_ID = config.get('node_id', cls.NODE_ID)
+        cls.NODE_TIMEOUT = config.get('node_timeout', cls.NODE_TIMEOUT)
+        cls.LEASE_DURATION = config.get('lease_duration', cls.LEASE_DURATION)
+        cls.BUSY_TIMEOUT = config.get('busy_timeout', cls.BUSY_TIMEOUT)
+        cls.RETENTION = config.get('retention', cls.RETENTION)
+    
+    def execute(self, query: str, args: tuple = ()):
+        with self.lock:
+            return self.connection.execute(query, args).fetchall()
+    
+    def transaction(self, func: Callable[[sqlite3.Connection], Any]):
+        """Runs func(connection) atomically, taking the write lock of the file up front so nodes do not interleave. Returns what func returns."""
+        with self.lock:
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(self.connection)
+                self.connection.execute("COMMIT")
+                return result
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+    
+    # Membership
+    def heartbeat(self, info: dict = {}):
+        self.execute("INSERT INTO nodes (node_id, heartbeat, info) VALUES (?, ?, ?) ON CONFLICT(node_id) DO UPDATE SET heartbeat=excluded.heartbeat, info=excluded.info",
+                     (self.node_id, time.time(), json.dumps(info)))
+    
+    def get_nodes(self):
+        deadline = time.time() - self.__class__.NODE_TIMEOUT
+        return [{'node_id': node_id, 'heartbeat': heartbeat, 'alive': heartbeat >= deadline, 'info': json.loads(info)}
+                for node_id, heartbeat, info in self.execute("SELECT node_id, heartbeat, info FROM nodes ORDER BY node_id")]
+    
+    def reap(self):
+        """Recovers the work of dead nodes. Returns the lost work as [(work_id, origin)], their origins are told by the caller."""
+        cls = self.__class__
+        now = time.time()
+        dead = "SELECT node_id FROM nodes WHERE heartbeat < ?"
+        deadline = now - cls.NODE_TIMEOUT
+        def reap(connection: sqlite3.Connection):
+            connection.execute("UPDATE work SET state='queued', owner=NULL, updated=? WHERE state='claimed' AND owner IN ({})".format(dead), (now, deadline))
+            lost = connection.execute("SELECT id, origin FROM work WHERE state='executing' AND owner IN ({})".format(dead), (deadline,)).fetchall()
+            connection.execute("UPDATE work SET state='lost', updated=? WHERE state='executing' AND owner IN ({})".format(dead), (now, deadline))
+            connection.execute("DELETE FROM messages WHERE node_id IN ({})".format(dead), (deadline,))
+            connection.execute("DELETE FROM work WHERE state IN ('done', 'lost') AND updated < ?", (now - cls.RETENTION,))
+            return lost
+        return [(work_id, origin) for work_id, origin in self.transaction(reap)]
+    
+    # Leader election
+    def acquire_lease(self, name: str):
+        """Takes or renews the lease, returns whether this node holds it."""
+        now = time.time()
+        def acquire(connection: sqlite3.Connection):
+            connection.execute("INSERT OR IGNORE INTO leases (name, owner, expires) VALUES (?, ?, 0)", (name, self.node_id))
+            connection.execute("UPDATE leases SET owner=?, expires=? WHERE name=? AND (owner=? OR expires<?)", (self.node_id, now + self.__class__.LEASE_DURATION, name, self.node_id, now))
+            return connection.execute("SELECT owner FROM leases WHERE name=?", (name,)).fetchone()[0]
+        return self.transaction(acquire) == self.node_id
+    
+    def release_lease(self, name: str):
+        self.execute("UPDATE leases SET expires=0 WHERE name=? AND owner=?", (name, self.node_id))
+    
+    def get_leases(self):
+        return [{'name': name, 'owner': owner, 'expires': expires} for name, owner, expires in self.execute("SELECT name, owner, expires FROM leases ORDER BY name")]
+    
+    # Work queue
+    def submit(self, dedup_key: str, automator: str, device: str, payload: dict) -> Optional[int]:
+        """Queues work, returns its id or None if work with the same dedup key is active."""
+        now = time.time()
+        try:
+            return self.transaction(lambda connection: connection.execute(
+                "INSERT INTO work (dedup_key, automator, device, payload, origin, state, created, updated) VALUES (?, ?, ?, ?, ?, 'queued', ?, ?)",
+                (dedup_key, automator, device, json.dumps(payload), self.node_id, now, now)).lastrowid)
+        except sqlite3.IntegrityError:
+            return None
+    
+    def get_active_state(self, dedup_keys: List[str]) -> Optional[str]:
+        """State of the active work with any of the dedup keys, None if there is none."""
+        if not len(dedup_keys):
+            return None
+        rows = self.execute("SELECT state FROM work WHERE state IN ('queued', 'claimed', 'executing') AND dedup_key IN ({})".format(','.join('?'*len(dedup_keys))), tuple(dedup_keys))
+        return rows[0][0] if len(rows) else None
+    
+    def claim(self, automators: List[str], devices: List[str]) -> Optional[Tuple[int, str, dict]]:
+        """Claims the oldest queued work this node can process. Returns (work_id, origin, payload), or None."""
+        if not len(automators):
+            return None
+        query = "SELECT id, origin, payload FROM work WHERE state='queued' AND automator IN ({}) AND device IN ({}) ORDER BY id LIMIT 1".format(
+            ','.join('?'*len(automators)), ','.join('?'*(len(devices)+1)))
+        def claim(connection: sqlite3.Connection):
+            row = connection.execute(query, (*automators, '', *devices)).fetchone()
+            if row is not None:
+                connection.execute("UPDATE work SET state='claimed', owner=?, updated=? WHERE id=?", (self.node_id, time.time(), row[0]))
+            return row
+        row = self.transaction(claim)
+        if row is None:
+            return None
+        work_id, origin, payload = row
+        return (work_id, origin, json.loads(payload))
+    
+    def set_state(self, work_id: int, state: str):
+        self.execute("UPDATE work SET state=?, updated=? WHERE id=? AND owner=?", (state, time.time(), work_id, self.node_id))
+    
+    def get_stats(self):
+        return {state: count for state, count in self.execute("SELECT state, COUNT(*) FROM work GROUP BY state")}
+    
+    # Replies of work executed on another node than its origin
+    def post(self, work_id: int, node_id: str, kind: str, body: dict):
+        self.execute("INSERT INTO messages (work_id, node_id, kind, body) VALUES (?, ?, ?, ?)", (work_id, node_id, kind, json.dumps(body)))
+    
+    def fetch(self) -> List[Tuple[int, str, dict]]:
+        rows = self.execute("SELECT id, work_id, kind, body FROM messages WHERE node_id=? ORDER BY id", (self.node_id,))
+        if len(rows):
+            self.execute("DELETE FROM messages WHERE node_id=? AND id<=?", (self.node_id, rows[-1][0]))
+        return [(work_id, kind, json.loads(body)) for _, work_id, kind, body in rows]
+
+
+class RemoteServerRequest(ServerRequest):
+    """Server request of work received by another node, replies and notifications are relayed to that node."""
+    def __init__(self, bridge: 'ClusterBridge', work_id: int, origin: str, request: str, user_identifier: str):
+        super().__init__(None, request, user_identifier, {'work_id': work_id, 'origin': origin})
+        self.bridge = bridge
+        self.work_id = work_id
+        self.origin = origin
+    
+    def reply(self, message):
+        self.bridge.coordinator.post(self.work_id, self.origin, 'reply', {'message': message})
+    
+    def notify(self, status, **details):
+        details = {k:v for k,v in details.items() if isinstance(v, (str, int, float, bool, type(None), list))}
+        self.bridge.coordinator.post(self.work_id, self.origin, 'notify', {'status': status, 'details': details})
+
+
+class ClusterBridge:
+    """Connects a node to the cluster. Requests accepted by this node are submitted to the shared work queue instead of the local queue,
+    and work is claimed into the local queue while it has room for the devices of this node."""
+    ENABLED = False
+    POLL_INTERVAL = 0.5 # seconds between claims and message deliveries
+    HEARTBEAT_INTERVAL = 5 # seconds
+    CLAIM_AHEAD = 1 # queued requests claimed per available device
+    TERMINAL_STATUSES = ['success', 'failed', 'expired', 'lost']
+    COORDINATOR_CLS = ClusterCoordinator
+    
+    def __init__(self, device_manager: 'DeviceManager', out_queue: 'CallbackableQueue', coordinator: Optional[ClusterCoordinator] = None):
+        self.device_manager = device_manager
+        self.out_queue = out_queue
+        self.coordinator = coordinator or self.__class__.COORDINATOR_CLS()
+        self.request_middleware: Optional['RequestMiddleware'] = None # set by the middleware, for translations
+        self.origin_requests: Dict[int, ServerRequest] = {} # work_id:server request, of work submitted by this node
+        self.last_heartbeat = 0.0
+        self.stop = False
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.ENABLED = config.get('enabled', cls.ENABLED)
+        cls.POLL_INTERVAL = config.get('poll_interval', cls.POLL_INTERVAL)
+        cls.HEARTBEAT_INTERVAL = config.get('heartbeat_interval', cls.HEARTBEAT_INTERVAL)
+        cls.CLAIM_AHEAD = config.get('claim_ahead', cls.CLAIM_AHEAD)
+        cls.COORDINATOR_CLS.configure(config)
+    
+    @staticmethod
+    def get_dedup_key(equivalents: List[InteractibleRequest]):
+        """Same for every request in a group of equivalent requests."""
+        return min(["{}|{}|{}".format(req.number, req.automator, req.product_spec) for req in equivalents])
+    
+    def submit(self, request: InteractibleRequest, equivalents: List[InteractibleRequest]) -> bool:
+        """Submits the request to the shared work queue, returns False if an equivalent request is active somewhere in the cluster."""
+        payload = {'number': request.number, 'product_spec': request.product_spec, 'automator': request.automator, 'device': request.device,
+                   'deadline': request.deadline, 'alternatives': request.alternatives, 'silent_progress': request.silent_progress,
+                   'request': request.server_request.request, 'user_identifier': request.server_request.user_identifier}
+        work_id = self.coordinator.submit(self.get_dedup_key(equivalents), request.automator, request.device, payload)
+        if work_id is None:
+            return False
+        self.origin_requests[work_id] = request.server_request
+        return True
+    
+    def get_active_state(self, equivalents: List[InteractibleRequest]):
+        """'in_queue', 'in_process' or None, for the cluster wide duplicate check."""
+        state = self.coordinator.get_active_state([self.get_dedup_key(equivalents)])
+        return None if state is None else ('in_process' if state == 'executing' else 'in_queue')
+    
+    def on_executing(self, request: InteractibleRequest):
+        if request.cluster_work_id is not None:
+            self.coordinator.set_state(request.cluster_work_id, 'executing')
+    
+    def on_finished(self, request: InteractibleRequest):
+        work_id = request.cluster_work_id
+        if work_id is not None:
+            self.coordinator.set_state(work_id, 'done')
+            if not isinstance(request.server_request, RemoteServerRequest):
+                self.origin_requests.pop(work_id, None)
+    
+    def get_local_capacity(self):
+        devices = [d for d in self.device_manager.devices if not (d.stop or d.is_offline)]
+        automators = sorted({automator for d in devices for automator in d.plugins})
+        targets = [d.serial for d in devices] + sorted({getattr(d, 'endpoint', '') for d in devices} - {''})
+        return (len(devices), automators, targets)
+    
+    def claim(self):
+        """Claims work while the local queue has room. Returns the number of claimed work."""
+        device_count, automators, targets = self.get_local_capacity()
+        claimed = 0
+        while len(self.out_queue.queue) < self.__class__.CLAIM_AHEAD * device_count:
+            work = self.coordinator.claim(automators, targets)
+            if work is None:
+                break
+            work_id, origin, payload = work
+            server_request = self.origin_requests.get(work_id) if origin == self.coordinator.node_id else None
+            if server_request is None:
+                server_request = RemoteServerRequest(self, work_id, origin, payload['request'], payload['user_identifier'])
+            request = InteractibleRequest(payload['number'], payload['product_spec'], payload['automator'], payload['device'], server_request=server_request, deadline=payload['deadline'])
+            request.alternatives = [tuple(alternative) for alternative in payload['alternatives']]
+            request.silent_progress = payload['silent_progress']
+            request.cluster_work_id = work_id
+            self.out_queue.put(request)
+            claimed += 1
+        return claimed
+    
+    def deliver(self):
+        """Relays replies of work this node submitted but another node executed."""
+        for work_id, kind, body in self.coordinator.fetch():
+            server_request = self.origin_requests.get(work_id)
+            if server_request is None:
+                continue
+            if kind == 'reply':
+                server_request.reply(body['message'])
+            elif kind == 'lost':
+                if self.request_middleware is not None:
+                    server_request.reply(self.request_middleware.t('transaction_outcome_unknown').format(message_content=server_request.request))
+                server_request.notify('lost')
+            else:
+                server_request.notify(body['status'], **body['details'])
+            if body.get('status', kind) in self.__class__.TERMINAL_STATUSES:
+                self.origin_requests.pop(work_id, None)
+    
+    def maintain(self):
+        device_count, automators, _ = self.get_local_capacity()
+        self.coordinator.heartbeat({'devices': device_count, 'automators': automators, 'queued': len(self.out_queue.queue)})
+        for work_id, origin in self.coordinator.reap():
+            logger.warning("Cluster work {} was executing on a dead node, its outcome is unknown.".format(work_id))
+            self.coordinator.post(work_id, origin, 'lost', {})
+    
+    def get_info(self):
+        return {'node_id': self.coordinator.node_id, 'nodes': self.coordinator.get_nodes(), 'leases': self.coordinator.get_leases(),
+                'work': self.coordinator.get_stats(), 'relaying': len(self.origin_requests)}
+    
+    def run(self):
+        while not self.stop:
+            try:
+                if time.time() - self.last_heartbeat >= self.__class__.HEARTBEAT_INTERVAL:
+                    self.maintain()
+                    self.last_heartbeat = time.time()
+                self.deliver()
+                self.claim()
+            except sqlite3.Error as exc:
+                logger.exception("Cluster coordination failed: {}".format(exc), exc_info=sys.exc_info())
+            time.sleep(self.__class__.POLL_INTERVAL)
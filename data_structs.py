@@ -1,35 +1,290 @@
-
-from queue import Queue
-from typing import Optional
-from automators.request import Request as AutomatorRequest
-from automators.result import Result
-from server.request import Request as ServerRequest
-
-
-class CallbackableQueue(Queue):
-    def __init__(self, maxsize: int = 0, get_callback = lambda *_:None):
-        super().__init__(maxsize)
-        self.get_callback = get_callback
-    
-    def get(self, block=True, timeout=None):
-        item = super().get(block, timeout)
-        self.get_callback(item)
-        return item
-
-
-class InteractibleRequest(AutomatorRequest):
-    def __init__(self, number, product_spec, automator='', device='', server_request=None, **kw):
-        super().__init__(number, product_spec, automator, device)
-        self.server_request: Optional[ServerRequest] = server_request
-    
-    def reply(self, message):
-        self.server_request.reply(message)
-
-
-class InteractibleResult(Result):
-    def __init__(self, number, product_spec, refID=None, time=None, description=None, error=None, automator=None, execution_duration=-1, request=None, **kwargs):
-        super().__init__(number, product_spec, refID, time, description, error, automator, execution_duration, request, **kwargs)
-        self.request: Optional[InteractibleRequest]
-
-    def reply(self, message):
-        self.request.server_request.reply(message)
+
+from collections import deque
+from dataclasses import dataclass
+import heapq
+import itertools
+from queue import Empty, Queue
+import time
+from typing import Callable, Deque, Dict, List, Optional
+from automators.request import Request as AutomatorRequest
+from automators.result import Result
+from server.request import Request as ServerRequest
+
+
+class CallbackableQueue(Queue):
+    def __init__(self, maxsize: int = 0, get_callback = lambda *_:None):
+        super().__init__(maxsize)
+        self.get_callback = get_callback
+    
+    def get(self, block=True, timeout=None):
+        item = super().get(block, timeout)
+        self.get_callback(item)
+        return item
+    
+    def put_front(self, item):
+        """Puts the item in front of the queue, for retries of items which have already waited their turn. Never blocks."""
+        with self.mutex:
+            self._put_front(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+    
+    def _put_front(self, item):
+        self.queue.appendleft(item)
+    
+    def done(self, item):
+        """Called by consumers when an item got from the queue is finished, whether it succeeded or not."""
+
+
+@dataclass
+class SchedulingPolicy:
+    weight: int = 1 # share of dispatches relative to other users of the same priority
+    priority: int = 0 # higher priority classes are always dispatched first
+    max_in_flight: int = 0 # maximum requests being processed at once, 0 for unlimited
+
+
+def get_deadline(item):
+    return getattr(item, 'deadline', None)
+
+
+def user_identifier_key(item):
+    server_request = getattr(item, 'server_request', None)
+    return server_request.user_identifier if server_request is not None else ''
+
+
+class FairQueueView:
+    """Read-mostly view of a FairQueue's items, in dispatch order. Stands in for Queue.queue, so holding the mutex is up to the caller."""
+    def __init__(self, fair_queue: 'FairQueue'):
+        self.fair_queue = fair_queue
+    
+    def __iter__(self):
+        return iter(self.fair_queue.scheduled_items())
+    
+    def __len__(self):
+        return sum([len(subqueue) for subqueue in self.fair_queue.subqueues.values()])
+    
+    def __contains__(self, item):
+        return any([item in subqueue for subqueue in list(self.fair_queue.subqueues.values())])
+    
+    def __getitem__(self, index):
+        return self.fair_queue.scheduled_items()[index]
+    
+    def remove(self, item):
+        for subqueue in self.fair_queue.subqueues.values():
+            if item in subqueue:
+                index = subqueue.index(item)
+                self.fair_queue._untrack_deadline(subqueue[index])
+                del subqueue[index]
+                return
+        raise ValueError("{} is not in queue.".format(item))
+
+
+class FairQueue(CallbackableQueue):
+    """Weighted fair queue with priority classes. Items are put into per-user sub-queues (see key), 
+    then dispatched from the highest priority class, by the smallest virtual time within a class. 
+    Every dispatch advances the user's virtual time by 1/weight, so users are served in proportion to their weights.
+    Users at their max_in_flight limit are skipped until done is called for one of their items. 
+    Items past their deadline (a unix timestamp, see get_deadline) are taken off a deadline heap when dispatching, 
+    or once their deadline passes while consumers wait, and passed to expire_callback instead."""
+    def __init__(self, maxsize: int = 0, get_callback = lambda *_:None, key: Callable = user_identifier_key, 
+                 expire_callback = lambda *_:None, get_deadline: Callable = get_deadline):
+        self.key = key
+        self.expire_callback = expire_callback
+        self.get_deadline = get_deadline
+        super().__init__(maxsize, get_callback)
+    
+    def _init(self, maxsize):
+        self.subqueues: Dict[str, Deque] = {}
+        self.policies: Dict[str, SchedulingPolicy] = {}
+        self.virtual_times: Dict[str, float] = {}
+        self.virtual_clock = 0.0
+        self.in_flight: Dict[str, int] = {}
+        self.arrival_counter = itertools.count()
+        self.arrivals: Dict[str, int] = {} # user:arrival number of the user's sub-queue, tie breaker
+        self.deadlines: List[list] = [] # heap of [deadline, count, item], item is None once it left the queue
+        self.deadline_entries: Dict[int, list] = {} # id(item):its entry in deadlines
+        self.deadline_counter = itertools.count()
+        self.queue = FairQueueView(self)
+    
+    def get_policy(self, user: str):
+        return self.policies.get(user, SchedulingPolicy())
+    
+    def set_policy(self, user: str, weight: int = 1, priority: int = 0, max_in_flight: int = 0):
+        with self.mutex:
+            self.policies[user] = SchedulingPolicy(max(weight or 1, 1), priority or 0, max(max_in_flight or 0, 0))
+            self.not_empty.notify_all() # the user may be eligible now
+    
+    def is_eligible(self, user: str):
+        max_in_flight = self.get_policy(user).max_in_flight
+        return max_in_flight <= 0 or self.in_flight.get(user, 0) < max_in_flight
+    
+    def eligible_users(self):
+        """Non-empty, eligible users, in dispatch order."""
+        users = [user for user, subqueue in self.subqueues.items() if len(subqueue) and self.is_eligible(user)]
+        return sorted(users, key=lambda user: (-self.get_policy(user).priority, self.virtual_times.get(user, 0), self.arrivals.get(user, 0)))
+    
+    def _qsize(self):
+        return sum([len(self.subqueues[user]) for user in self.subqueues if self.is_eligible(user)])
+    
+    def _get_subqueue(self, user: str):
+        subqueue = self.subqueues.setdefault(user, deque())
+        if not len(subqueue):
+            # A user which was idle does not get credit for the time it was idle.
+            self.virtual_times[user] = max(self.virtual_times.get(user, 0), self.virtual_clock)
+            self.arrivals[user] = next(self.arrival_counter)
+        return subqueue
+    
+    def _put(self, item):
+        self._get_subqueue(self.key(item)).append(item)
+        self._track_deadline(item)
+    
+    def _put_front(self, item):
+        self._get_subqueue(self.key(item)).appendleft(item)
+        self._track_deadline(item)
+    
+    def _track_deadline(self, item):
+        deadline = self.get_deadline(item)
+        if deadline is not None:
+            entry = [deadline, next(self.deadline_counter), item]
+            self.deadline_entries[id(item)] = entry
+            heapq.heappush(self.deadlines, entry)
+    
+    def _untrack_deadline(self, item):
+        entry = self.deadline_entries.pop(id(item), None)
+        if entry is None:
+            return
+        entry[2] = None
+        if len(self.deadlines) > 2*len(self.deadline_entries) + 64: # mostly dispatched items, compact it
+            self.deadlines = [entry for entry in self.deadlines if entry[2] is not None]
+            heapq.heapify(self.deadlines)
+    
+    def _time_until_expiry(self) -> Optional[float]:
+        """Seconds until the earliest deadline of a queued item, None if no queued item has a deadline."""
+        while len(self.deadlines) and self.deadlines[0][2] is None:
+            heapq.heappop(self.deadlines)
+        return self.deadlines[0][0] - time.time() if len(self.deadlines) else None
+    
+    def _dispatch(self, user: str, index: int = 0):
+        subqueue = self.subqueues[user]
+        item = subqueue[index]
+        del subqueue[index]
+        self.virtual_clock = max(self.virtual_clock, self.virtual_times.get(user, 0))
+        self.virtual_times[user] = self.virtual_times.get(user, 0) + 1/self.get_policy(user).weight
+        self.in_flight[user] = self.in_flight.get(user, 0) + 1
+        if not len(subqueue):
+            self.subqueues.pop(user)
+        self._untrack_deadline(item)
+        return item
+    
+    def _get(self):
+        return self._dispatch(self.eligible_users()[0])
+    
+    def _pop_expired(self):
+        """Takes the items past their deadline off the deadline heap and out of their sub-queues, only looks at the expired ones."""
+        expired = []
+        now = time.time()
+        while len(self.deadlines) and self.deadlines[0][0] <= now:
+            item = heapq.heappop(self.deadlines)[2]
+            if item is None:
+                continue
+            self.deadline_entries.pop(id(item), None)
+            user = self.key(item)
+            subqueue = self.subqueues.get(user, deque())
+            index = next((index for index, queued in enumerate(subqueue) if queued is item), None)
+            if index is None:
+                continue
+            del subqueue[index]
+            if not len(subqueue):
+                self.subqueues.pop(user)
+            expired.append(item)
+        return expired
+    
+    def _pop_matching(self, predicate: Callable):
+        for user in self.eligible_users():
+            for index, item in enumerate(self.subqueues[user]):
+                if predicate(item):
+                    return self._dispatch(user, index)
+        return None
+    
+    def get(self, block=True, timeout=None):
+        return self.get_matching(lambda _: True, block, timeout)
+    
+    def get_matching(self, predicate: Callable, block=True, timeout=None):
+        """Like get, but only dispatches items for which predicate(item) is true. 
+        Non-matching items are skipped instead of blocking the items behind them."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self.not_empty:
+                expired = self._pop_expired()
+                item = self._pop_matching(predicate)
+                if item is None and not len(expired):
+                    if not block:
+                        raise Empty
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise Empty
+                    until_expiry = self._time_until_expiry() # wakes up to expire items, even while nothing is dispatchable
+                    if until_expiry is not None:
+                        remaining = max(until_expiry, 0.01) if remaining is None else min(remaining, max(until_expiry, 0.01))
+                    self.not_empty.wait(remaining)
+                    continue
+                for _ in range(len(expired) + (item is not None)):
+                    self.not_full.notify()
+            for expired_item in expired: # outside of the lock, the callback may reply to users
+                self.expire_callback(expired_item)
+            if item is not None:
+                self.get_callback(item)
+                return item
+            if not block:
+                raise Empty
+    
+    def done(self, item):
+        user = self.key(item)
+        with self.mutex:
+            if self.in_flight.get(user, 0) > 0:
+                self.in_flight[user] -= 1
+            if not self.in_flight.get(user):
+                self.in_flight.pop(user, None)
+            self.not_empty.notify_all()
+    
+    def scheduled_items(self) -> List:
+        """Items in the order they would be dispatched, ignoring in-flight limits. 
+        Like Queue.queue, the caller should hold the mutex for a consistent result."""
+        heap = [(-self.get_policy(user).priority, self.virtual_times.get(user, 0), self.arrivals.get(user, 0), user, list(subqueue)) 
+                for user, subqueue in list(self.subqueues.items()) if len(subqueue)]
+        weights = {user: self.get_policy(user).weight for user in self.subqueues}
+        heapq.heapify(heap)
+        items = []
+        while heap:
+            priority, virtual_time, arrival, user, pending = heapq.heappop(heap)
+            items.append(pending.pop(0))
+            if pending:
+                heapq.heappush(heap, (priority, virtual_time + 1/weights[user], arrival, user, pending))
+        return items
+    
+    def get_stats(self):
+        """Per-user scheduling state, keyed by user."""
+        with self.mutex:
+            users = set(self.subqueues) | set(self.in_flight)
+            return {user: {'queued': len(self.subqueues.get(user, [])), 'in_flight': self.in_flight.get(user, 0), 
+                           'virtual_time': self.virtual_times.get(user, 0), 'eligible': self.is_eligible(user), 
+                           **self.get_policy(user).__dict__} for user in users}
+
+
+class InteractibleRequest(AutomatorRequest):
+    def __init__(self, number, product_spec, automator='', device='', server_request=None, deadline=None, **kw):
+        super().__init__(number, product_spec, automator, device, deadline)
+        self.server_request: Optional[ServerRequest] = server_request
+        self.silent_progress = False # skips the 'being processed' reply, for requests from bulk messages
+        self.cluster_work_id: Optional[int] = None # id in the cluster's shared work queue, see cluster.ClusterBridge
+    
+    def reply(self, message):
+        self.server_request.reply(message)
+
+
+class InteractibleResult(Result):
+    def __init__(self, number, product_spec, refID=None, time=None, description=None, error=None, automator=None, execution_duration=-1, request=None, **kwargs):
+        super().__init__(number, product_spec, refID, time, description, error, automator, execution_duration, request, **kwargs)
+        self.request: Optional[InteractibleRequest]
+
+    def reply(self, message):
+        self.request.server_request.reply(message)
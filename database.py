@@ -1,33 +1,295 @@
-from api_template.base.database import *
-
-
-class Transaction(Model):
-    __TABLE_NAME__ = "transactions"
-    id = Field(int, primary_key=True, auto_increment=True, unique=True, not_null=True)
-    number = Field(str, not_null=True)
-    product_spec = Field(str, not_null=True)
-    refID = Field(str, not_null=True)
-    time = Field(datetime, not_null=True)
-    description = Field(str)
-    error = Field(str)
-    automator = Field(str, not_null=True, default='')
-    execution_duration = Field(int, not_null=True, default=-1)
-    
-    _repr_format = "<%(classname)s id=%(id)d number='%(number)s' product_spec='%(product_spec)s' refID='%(refID)s' success=%(success)s>"
-    
-    @property
-    def success(self):
-        return (self.time is not None and self.refID is not None and self.error is None)
-
-
-class User(Model):
-    __TABLE_NAME__ = "users"
-    id = Field(int, primary_key=True, auto_increment=True, unique=True, not_null=True)
-    server = Field(str, not_null=True)
-    identifier = Field(str, not_null=True)
-    
-    _repr_format = "<%(classname)s id=%(id)d id=%(id)s server='%(server)s' identifier='%(identifier)s'>"
-
-
-class SynapsisDB(MultiThreadedSQLiteDB):
-    TABLES = [Transaction, User]
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+import logging
+import os
+from queue import Queue, Empty
+import sqlite3
+import threading
+import time
+from typing import Iterator, List, Optional, Sequence, Tuple
+from urllib.request import pathname2url
+
+from api_template.base.database import *
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Index:
+    """A secondary index, declared in a model's __INDEXES__ and created at startup by migrations.ensure_indexes."""
+    name: str
+    columns: Tuple[str, ...]
+    unique: bool = False
+    
+    def create_sql(self, table_name: str):
+        return "CREATE {}INDEX IF NOT EXISTS {} ON {} ({})".format('UNIQUE ' if self.unique else '', self.name, table_name, ', '.join(self.columns))
+
+
+class Transaction(Model):
+    __TABLE_NAME__ = "transactions"
+    id = Field(int, primary_key=True, auto_increment=True, unique=True, not_null=True)
+    number = Field(str, not_null=True)
+    product_spec = Field(str, not_null=True)
+    refID = Field(str, not_null=True)
+    time = Field(datetime, not_null=True)
+    description = Field(str)
+    error = Field(str)
+    automator = Field(str, not_null=True, default='')
+    execution_duration = Field(int, not_null=True, default=-1)
+    device = Field(str, not_null=True, default='')
+    
+    __INDEXES__ = [Index('transactions_lookup', ('number', 'product_spec', 'automator', 'time')), # check_duplicate
+                   Index('transactions_time', ('time',)), # today's transactions, check_duplicates
+                   Index('transactions_refid', ('refID',))] # exact lookups, see search.TransactionSearch.lookup
+    
+    _repr_format = "<%(classname)s id=%(id)d number='%(number)s' product_spec='%(product_spec)s' refID='%(refID)s' success=%(success)s>"
+    
+    @property
+    def success(self):
+        return (self.time is not None and self.refID is not None and self.error is None)
+    
+    @classmethod
+    def from_row(cls, row: dict):
+        """Builds a transaction from a row read by a ReadConnectionPool, which leaves the time as it is stored."""
+        row = dict(row)
+        if isinstance(row.get('time'), str):
+            row['time'] = datetime.fromisoformat(row['time'])
+        elif isinstance(row.get('time'), (int, float)):
+            row['time'] = datetime.fromtimestamp(row['time'])
+        return cls(**row)
+
+
+class User(Model):
+    __TABLE_NAME__ = "users"
+    id = Field(int, primary_key=True, auto_increment=True, unique=True, not_null=True)
+    server = Field(str, not_null=True)
+    identifier = Field(str, not_null=True)
+    weight = Field(int, not_null=True, default=1)
+    priority = Field(int, not_null=True, default=0)
+    max_in_flight = Field(int, not_null=True, default=0)
+    
+    __INDEXES__ = [Index('users_server_identifier', ('server', 'identifier'))] # check_user
+    
+    _repr_format = "<%(classname)s id=%(id)d id=%(id)s server='%(server)s' identifier='%(identifier)s' weight=%(weight)s priority=%(priority)s>"
+    
+    @classmethod
+    def from_row(cls, row: dict):
+        return cls(**dict(row))
+
+
+class ReadConnectionPool:
+    """Read-only connections to the database file, for the API and analytics. With WAL journaling, 
+    reads on these connections neither wait for nor stall the writes of the cursor proxy. Every query is timed, 
+    the ones slower than SLOW_QUERY_THRESHOLD are logged and kept for get_info."""
+    SIZE = 4
+    ACQUIRE_TIMEOUT = 10 # seconds
+    BUSY_TIMEOUT = 5 # seconds
+    SLOW_QUERY_THRESHOLD = 0.5 # seconds
+    SLOW_QUERY_HISTORY = 20
+    
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.connections: Queue[sqlite3.Connection] = Queue()
+        self.opened = 0
+        self.lock = threading.Lock()
+        self.queries = 0
+        self.total_duration = 0.0
+        self.slow_queries = deque(maxlen=self.__class__.SLOW_QUERY_HISTORY)
+    
+    @classmethod
+    def configure(cls, config):
+        cls.SIZE = config.get('size', cls.SIZE)
+        cls.ACQUIRE_TIMEOUT = config.get('acquire_timeout', cls.ACQUIRE_TIMEOUT)
+        cls.BUSY_TIMEOUT = config.get('busy_timeout', cls.BUSY_TIMEOUT)
+        cls.SLOW_QUERY_THRESHOLD = config.get('slow_query_threshold', cls.SLOW_QUERY_THRESHOLD)
+        cls.SLOW_QUERY_HISTORY = config.get('slow_query_history', cls.SLOW_QUERY_HISTORY)
+    
+    def open(self):
+        uri = 'file:{}?mode=ro'.format(pathname2url(os.path.abspath(self.filename)))
+        connection = sqlite3.connect(uri, uri=True, timeout=self.__class__.BUSY_TIMEOUT, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA query_only = 1")
+        return connection
+    
+    @contextmanager
+    def connection(self):
+        """Borrows a connection, opening one while less than SIZE are open. Raises TimeoutError when none is returned in time."""
+        try:
+            connection = self.connections.get_nowait()
+        except Empty:
+            with self.lock:
+                can_open = self.opened < self.__class__.SIZE
+                self.opened += can_open
+            if can_open:
+                try:
+                    connection = self.open()
+                except BaseException:
+                    with self.lock:
+                        self.opened -= 1
+                    raise
+            else:
+                try:
+                    connection = self.connections.get(timeout=self.__class__.ACQUIRE_TIMEOUT)
+                except Empty:
+                    raise TimeoutError("No read connection became available in {}s.".format(self.__class__.ACQUIRE_TIMEOUT))
+        try:
+            yield connection
+        finally:
+            if connection.in_transaction:
+                connection.rollback()
+            self.connections.put(connection)
+    
+    def record(self, sql: str, duration: float):
+        with self.lock:
+            self.queries += 1
+            self.total_duration += duration
+            if duration >= self.__class__.SLOW_QUERY_THRESHOLD:
+                self.slow_queries.append({'sql': sql, 'duration': duration, 'time': time.time()})
+        if duration >= self.__class__.SLOW_QUERY_THRESHOLD:
+            logger.warning("Slow query took {:.3f}s: {}".format(duration, sql))
+    
+    def select(self, sql: str, params: tuple = ()):
+        """Runs a query and returns its rows as dicts."""
+        with self.connection() as connection:
+            start = time.monotonic()
+            try:
+                return [dict(row) for row in connection.execute(sql, params).fetchall()]
+            finally:
+                self.record(sql, time.monotonic() - start)
+    
+    def close(self):
+        while True:
+            try:
+                self.connections.get_nowait().close()
+            except Empty:
+                return
+    
+    def get_info(self):
+        with self.lock:
+            return {'size': self.__class__.SIZE, 'opened': self.opened, 'idle': self.connections.qsize(), 'queries': self.queries, 
+                    'average_duration': self.total_duration/self.queries if self.queries else 0, 'slow_queries': list(self.slow_queries)}
+
+
+@dataclass
+class TransactionFilter:
+    """Filters of the transaction exports. start and end are timestamps, end is exclusive."""
+    start: Optional[float] = None
+    end: Optional[float] = None
+    automator: Optional[str] = None
+    number: Optional[str] = None
+    success: Optional[bool] = None
+    
+    def to_sql(self):
+        """Returns the WHERE clauses and their parameters."""
+        clauses, params = [], []
+        if self.start is not None:
+            clauses.append("time >= ?")
+            params.append(datetime.fromtimestamp(self.start))
+        if self.end is not None:
+            clauses.append("time < ?")
+            params.append(datetime.fromtimestamp(self.end))
+        if self.automator is not None:
+            clauses.append("automator = ?")
+            params.append(self.automator)
+        if self.number is not None:
+            clauses.append("number = ?")
+            params.append(self.number)
+        if self.success is not None:
+            clauses.append("(error IS NULL AND refID IS NOT NULL)" if self.success else "(error IS NOT NULL OR refID IS NULL)")
+        return clauses, params
+
+
+class TransactionPager:
+    """Keyset pagination over the transactions, ordered by id or by (time, id). Pages are fetched by their own short query 
+    on a read connection, resuming after the key of the previous page's last row, so paging deep costs the same as the first 
+    page and no lock is held between pages. With archive partitions, each page is queried from every partition and merged."""
+    ORDERS = {'id': ('id',), 'time': ('time', 'id')}
+    
+    def __init__(self, reader: 'ReadConnectionPool', filters: Optional[TransactionFilter] = None, order_by: str = 'id', descending: bool = False, 
+                 partitions: Sequence['ReadConnectionPool'] = ()):
+        if order_by not in self.__class__.ORDERS:
+            raise ValueError("Can not order transactions by '{}'.".format(order_by))
+        self.reader = reader
+        self.partitions = partitions
+        self.filters = filters or TransactionFilter()
+        self.columns = self.__class__.ORDERS[order_by]
+        self.descending = descending
+    
+    def encode_cursor(self, row: dict) -> str:
+        return '|'.join(str(row[column]) for column in self.columns)
+    
+    def decode_cursor(self, cursor: str) -> list:
+        values = cursor.rsplit('|', len(self.columns)-1)
+        if len(values) != len(self.columns) or not values[-1].lstrip('-').isdigit():
+            raise ValueError("Invalid cursor '{}'.".format(cursor))
+        return values[:-1] + [int(values[-1])]
+    
+    def page(self, after: Optional[str] = None, limit: int = 100) -> Tuple[List[dict], Optional[str]]:
+        """Returns the rows after the cursor and the cursor of the next page, None on the last page."""
+        clauses, params = self.filters.to_sql()
+        if after is not None:
+            clauses.append("({}) {} ({})".format(', '.join(self.columns), '<' if self.descending else '>', ', '.join('?'*len(self.columns))))
+            params.extend(self.decode_cursor(after))
+        sql = "SELECT * FROM transactions{} ORDER BY {} LIMIT ?".format(
+            " WHERE " + " AND ".join(clauses) if len(clauses) else "", 
+            ', '.join("{} {}".format(column, 'DESC' if self.descending else 'ASC') for column in self.columns))
+        rows = self.reader.select(sql, tuple(params) + (limit,))
+        if len(self.partitions):
+            for partition in self.partitions:
+                rows.extend(partition.select(sql, tuple(params) + (limit,)))
+            rows.sort(key=lambda row: tuple(row[column] for column in self.columns), reverse=self.descending)
+            rows = rows[:limit]
+        return rows, (self.encode_cursor(rows[-1]) if len(rows) == limit else None)
+    
+    def iterate(self, batch_size: int = 500) -> Iterator[dict]:
+        """Yields every matching row, holding at most one page in memory."""
+        cursor = None
+        while True:
+            rows, cursor = self.page(cursor, batch_size)
+            yield from rows
+            if cursor is None:
+                return
+
+
+class SynapsisDB(MultiThreadedSQLiteDB):
+    """In the 'single' storage mode, everything goes through the proxied cursor. In the 'split' mode, the database is 
+    journaled with WAL, the proxied cursor is left as the only writer and reads of the API go through a ReadConnectionPool."""
+    TABLES = [Transaction, User]
+    STORAGE_MODE = 'single' # single/split
+    READ_CONNECTION_POOL_CLS = ReadConnectionPool
+    
+    def __init__(self, filename: str, *args, **kwargs):
+        super().__init__(filename, *args, **kwargs)
+        cls = self.__class__
+        self.filename = filename
+        self.reader = None
+        self.export_reader = None
+        self.reader_lock = threading.Lock()
+        if cls.STORAGE_MODE == 'split':
+            self.execute("PRAGMA journal_mode = WAL")
+            self.execute("PRAGMA synchronous = NORMAL") # durable enough with WAL, commits no longer wait for a sync
+            self.reader = cls.READ_CONNECTION_POOL_CLS(filename)
+    
+    @classmethod
+    def configure(cls, config):
+        cls.STORAGE_MODE = config.get('storage_mode', cls.STORAGE_MODE)
+        cls.READ_CONNECTION_POOL_CLS.configure(config.get('read_pool', {}))
+    
+    def get_read_pool(self) -> ReadConnectionPool:
+        """The read pool of the split mode. In the single mode, one is opened on first use for the paginated exports, 
+        which only read in short pages."""
+        if self.reader is None:
+            with self.reader_lock:
+                if self.export_reader is None:
+                    self.export_reader = self.__class__.READ_CONNECTION_POOL_CLS(self.filename)
+            return self.export_reader
+        return self.reader
+    
+    def get_info(self):
+        pool = self.reader or self.export_reader
+        return {'storage_mode': self.__class__.STORAGE_MODE, 'read_pool': pool.get_info() if pool is not None else None}
+    
+    def flush(self):
+        """Blocks until the cursor proxy has executed every queued statement, e.g: the table creations before migrating."""
+        list(User.get(User.id==-1))
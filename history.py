@@ -0,0 +1,220 @@
+from array import array
+from bisect import bisect_left
+from datetime import datetime
+import json
+import logging
+import os
+import struct
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Union
+import zlib
+
+from automators.data_structs import Config
+from automators.result import Result
+from importer import find_pickles, iter_pickles
+
+logger = logging.getLogger(__name__)
+
+
+RECORD_HEADER = struct.Struct('<II') # payload length, crc32 of the payload
+INDEX_ENTRY = struct.Struct('<Qd16s') # record offset, timestamp, number
+
+
+class HistoryLog:
+    """Append-only log of results. Records are length-prefixed, checksummed JSON, appended to the end of the file.
+    A sidecar index (<filename>.idx) holds one fixed-size entry per record with its offset, time and number, and is loaded
+    into memory on open, so any record is read with one seek and ranges of time or a number's records without scanning the log.
+    A record torn by a crash is cut off on open, records missing from the index are indexed again."""
+    ENABLED = False
+    FILENAME = 'history.log'
+    FSYNC = False # fsyncs every append, durable across power loss at the cost of throughput
+    
+    def __init__(self, filename: Optional[str] = None):
+        cls = self.__class__
+        self.filename = filename or cls.FILENAME
+        self.index_filename = self.filename + '.idx'
+        self.lock = Lock()
+        self.offsets = array('Q')
+        self.times = array('d')
+        self.numbers: Dict[str, List[int]] = {}
+        self.ordered = True # whether times are ascending, for bisecting
+        with self.lock:
+            self.data = open(self.filename, 'a+b')
+            self.index = open(self.index_filename, 'a+b')
+            self.load()
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.ENABLED = config.get('enabled', cls.ENABLED)
+        cls.FILENAME = config.get('filename', cls.FILENAME)
+        cls.FSYNC = config.get('fsync', cls.FSYNC)
+    
+    def __len__(self):
+        return len(self.offsets)
+    
+    def add_entry(self, offset: int, timestamp: float, number: str):
+        if len(self.times) and timestamp < self.times[-1]:
+            self.ordered = False
+        self.numbers.setdefault(number, []).append(len(self.offsets))
+        self.offsets.append(offset)
+        self.times.append(timestamp)
+    
+    def pop_entry(self) -> int:
+        """Forgets the last entry, returns its offset."""
+        number = [number for number, positions in self.numbers.items() if len(positions) and positions[-1] == len(self.offsets) - 1][0]
+        self.numbers[number].pop()
+        if not len(self.numbers[number]):
+            del self.numbers[number]
+        self.times.pop()
+        return self.offsets.pop()
+    
+    def load(self):
+        """Loads the index, drops the entries of the records torn at the end of the log (neither file is fsynced by default, 
+        so an entry may outlive its record), then recovers the records appended after the last complete index entry."""
+        self.index.seek(0)
+        raw = self.index.read()
+        complete = len(raw) - len(raw) % INDEX_ENTRY.size
+        data_size = os.fstat(self.data.fileno()).st_size
+        for offset, timestamp, number in INDEX_ENTRY.iter_unpack(raw[:complete]):
+            if offset >= data_size: # indexed, but the record itself was lost
+                break
+            self.add_entry(offset, timestamp, number.rstrip(b'\0').decode())
+        torn = None
+        while len(self.offsets):
+            try:
+                self.read_record(self.offsets[-1])
+                break
+            except ValueError:
+                torn = self.pop_entry()
+        if torn is not None:
+            logger.warning("Cutting off an indexed torn record at offset {} of {}.".format(torn, self.filename))
+            self.data.truncate(torn)
+            data_size = torn
+        if complete != len(self.offsets)*INDEX_ENTRY.size:
+            self.index.truncate(len(self.offsets)*INDEX_ENTRY.size)
+    
+        offset = self.offsets[-1] + RECORD_HEADER.size + self.read_header(self.offsets[-1])[0] if len(self.offsets) else 0
+        recovered = 0
+        while offset < data_size:
+            try:
+                record, size = self.read_record(offset)
+            except ValueError:
+                logger.warning("Cutting off a torn record at offset {} of {}.".format(offset, self.filename))
+                self.data.truncate(offset)
+                break
+            self.write_entry(offset, record['time'], str(record['number']))
+            offset += size
+            recovered += 1
+        if recovered:
+            logger.info("Indexed {} records missing from {}.".format(recovered, self.index_filename))
+    
+    def read_header(self, offset: int):
+        self.data.seek(offset)
+        header = self.data.read(RECORD_HEADER.size)
+        if len(header) < RECORD_HEADER.size:
+            raise ValueError("Truncated record header at offset {}.".format(offset))
+        return RECORD_HEADER.unpack(header)
+    
+    def read_record(self, offset: int):
+        """Returns the record at offset and its size in the log, header included."""
+        length, checksum = self.read_header(offset)
+        payload = self.data.read(length)
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            raise ValueError("Corrupted record at offset {}.".format(offset))
+        return json.loads(payload), RECORD_HEADER.size + length
+    
+    @staticmethod
+    def encode(record: dict) -> bytes:
+        return json.dumps(record, separators=(',', ':'), default=str).encode()
+    
+    def write_entry(self, offset: int, timestamp: float, number: str):
+        self.index.write(INDEX_ENTRY.pack(offset, timestamp, number.encode()[:16]))
+        self.index.flush()
+        self.add_entry(offset, timestamp, number[:16])
+    
+    def append(self, result: Union[Result, dict]):
+        """Appends a result, in O(1): the record is written at the end of the log, then its entry at the end of the index."""
+        record = dict(result.dict, device=getattr(result, 'extra', {}).get('device', '')) if isinstance(result, Result) else dict(result)
+        if isinstance(record.get('time'), datetime):
+            record['time'] = record['time'].timestamp()
+        record['time'] = record.get('time') or datetime.now().timestamp()
+        payload = self.encode(record)
+        with self.lock:
+            self.data.seek(0, os.SEEK_END)
+            offset = self.data.tell()
+            self.data.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            self.data.flush()
+            if self.__class__.FSYNC:
+                os.fsync(self.data.fileno())
+            self.write_entry(offset, record['time'], str(record['number']))
+    
+    def get(self, position: int) -> dict:
+        """The record at position, in order of appending."""
+        with self.lock:
+            return self.read_record(self.offsets[position])[0]
+    
+    def scan(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[dict]:
+        """Yields the records with start <= time < end, timestamps, in order of appending."""
+        with self.lock:
+            count = len(self.offsets)
+            first = bisect_left(self.times, start) if self.ordered and start is not None else 0
+        for position in range(first, count):
+            timestamp = self.times[position]
+            if end is not None and timestamp >= end:
+                if self.ordered:
+                    return
+                continue
+            if start is not None and timestamp < start:
+                continue
+            yield self.get(position)
+    
+    def find(self, number: str) -> List[dict]:
+        """Every record of the number, in order of appending. The index only keeps the first 16 bytes of numbers, 
+        so the records of longer numbers sharing them are filtered out."""
+        with self.lock:
+            positions = list(self.numbers.get(number[:16], []))
+        return [record for record in map(self.get, positions) if str(record['number']) == number]
+    
+    def close(self):
+        with self.lock:
+            self.data.close()
+            self.index.close()
+    
+    def get_info(self):
+        return {'enabled': self.__class__.ENABLED, 'filename': self.filename, 'records': len(self),
+                'first_time': self.times[0] if len(self.times) else None, 'last_time': self.times[-1] if len(self.times) else None}
+
+
+def convert_pickles(log: HistoryLog, filenames: List[str]) -> int:
+    """Appends the results of pickle history files, see importer.find_pickles, to the log.
+    Files are loaded one at a time, pass them oldest first to keep the log in time order. Returns the number of results."""
+    total = 0
+    for record in iter_pickles(filenames):
+        log.append(record)
+        total += 1
+    logger.info("Converted {} results of {} files.".format(total, len(filenames)))
+    return total
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Converts or prints the history log of results.")
+    parser.add_argument('command', choices=['convert', 'print'])
+    parser.add_argument('-l', '--log', dest='log', default=HistoryLog.FILENAME, help='The history log file.')
+    parser.add_argument('-p', '--pickle', dest='pickle', default='Hist.pick', help='Name of the pickle history, as given to utils.addPickle.')
+    parser.add_argument('--start', dest='start', default=None, help='Prints from this date on, YYYY-MM-DD.')
+    parser.add_argument('--end', dest='end', default=None, help='Prints until this date, exclusive, YYYY-MM-DD.')
+    args = parser.parse_args()
+
+    log = HistoryLog(args.log)
+    if args.command == 'convert':
+        filenames = find_pickles(args.pickle)
+        print("Converted {} results of {} files.".format(convert_pickles(log, filenames), len(filenames)))
+    else:
+        parse = lambda date: datetime.strptime(date, '%Y-%m-%d').timestamp() if date else None
+        for i, record in enumerate(log.scan(parse(args.start), parse(args.end))):
+            record['time'] = datetime.fromtimestamp(record['time'])
+            device = record.pop('device', '')
+            print("Transaction#{} {}{}".format(i, Result(**record).detailed(), " Device: {}.".format(device) if device else ''))
+    log.close()
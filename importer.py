@@ -0,0 +1,317 @@
+"""Streaming importer of legacy transaction history and user lists into the database. Records are read one at a time,
+automators are inferred over a sliding window and rows are committed in chunks, each together with the number of records
+of its source imported so far, so an interrupted import resumes after its last committed chunk."""
+from collections import deque
+from datetime import datetime
+import json
+import logging
+import os
+from pathlib import Path
+import pickle
+import sqlite3
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+PROGRESS_SCHEMA = "CREATE TABLE IF NOT EXISTS import_progress (source TEXT PRIMARY KEY, position INTEGER NOT NULL, finished INTEGER NOT NULL DEFAULT 0, updated REAL NOT NULL)"
+TRANSACTION_COLUMNS = ('number', 'product_spec', 'refID', 'time', 'description', 'error', 'automator', 'execution_duration', 'device')
+REFID_PREFIXES = [(('8', '9'), 'linkaja'), (('RANDOM', 'GUI'), 'digipos'), (('0',), 'mitra_tokopedia')] # of migrate_2
+
+
+class JsonStream:
+    """Incremental reader of a JSON document, yielding the elements of its arrays one at a time with their path of keys,
+    e.g: ('transactions', 'Hist_Jan_2022.pick') for the elements of data.json. Only one element is held in memory."""
+    CHUNK_SIZE = 64*1024
+    
+    def __init__(self, f: TextIO):
+        self.f = f
+        self.buffer = ''
+        self.position = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+    
+    def fill(self):
+        chunk = self.f.read(self.__class__.CHUNK_SIZE)
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        self.eof = not chunk
+        return not self.eof
+    
+    def peek(self) -> str:
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in ' \t\r\n':
+                self.position += 1
+            if self.position < len(self.buffer) or not self.fill():
+                return self.buffer[self.position:self.position+1]
+    
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if char == '' or char not in chars:
+            raise ValueError("Expected one of '{}' but got '{}'.".format(chars, char))
+        self.position += 1
+        return char
+    
+    def decode_value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+                if end < len(self.buffer) or self.eof: # a number at the end of the buffer may continue in the next chunk
+                    self.position = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+    
+    def walk(self, path: Tuple = ()) -> Iterator[Tuple[Tuple, Any]]:
+        char = self.peek()
+        if char == '{':
+            self.position += 1
+            if self.peek() == '}':
+                self.position += 1
+                return
+            while True:
+                key = self.decode_value()
+                self.expect(':')
+                yield from self.walk(path + (key,))
+                if self.expect(',}') == '}':
+                    return
+        elif char == '[':
+            self.position += 1
+            if self.peek() == ']':
+                self.position += 1
+                return
+            while True:
+                yield path, self.decode_value()
+                if self.expect(',]') == ']':
+                    return
+        else:
+            self.decode_value() # scalars outside of arrays are skipped
+
+
+def iter_legacy_json(filename: str, section: str) -> Iterator[dict]:
+    """The records of a section ('transactions' or 'users') of a data.json dumped by the former migrations.migrate_1."""
+    with open(filename) as f:
+        for path, record in JsonStream(f).walk():
+            if len(path) and path[0] == section:
+                yield record
+
+
+def iter_ndjson(filename: str) -> Iterator[dict]:
+    """The records of a newline delimited JSON file, e.g: from /database/transactions/export."""
+    with open(filename) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def find_pickles(pickle_filename: str = 'Hist.pick') -> List[str]:
+    """The monthly pickle history files of utils.addPickle, <name>_<Mon>_<Year>.<ext> for a pickle_filename of <name>.<ext>, oldest first."""
+    from utils import TIME_INDICATOR_FORMAT
+    path = Path(pickle_filename)
+    month_format = '{}_{}{}'.format(path.stem, TIME_INDICATOR_FORMAT, path.suffix)
+    paths = path.parent.glob('{}_*{}'.format(path.stem, path.suffix))
+    return [str(p) for p in sorted(paths, key=lambda p: datetime.strptime(p.name, month_format))]
+
+
+def iter_pickles(filenames: List[str]) -> Iterator[dict]:
+    """The results of pickle history files (utils.addPickle), one file in memory at a time. Pass them oldest first."""
+    for filename in filenames:
+        with open(filename, 'rb') as f:
+            results = pickle.load(f)
+        for result in results:
+            yield dict(result.dict, device=getattr(result, 'extra', {}).get('device', ''))
+        del results
+
+
+def iter_user_list(filename: str, server: str = 'jabber') -> Iterator[dict]:
+    """The users of a registered ids file, one per line, '#' for comments."""
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield {'server': server, 'identifier': line.replace(' ', '@')}
+
+
+def get_automator_by_ref_id(record: dict) -> Optional[str]:
+    ref_id = record.get('refID') or '?'
+    for prefixes, automator in REFID_PREFIXES:
+        if ref_id.startswith(prefixes):
+            return automator
+    return None
+
+
+def infer_automators(records: Iterable[dict], window: int = 1) -> Iterator[dict]:
+    """Fills in the missing automator of records from their refID, or else from their nearest neighbours with a known one,
+    looking at most window records behind and ahead, like migrate_2 did over the whole list. Holds 2*window+1 records."""
+    behind: deque = deque(maxlen=window) # resolved automators
+    ahead: deque = deque() # (record, automator from its refID)
+
+    def resolve(record: dict, own: Optional[str]):
+        if record.get('automator'):
+            return record['automator']
+        if own is not None:
+            return own
+        previous = next((a for a in reversed(behind) if a), None)
+        following = next((a for _, a in ahead if a), None)
+        if previous == following or following is None:
+            return previous or ''
+        return following if previous is None else ''
+
+    for record in records:
+        ahead.append((record, get_automator_by_ref_id(record)))
+        if len(ahead) > window:
+            current, own = ahead.popleft()
+            current['automator'] = resolve(current, own)
+            behind.append(current['automator'])
+            yield current
+    while len(ahead):
+        current, own = ahead.popleft()
+        current['automator'] = resolve(current, own)
+        behind.append(current['automator'])
+        yield current
+
+
+def to_transaction_row(record: dict) -> tuple:
+    record = dict(record)
+    if isinstance(record.get('time'), (int, float)):
+        record['time'] = datetime.fromtimestamp(record['time'])
+    record['refID'] = record.get('refID') or '?'
+    record['execution_duration'] = record['execution_duration'] if record.get('execution_duration') is not None else -1
+    record['device'] = record.get('device') or ''
+    return tuple(record.get(column) for column in TRANSACTION_COLUMNS)
+
+
+class Importer:
+    """Imports records into the database file on a connection of its own, CHUNK_SIZE records per transaction.
+    The app should not be running, the tables must exist (see migrations). The stats of /database/stats are read from the rollups, 
+    call rebuild_rollups once the transactions are imported."""
+    CHUNK_SIZE = 5000
+    BUSY_TIMEOUT = 30 # seconds
+    
+    def __init__(self, filename: str, progress: Optional[Callable[[str, int, float], None]] = None):
+        self.filename = filename
+        self.connection = sqlite3.connect(filename, timeout=self.__class__.BUSY_TIMEOUT, isolation_level=None)
+        self.connection.execute(PROGRESS_SCHEMA)
+        self.progress = progress or self.log_progress
+    
+    @staticmethod
+    def log_progress(source: str, position: int, rate: float):
+        logger.info("Imported {} records of {} ({:.0f}/s).".format(position, source, rate))
+    
+    def get_position(self, source: str) -> Tuple[int, bool]:
+        row = self.connection.execute("SELECT position, finished FROM import_progress WHERE source = ?", (source,)).fetchone()
+        return (row[0], bool(row[1])) if row is not None else (0, False)
+    
+    def reset(self, source: str):
+        self.connection.execute("DELETE FROM import_progress WHERE source = ?", (source,))
+    
+    def run(self, source: str, records: Iterable[Any], insert: Callable[[sqlite3.Connection, List[Any]], None]) -> int:
+        """Inserts the records after the source's committed position, in chunks. Returns the number of records imported by this run."""
+        position, finished = self.get_position(source)
+        if finished:
+            logger.info("{} has already been imported.".format(source))
+            return 0
+        if position:
+            logger.info("Resuming the import of {} after {} records.".format(source, position))
+        start, imported, chunk = time.time(), 0, []
+    
+        def commit(chunk: list, done: bool):
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                if len(chunk):
+                    insert(self.connection, chunk)
+                self.connection.execute("INSERT OR REPLACE INTO import_progress (source, position, finished, updated) VALUES (?, ?, ?, ?)",
+                                        (source, position + imported + len(chunk), int(done), time.time()))
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+    
+        for index, record in enumerate(records):
+            if index < position:
+                continue
+            chunk.append(record)
+            if len(chunk) >= self.__class__.CHUNK_SIZE:
+                commit(chunk, False)
+                imported += len(chunk)
+                chunk = []
+                self.progress(source, position + imported, imported / max(time.time() - start, 1e-6))
+        commit(chunk, True)
+        imported += len(chunk)
+        self.progress(source, position + imported, imported / max(time.time() - start, 1e-6))
+        return imported
+    
+    def import_transactions(self, source: str, records: Iterable[dict], window: int = 1) -> int:
+        def insert(connection: sqlite3.Connection, chunk: List[dict]):
+            connection.executemany("INSERT INTO transactions ({}) VALUES ({})".format(', '.join(TRANSACTION_COLUMNS), ', '.join('?'*len(TRANSACTION_COLUMNS))),
+                                   [to_transaction_row(record) for record in chunk])
+        return self.run(source, infer_automators(records, window), insert)
+    
+    def import_users(self, source: str, records: Iterable[dict]) -> int:
+        def insert(connection: sqlite3.Connection, chunk: List[dict]):
+            connection.executemany("INSERT INTO users (server, identifier) SELECT ?, ? WHERE NOT EXISTS (SELECT 1 FROM users WHERE server = ? AND identifier = ?)",
+                                   [(user['server'], user['identifier'])*2 for user in chunk])
+        return self.run(source, records, insert)
+    
+    def rebuild_rollups(self, archive_directory: Optional[str] = None) -> int:
+        """Recomputes the transaction rollups, which the imported transactions are otherwise missing from. The rollups are rebuilt as a whole, 
+        so the months archived into archive_directory are read too. Returns the number of transactions."""
+        from archive import TransactionArchive
+        from rollups import TransactionRollups
+        
+        partitions = TransactionArchive(self.filename, archive_directory).get_filenames() if archive_directory and os.path.isdir(archive_directory) else []
+        rollups = TransactionRollups(self.filename)
+        try:
+            return rollups.rebuild(partitions)
+        finally:
+            rollups.connection.close()
+    
+    def close(self):
+        self.connection.close()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Imports legacy history and user lists into the database, resuming interrupted imports.")
+    parser.add_argument('-d', '--database', dest='database', default='database.db')
+    parser.add_argument('--json', dest='json', default=None, help='A data.json of migrations.dump_legacy_pickle, with transactions and users.')
+    parser.add_argument('--ndjson', dest='ndjson', default=None, help='Newline delimited transactions, e.g: from /database/transactions/export.')
+    parser.add_argument('--pickles', dest='pickles', nargs='*', default=[], help='Pickle history files, oldest first.')
+    parser.add_argument('--users', dest='users', default=None, help='A registered ids file.')
+    parser.add_argument('--window', dest='window', type=int, default=1, help='Neighbours looked at on each side to infer a missing automator.')
+    parser.add_argument('--restart', dest='restart', action='store_true', help='Forgets the progress of the given sources, importing them again.')
+    parser.add_argument('--archive', dest='archive', default='archive', help='The directory of the archived months, read when the stats are rebuilt.')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
+    import migrations
+    from database import SynapsisDB
+    SynapsisDB(args.database).flush() # creates the tables
+    migrations.migrate(args.database, SynapsisDB.TABLES)
+
+    importer = Importer(args.database)
+    sources = []
+    if args.json:
+        sources += [('transactions:' + args.json, 'transactions', lambda: iter_legacy_json(args.json, 'transactions')), ('users:' + args.json, 'users', lambda: iter_legacy_json(args.json, 'users'))]
+    if args.ndjson:
+        sources.append(('transactions:' + args.ndjson, 'transactions', lambda: iter_ndjson(args.ndjson)))
+    if len(args.pickles):
+        sources.append(('transactions:' + ','.join(args.pickles), 'transactions', lambda: iter_pickles(args.pickles)))
+    if args.users:
+        sources.append(('users:' + args.users, 'users', lambda: iter_user_list(args.users)))
+    imported = 0
+    for source, kind, records in sources:
+        if args.restart:
+            importer.reset(source)
+        if kind == 'transactions':
+            imported += importer.import_transactions(source, records(), args.window)
+        else:
+            importer.import_users(source, records())
+    if imported:
+        importer.rebuild_rollups(args.archive)
+    importer.close()
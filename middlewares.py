@@ -1,198 +1,442 @@
-
-from datetime import datetime
-from queue import Queue, Empty
-import logging
-
-from automators.data_structs import Config
-from automators.device_manager import DeviceManager
-from server.request import Request as ServerRequest
-
-from database import SynapsisDB, Transaction, User
-from data_structs import CallbackableQueue, InteractibleRequest, InteractibleResult
-from translator import Translator
-
-logger = logging.getLogger(__name__)
-
-
-def parse_request(message):
-    message=message.upper()
-    mess = [x[::-1] for x in message[::-1].split('.',2)[::-1]] # [::-1] to reverse a list or string, to preserve a product_spec with a '.' in it.
-    keys = ['product_spec', 'number', 'pin'] # Format='<prod>[.number][.pin]'
-    return dict(zip(keys, mess))
-
-
-def time_formatter(time:int):
-    if time<0:
-        return "ERR"
-    hours, time = divmod(time, 60*60)
-    minutes, seconds = divmod(time, 60)
-    comps = []
-    if hours>0:
-        comps.append('{}h'.format(hours))
-    if minutes>0:
-        comps.append('{}m'.format(minutes))
-    if seconds>0:
-        comps.append('{}s'.format(seconds))
-    return " ".join(comps)
-
-
-def _print(*args, **kwargs):
-    print("[{}]".format(datetime.now().replace(microsecond=0).isoformat()),*args, **kwargs)
-
-
-class RequestMiddleware:
-    AUTOMATOR_PREFIX_MAPPING = {'L':'linkaja', 'D':'digipos', 'M':'mitra_tokopedia'}
-    AUTOMATOR_REVERSE_PREFIX_MAPPING = {v:k for k,v in AUTOMATOR_PREFIX_MAPPING.items()}
-    TRANSLATOR: Translator = Translator()
-    CONFIG: Config
-    
-    def __init__(self, device_manager: DeviceManager, in_queue: Queue[ServerRequest], out_queue: CallbackableQueue):
-        self.device_manager = device_manager
-        self.in_queue = in_queue
-        self.out_queue = out_queue
-        self.out_queue.get_callback = self.request_out_callback
-    
-    @classmethod
-    def configure(cls, config: Config):
-        cls.CONFIG = config
-        cls.AUTOMATOR_PREFIX_MAPPING = {k.upper():v.lower() for k,v in config.get('automator_prefix_mapping', cls.AUTOMATOR_PREFIX_MAPPING).items()}
-        cls.AUTOMATOR_REVERSE_PREFIX_MAPPING = {v:k for k,v in cls.AUTOMATOR_PREFIX_MAPPING.items()}
-        cls.TRANSLATOR = Translator(**config['translator_config'])
-    
-    @property
-    def t(self):
-        return self.__class__.TRANSLATOR
-    
-    def request_out_callback(self, request: InteractibleRequest):
-        status_str = "Handling request for [{}] {}".format(request.server_request.user_identifier, str(request))
-        logger.info(status_str)
-        _print(status_str)
-        request.server_request.reply(self.t('transaction_is_being_processed').format(message_content=request.server_request.request))
-    
-    def select_automator(self, product_spec: str):
-        return self.__class__.AUTOMATOR_PREFIX_MAPPING.get(product_spec.upper(), '')
-    
-    def make_automator_request(self, req: ServerRequest):
-        data = parse_request(req.request)
-        data['automator'] = self.__class__.AUTOMATOR_PREFIX_MAPPING.get(data['product_spec'][0], '')
-        if data['automator'] != '':
-            data['product_spec'] = data['product_spec'][1:]
-        data['server_request'] = req
-        return InteractibleRequest(**data)
-    
-    def get_full_product_spec(self, req: InteractibleRequest):
-        return '{}{}'.format(self.__class__.AUTOMATOR_REVERSE_PREFIX_MAPPING.get(req.automator, ''), req.product_spec)
-    
-    def get_message_content_from_transaction(self, transaction: Transaction):
-        req_obj = InteractibleRequest(**transaction.to_dict())
-        req_obj.product_spec=self.get_full_product_spec(req_obj)
-        return self.t('message_content').format(req=req_obj)
-    
-    def check_user(self, req: ServerRequest):
-        res = list(User.get(User.server == req.server.SERVER_NAME.lower(), User.identifier == req.user_identifier))
-        return res if len(res) >= 1 else None
-    
-    def check_duplicate(self, req: InteractibleRequest):
-        curr_time = datetime.now()
-        if req in self.out_queue.queue:
-            return ('in_queue', None)
-        elif req in self.device_manager.current_requests:
-            return ('in_process', None)
-        ts = [t for t in Transaction.get(Transaction.time>datetime(curr_time.year, curr_time.month, curr_time.day), Transaction.number==req.number, Transaction.product_spec==req.product_spec, Transaction.automator==req.automator) if t.success]
-        if len(ts)>0:
-            return ('in_cached_result', ts[-1])
-        return ('no_duplicates', None)
-    
-    def run(self):
-        while True:
-            try:
-                request = self.in_queue.get(True)
-                if request.request.count('.') < 2: # invalid format
-                    continue
-                new_request = self.make_automator_request(request)
-                if not new_request.number.isdigit(): # invalid format
-                    continue
-                new_req_copy = InteractibleRequest(**new_request.dict) # solely for message_content
-                new_req_copy.product_spec = self.get_full_product_spec(new_req_copy)
-                request.request = self.t('message_content').format(req=new_req_copy)
-                del new_req_copy
-                status_str = "Received request from [{}]: {}".format(request.user_identifier, str(new_request))
-                logger.info(status_str)
-                _print(status_str)
-            except TypeError:
-                continue
-            
-            usr_chk_res = self.check_user(request)
-            if usr_chk_res is None:
-                s = "User [{}] is not registered. Sending an appropriate reply.".format(request.user_identifier)
-                logger.info(s)
-                _print(s)
-                request.reply(self.t('user_not_registered'))
-                continue
-            
-            dup_res, transaction = self.check_duplicate(new_request)
-            if dup_res == 'in_queue':
-                request.reply(self.t('transaction_enqueued').format(message_content=request.request))
-                status_str = "Resending reply for request for [{}] {}.".format(request.user_identifier, str(new_request))
-            elif dup_res == 'in_process':
-                request.reply(self.t('transaction_is_being_processed').format(message_content=request.request))
-                status_str = "Resending status for request for [{}] {}.".format(request.user_identifier, str(new_request))
-            elif dup_res == 'in_cached_result':
-                assert(isinstance(transaction, Transaction))
-                previous_reply = self.t('transaction_success' if transaction.refID != '?' else 'transaction_success_no_ref_id')
-                previous_reply = previous_reply.format(message_content=self.get_message_content_from_transaction(transaction), res=transaction)
-                status_str = "Resending reply for request for [{}] {}.".format(request.user_identifier, str(new_request))
-                request.reply(self.t('transaction_had_been_processed').format(message_content=request.request, datetime=transaction.time, reply=previous_reply))
-            else:
-                status_str = "Enqueued request for [{}] {}".format(request.user_identifier, str(new_request))
-                request.reply(self.t('transaction_enqueued').format(message_content=request.request))
-                self.out_queue.put(new_request)
-            logger.info(status_str)
-            _print(status_str)
-
-
-class ResultMiddleware:
-    TRANSLATOR: Translator = Translator()
-    CONFIG: Config
-    
-    def __init__(self, database_manager: SynapsisDB, in_queue: Queue[InteractibleResult]):
-        self.database_manager = database_manager
-        self.in_queue = in_queue
-    
-    @classmethod
-    def configure(cls, config: Config):
-        cls.CONFIG = config
-        cls.TRANSLATOR = Translator(**config['translator_config'])
-    
-    @property
-    def t(self):
-        return self.__class__.TRANSLATOR
-
-    def run(self):
-        while True:
-            try:
-                result = self.in_queue.get(True)
-            except Empty:
-                continue
-            
-            self.database_manager.insert(Transaction(result.dict))
-            
-            reply_str = ''
-            if result.success and result.refID != '?':
-                reply_str = self.t('transaction_success')
-            elif result.success:
-                reply_str = self.t('transaction_success_no_ref_id')
-            else:
-                reply_str = self.t('transaction_failed')
-            reply_str = reply_str.format(message_content=result.request.server_request.request, res=result, reason=result.error or result.description)
-            
-            if result.extra.get('balance') is not None:
-                reply_str+= ". " + self.t('balance_suffix').format(balance=result.extra.get('balance'))
-            
-            if result.send_reply:
-                result.request.reply(reply_str) #type:ignore
-                status_str = "Sent result for [{}] {} ({}) ({})".format(result.request.server_request.user_identifier, str(result.request), "SUCCESS" if result.success else "FAILED", time_formatter(result.execution_duration))
-            else:
-                status_str = "Processed request for [{}] {} ({}) ({})".format(result.request.server_request.user_identifier, str(result.request), "SUCCESS" if result.success else "FAILED", time_formatter(result.execution_duration))
-            logger.info(status_str)
-            _print(status_str)
+
+from datetime import datetime
+from queue import Queue, Empty
+import time
+from typing import Dict, List, Optional
+import logging
+
+from admission import AdmissionController
+from cluster import ClusterBridge
+from automators.data_structs import Config
+from automators.device_manager import DeviceManager
+from server.request import Request as ServerRequest
+
+from database import SynapsisDB, Transaction, User
+from data_structs import CallbackableQueue, InteractibleRequest, InteractibleResult
+from history import HistoryLog
+from rollups import TransactionRollups
+from routing import ProductRouter
+from translator import Translator
+
+logger = logging.getLogger(__name__)
+
+
+def parse_request(message):
+    message=message.upper()
+    mess = [x[::-1] for x in message[::-1].split('.',2)[::-1]] # [::-1] to reverse a list or string, to preserve a product_spec with a '.' in it.
+    keys = ['product_spec', 'number', 'pin'] # Format='<prod>[.number][.pin]'
+    return dict(zip(keys, mess))
+
+
+TTL_UNITS = {'s': 1, 'm': 60, 'h': 60*60}
+
+
+def parse_ttl(ttl: str):
+    """Parses a time to live like '90', '90s', '15m' or '1h' into seconds. Returns None if format is invalid."""
+    ttl = ttl.strip().lower()
+    unit = TTL_UNITS.get(ttl[-1:])
+    if unit is not None:
+        ttl = ttl[:-1]
+    if not ttl.isdigit() or int(ttl) <= 0:
+        return None
+    return int(ttl)*(unit or 1)
+
+
+def time_formatter(time:int):
+    if time<0:
+        return "ERR"
+    hours, time = divmod(time, 60*60)
+    minutes, seconds = divmod(time, 60)
+    comps = []
+    if hours>0:
+        comps.append('{}h'.format(hours))
+    if minutes>0:
+        comps.append('{}m'.format(minutes))
+    if seconds>0:
+        comps.append('{}s'.format(seconds))
+    return " ".join(comps)
+
+
+def _print(*args, **kwargs):
+    print("[{}]".format(datetime.now().replace(microsecond=0).isoformat()),*args, **kwargs)
+
+
+class RequestMiddleware:
+    AUTOMATOR_PREFIX_MAPPING = {'L':'linkaja', 'D':'digipos', 'M':'mitra_tokopedia', 'A':ProductRouter.AUTO_AUTOMATOR}
+    AUTOMATOR_REVERSE_PREFIX_MAPPING = {v:k for k,v in AUTOMATOR_PREFIX_MAPPING.items()}
+    TRANSLATOR: Translator = Translator()
+    ADMISSION_CONTROLLER_CLS = AdmissionController
+    PRODUCT_ROUTER_CLS = ProductRouter
+    DEFAULT_REQUEST_TTL = 0 # seconds a request may wait in queue, 0 for no deadline
+    REQUEST_TTLS: Dict[str, float] = {} # automator:seconds, overrides DEFAULT_REQUEST_TTL
+    TTL_SEPARATOR = '#' # Format='<prod>.<number>.<pin>[#ttl]'
+    CONFIG: Config
+    
+    def __init__(self, device_manager: DeviceManager, in_queue: Queue[ServerRequest], out_queue: CallbackableQueue, cluster: Optional[ClusterBridge] = None):
+        self.device_manager = device_manager
+        self.in_queue = in_queue
+        self.out_queue = out_queue
+        self.out_queue.get_callback = self.request_out_callback
+        if hasattr(self.out_queue, 'expire_callback'):
+            self.out_queue.expire_callback = self.request_expired_callback # type: ignore
+        self.admission = self.__class__.ADMISSION_CONTROLLER_CLS(device_manager, out_queue)
+        self.router = self.__class__.PRODUCT_ROUTER_CLS(device_manager, self.admission)
+        self.cluster = cluster
+        if self.cluster is not None:
+            self.cluster.request_middleware = self
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.CONFIG = config
+        cls.AUTOMATOR_PREFIX_MAPPING = {k.upper():v.lower() for k,v in config.get('automator_prefix_mapping', cls.AUTOMATOR_PREFIX_MAPPING).items()}
+        cls.AUTOMATOR_REVERSE_PREFIX_MAPPING = {v:k for k,v in cls.AUTOMATOR_PREFIX_MAPPING.items()}
+        cls.TRANSLATOR = Translator(**config['translator_config'])
+        cls.ADMISSION_CONTROLLER_CLS.configure(config.get('admission', Config()))
+        cls.PRODUCT_ROUTER_CLS.configure(config.get('routing', Config()))
+        cls.DEFAULT_REQUEST_TTL = config.get('default_request_ttl', cls.DEFAULT_REQUEST_TTL)
+        cls.REQUEST_TTLS = {k.lower():v for k,v in config.get('request_ttls', cls.REQUEST_TTLS).items()}
+        cls.TTL_SEPARATOR = config.get('ttl_separator', cls.TTL_SEPARATOR)
+    
+    @property
+    def t(self):
+        return self.__class__.TRANSLATOR
+    
+    def request_out_callback(self, request: InteractibleRequest):
+        status_str = "Handling request for [{}] {}".format(request.server_request.user_identifier, str(request))
+        logger.info(status_str)
+        _print(status_str)
+        if not request.silent_progress:
+            request.server_request.reply(self.t('transaction_is_being_processed').format(message_content=request.server_request.request))
+        request.server_request.notify('processing')
+        if self.cluster is not None:
+            self.cluster.on_executing(request)
+    
+    def request_expired_callback(self, request: InteractibleRequest):
+        status_str = "Request for [{}] {} expired in queue".format(request.server_request.user_identifier, str(request))
+        logger.info(status_str)
+        _print(status_str)
+        request.server_request.reply(self.t('transaction_expired').format(message_content=request.server_request.request))
+        request.server_request.notify('expired')
+        if self.cluster is not None:
+            self.cluster.on_finished(request)
+    
+    def get_request_ttl(self, automator: str):
+        cls = self.__class__
+        return cls.REQUEST_TTLS.get(automator or self.device_manager.DEVICE_CLS.DEFAULT_AUTOMATOR, cls.DEFAULT_REQUEST_TTL)
+    
+    def select_automator(self, product_spec: str):
+        return self.__class__.AUTOMATOR_PREFIX_MAPPING.get(product_spec.upper(), '')
+    
+    def make_automator_request(self, req: ServerRequest):
+        data = parse_request(req.request)
+        data['automator'] = self.__class__.AUTOMATOR_PREFIX_MAPPING.get(data['product_spec'][0], '')
+        if data['automator'] != '':
+            data['product_spec'] = data['product_spec'][1:]
+        data['server_request'] = req
+        return InteractibleRequest(**data)
+    
+    def route_request(self, req: InteractibleRequest):
+        """Binds an auto routed request to the best automator of its product group, the rest become its fail over alternatives. 
+        Returns False if the product group is unknown."""
+        routes = self.router.route(req.product_spec)
+        if routes is None:
+            return False
+        (req.automator, req.product_spec), req.alternatives = routes[0], routes[1:]
+        return True
+    
+    def get_full_product_spec(self, req: InteractibleRequest):
+        return '{}{}'.format(self.__class__.AUTOMATOR_REVERSE_PREFIX_MAPPING.get(req.automator, ''), req.product_spec)
+    
+    def get_message_content_from_transaction(self, transaction: Transaction):
+        req_obj = InteractibleRequest(**transaction.to_dict())
+        req_obj.product_spec=self.get_full_product_spec(req_obj)
+        return self.t('message_content').format(req=req_obj)
+    
+    def check_user(self, req: ServerRequest):
+        res = list(User.get(User.server == req.server.SERVER_NAME.lower(), User.identifier == req.user_identifier))
+        return res if len(res) >= 1 else None
+    
+    def apply_scheduling_policy(self, user: User):
+        """Makes the out queue schedule the user's requests by the weight, priority and in-flight limit stored for the user."""
+        if hasattr(self.out_queue, 'set_policy'):
+            self.out_queue.set_policy(user.identifier, weight=user.weight, priority=user.priority, max_in_flight=user.max_in_flight) # type: ignore
+    
+    def get_equivalent_requests(self, req: InteractibleRequest):
+        """The request and its equivalents on other automators, which would sell the customer the same product."""
+        return [InteractibleRequest(req.number, product_spec, automator) for automator, product_spec in self.router.get_equivalents(req.automator, req.product_spec)]
+    
+    def check_duplicate(self, req: InteractibleRequest):
+        equivalents = self.get_equivalent_requests(req)
+        cluster_state = self.cluster.get_active_state(equivalents) if self.cluster is not None else None
+        if any([r in self.out_queue.queue for r in equivalents]):
+            return ('in_queue', None)
+        elif any([r in self.device_manager.current_requests + self.device_manager.quarantined_requests for r in equivalents]):
+            return ('in_process', None)
+        elif cluster_state is not None:
+            return (cluster_state, None)
+        keys = [(r.number, r.product_spec, r.automator) for r in equivalents] # equivalents share the number, so one query covers them
+        ts = [t for t in self.get_todays_transactions(req.number) if (t.number, t.product_spec, t.automator) in keys and t.success]
+        if len(ts)>0:
+            return ('in_cached_result', ts[-1])
+        return ('no_duplicates', None)
+    
+    def get_todays_transactions(self, number: str) -> List[Transaction]:
+        """Today's transactions for the number, through the transactions_lookup index."""
+        curr_time = datetime.now()
+        return list(Transaction.get(Transaction.time>datetime(curr_time.year, curr_time.month, curr_time.day), Transaction.number==number))
+    
+    def check_duplicates(self, reqs: List[InteractibleRequest]):
+        """Batched check_duplicate, the queue, current requests and today's transactions are each only looked up once. 
+        Requests repeated within reqs are reported as 'in_queue' after their first occurrence."""
+        if len(reqs) <= 1:
+            return [self.check_duplicate(req) for req in reqs]
+        key = lambda obj: (obj.number, obj.product_spec, obj.automator)
+        with self.out_queue.mutex:
+            in_queue = {key(req) for req in self.out_queue.queue}
+        in_process = {key(req) for req in self.device_manager.current_requests + self.device_manager.quarantined_requests}
+        cached = {key(t): t for number in {req.number for req in reqs} for t in self.get_todays_transactions(number) if t.success}
+        
+        results = []
+        for req in reqs:
+            equivalents = self.get_equivalent_requests(req)
+            keys = [key(r) for r in equivalents]
+            cached_keys = [k for k in keys if k in cached]
+            cluster_state = self.cluster.get_active_state(equivalents) if self.cluster is not None else None
+            if any([k in in_queue for k in keys]):
+                results.append(('in_queue', None))
+            elif any([k in in_process for k in keys]):
+                results.append(('in_process', None))
+            elif cluster_state is not None:
+                results.append((cluster_state, None))
+            elif len(cached_keys):
+                results.append(('in_cached_result', cached[cached_keys[0]]))
+            else:
+                results.append(('no_duplicates', None))
+                in_queue.add(key(req))
+        return results
+    
+    def enqueue(self, req: InteractibleRequest):
+        """Puts the request into the out queue, or the cluster's shared work queue in cluster mode. 
+        Returns False if an equivalent request got there first, e.g: through another node."""
+        if self.cluster is not None:
+            return self.cluster.submit(req, self.get_equivalent_requests(req))
+        self.out_queue.put(req)
+        return True
+    
+    def split_requests(self, message: str):
+        return [line.strip() for line in message.splitlines() if line.strip()]
+    
+    def parse_server_request(self, request: ServerRequest) -> Optional[InteractibleRequest]:
+        """Makes an automator request from the server request and rewrites request.request into its message content. Returns None if format is invalid."""
+        message, separator, ttl_str = request.request.partition(self.__class__.TTL_SEPARATOR)
+        ttl = parse_ttl(ttl_str) if separator else None
+        if separator and ttl is None: # invalid format
+            return None
+        request.request = message.strip()
+        if request.request.count('.') < 2: # invalid format
+            return None
+        new_request = self.make_automator_request(request)
+        if not new_request.number.isdigit(): # invalid format
+            return None
+        new_req_copy = InteractibleRequest(**new_request.dict) # solely for message_content, as sent by the user
+        new_req_copy.product_spec = self.get_full_product_spec(new_req_copy)
+        if new_request.automator == self.router.AUTO_AUTOMATOR and not self.route_request(new_request):
+            return None
+        if ttl is None:
+            ttl = self.get_request_ttl(new_request.automator)
+        new_request.deadline = time.time() + ttl if ttl > 0 else None
+        request.request = self.t('message_content').format(req=new_req_copy)
+        return new_request
+    
+    def reply_not_registered(self, request: ServerRequest):
+        s = "User [{}] is not registered. Sending an appropriate reply.".format(request.user_identifier)
+        logger.info(s)
+        _print(s)
+        request.reply(self.t('user_not_registered'))
+        request.notify('not_registered')
+    
+    def reply_busy(self, request: ServerRequest, reason: Optional[str], estimated_wait: float = float('inf')):
+        s = "Rejected request from [{}] {}, reason={} estimated_wait={}.".format(request.user_identifier, request.request, reason, estimated_wait)
+        logger.info(s)
+        _print(s)
+        reply_str = self.t('server_busy').format(message_content=request.request)
+        if 0 < estimated_wait < float('inf'):
+            reply_str += ' ' + self.t('estimated_wait_suffix').format(wait=time_formatter(int(estimated_wait)))
+        request.reply(reply_str)
+        request.notify('busy', reason=reason, estimated_wait=estimated_wait if estimated_wait < float('inf') else None)
+    
+    def handle_request(self, request: ServerRequest):
+        try:
+            new_request = self.parse_server_request(request)
+            if new_request is None:
+                request.notify('invalid')
+                return
+            status_str = "Received request from [{}]: {}".format(request.user_identifier, str(new_request))
+            logger.info(status_str)
+            _print(status_str)
+        except TypeError:
+            return
+        
+        usr_chk_res = self.check_user(request)
+        if usr_chk_res is None:
+            return self.reply_not_registered(request)
+        admitted, reason = self.admission.admit_message(request.user_identifier)
+        if not admitted:
+            return self.reply_busy(request, reason)
+        self.apply_scheduling_policy(usr_chk_res[0])
+        
+        dup_res, transaction = self.check_duplicate(new_request)
+        if dup_res == 'no_duplicates':
+            admitted, reason, estimated_wait = self.admission.admit_request(new_request.automator)
+            if not admitted:
+                return self.reply_busy(request, reason, estimated_wait)
+            if not self.enqueue(new_request):
+                dup_res = 'in_queue'
+        
+        if dup_res == 'in_queue':
+            request.reply(self.t('transaction_enqueued').format(message_content=request.request))
+            status_str = "Resending reply for request for [{}] {}.".format(request.user_identifier, str(new_request))
+        elif dup_res == 'in_process':
+            request.reply(self.t('transaction_is_being_processed').format(message_content=request.request))
+            status_str = "Resending status for request for [{}] {}.".format(request.user_identifier, str(new_request))
+        elif dup_res == 'in_cached_result':
+            assert(isinstance(transaction, Transaction))
+            previous_reply = self.t('transaction_success' if transaction.refID != '?' else 'transaction_success_no_ref_id')
+            previous_reply = previous_reply.format(message_content=self.get_message_content_from_transaction(transaction), res=transaction)
+            status_str = "Resending reply for request for [{}] {}.".format(request.user_identifier, str(new_request))
+            request.reply(self.t('transaction_had_been_processed').format(message_content=request.request, datetime=transaction.time, reply=previous_reply))
+        else:
+            status_str = "Enqueued request for [{}] {}".format(request.user_identifier, str(new_request))
+            request.reply(self.t('transaction_enqueued').format(message_content=request.request))
+        request.notify(dup_res if dup_res != 'no_duplicates' else 'enqueued', request=new_request, transaction=transaction)
+        logger.info(status_str)
+        _print(status_str)
+    
+    def handle_bulk_request(self, request: ServerRequest, lines: List[str]):
+        """Handles a message with many newline separated requests, with a single user check, 
+        a batched duplicate check and a single consolidated acknowledgement."""
+        status_str = "Received {} requests in a message from [{}]".format(len(lines), request.user_identifier)
+        logger.info(status_str)
+        _print(status_str)
+        
+        usr_chk_res = self.check_user(request)
+        if usr_chk_res is None:
+            return self.reply_not_registered(request)
+        
+        sub_requests: List[ServerRequest] = []
+        new_requests: List[InteractibleRequest] = []
+        invalid = []
+        for line in lines:
+            sub_request = ServerRequest(request.server, line, request.user_identifier, request.interaction_data)
+            try:
+                new_request = self.parse_server_request(sub_request)
+            except TypeError:
+                new_request = None
+            if new_request is None:
+                invalid.append(line)
+                continue
+            new_request.silent_progress = True # results are still replied one by one, but not the progress
+            sub_requests.append(sub_request)
+            new_requests.append(new_request)
+        
+        admitted_count, reason = self.admission.admit_requests(request.user_identifier, len(new_requests))
+        if admitted_count == 0 and len(new_requests):
+            return self.reply_busy(request, reason)
+        self.apply_scheduling_policy(usr_chk_res[0])
+        rejected = [sub_request.request for sub_request in sub_requests[admitted_count:]] # rate limited
+        sub_requests, new_requests = sub_requests[:admitted_count], new_requests[:admitted_count]
+        
+        enqueued, duplicates = [], []
+        for sub_request, new_request, (dup_res, transaction) in zip(sub_requests, new_requests, self.check_duplicates(new_requests)):
+            if dup_res != 'no_duplicates':
+                duplicates.append(sub_request.request)
+            elif not self.admission.admit_request(new_request.automator)[0]:
+                rejected.append(sub_request.request)
+            elif not self.enqueue(new_request):
+                duplicates.append(sub_request.request)
+            else:
+                enqueued.append(sub_request.request)
+        
+        reply_str = self.t('bulk_transactions_summary').format(enqueued=len(enqueued), duplicates=len(duplicates), invalid=len(invalid))
+        if len(duplicates):
+            reply_str += ' ' + self.t('bulk_duplicates_suffix').format(message_contents=', '.join(duplicates))
+        if len(invalid):
+            reply_str += ' ' + self.t('bulk_invalid_suffix').format(messages=', '.join(invalid))
+        if len(rejected):
+            reply_str += ' ' + self.t('bulk_busy_suffix').format(message_contents=', '.join(rejected))
+        request.reply(reply_str)
+        request.notify('bulk_enqueued', enqueued=enqueued, duplicates=duplicates, invalid=invalid, rejected=rejected)
+        status_str = "Enqueued {} requests for [{}], {} duplicates, {} invalid.".format(len(enqueued), request.user_identifier, len(duplicates), len(invalid))
+        logger.info(status_str)
+        _print(status_str)
+    
+    def run(self):
+        while True:
+            request = self.in_queue.get(True)
+            lines = self.split_requests(request.request) if isinstance(request.request, str) else []
+            if len(lines) > 1:
+                self.handle_bulk_request(request, lines)
+            else:
+                self.handle_request(request)
+
+
+class ResultMiddleware:
+    TRANSLATOR: Translator = Translator()
+    CONFIG: Config
+    
+    def __init__(self, database_manager: SynapsisDB, in_queue: Queue[InteractibleResult], cluster: Optional[ClusterBridge] = None, rollups: Optional[TransactionRollups] = None, 
+                 history: Optional[HistoryLog] = None):
+        self.database_manager = database_manager
+        self.in_queue = in_queue
+        self.cluster = cluster
+        self.rollups = rollups
+        self.history = history
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.CONFIG = config
+        cls.TRANSLATOR = Translator(**config['translator_config'])
+    
+    @property
+    def t(self):
+        return self.__class__.TRANSLATOR
+
+    def run(self):
+        while True:
+            try:
+                result = self.in_queue.get(True)
+            except Empty:
+                continue
+            
+            device = result.extra.get('device', '')
+            self.database_manager.insert(Transaction({**result.dict, 'device': device}))
+            if self.rollups is not None:
+                self.rollups.record(result.time or datetime.now(), result.automator, result.product_spec, device, result.success, result.execution_duration)
+            if self.history is not None:
+                try:
+                    self.history.append(result)
+                except Exception as exc: # e.g: disk full, the history log is optional and must not stop the results
+                    logger.warning("Failed to append result to the history log: {}".format(exc))
+            if self.cluster is not None:
+                self.cluster.on_finished(result.request)
+            
+            reply_str = ''
+            if result.success and result.refID != '?':
+                reply_str = self.t('transaction_success')
+            elif result.success:
+                reply_str = self.t('transaction_success_no_ref_id')
+            else:
+                reply_str = self.t('transaction_failed')
+            reply_str = reply_str.format(message_content=result.request.server_request.request, res=result, reason=result.error or result.description)
+            
+            if result.extra.get('balance') is not None:
+                reply_str+= ". " + self.t('balance_suffix').format(balance=result.extra.get('balance'))
+            
+            result.request.server_request.notify('success' if result.success else 'failed', result=result, reply=reply_str)
+            if result.send_reply:
+                result.request.reply(reply_str) #type:ignore
+                status_str = "Sent result for [{}] {} ({}) ({})".format(result.request.server_request.user_identifier, str(result.request), "SUCCESS" if result.success else "FAILED", time_formatter(result.execution_duration))
+            else:
+                status_str = "Processed request for [{}] {} ({}) ({})".format(result.request.server_request.user_identifier, str(result.request), "SUCCESS" if result.success else "FAILED", time_formatter(result.execution_duration))
+            logger.info(status_str)
+            _print(status_str)
@@ -1,95 +1,150 @@
-
-DATA_FILENAME = 'data.json'
-USER_FILENAME = 'registered_ids'
-DB_FILENAME = 'database.db'
-
-
-def migrate_1():
-    import json
-    from utils import readPickle
-    transactions = {}
-    for name, lst in readPickle(getdata=True).items(): # type: ignore
-        transactions[name]=[]
-        for entry in lst:
-            r=entry.dict
-            r['time']=r['time'].timestamp()
-            transactions[name].append(r)
-    
-    with open(USER_FILENAME) as f:
-        user_data=[{'server':'jabber', 'identifier': ln.replace(' ', '@')} for ln in f.read().strip().splitlines() if ln and not ln.startswith('#')]
-    
-    print("Dumped {} transactions and {} users.".format(sum([len(record) for record in transactions]), user_data))
-    with open(DATA_FILENAME, 'w') as f:
-        json.dump({'transactions': transactions, 'users': user_data}, f, indent=4)
-
-
-def migrate_2(drop_all=True):
-    import json
-    from datetime import datetime
-    from database import SynapsisDB, User, Transaction
-    
-    db=SynapsisDB(DB_FILENAME)
-    
-    def startswith_any(s, matchers):
-        for m in matchers:
-            if s.startswith(m):
-                return True
-        return False
-    
-    # Migrate transactions
-    with open(DATA_FILENAME) as f:
-        data=json.load(f)
-        transactions = data['transactions']
-        users = data['users']
-    print("Loaded {} transactions and {} users.".format(len(transactions), len(users)))
-    transactions=[e for lst in transactions.values() for e in lst] # flatten
-    for e in transactions:
-        e['time']=datetime.fromtimestamp(e['time'])
-        e['refID']=e.get('refID', '?') or '?'
-        if startswith_any(e['refID'], ['8', '9']):
-            e['executor']='linkaja'
-        elif startswith_any(e['refID'], ['RANDOM', 'GUI']):
-            e['executor']='digipos'
-        elif startswith_any(e['refID'], ['0']):
-            e['executor']='mitra_tokopedia'
-        else:
-            e['executor']=None
-    # trying to recover the executor
-    for i,e in enumerate(transactions):
-        a,b=None,None
-        if e['executor']==None:
-            if i>0:
-                a=transactions[i-1]['executor']
-            if i+1<len(transactions):
-                b=transactions[i+1]['executor']
-            
-            if a==b:
-                e['executor'] = a
-            elif a is not None and b is None:
-                e['executor'] = a
-            elif a is None and b is not None:
-                e['executor'] = b
-            else:
-                e['executor'] = ''
-    for e in transactions:
-        e['automator'] = e.pop('executor')
-    db.drop_table(Transaction) if drop_all else None
-    db.create_table(Transaction)
-    print("Inserting {} transactions".format(len(transactions)))
-    db.insert_many([Transaction(**e) for e in transactions])
-    
-    # Migrate users
-    db.drop_table(User) if drop_all else None
-    db.create_table(User)
-    print("Inserting {} users".format(len(users)))
-    db.insert_many([User(**data) for data in users])
-    # Blocks until CursorProxy has finished inserting and can get data.
-    print("Waiting for CursorProxy to finish...")
-    list(User.get(User.id==1))
-    print("CursorProxy finished processing.")
-
-
-if __name__ == '__main__':
-    DB_FILENAME='test.db'
-    TRANSACTIONS_DATA_FILENAME='tests/data.json'
-    migrate_2()
+"""Versioned schema migrations of SynapsisDB. The applied version is recorded in the database's PRAGMA user_version, 
+pending migrations are applied in order at startup, followed by the indexes declared in the models' __INDEXES__."""
+from dataclasses import dataclass
+import logging
+import sqlite3
+import time
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+USER_FILENAME = 'registered_ids'
+DB_FILENAME = 'database.db'
+BUSY_TIMEOUT = 30 # seconds
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    func: Callable[[sqlite3.Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, description: str):
+    """Registers the decorated function as the migration to the given schema version."""
+    def decorator(func: Callable[[sqlite3.Connection], None]):
+        MIGRATIONS.append(Migration(version, description, func))
+        MIGRATIONS.sort(key=lambda m: m.version)
+        return func
+    return decorator
+
+
+def get_columns(connection: sqlite3.Connection, table_name: str):
+    return [row[1] for row in connection.execute("PRAGMA table_info({})".format(table_name)).fetchall()]
+
+
+@migration(1, "Adds the scheduling columns (weight, priority, max_in_flight) to the users table.")
+def add_user_scheduling_columns(connection: sqlite3.Connection):
+    columns = {'weight': 'INTEGER NOT NULL DEFAULT 1', 'priority': 'INTEGER NOT NULL DEFAULT 0', 'max_in_flight': 'INTEGER NOT NULL DEFAULT 0'}
+    existing = get_columns(connection, 'users')
+    if not len(existing): # created by the current model, with the columns
+        return
+    for name, definition in columns.items():
+        if name not in existing:
+            connection.execute("ALTER TABLE users ADD COLUMN {} {}".format(name, definition))
+
+
+@migration(2, "Adds the device column to the transactions table.")
+def add_transaction_device_column(connection: sqlite3.Connection):
+    existing = get_columns(connection, 'transactions')
+    if len(existing) and 'device' not in existing:
+        connection.execute("ALTER TABLE transactions ADD COLUMN device TEXT NOT NULL DEFAULT ''")
+
+
+@migration(3, "Adds the full-text search index of the transactions, with its sync triggers. Skipped without FTS5, see search.create_search_index.")
+def add_transaction_search_index(connection: sqlite3.Connection):
+    from search import create_search_index
+    create_search_index(connection)
+
+
+def get_schema_version(connection: sqlite3.Connection) -> int:
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+
+def apply_migrations(connection: sqlite3.Connection, target: Optional[int] = None) -> int:
+    """Applies the pending migrations up to target (the latest by default), each in its own transaction along with its version. Returns the schema version."""
+    version = get_schema_version(connection)
+    for m in MIGRATIONS:
+        if m.version <= version or (target is not None and m.version > target):
+            continue
+        logger.info("Migrating database to version {}: {}".format(m.version, m.description))
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            m.func(connection)
+            connection.execute("PRAGMA user_version = {:d}".format(m.version))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        version = m.version
+    return version
+
+
+def ensure_indexes(connection: sqlite3.Connection, models: list) -> List[str]:
+    """Creates the indexes declared in the models' __INDEXES__ which do not exist yet. Returns their names."""
+    existing = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type='index'").fetchall()}
+    created = []
+    for model in models:
+        table_name = model.__TABLE_NAME__
+        if not len(get_columns(connection, table_name)):
+            logger.warning("Table '{}' does not exist yet, skipping its indexes.".format(table_name))
+            continue
+        for index in getattr(model, '__INDEXES__', []):
+            if index.name in existing:
+                continue
+            start = time.time()
+            connection.execute(index.create_sql(table_name))
+            logger.info("Created index '{}' on {}({}) in {:.2f}s.".format(index.name, table_name, ', '.join(index.columns), time.time() - start))
+            created.append(index.name)
+    return created
+
+
+def migrate(filename: str = DB_FILENAME, models: list = [], target: Optional[int] = None) -> int:
+    """Brings the database file up to date, returns its schema version."""
+    connection = sqlite3.connect(filename, timeout=BUSY_TIMEOUT, isolation_level=None)
+    try:
+        version = apply_migrations(connection, target)
+        ensure_indexes(connection, models)
+        return version
+    finally:
+        connection.close()
+
+
+# Legacy storage, from before SynapsisDB. Imported once by hand, see the bottom of this file.
+
+
+def import_legacy(filename: str = DB_FILENAME, pickle_filename: str = 'Hist.pick', archive_directory: str = 'archive'):
+    """Imports the monthly pickle history of utils.addPickle and the registered ids file with the streaming importer, 
+    resuming a previous interrupted import, then rebuilds the transaction rollups. A data.json of the former two step migration is imported by 'python importer.py --json'."""
+    import os
+    from importer import Importer, find_pickles, iter_pickles, iter_user_list
+    
+    pickles = find_pickles(pickle_filename)
+    importer = Importer(filename)
+    try:
+        if len(pickles) and importer.import_transactions('transactions:' + ','.join(pickles), iter_pickles(pickles)):
+            importer.rebuild_rollups(archive_directory)
+        if os.path.exists(USER_FILENAME):
+            importer.import_users('users:' + USER_FILENAME, iter_user_list(USER_FILENAME))
+    finally:
+        importer.close()
+
+
+if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Migrates the database of Synapsis.")
+    parser.add_argument('-d', '--database', dest='database', default=DB_FILENAME, help='The database file to migrate.')
+    parser.add_argument('--target', dest='target', type=int, default=None, help='Schema version to migrate to, the latest by default.')
+    parser.add_argument('--import-legacy', dest='import_legacy', action='store_true', help='Imports the legacy pickle storage and registered ids file afterwards.')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(message)s') # the import's progress
+    
+    from database import SynapsisDB
+    SynapsisDB(args.database).flush() # creates the tables
+    print("Database is at schema version {}.".format(migrate(args.database, SynapsisDB.TABLES, args.target)))
+    if args.import_legacy:
+        import_legacy(args.database)
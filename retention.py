@@ -0,0 +1,246 @@
+"""Retention of transactions and stats. Rows older than their rule's keep_days are deleted in small batches, each its
+own short write transaction with a pause after it, so ResultMiddleware's writes are never held up for long. The freed pages
+are returned to the filesystem by incremental_vacuum, a few pages per transaction, which needs auto_vacuum=INCREMENTAL
+(see enable_incremental_vacuum). The same rules apply to the archive partitions, emptied partitions are removed."""
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+import glob
+import logging
+import os
+import sqlite3
+from threading import Event, Lock
+import time
+from typing import Dict, List, Optional
+
+from automators.data_structs import Config
+
+logger = logging.getLogger(__name__)
+
+
+STATUS_CONDITIONS = {'any': '1',
+                     'success': 'refID IS NOT NULL AND error IS NULL',
+                     'failed': 'NOT (refID IS NOT NULL AND error IS NULL)'} # of Result.success
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+@dataclass
+class RetentionRule:
+    """Keeps the rows of table whose time_column is within the last keep_days days. status narrows a rule on the
+    transactions table to its successful or failed transactions. archive applies it to the archive partitions too."""
+    table: str
+    keep_days: int
+    status: str = 'any'
+    time_column: str = 'time'
+    archive: bool = True
+    
+    @classmethod
+    def from_config(cls, config: Config):
+        rule = cls(config['table'], config['keep_days'], config.get('status', 'any'), config.get('time_column', 'time'), config.get('archive', True))
+        if rule.status not in STATUS_CONDITIONS:
+            raise ValueError("Unknown retention status '{}', expected one of {}.".format(rule.status, ', '.join(STATUS_CONDITIONS)))
+        return rule
+    
+    def get_cutoff(self, now: datetime) -> str:
+        """Days are kept whole, the cutoff is the start of the oldest kept day, as stored in text columns."""
+        return (now - timedelta(days=self.keep_days)).date().isoformat()
+    
+    def get_sql(self, batch_size: int, key: str = 'rowid') -> str:
+        return ("DELETE FROM {table} WHERE ({key}) IN (SELECT {key} FROM {table} WHERE {column} < ? AND {condition} LIMIT {limit:d})"
+                .format(table=self.table, key=key, column=self.time_column, condition=STATUS_CONDITIONS[self.status], limit=batch_size))
+    
+    def describe(self):
+        return "{}{} older than {} days".format(self.table, '' if self.status == 'any' else ' ({})'.format(self.status), self.keep_days)
+
+
+def get_key(connection: sqlite3.Connection, table: str) -> str:
+    """The primary key columns of a WITHOUT ROWID table, rowid for the others."""
+    if connection.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()[0].upper().rstrip().endswith('WITHOUT ROWID'):
+        columns = sorted((row[5], row[1]) for row in connection.execute("PRAGMA table_info({})".format(table)).fetchall() if row[5])
+        return ', '.join(name for _, name in columns)
+    return 'rowid'
+
+
+def get_page_counts(connection: sqlite3.Connection):
+    """Pages of the file and free pages in it."""
+    return connection.execute("PRAGMA page_count").fetchone()[0], connection.execute("PRAGMA freelist_count").fetchone()[0]
+
+
+def enable_incremental_vacuum(filename: str, busy_timeout: float = 30) -> bool:
+    """Switches the database file to auto_vacuum=INCREMENTAL, with a full VACUUM which rewrites the whole file
+    and holds its write lock meanwhile. Run it once, before the app writes to it. Returns whether it was switched."""
+    connection = sqlite3.connect(filename, timeout=busy_timeout, isolation_level=None)
+    try:
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] == AUTO_VACUUM_INCREMENTAL:
+            return False
+        start = time.time()
+        connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        connection.execute("VACUUM")
+        logger.info("Switched {} to incremental vacuum in {:.2f}s.".format(filename, time.time() - start))
+        return True
+    finally:
+        connection.close()
+
+
+class RetentionEngine:
+    ENABLED = False
+    CHECK_INTERVAL = 60*60 # seconds
+    BATCH_SIZE = 500 # rows deleted per transaction
+    BATCH_PAUSE = 0.05 # seconds between transactions, for the writer to get the lock
+    VACUUM_PAGES = 256 # pages returned to the filesystem per transaction
+    BUSY_TIMEOUT = 30 # seconds
+    ENABLE_INCREMENTAL_VACUUM = True # switches the database on startup, see enable_incremental_vacuum
+    RULES: List[RetentionRule] = []
+    LOG_KEEP_DAYS = 0 # days rotated log backups are kept, 0 to keep them
+    
+    def __init__(self, filename: str, archive=None, log_filename: Optional[str] = None):
+        self.filename = filename
+        self.archive = archive
+        self.log_filename = log_filename
+        self.lock = Lock() # one pass at a time
+        self.stop_event = Event()
+        self.last_report: Optional[dict] = None
+        self.totals = {'deleted': 0, 'reclaimed_bytes': 0, 'removed_partitions': 0, 'removed_logs': 0}
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.ENABLED = config.get('enabled', cls.ENABLED)
+        cls.CHECK_INTERVAL = config.get('check_interval', cls.CHECK_INTERVAL)
+        cls.BATCH_SIZE = config.get('batch_size', cls.BATCH_SIZE)
+        cls.BATCH_PAUSE = config.get('batch_pause', cls.BATCH_PAUSE)
+        cls.VACUUM_PAGES = config.get('vacuum_pages', cls.VACUUM_PAGES)
+        cls.BUSY_TIMEOUT = config.get('busy_timeout', cls.BUSY_TIMEOUT)
+        cls.ENABLE_INCREMENTAL_VACUUM = config.get('enable_incremental_vacuum', cls.ENABLE_INCREMENTAL_VACUUM)
+        cls.RULES = [RetentionRule.from_config(rule) for rule in config.get('rules', [])] or cls.RULES
+        cls.LOG_KEEP_DAYS = config.get('log_keep_days', cls.LOG_KEEP_DAYS)
+    
+    @property
+    def stop(self):
+        return self.stop_event.is_set()
+    
+    @stop.setter
+    def stop(self, value):
+        self.stop_event.set() if value else self.stop_event.clear()
+    
+    def delete_expired(self, connection: sqlite3.Connection, rule: RetentionRule, now: datetime) -> int:
+        """Deletes the rows expired by rule, BATCH_SIZE at a time. Returns the number of deleted rows."""
+        cls = self.__class__
+        sql, cutoff, deleted = rule.get_sql(cls.BATCH_SIZE, get_key(connection, rule.table)), rule.get_cutoff(now), 0
+        while not self.stop:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                count = connection.execute(sql, (cutoff,)).rowcount
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            deleted += count
+            if count < cls.BATCH_SIZE:
+                break
+            self.stop_event.wait(cls.BATCH_PAUSE)
+        return deleted
+    
+    def vacuum(self, connection: sqlite3.Connection, full: bool = False) -> int:
+        """Returns the free pages to the filesystem, VACUUM_PAGES per transaction. Returns the reclaimed bytes.
+        Files not in incremental auto_vacuum mode are vacuumed whole if full, otherwise their free pages are only reused."""
+        cls = self.__class__
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+        pages, free = get_page_counts(connection)
+        if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+            if not full:
+                return 0
+            connection.execute("VACUUM")
+            free = 0
+        while free > 0 and not self.stop:
+            connection.execute("PRAGMA incremental_vacuum({:d})".format(cls.VACUUM_PAGES)).fetchall()
+            free = get_page_counts(connection)[1]
+            self.stop_event.wait(cls.BATCH_PAUSE)
+        return (pages - get_page_counts(connection)[0]) * page_size
+    
+    def enforce(self, filename: str, rules: List[RetentionRule], now: datetime, full_vacuum: bool = False) -> dict:
+        """Applies the rules to the tables of a database file which exist in it, then vacuums it."""
+        connection = sqlite3.connect(filename, timeout=self.__class__.BUSY_TIMEOUT, isolation_level=None)
+        try:
+            tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+            deleted = {rule.describe(): self.delete_expired(connection, rule, now) for rule in rules if rule.table in tables}
+            return {'deleted': deleted, 'reclaimed_bytes': self.vacuum(connection, full_vacuum) if sum(deleted.values()) else 0}
+        finally:
+            connection.close()
+    
+    def enforce_archive(self, rules: List[RetentionRule], now: datetime) -> Dict[str, dict]:
+        """Applies the rules to every archive partition, removing the ones left empty."""
+        reports = {}
+        for filename in self.archive.get_filenames():
+            if self.stop:
+                break
+            report = reports[filename] = self.enforce(filename, rules, now, full_vacuum=True) # partitions are not written to by the app
+            connection = sqlite3.connect(filename, timeout=self.__class__.BUSY_TIMEOUT)
+            try:
+                empty = connection.execute("SELECT NOT EXISTS (SELECT 1 FROM transactions)").fetchone()[0]
+            finally:
+                connection.close()
+            if empty:
+                with self.archive.lock:
+                    reader = self.archive.readers.pop(filename, None)
+                if reader is not None:
+                    reader.close()
+                report['reclaimed_bytes'] += os.path.getsize(filename)
+                report['removed'] = True
+                os.remove(filename)
+                logger.info("Removed the emptied archive partition {}.".format(filename))
+        return reports
+    
+    def prune_logs(self, now: datetime) -> List[str]:
+        """Removes the rotated backups of the log file (<filename>.<n>) last written more than LOG_KEEP_DAYS days ago."""
+        cls = self.__class__
+        if not cls.LOG_KEEP_DAYS or not self.log_filename:
+            return []
+        cutoff = (now - timedelta(days=cls.LOG_KEEP_DAYS)).timestamp()
+        removed = []
+        for filename in glob.glob(glob.escape(self.log_filename) + '.*'):
+            if filename.rsplit('.', 1)[-1].isdigit() and os.path.getmtime(filename) < cutoff:
+                os.remove(filename)
+                removed.append(filename)
+        return removed
+    
+    def run_once(self, now: Optional[datetime] = None) -> dict:
+        """One retention pass over the database, the archive and the logs. Returns its report."""
+        now = now or datetime.now()
+        rules = self.__class__.RULES
+        with self.lock:
+            start = time.time()
+            report = {'time': start, 'database': self.enforce(self.filename, rules, now)}
+            archive_rules = [rule for rule in rules if rule.archive]
+            report['archive'] = self.enforce_archive(archive_rules, now) if self.archive is not None and len(archive_rules) else {}
+            report['logs'] = self.prune_logs(now)
+            report['duration'] = time.time() - start
+    
+            partitions = report['archive'].values()
+            self.totals['deleted'] += sum(sum(r['deleted'].values()) for r in [report['database'], *partitions])
+            self.totals['reclaimed_bytes'] += report['database']['reclaimed_bytes'] + sum(r['reclaimed_bytes'] for r in partitions)
+            self.totals['removed_partitions'] += sum(1 for r in partitions if r.get('removed'))
+            self.totals['removed_logs'] += len(report['logs'])
+            self.last_report = report
+        return report
+    
+    def run(self):
+        while not self.stop:
+            try:
+                report = self.run_once()
+                deleted = sum(report['database']['deleted'].values())
+                if deleted:
+                    logger.info("Retention deleted {} rows and reclaimed {} bytes.".format(deleted, report['database']['reclaimed_bytes']))
+            except Exception as exc:
+                logger.warning("Retention pass failed: {}".format(exc))
+            self.stop_event.wait(self.__class__.CHECK_INTERVAL)
+    
+    def get_info(self):
+        cls = self.__class__
+        connection = sqlite3.connect(self.filename, timeout=cls.BUSY_TIMEOUT)
+        try:
+            auto_vacuum = connection.execute("PRAGMA auto_vacuum").fetchone()[0]
+            page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+            pages, free = get_page_counts(connection)
+        finally:
+            connection.close()
+        return {'enabled': cls.ENABLED, 'rules': [rule.describe() for rule in cls.RULES], 'incremental_vacuum': auto_vacuum == AUTO_VACUUM_INCREMENTAL,
+                'file_bytes': pages*page_size, 'free_bytes': free*page_size, 'totals': dict(self.totals), 'last_report': self.last_report}
@@ -0,0 +1,255 @@
+from datetime import date, datetime, timedelta
+import json
+import logging
+import math
+import sqlite3
+from threading import Lock
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from automators.data_structs import Config
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS transaction_rollups (day TEXT NOT NULL, hour INTEGER NOT NULL, automator TEXT NOT NULL, product_spec TEXT NOT NULL, device TEXT NOT NULL, "
+    "count INTEGER NOT NULL, success_count INTEGER NOT NULL, duration_count INTEGER NOT NULL, duration_sum INTEGER NOT NULL, duration_min INTEGER, duration_max INTEGER, "
+    "duration_sketch TEXT NOT NULL, PRIMARY KEY (day, hour, automator, product_spec, device)) WITHOUT ROWID",
+]
+DIMENSIONS = ('day', 'hour', 'automator', 'product_spec', 'device')
+
+
+class DurationSketch:
+    """Mergeable quantile sketch of execution durations. Durations are counted in logarithmic buckets,
+    so any quantile is within RELATIVE_ACCURACY of the real one, and sketches of different hours or devices are merged by adding up their buckets."""
+    RELATIVE_ACCURACY = 0.05
+    ZERO_INDEX = -2**31 # below the bucket of any positive duration
+    
+    def __init__(self, buckets: Optional[Dict[int, int]] = None):
+        self.buckets: Dict[int, int] = buckets or {}
+    
+    @classmethod
+    def gamma(cls):
+        return (1 + cls.RELATIVE_ACCURACY) / (1 - cls.RELATIVE_ACCURACY)
+    
+    @classmethod
+    def from_json(cls, data: str):
+        return cls({int(k): v for k, v in json.loads(data).items()})
+    
+    def to_json(self):
+        return json.dumps(self.buckets, separators=(',', ':'))
+    
+    def add(self, value: float, count: int = 1):
+        index = self.__class__.ZERO_INDEX if value <= 0 else math.ceil(math.log(value, self.__class__.gamma()))
+        self.buckets[index] = self.buckets.get(index, 0) + count
+    
+    def merge(self, other: 'DurationSketch'):
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        return self
+    
+    def quantile(self, q: float) -> Optional[float]:
+        total = sum(self.buckets.values())
+        if total == 0:
+            return None
+        rank = q * (total - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                if index == self.__class__.ZERO_INDEX:
+                    return 0
+                gamma = self.__class__.gamma()
+                return 2 * gamma**index / (gamma + 1) # the middle of (gamma^(index-1), gamma^index], in relative terms
+        return None
+
+
+class TransactionRollups:
+    """Per day, hour, automator, product_spec and device counts and execution durations of the transactions,
+    recorded as ResultMiddleware writes each result. Results are added up in memory and written every FLUSH_INTERVAL
+    in one transaction, on a connection of its own. Stats are read from the rollups, never from the transactions."""
+    ENABLED = True
+    FLUSH_INTERVAL = 5 # seconds
+    BUSY_TIMEOUT = 10 # seconds
+    REBUILD_BATCH_SIZE = 5000
+    DEFAULT_STATS_DAYS = 31 # days read by get_stats without a start_day
+    SKETCH_CLS = DurationSketch
+    
+    def __init__(self, filename: str):
+        cls = self.__class__
+        self.filename = filename
+        self.connection = sqlite3.connect(filename, timeout=cls.BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        self.lock = Lock()
+        self.pending: Dict[Tuple[str, int, str, str, str], dict] = {}
+        self.last_flush = time.monotonic()
+        with self.lock:
+            self.created = not len(self.connection.execute("SELECT name FROM sqlite_master WHERE name='transaction_rollups'").fetchall())
+            [self.connection.execute(statement) for statement in SCHEMA]
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.ENABLED = config.get('enabled', cls.ENABLED)
+        cls.FLUSH_INTERVAL = config.get('flush_interval', cls.FLUSH_INTERVAL)
+        cls.BUSY_TIMEOUT = config.get('busy_timeout', cls.BUSY_TIMEOUT)
+        cls.REBUILD_BATCH_SIZE = config.get('rebuild_batch_size', cls.REBUILD_BATCH_SIZE)
+        cls.DEFAULT_STATS_DAYS = config.get('default_stats_days', cls.DEFAULT_STATS_DAYS)
+        cls.SKETCH_CLS.RELATIVE_ACCURACY = config.get('sketch_relative_accuracy', cls.SKETCH_CLS.RELATIVE_ACCURACY)
+    
+    def new_measures(self):
+        return {'count': 0, 'success_count': 0, 'duration_count': 0, 'duration_sum': 0, 'duration_min': None, 'duration_max': None, 'duration_sketch': self.__class__.SKETCH_CLS()}
+    
+    def add(self, measures: dict, success: bool, duration: int, count: int = 1):
+        measures['count'] += count
+        measures['success_count'] += count if success else 0
+        if duration is not None and duration >= 0: # -1 when the request never ran, e.g: quarantined
+            measures['duration_count'] += count
+            measures['duration_sum'] += duration*count
+            measures['duration_min'] = duration if measures['duration_min'] is None else min(measures['duration_min'], duration)
+            measures['duration_max'] = duration if measures['duration_max'] is None else max(measures['duration_max'], duration)
+            measures['duration_sketch'].add(duration, count)
+    
+    def record(self, time_: datetime, automator: str, product_spec: str, device: str, success: bool, duration: int):
+        key = (time_.strftime('%Y-%m-%d'), time_.hour, automator or '', product_spec, device or '')
+        with self.lock:
+            self.add(self.pending.setdefault(key, self.new_measures()), success, duration)
+            due = time.monotonic() - self.last_flush >= self.__class__.FLUSH_INTERVAL
+        if due:
+            self.flush()
+    
+    def merge_into(self, connection: sqlite3.Connection, pending: dict):
+        for key, measures in pending.items():
+            row = connection.execute("SELECT count, success_count, duration_count, duration_sum, duration_min, duration_max, duration_sketch FROM transaction_rollups "
+                                     "WHERE day=? AND hour=? AND automator=? AND product_spec=? AND device=?", key).fetchone()
+            if row is not None:
+                measures = self.merge_measures(self.row_to_measures(row), measures)
+            connection.execute("INSERT OR REPLACE INTO transaction_rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                               key + (measures['count'], measures['success_count'], measures['duration_count'], measures['duration_sum'],
+                                      measures['duration_min'], measures['duration_max'], measures['duration_sketch'].to_json()))
+    
+    def flush(self):
+        """Writes the pending results into the rollups. They are kept for the next flush if writing fails."""
+        with self.lock:
+            pending, self.pending = self.pending, {}
+            self.last_flush = time.monotonic()
+            if not len(pending):
+                return
+            try:
+                self.connection.execute("BEGIN IMMEDIATE")
+                self.merge_into(self.connection, pending)
+                self.connection.execute("COMMIT")
+            except Exception as exc:
+                if self.connection.in_transaction:
+                    self.connection.execute("ROLLBACK")
+                for key, measures in pending.items():
+                    self.pending[key] = self.merge_measures(measures, self.pending[key]) if key in self.pending else measures
+                logger.warning("Failed to flush {} transaction rollups: {}".format(len(pending), exc))
+    
+    def row_to_measures(self, row: Sequence):
+        return {'count': row[0], 'success_count': row[1], 'duration_count': row[2], 'duration_sum': row[3],
+                'duration_min': row[4], 'duration_max': row[5], 'duration_sketch': self.__class__.SKETCH_CLS.from_json(row[6])}
+    
+    def merge_measures(self, a: dict, b: dict):
+        mins = [m for m in (a['duration_min'], b['duration_min']) if m is not None]
+        maxs = [m for m in (a['duration_max'], b['duration_max']) if m is not None]
+        return {'count': a['count']+b['count'], 'success_count': a['success_count']+b['success_count'],
+                'duration_count': a['duration_count']+b['duration_count'], 'duration_sum': a['duration_sum']+b['duration_sum'],
+                'duration_min': min(mins) if len(mins) else None, 'duration_max': max(maxs) if len(maxs) else None,
+                'duration_sketch': self.__class__.SKETCH_CLS().merge(a['duration_sketch']).merge(b['duration_sketch'])}
+    
+    def get_stats(self, group_by: Sequence[str] = ('automator',), start_day: Optional[str] = None, end_day: Optional[str] = None,
+                  automator: Optional[str] = None, product_spec: Optional[str] = None, device: Optional[str] = None, percentiles: bool = True) -> List[dict]:
+        """Adds up the rollups in the day range (inclusive, 'YYYY-MM-DD') matching the filters into one entry per group_by combination. 
+        Without a start_day, only the last DEFAULT_STATS_DAYS days up to end_day (or today) are read. Counts, sums, minimums and maximums are 
+        aggregated by SQLite, the duration sketches are only read and merged for the percentiles."""
+        if any(dimension not in DIMENSIONS for dimension in group_by):
+            raise ValueError("Can only group by {}.".format(', '.join(DIMENSIONS)))
+        if start_day is None:
+            last_day = datetime.strptime(end_day, '%Y-%m-%d').date() if end_day is not None else date.today()
+            start_day = (last_day - timedelta(days=self.__class__.DEFAULT_STATS_DAYS - 1)).isoformat()
+        self.flush()
+        clauses, params = [], []
+        for column, operator, value in [('day', '>=', start_day), ('day', '<=', end_day), ('automator', '=', automator), ('product_spec', '=', product_spec), ('device', '=', device)]:
+            if value is not None:
+                clauses.append("{} {} ?".format(column, operator))
+                params.append(value)
+        where = " WHERE " + " AND ".join(clauses)
+        grouping = " GROUP BY {0} ORDER BY {0}".format(', '.join(group_by)) if len(group_by) else ""
+        sql = ("SELECT {}sum(count), sum(success_count), sum(duration_count), sum(duration_sum), min(duration_min), max(duration_max) FROM transaction_rollups{}{}"
+               .format(''.join(dimension + ', ' for dimension in group_by), where, grouping))
+        with self.lock:
+            rows = [row for row in self.connection.execute(sql, params).fetchall() if row[len(group_by)] is not None] # no rows at all without group_by
+            sketches: Dict[tuple, DurationSketch] = {}
+            if percentiles:
+                cursor = self.connection.execute("SELECT {}duration_sketch FROM transaction_rollups{} AND duration_count > 0"
+                                                 .format(''.join(dimension + ', ' for dimension in group_by), where), params)
+                for row in cursor:
+                    sketches.setdefault(tuple(row[:-1]), self.__class__.SKETCH_CLS()).merge(self.__class__.SKETCH_CLS.from_json(row[-1]))
+        stats = []
+        for row in rows:
+            key = tuple(row[:len(group_by)])
+            count, success_count, duration_count, duration_sum, duration_min, duration_max = row[len(group_by):]
+            entry = {**dict(zip(group_by, key)), 'count': count, 'success_count': success_count, 'duration_count': duration_count, 'duration_sum': duration_sum,
+                     'duration_min': duration_min, 'duration_max': duration_max, 'duration_average': duration_sum/duration_count if duration_count else None}
+            if percentiles:
+                sketch = sketches.get(key, self.__class__.SKETCH_CLS())
+                entry.update(duration_p50=sketch.quantile(0.5), duration_p95=sketch.quantile(0.95))
+            stats.append(entry)
+        return stats
+    
+    def rebuild(self, partitions: Sequence[str] = ()):
+        """Recomputes every rollup from the transactions table and the archived partitions' files, 
+        e.g: on first start or after losing unflushed results in a crash."""
+        logger.info("Rebuilding transaction rollups...")
+        start = time.time()
+        with self.lock:
+            self.pending = {}
+            self.connection.execute("BEGIN IMMEDIATE")
+            try:
+                self.connection.execute("DELETE FROM transaction_rollups")
+                total = self.rebuild_from(self.connection, 'main')
+                self.connection.execute("COMMIT")
+            except BaseException:
+                self.connection.execute("ROLLBACK")
+                raise
+            for filename in partitions: # attached outside of the transaction, each partition is merged in a transaction of its own
+                self.connection.execute("ATTACH DATABASE ? AS archived", (filename,))
+                try:
+                    self.connection.execute("BEGIN IMMEDIATE")
+                    try:
+                        total += self.rebuild_from(self.connection, 'archived')
+                        self.connection.execute("COMMIT")
+                    except BaseException:
+                        self.connection.execute("ROLLBACK")
+                        raise
+                finally:
+                    self.connection.execute("DETACH DATABASE archived")
+        logger.info("Rebuilt transaction rollups from {} transactions in {:.2f}s.".format(total, time.time() - start))
+        return total
+    
+    def rebuild_from(self, connection: sqlite3.Connection, schema: str):
+        """Adds the transactions of the schema's transactions table to the rollups, in batches. Returns the number of transactions."""
+        last_id, total = 0, 0
+        while True:
+            rows = connection.execute("SELECT id, time, automator, product_spec, device, refID, error, execution_duration FROM {}.transactions "
+                                      "WHERE id > ? ORDER BY id LIMIT ?".format(schema), (last_id, self.__class__.REBUILD_BATCH_SIZE)).fetchall()
+            if not len(rows):
+                return total
+            batch = {}
+            for id_, time_, automator, product_spec, device, refID, error, duration in rows:
+                time_ = parse_time(time_)
+                key = (time_.strftime('%Y-%m-%d'), time_.hour, automator or '', product_spec, device or '')
+                self.add(batch.setdefault(key, self.new_measures()), refID is not None and error is None, duration)
+            self.merge_into(connection, batch)
+            last_id, total = rows[-1][0], total + len(rows)
+    
+    def get_info(self):
+        with self.lock:
+            return {'enabled': self.__class__.ENABLED, 'pending': len(self.pending), 'seconds_since_flush': time.monotonic() - self.last_flush}
+
+
+def parse_time(value) -> datetime:
+    """Parses a transaction time as stored in the transactions table."""
+    if isinstance(value, (int, float)):
+        return datetime.fromtimestamp(value)
+    return datetime.fromisoformat(value)
@@ -0,0 +1,87 @@
+import json
+import os
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
+
+from automators.data_structs import Config
+
+if TYPE_CHECKING:
+    from admission import AdmissionController
+    from automators.device_manager import DeviceManager
+
+
+class ProductRouter:
+    """Routes requests for a group of equivalent products to the automator with the lowest expected completion time. 
+    The groups of EQUIVALENTS_FILE are curated by hand: a matching product_spec does not make products equivalent, 
+    only products with the same package and price may be grouped, as routing, fail-over and duplicate checks treat them as one. 
+    The expected completion time is the estimated wait from the queue depth and capable devices, 
+    inflated by the recent failure rate of the automator, since every failure costs another attempt."""
+    AUTO_AUTOMATOR = 'auto' # automator name of requests to be routed, mapped to a prefix in AUTOMATOR_PREFIX_MAPPING
+    EQUIVALENTS_FILE = 'products/equivalents.json' # group:{automator:product_spec}
+    UNAVAILABLE_FAILURE_RATE = 0.8 # automators failing at least this often are only used as the last alternatives
+    MIN_SUCCESS_RATE = 0.05 # bounds the failure inflation of the expected completion time
+    EQUIVALENTS: Dict[str, Dict[str, str]] = {}
+    CONFIG: Config
+    
+    def __init__(self, device_manager: 'DeviceManager', admission: 'AdmissionController'):
+        self.device_manager = device_manager
+        self.admission = admission
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.CONFIG = config
+        cls.AUTO_AUTOMATOR = config.get('auto_automator', cls.AUTO_AUTOMATOR)
+        cls.EQUIVALENTS_FILE = config.get('equivalents_file', cls.EQUIVALENTS_FILE)
+        cls.UNAVAILABLE_FAILURE_RATE = config.get('unavailable_failure_rate', cls.UNAVAILABLE_FAILURE_RATE)
+        cls.MIN_SUCCESS_RATE = config.get('min_success_rate', cls.MIN_SUCCESS_RATE)
+        cls.EQUIVALENTS = cls.load_equivalents(cls.EQUIVALENTS_FILE)
+    
+    @staticmethod
+    def load_equivalents(filename: str):
+        if not os.path.isfile(filename):
+            return {}
+        with open(filename) as f:
+            return {group.upper():{automator.lower():spec.upper() for automator, spec in specs.items()} for group, specs in json.load(f).items()}
+    
+    def get_group(self, product_spec: str):
+        return self.__class__.EQUIVALENTS.get(product_spec.upper())
+    
+    def get_equivalents(self, automator: str, product_spec: str) -> List[Tuple[str, str]]:
+        """Every (automator, product_spec) equivalent to the given one, including itself."""
+        for specs in self.__class__.EQUIVALENTS.values():
+            if specs.get(automator) == product_spec.upper():
+                return list(specs.items())
+        return [(automator, product_spec)]
+    
+    def expected_completion_time(self, automator: str):
+        capable_devices = self.device_manager.get_capable_devices(automator)
+        if not len(capable_devices):
+            return float('inf')
+        depth = self.admission.get_queue_depth(automator)
+        idle_devices = [d for d in capable_devices if d.current_request is None]
+        if depth < len(idle_devices):
+            default = self.device_manager.DEFAULT_EXECUTION_DURATION
+            wait = min([d.get_average_execution_duration(automator, default) for d in idle_devices])
+        else:
+            wait = self.device_manager.estimate_wait(automator, depth)
+        success_rate = 1 - self.device_manager.get_failure_rate(automator)
+        return wait / max(success_rate, self.__class__.MIN_SUCCESS_RATE)
+    
+    def rank(self, group: Dict[str, str]) -> List[Tuple[str, str]]:
+        """(automator, product_spec) of the group, best first. Automators without capable devices are left out."""
+        ranked = []
+        for automator, product_spec in group.items():
+            expected_time = self.expected_completion_time(automator)
+            if expected_time == float('inf'):
+                continue
+            unavailable = self.device_manager.get_failure_rate(automator) >= self.__class__.UNAVAILABLE_FAILURE_RATE
+            ranked.append(((unavailable, expected_time), automator, product_spec))
+        return [(automator, product_spec) for _, automator, product_spec in sorted(ranked)]
+    
+    def route(self, product_spec: str) -> Optional[List[Tuple[str, str]]]:
+        """Ranked (automator, product_spec) for the product group, None if the group is unknown. 
+        If no automator of the group can be served now, the group is returned as is, to wait in queue."""
+        group = self.get_group(product_spec)
+        if group is None:
+            return None
+        ranked = self.rank(group)
+        return ranked if len(ranked) else list(group.items())
@@ -0,0 +1,129 @@
+"""Full-text search over the refID, number, description and error of transactions. An FTS5 index (transactions_search)
+shadows the transactions table as external content, kept in sync by triggers on insert, update and delete, in the main
+database and in every archive partition. The trigram tokenizer matches any substring of at least three characters, 
+it needs SQLite 3.34+, older versions fall back to TRIGRAM_FALLBACK_TOKENIZER, which only matches whole words."""
+import logging
+import sqlite3
+from typing import List, Optional, Sequence, Tuple
+
+from automators.data_structs import Config
+
+logger = logging.getLogger(__name__)
+
+
+SEARCH_COLUMNS = ('refID', 'number', 'description', 'error')
+SEARCH_TRIGGERS = {
+    'transactions_search_insert': "AFTER INSERT ON transactions BEGIN "
+                                  "INSERT INTO transactions_search (rowid, {columns}) VALUES (new.id, {new}); END",
+    'transactions_search_delete': "AFTER DELETE ON transactions BEGIN "
+                                  "INSERT INTO transactions_search (transactions_search, rowid, {columns}) VALUES ('delete', old.id, {old}); END",
+    'transactions_search_update': "AFTER UPDATE ON transactions BEGIN "
+                                  "INSERT INTO transactions_search (transactions_search, rowid, {columns}) VALUES ('delete', old.id, {old}); "
+                                  "INSERT INTO transactions_search (rowid, {columns}) VALUES (new.id, {new}); END",
+}
+
+
+TRIGRAM_MIN_VERSION = (3, 34, 0)
+TRIGRAM_FALLBACK_TOKENIZER = 'unicode61'
+
+
+def has_fts5(connection: sqlite3.Connection) -> bool:
+    return bool(connection.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+
+
+def get_tokenizer(tokenizer: str) -> str:
+    """The tokenizer, or TRIGRAM_FALLBACK_TOKENIZER if it is trigram and this SQLite is older than TRIGRAM_MIN_VERSION."""
+    if tokenizer.split()[0] == 'trigram' and sqlite3.sqlite_version_info < TRIGRAM_MIN_VERSION:
+        logger.warning("SQLite {} has no trigram tokenizer (3.34+), searching whole words with {} instead.".format(sqlite3.sqlite_version, TRIGRAM_FALLBACK_TOKENIZER))
+        return TRIGRAM_FALLBACK_TOKENIZER
+    return tokenizer
+
+
+def create_search_index(connection: sqlite3.Connection, schema: str = 'main', tokenizer: Optional[str] = None) -> bool:
+    """Creates the search index and its triggers on the transactions table of schema, then indexes the existing rows.
+    Returns whether it was created, False if it already existed, there is no transactions table or SQLite is built without FTS5."""
+    if not has_fts5(connection):
+        logger.warning("Not indexing {}.transactions for search, SQLite {} is built without FTS5.".format(schema, sqlite3.sqlite_version))
+        return False
+    exists = lambda name, type_: connection.execute("SELECT 1 FROM {}.sqlite_master WHERE type=? AND name=?".format(schema), (type_, name)).fetchone() is not None
+    if not exists('transactions', 'table') or exists('transactions_search', 'table'):
+        return False
+    columns = {row[1] for row in connection.execute("PRAGMA {}.table_info(transactions)".format(schema)).fetchall()}
+    missing = [column for column in SEARCH_COLUMNS if column not in columns]
+    if len(missing):
+        logger.warning("Not indexing {}.transactions for search, it has no {} columns.".format(schema, ', '.join(missing)))
+        return False
+    connection.execute("CREATE VIRTUAL TABLE {}.transactions_search USING fts5({}, content='transactions', content_rowid='id', tokenize='{}')".format(
+                       schema, ', '.join(SEARCH_COLUMNS), get_tokenizer(tokenizer or TransactionSearch.TOKENIZER)))
+    values = {'columns': ', '.join(SEARCH_COLUMNS), 'new': ', '.join('new.'+c for c in SEARCH_COLUMNS), 'old': ', '.join('old.'+c for c in SEARCH_COLUMNS)}
+    for name, body in SEARCH_TRIGGERS.items():
+        connection.execute("CREATE TRIGGER IF NOT EXISTS {}.{} {}".format(schema, name, body.format(**values)))
+    connection.execute("INSERT INTO {}.transactions_search (transactions_search) VALUES ('rebuild')".format(schema))
+    logger.info("Created the search index of {}.transactions.".format(schema))
+    return True
+
+
+class TransactionSearch:
+    """Ranked search of transactions through the search index, on read connections of the main database and of the
+    archive partitions. Results are ordered by bm25 rank, the refID and number weighted above the description and error. 
+    Each partition ranks its rows against its own term statistics, the ranks of different months are merged as they are, 
+    so they are only roughly comparable: a term rare in one month outranks the same match in a month where it is common."""
+    TOKENIZER = 'trigram'
+    MIN_TERM_LENGTH = 3 # trigrams, shorter terms cannot be matched
+    WEIGHTS = {'refID': 10.0, 'number': 10.0, 'description': 1.0, 'error': 1.0}
+    
+    def __init__(self, reader, partitions: Sequence = ()):
+        self.readers = [reader] + list(partitions)
+    
+    @classmethod
+    def configure(cls, config: Config):
+        cls.TOKENIZER = config.get('tokenizer', cls.TOKENIZER)
+        cls.MIN_TERM_LENGTH = config.get('min_term_length', cls.MIN_TERM_LENGTH)
+        cls.WEIGHTS = {**cls.WEIGHTS, **config.get('weights', {})}
+    
+    @classmethod
+    def build_query(cls, query: str, fields: Sequence[str] = SEARCH_COLUMNS) -> str:
+        """The FTS5 match expression of every whitespace separated term, as a quoted phrase, in any of fields."""
+        terms = query.split()
+        if not len(terms):
+            raise ValueError("Empty search query.")
+        if any(len(term) < cls.MIN_TERM_LENGTH for term in terms):
+            raise ValueError("Search terms need at least {} characters.".format(cls.MIN_TERM_LENGTH))
+        unknown = [field for field in fields if field not in SEARCH_COLUMNS]
+        if len(unknown):
+            raise ValueError("Unknown search fields: {}.".format(', '.join(unknown)))
+        return '{{{}}} : ({})'.format(' '.join(fields), ' AND '.join('"{}"'.format(term.replace('"', '""')) for term in terms))
+    
+    @classmethod
+    def get_sql(cls):
+        weights = ', '.join(str(float(cls.WEIGHTS.get(column, 1.0))) for column in SEARCH_COLUMNS)
+        return ("SELECT transactions.*, bm25(transactions_search, {}) AS rank FROM transactions_search "
+                "JOIN transactions ON transactions.id = transactions_search.rowid "
+                "WHERE transactions_search MATCH ? ORDER BY rank, transactions.id DESC LIMIT ?".format(weights))
+    
+    def search(self, query: str, fields: Sequence[str] = SEARCH_COLUMNS, limit: int = 50, offset: int = 0) -> Tuple[List[dict], Optional[int]]:
+        """Returns a page of the matching transactions, best first, and the offset of the next page, None on the last one."""
+        match, sql = self.build_query(query, fields), self.get_sql()
+        rows = []
+        for reader in self.readers:
+            try:
+                rows += reader.select(sql, (match, offset+limit+1))
+            except sqlite3.OperationalError as exc:
+                if 'no such table' not in str(exc):
+                    raise
+                if reader is self.readers[0]: # an archive partition may not be indexed yet, the main database only without FTS5
+                    raise ValueError("Search is not available, the transactions are not indexed.")
+        rows.sort(key=lambda row: (row['rank'], -row['id']))
+        page = rows[offset:offset+limit]
+        return page, offset+limit if len(rows) > offset+limit else None
+    
+    def lookup(self, refID: Optional[str] = None, number: Optional[str] = None, limit: int = 50) -> List[dict]:
+        """The transactions with exactly this refID or number, newest first, through the refID and number indexes."""
+        if refID is None and number is None:
+            raise ValueError("Either refID or number is required.")
+        column, value = ('refID', refID) if refID is not None else ('number', number)
+        rows = []
+        for reader in self.readers:
+            rows += reader.select("SELECT * FROM transactions WHERE {} = ? ORDER BY id DESC LIMIT ?".format(column), (value, limit))
+        rows.sort(key=lambda row: -row['id'])
+        return rows[:limit]
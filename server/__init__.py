@@ -1,3 +1,4 @@
-from .base import BaseServer
-from .jabber import JabberClient, JabberCredentials, JabberShard, JabberServer
-from .request import Request as ServerRequest
+from .base import BaseServer
+from .jabber import JabberClient, JabberCredentials, JabberShard, JabberServer
+from .http_ingestion import HTTPIngestionServer, HTTPIngestionClient
+from .request import Request as ServerRequest
@@ -0,0 +1,363 @@
+import base64
+import json
+import logging
+import secrets
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, TYPE_CHECKING
+from urllib.parse import parse_qs, urlsplit
+
+from server.base import BaseServer, Credentials
+from server.request import Request
+
+if TYPE_CHECKING:
+    from automators.data_structs import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Ticket:
+    """Tracks a single request submitted through the http ingestion server."""
+    id: str
+    user_identifier: str
+    request: str
+    callback_url: Optional[str] = None
+    status: str = 'pending'
+    details: dict = field(default_factory=dict)
+    replies: List[str] = field(default_factory=list)
+    created: float = field(default_factory=time.time)
+    updated: float = field(default_factory=time.time)
+    admitted: threading.Event = field(default_factory=threading.Event, repr=False)
+    logged: bool = field(default=False, repr=False) # whether it is in the finished log, a ticket is logged once
+
+    ADMISSION_STATUSES = ('invalid', 'not_registered', 'busy', 'in_queue', 'in_process', 'in_cached_result', 'enqueued', 'bulk_enqueued')
+    FINAL_STATUSES = ('invalid', 'not_registered', 'busy', 'in_cached_result', 'success', 'failed', 'expired', 'lost') # lost: executing on a cluster node that died, see ClusterBridge.TERMINAL_STATUSES
+
+    @property
+    def accepted(self):
+        return not self.duplicate and self.status not in ('pending', 'invalid', 'not_registered', 'busy')
+
+    @property
+    def duplicate(self):
+        return self.status in ('in_queue', 'in_process', 'in_cached_result')
+
+    @property
+    def finished(self):
+        return self.status in self.__class__.FINAL_STATUSES
+
+    @property
+    def dict(self):
+        return {'ticket': self.id, 'request': self.request, 'status': self.status, 'accepted': self.accepted, 'duplicate': self.duplicate,
+                'finished': self.finished, 'details': self.details, 'replies': self.replies, 'created': self.created, 'updated': self.updated}
+
+
+class HTTPIngestionServer(BaseServer):
+    """Accepts batches of requests over HTTP/JSON. Intended for resellers submitting requests programmatically.
+
+    Endpoints (HTTP basic auth, username is used as the user_identifier):
+    - POST /requests        body: {"requests": ["<prod>.<number>.<pin>", ...], "callback_url": optional}
+    - GET  /requests/<id>   gets the current status of a ticket
+    - GET  /results         long-polls finished tickets, query: cursor=<int>&wait=<seconds>
+    """
+    SERVER_NAME = 'http'
+    CREDENTIAL_CLS = Credentials
+    ENABLED = False
+    KEEP_ALIVE_SLEEP_DURATION = 10
+    HOST = '127.0.0.1'
+    PORT = 8090
+    MAX_BATCH_SIZE = 1000
+    ADMISSION_TIMEOUT = 10
+    LONG_POLL_TIMEOUT = 30
+    RESULT_RETENTION = 60*60
+    CALLBACK_HOSTS = ['127.0.0.1', 'localhost', '::1']
+    CALLBACK_TIMEOUT = 5
+    CALLBACK_WORKERS = 4
+    CONFIG: 'Config'
+
+    def __init__(self, transaction_queue, credential_list: List[Credentials]):
+        super().__init__(transaction_queue, credential_list)
+        self.credentials = {cred.username: cred.password for cred in credential_list}
+        self.tickets: Dict[str, Ticket] = {}
+        self.finished_log: Dict[str, List[Ticket]] = {} # user_identifier:[tickets, in order of completion]
+        self.finished_offsets: Dict[str, int] = {} # user_identifier:count of purged entries, keeps cursors valid after purging
+        self.lock = threading.Lock()
+        self.finished_condition = threading.Condition(self.lock)
+        self.callback_executor = ThreadPoolExecutor(max_workers=self.__class__.CALLBACK_WORKERS, thread_name_prefix='HTTPIngestionCallback')
+        self.http_server: Optional[ThreadingHTTPServer] = None
+
+    @classmethod
+    def configure(cls, config: 'Config'):
+        cls.CONFIG = config
+        cls.KEEP_ALIVE_SLEEP_DURATION = config.get('keep_alive_sleep_duration', cls.KEEP_ALIVE_SLEEP_DURATION)
+        cls.HOST = config.get('host', cls.HOST)
+        cls.PORT = config.get('port', cls.PORT)
+        cls.MAX_BATCH_SIZE = config.get('max_batch_size', cls.MAX_BATCH_SIZE)
+        cls.ADMISSION_TIMEOUT = config.get('admission_timeout', cls.ADMISSION_TIMEOUT)
+        cls.LONG_POLL_TIMEOUT = config.get('long_poll_timeout', cls.LONG_POLL_TIMEOUT)
+        cls.RESULT_RETENTION = config.get('result_retention', cls.RESULT_RETENTION)
+        cls.CALLBACK_HOSTS = config.get('callback_hosts', cls.CALLBACK_HOSTS)
+        cls.CALLBACK_TIMEOUT = config.get('callback_timeout', cls.CALLBACK_TIMEOUT)
+        cls.CALLBACK_WORKERS = config.get('callback_workers', cls.CALLBACK_WORKERS)
+
+    @property
+    def shards_identifiers(self) -> List[str]:
+        return ['{}:{}'.format(self.__class__.HOST, self.__class__.PORT)]
+
+    def add_contact(self, shard_identifier: str, user_identifier: str):
+        # There is no contact list for http, registration is done solely through the database.
+        return True
+
+    def remove_contact(self, shard_identifier: str, user_identifier: str):
+        return True
+
+    def authenticate(self, authorization_header: Optional[str]):
+        """Returns the user_identifier of a valid basic authorization header, otherwise None."""
+        if not authorization_header or not authorization_header.startswith('Basic '):
+            return None
+        try:
+            username, password = base64.b64decode(authorization_header[6:]).decode('utf-8').split(':', 1)
+        except (ValueError, UnicodeDecodeError):
+            return None
+        if username in self.credentials and secrets.compare_digest(self.credentials[username], password):
+            return username
+        return None
+
+    def is_valid_callback(self, callback_url: Optional[str]):
+        if callback_url is None:
+            return True
+        parsed = urlsplit(callback_url)
+        return parsed.scheme in ('http', 'https') and parsed.hostname in self.__class__.CALLBACK_HOSTS
+
+    def submit_batch(self, user_identifier: str, requests: List[str], callback_url: Optional[str] = None):
+        """Puts every request of a batch into the transaction queue, then waits for the admission verdict of each of them."""
+        tickets = []
+        for message in requests:
+            ticket = Ticket(secrets.token_hex(8), user_identifier, str(message), callback_url=callback_url)
+            with self.lock:
+                self.tickets[ticket.id] = ticket
+            tickets.append(ticket)
+            self.submit(Request(self, ticket.request, user_identifier, {'ticket': ticket.id}))
+
+        deadline = time.time() + self.__class__.ADMISSION_TIMEOUT
+        for ticket in tickets:
+            ticket.admitted.wait(max(0, deadline - time.time()))
+        return [dict(ticket.dict, index=index) for index, ticket in enumerate(tickets)]
+
+    def get_ticket(self, user_identifier: str, ticket_id: str):
+        with self.lock:
+            ticket = self.tickets.get(ticket_id)
+        if ticket is None or ticket.user_identifier != user_identifier:
+            return None
+        return ticket
+
+    def poll_results(self, user_identifier: str, cursor: int = 0, wait: float = 0):
+        """Returns finished tickets after the cursor, blocks up to `wait` seconds if there are none yet."""
+        wait = max(0, min(wait, self.__class__.LONG_POLL_TIMEOUT))
+        deadline = time.time() + wait
+        with self.finished_condition:
+            while True:
+                offset = self.finished_offsets.get(user_identifier, 0)
+                finished = self.finished_log.get(user_identifier, [])
+                start = max(cursor - offset, 0)
+                if start < len(finished) or time.time() >= deadline:
+                    break
+                self.finished_condition.wait(deadline - time.time())
+            entries = [ticket.dict for ticket in finished[start:]]
+            return {'cursor': offset + len(finished), 'results': entries}
+
+    def deliver_callback(self, ticket: Ticket):
+        data = json.dumps(ticket.dict).encode('utf-8')
+        req = urllib.request.Request(ticket.callback_url, data=data, headers={'Content-Type': 'application/json'}, method='POST') # type: ignore
+        try:
+            with urllib.request.urlopen(req, timeout=self.__class__.CALLBACK_TIMEOUT) as resp:
+                resp.read()
+        except Exception as exc:
+            logger.info("Failed to deliver callback for ticket '{}' to '{}': {}".format(ticket.id, ticket.callback_url, exc))
+
+    def notify(self, status: str, interaction_data: dict, **details):
+        with self.lock:
+            ticket = self.tickets.get(interaction_data.get('ticket', ''))
+            if ticket is None:
+                return
+            ticket.status = status
+            ticket.updated = time.time()
+            ticket.details.update({k: self.encode_detail(v) for k,v in details.items()})
+            first_finish = ticket.finished and not ticket.logged
+            if first_finish:
+                ticket.logged = True
+                self.finished_log.setdefault(ticket.user_identifier, []).append(ticket)
+                self.finished_condition.notify_all()
+        if status in Ticket.ADMISSION_STATUSES or ticket.finished:
+            ticket.admitted.set()
+        if first_finish and ticket.callback_url is not None:
+            self.callback_executor.submit(self.deliver_callback, ticket)
+
+    @staticmethod
+    def encode_detail(value):
+        if hasattr(value, 'dict') and not callable(value.dict):
+            value = value.dict
+        elif hasattr(value, 'to_dict'):
+            value = value.to_dict()
+        return json.loads(json.dumps(value, default=lambda obj: obj.timestamp() if hasattr(obj, 'timestamp') else str(obj)))
+
+    def reply(self, message, interaction_data):
+        with self.lock:
+            ticket = self.tickets.get(interaction_data.get('ticket', ''))
+            if ticket is not None:
+                ticket.replies.append(message)
+
+    def purge_tickets(self):
+        """Removes finished tickets older than RESULT_RETENTION."""
+        threshold = time.time() - self.__class__.RESULT_RETENTION
+        with self.lock:
+            for ticket_id in [tid for tid, ticket in self.tickets.items() if ticket.finished and ticket.updated < threshold]:
+                self.tickets.pop(ticket_id)
+            for user_identifier, finished in self.finished_log.items():
+                expired_count = len([ticket for ticket in finished if ticket.updated < threshold])
+                del finished[:expired_count]
+                self.finished_offsets[user_identifier] = self.finished_offsets.get(user_identifier, 0) + expired_count
+
+    def make_handler_cls(self):
+        server = self
+
+        class Handler(HTTPIngestionRequestHandler):
+            ingestion_server = server
+        return Handler
+
+    def run(self):
+        cls = self.__class__
+        self.http_server = ThreadingHTTPServer((cls.HOST, cls.PORT), self.make_handler_cls())
+        self.http_server.daemon_threads = True
+        threading.Thread(target=self.http_server.serve_forever, name='HTTPIngestion-Thread', daemon=True).start()
+        print("Started HTTP Ingestion Server on {}:{}.".format(cls.HOST, cls.PORT))
+        logger.info("Started HTTP Ingestion Server on {}:{}.".format(cls.HOST, cls.PORT))
+        while True:
+            time.sleep(cls.KEEP_ALIVE_SLEEP_DURATION)
+            self.purge_tickets()
+            if self.stop:
+                self.http_server.shutdown()
+                self.http_server.server_close()
+                logger.info("Server stopped.")
+                return
+
+
+class HTTPIngestionRequestHandler(BaseHTTPRequestHandler):
+    ingestion_server: HTTPIngestionServer
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        logger.debug("{} - {}".format(self.address_string(), format % args))
+
+    def send_json(self, status_code: int, data):
+        body = json.dumps(data).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def get_user(self):
+        user_identifier = self.ingestion_server.authenticate(self.headers.get('Authorization'))
+        if user_identifier is None:
+            self.send_response(401)
+            self.send_header('WWW-Authenticate', 'Basic realm="synapsis"')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        return user_identifier
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw_body = self.rfile.read(length)
+        user_identifier = self.get_user()
+        if user_identifier is None:
+            return
+        if urlsplit(self.path).path.rstrip('/') != '/requests':
+            return self.send_json(404, {'detail': 'Not found.'})
+        try:
+            body = json.loads(raw_body or b'{}')
+            requests, callback_url = body['requests'], body.get('callback_url')
+            if not isinstance(requests, list):
+                raise TypeError
+        except (ValueError, KeyError, TypeError):
+            return self.send_json(400, {'detail': "Body must be a json object with a 'requests' list."})
+        if len(requests) > self.ingestion_server.MAX_BATCH_SIZE:
+            return self.send_json(413, {'detail': 'Batch size exceeds {}.'.format(self.ingestion_server.MAX_BATCH_SIZE)})
+        if not self.ingestion_server.is_valid_callback(callback_url):
+            return self.send_json(400, {'detail': 'callback_url must point to one of {}.'.format(self.ingestion_server.CALLBACK_HOSTS)})
+        self.send_json(200, {'results': self.ingestion_server.submit_batch(user_identifier, requests, callback_url)})
+
+    def do_GET(self):
+        user_identifier = self.get_user()
+        if user_identifier is None:
+            return
+        url = urlsplit(self.path)
+        path = url.path.rstrip('/')
+        query = {k: v[-1] for k,v in parse_qs(url.query).items()}
+        if path == '/results':
+            try:
+                cursor, wait = int(query.get('cursor', 0)), float(query.get('wait', 0))
+            except ValueError:
+                return self.send_json(400, {'detail': 'cursor and wait must be numbers.'})
+            return self.send_json(200, self.ingestion_server.poll_results(user_identifier, cursor, wait))
+        if path.startswith('/requests/'):
+            ticket = self.ingestion_server.get_ticket(user_identifier, path[len('/requests/'):])
+            if ticket is None:
+                return self.send_json(404, {'detail': 'No such ticket is found.'})
+            return self.send_json(200, ticket.dict)
+        self.send_json(404, {'detail': 'Not found.'})
+
+
+class HTTPIngestionClient:
+    """Minimal client for the http ingestion server, used for benchmarking without external services."""
+    def __init__(self, base_url: str, username: str, password: str, timeout: float = 60):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.authorization = 'Basic ' + base64.b64encode('{}:{}'.format(username, password).encode('utf-8')).decode('ascii')
+
+    def _request(self, method: str, path: str, data=None):
+        body = json.dumps(data).encode('utf-8') if data is not None else None
+        req = urllib.request.Request(self.base_url + path, data=body, method=method,
+                                     headers={'Authorization': self.authorization, 'Content-Type': 'application/json'})
+        with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+            return json.loads(resp.read())
+
+    def submit(self, requests: List[str], callback_url: Optional[str] = None):
+        data = {'requests': requests}
+        if callback_url is not None:
+            data['callback_url'] = callback_url
+        return self._request('POST', '/requests', data)['results']
+
+    def get_ticket(self, ticket_id: str):
+        return self._request('GET', '/requests/{}'.format(ticket_id))
+
+    def poll(self, cursor: int = 0, wait: float = 0):
+        return self._request('GET', '/results?cursor={}&wait={}'.format(cursor, wait))
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Benchmarks an http ingestion server.')
+    parser.add_argument('--url', dest='url', default='http://127.0.0.1:8090')
+    parser.add_argument('-u', '--username', dest='username', required=True)
+    parser.add_argument('-p', '--password', dest='password', required=True)
+    parser.add_argument('-n', '--count', dest='count', type=int, default=1000, help='Total requests to submit.')
+    parser.add_argument('-b', '--batch-size', dest='batch_size', type=int, default=100)
+    parser.add_argument('--product', dest='product', default='L10')
+    args = parser.parse_args()
+
+    client = HTTPIngestionClient(args.url, args.username, args.password)
+    statuses: Dict[str, int] = {}
+    start = time.time()
+    for batch_start in range(0, args.count, args.batch_size):
+        batch = ['{}.08{:010d}.0000'.format(args.product, i) for i in range(batch_start, min(batch_start+args.batch_size, args.count))]
+        for item in client.submit(batch):
+            statuses[item['status']] = statuses.get(item['status'], 0) + 1
+    elapsed = time.time() - start
+    print("Submitted {} requests in {:.2f}s ({:.1f} req/s).".format(args.count, elapsed, args.count/elapsed if elapsed else 0))
+    print("Statuses: {}".format(statuses))
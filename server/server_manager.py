@@ -1,94 +1,143 @@
-from queue import Queue
-from threading import Thread
-import time
-import logging
-
-from .jabber import JabberServer
-
-# Type hint only
-try:
-    from automators.data_structs import Config
-except:
-    pass
-
-logger = logging.getLogger(__name__)
-
-
-class ServerManager:
-    KEEP_ALIVE_SLEEP_DURATION = 10
-    SERVERS = [JabberServer]
-    CREDENTIALS = {}
-    CONFIG: 'Config'
-    
-    def __init__(self, request_out: Queue):
-        cls = self.__class__
-        self.request_out = request_out
-        self.servers = {server_cls.SERVER_NAME: server_cls(self.request_out, self.CREDENTIALS[server_cls.SERVER_NAME]) for server_cls in cls.SERVERS}
-        self.runner_threads = {name: Thread(target=server.run, daemon=True) for name, server in self.servers.items()}
-        self._stop = False
-    
-    @property
-    def stop(self):
-        return self._stop
-    
-    @stop.setter
-    def stop(self, value: bool):
-        self._stop = value
-        [setattr(srv, 'stop', value) for srv in self.servers.values()]
-        if value:
-            stopped_threads = [name for name, thread in self.runner_threads.items() if not thread.is_alive()]
-            new_runners = {name: Thread(target=self.servers[name].run, daemon=True) for name in stopped_threads}
-            [thread.run() for thread in new_runners.values()]
-            self.runner_threads.update(new_runners)
-    
-    @property
-    def server_shards(self):
-        return {name: srv.shards_identifiers for name, srv in self.servers.items()}
-    
-    @classmethod
-    def configure(cls, config: 'Config'):
-        cls.CONFIG = config
-        cls.KEEP_ALIVE_SLEEP_DURATION = config.get('keep_alive_sleep_duration', cls.KEEP_ALIVE_SLEEP_DURATION)
-        for server in cls.SERVERS:
-            conf = config.get(server.SERVER_NAME, {})
-            server.configure(conf)
-            cls.CREDENTIALS[server.SERVER_NAME] = [server.CREDENTIAL_CLS.from_dict(cred) for cred in conf.get('credential_list', [])]
-    
-    def add_contact(self, server_name: str, shard_identifier: str, user_iddentifier: str) -> bool:
-        """Calls add contact method of the server."""
-        server = self.servers.get(server_name)
-        if server is None:
-            return False
-        return server.add_contact(shard_identifier, user_iddentifier)
-    
-    def remove_contact(self, server_name: str, shard_identifier: str, user_iddentifier: str) -> bool:
-        """Calls remove contact method of the server."""
-        server = self.servers.get(server_name)
-        if server is None:
-            return False
-        return server.remove_contact(shard_identifier, user_iddentifier)
-    
-    def restart_server(self, server_name):
-        try:
-            server = self.servers.pop(server_name)
-            server_cls = server.__class__
-        except KeyError:
-            return
-        logger.info("Restarting server '{}'.".format(server_name))
-        server.stop = True
-        logger.info("Set server '{}'.stop -> True. Waiting for it to exit...".format(server_name))
-        del server
-        self.runner_threads[server_name].join()
-        logger.info("Server '{}' stopped. Initializing another server object and starting it...".format(server_name))
-        self.servers[server_cls.SERVER_NAME] = server_cls(self.request_out, self.CREDENTIALS[server_cls.SERVER_NAME])
-        self.runner_threads[server_name] = Thread(target=self.servers[server_cls.SERVER_NAME].run, daemon=True)
-        self.runner_threads[server_name].start()
-        logger.info("Server '{}' Restarted.".format(server_name))
-    
-    def run(self):
-        [thread.start() for thread in self.runner_threads.values()]
-        while True:
-            time.sleep(self.__class__.KEEP_ALIVE_SLEEP_DURATION)
-            if self.stop:
-                logger.info("ServerManager is stopped by signal.")
-                return
+from queue import Queue
+from threading import Thread
+import time
+import logging
+from typing import Optional, Set, TYPE_CHECKING
+
+from .jabber import JabberServer
+from .http_ingestion import HTTPIngestionServer
+
+# Type hint only
+try:
+    from automators.data_structs import Config
+except:
+    pass
+
+if TYPE_CHECKING:
+    from cluster import ClusterCoordinator
+
+logger = logging.getLogger(__name__)
+
+
+class ServerManager:
+    KEEP_ALIVE_SLEEP_DURATION = 10
+    SERVERS = [JabberServer, HTTPIngestionServer]
+    CREDENTIALS = {}
+    CONFIG: 'Config'
+    
+    def __init__(self, request_out: Queue, coordinator: Optional['ClusterCoordinator'] = None):
+        cls = self.__class__
+        self.request_out = request_out
+        self.servers = {server_cls.SERVER_NAME: server_cls(self.request_out, self.CREDENTIALS[server_cls.SERVER_NAME]) for server_cls in cls.SERVERS if server_cls.ENABLED}
+        self.runner_threads = {name: Thread(target=server.run, daemon=True) for name, server in self.servers.items()}
+        self._stop = False
+        self.coordinator = coordinator # in cluster mode, a server only runs on the node holding its lease
+        self.leading: Set[str] = set() # names of servers this node holds the lease of
+    
+    @property
+    def stop(self):
+        return self._stop
+    
+    @stop.setter
+    def stop(self, value: bool):
+        self._stop = value
+        [setattr(srv, 'stop', value) for srv in self.servers.values()]
+        if value:
+            stopped_threads = [name for name, thread in self.runner_threads.items() if not thread.is_alive()]
+            new_runners = {name: Thread(target=self.servers[name].run, daemon=True) for name in stopped_threads}
+            [thread.run() for thread in new_runners.values()]
+            self.runner_threads.update(new_runners)
+    
+    @property
+    def server_shards(self):
+        return {name: srv.shards_identifiers for name, srv in self.servers.items()}
+    
+    @classmethod
+    def configure(cls, config: 'Config'):
+        cls.CONFIG = config
+        cls.KEEP_ALIVE_SLEEP_DURATION = config.get('keep_alive_sleep_duration', cls.KEEP_ALIVE_SLEEP_DURATION)
+        for server in cls.SERVERS:
+            conf = config.get(server.SERVER_NAME, {})
+            server.configure(conf)
+            server.ENABLED = conf.get('enabled', server.ENABLED)
+            server.BUSY_REPLY = conf.get('busy_reply', server.BUSY_REPLY)
+            cls.CREDENTIALS[server.SERVER_NAME] = [server.CREDENTIAL_CLS.from_dict(cred) for cred in conf.get('credential_list', [])]
+    
+    def add_contact(self, server_name: str, shard_identifier: str, user_iddentifier: str) -> bool:
+        """Calls add contact method of the server."""
+        server = self.servers.get(server_name)
+        if server is None:
+            return False
+        return server.add_contact(shard_identifier, user_iddentifier)
+    
+    def remove_contact(self, server_name: str, shard_identifier: str, user_iddentifier: str) -> bool:
+        """Calls remove contact method of the server."""
+        server = self.servers.get(server_name)
+        if server is None:
+            return False
+        return server.remove_contact(shard_identifier, user_iddentifier)
+    
+    def restart_server(self, server_name) -> bool:
+        """Restarts the server, returns whether it was restarted. In cluster mode only the node holding the server's lease runs it, 
+        so it is not started on the others."""
+        if self.coordinator is not None and server_name not in self.leading:
+            logger.info("Not restarting server '{}', this node does not hold its lease.".format(server_name))
+            return False
+        try:
+            server = self.servers.pop(server_name)
+            server_cls = server.__class__
+        except KeyError:
+            return False
+        logger.info("Restarting server '{}'.".format(server_name))
+        server.stop = True
+        logger.info("Set server '{}'.stop -> True. Waiting for it to exit...".format(server_name))
+        del server
+        self.runner_threads[server_name].join()
+        logger.info("Server '{}' stopped. Initializing another server object and starting it...".format(server_name))
+        self.servers[server_cls.SERVER_NAME] = server_cls(self.request_out, self.CREDENTIALS[server_cls.SERVER_NAME])
+        self.runner_threads[server_name] = Thread(target=self.servers[server_cls.SERVER_NAME].run, daemon=True)
+        self.runner_threads[server_name].start()
+        logger.info("Server '{}' Restarted.".format(server_name))
+        return True
+    
+    def start_server(self, server_name: str):
+        """Starts the server, with a new server object if it has run before."""
+        thread = self.runner_threads[server_name]
+        if thread.is_alive():
+            return
+        if thread.ident is not None: # threads can only be started once
+            server_cls = self.servers[server_name].__class__
+            self.servers[server_name] = server_cls(self.request_out, self.CREDENTIALS[server_name])
+            self.runner_threads[server_name] = thread = Thread(target=self.servers[server_name].run, daemon=True)
+        thread.start()
+    
+    def elect(self):
+        """Takes or renews the lease of every server, starting the servers this node became the leader of and stopping the ones it lost, 
+        so a customer facing identity is only logged in from one node of the cluster."""
+        assert self.coordinator is not None
+        for server_name in list(self.servers):
+            leader = self.coordinator.acquire_lease('server:{}'.format(server_name))
+            if leader and server_name not in self.leading:
+                logger.info("Became the leader of server '{}', starting it.".format(server_name))
+                self.leading.add(server_name)
+                self.start_server(server_name)
+            elif not leader and server_name in self.leading:
+                logger.info("Lost the lease of server '{}', stopping it.".format(server_name))
+                self.leading.discard(server_name)
+                self.servers[server_name].stop = True
+    
+    def run(self):
+        if self.coordinator is None:
+            [thread.start() for thread in self.runner_threads.values()]
+        while True:
+            if self.coordinator is not None and not self.stop:
+                try:
+                    self.elect()
+                except Exception as exc:
+                    logger.exception("Failed to renew server leases: {}".format(exc))
+            time.sleep(self.__class__.KEEP_ALIVE_SLEEP_DURATION)
+            if self.stop:
+                if self.coordinator is not None:
+                    [self.coordinator.release_lease('server:{}'.format(server_name)) for server_name in self.leading]
+                logger.info("ServerManager is stopped by signal.")
+                return
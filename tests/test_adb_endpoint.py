@@ -0,0 +1,71 @@
+import unittest
+
+from types import SimpleNamespace
+
+from automators.adb_endpoint import AdbEndpoint
+from automators.device_manager import DeviceManager
+
+
+class _Client:
+    def __init__(self, host='127.0.0.1', port=5037):
+        self.host = host
+        self.port = port
+        self.error = None
+        self.serials = ['a', 'b']
+    
+    def devices(self):
+        if self.error is not None:
+            raise self.error
+        return self.serials
+
+
+class _AdbEndpoint(AdbEndpoint):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.restarts = 0
+    
+    def restart(self):
+        self.restarts += 1
+        return True
+
+
+class TestAdbEndpoint(unittest.TestCase):
+    def test_Health(self):
+        client = _Client()
+        endpoint = AdbEndpoint('local', client)
+        self.assertEqual(endpoint.devices(), ['a', 'b'])
+        self.assertTrue(endpoint.healthy)
+        client.error = RuntimeError('ERROR: connecting to 127.0.0.1:5037')
+        for _ in range(AdbEndpoint.MAX_FAILURES):
+            with self.assertRaises(RuntimeError):
+                endpoint.devices()
+        self.assertFalse(endpoint.healthy)
+        self.assertIn('connecting', endpoint.get_info()['last_error'])
+        client.error = None
+        endpoint.devices()
+        self.assertTrue(endpoint.healthy)
+        self.assertEqual(endpoint.get_info()['device_count'], 2)
+    
+    def test_Remote_Restart(self):
+        remote = AdbEndpoint('remote', _Client('10.0.0.2'))
+        self.assertFalse(remote.is_local)
+        self.assertFalse(remote.restart()) # no restart command
+        self.assertFalse(remote.restart()) # cooldown
+        remote.last_restart = 0
+        remote.restart_command = ['true']
+        self.assertTrue(remote.restart())
+    
+    def test_Restart_Only_When_Unhealthy(self):
+        client = _Client()
+        endpoint = _AdbEndpoint('local', client)
+        manager = SimpleNamespace(endpoints=[endpoint])
+        client.error = RuntimeError('ERROR: timeout')
+        for _ in range(AdbEndpoint.MAX_FAILURES - 1):
+            self.assertEqual(DeviceManager.list_devices(manager), [])
+        self.assertEqual(endpoint.restarts, 0)
+        DeviceManager.list_devices(manager)
+        self.assertEqual(endpoint.restarts, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
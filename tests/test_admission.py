@@ -0,0 +1,67 @@
+import unittest
+
+from admission import AdmissionController
+from data_structs import CallbackableQueue
+
+
+class _DeviceClass:
+    DEFAULT_AUTOMATOR = 'linkaja'
+
+
+class _DeviceManager:
+    DEVICE_CLS = _DeviceClass
+
+    def __init__(self):
+        self.wait = 0
+
+    def estimate_wait(self, automator_name, depth):
+        return self.wait * depth
+
+
+class TestAdmissionController(unittest.TestCase):
+    def setUp(self):
+        self.limits = {name: getattr(AdmissionController, name) for name in ['GLOBAL_RATE', 'GLOBAL_BURST', 'USER_RATE', 'USER_BURST', 'MAX_QUEUE_SIZE', 'MAX_ESTIMATED_WAIT']}
+        self.device_manager = _DeviceManager()
+        self.out_queue = CallbackableQueue()
+
+    def tearDown(self):
+        for name, value in self.limits.items():
+            setattr(AdmissionController, name, value)
+
+    def make_controller(self, **limits):
+        for name, value in limits.items():
+            setattr(AdmissionController, name.upper(), value)
+        return AdmissionController(self.device_manager, self.out_queue)
+
+    def test_Disabled(self):
+        controller = self.make_controller()
+        self.assertEqual(controller.admit_message('user'), (True, None))
+        self.assertEqual(controller.admit_requests('user', 1000), (1000, None))
+        self.assertEqual(controller.admit_request('linkaja'), (True, None, 0))
+
+    def test_Messages_Larger_Than_The_Burst(self):
+        controller = self.make_controller(user_rate=0.001, user_burst=3)
+        self.assertEqual(controller.admit_requests('user', 5), (3, 'user_rate_limited')) # admitted in part, not never
+        self.assertEqual(controller.admit_message('user'), (False, 'user_rate_limited'))
+        self.assertEqual(controller.admit_requests('other', 2), (2, None))
+
+    def test_Global_Limit_Refunds_The_User(self):
+        controller = self.make_controller(global_rate=0.001, global_burst=2, user_rate=0.001, user_burst=4)
+        self.assertEqual(controller.admit_requests('user', 3), (2, 'global_rate_limited'))
+        self.assertEqual(controller.admit_message('other'), (False, 'global_rate_limited'))
+        self.assertEqual(controller.get_user_bucket('user').try_acquire_up_to(4), 2) # the request the global limit rejected is refunded
+
+    def test_Queue_Size_And_SLA(self):
+        controller = self.make_controller(max_queue_size=2, max_estimated_wait=60)
+        self.device_manager.wait = 40
+        self.assertEqual(controller.admit_request('linkaja'), (True, None, 0))
+        self.out_queue.put(type('Request', (), {'automator': ''})())
+        self.assertEqual(controller.admit_request('linkaja'), (True, None, 40))
+        self.out_queue.put(type('Request', (), {'automator': 'linkaja'})())
+        self.assertEqual(controller.admit_request('digipos')[:2], (False, 'queue_full'))
+        AdmissionController.MAX_QUEUE_SIZE = 0
+        self.assertEqual(controller.admit_request('linkaja'), (False, 'sla_exceeded', 80))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+
+from datetime import datetime
+import io
+
+from analytics import TransactionColumns, duration_percentiles, failure_breakdown, hourly_throughput
+
+
+def make_row(id_, time_, automator, error=None, duration=10, device='dev1'):
+    return {'id': id_, 'time': time_.isoformat(' '), 'automator': automator, 'product_spec': 'TN5', 'device': device,
+            'refID': None if error else 'REF', 'error': error, 'execution_duration': duration}
+
+
+class TestTransactionColumns(unittest.TestCase):
+    def setUp(self):
+        self.rows = [make_row(1, datetime(2022, 1, 1, 10, 5), 'linkaja', duration=10),
+                     make_row(2, datetime(2022, 1, 1, 10, 30), 'linkaja', error='timeout', duration=30),
+                     make_row(3, datetime(2022, 1, 1, 11, 0), 'digipos', duration=20, device='dev2'),
+                     make_row(4, datetime(2022, 1, 1, 11, 10), 'linkaja', error='timeout', duration=-1),
+                     make_row(5, datetime(2022, 1, 1, 11, 20), 'linkaja', error='no stock', duration=-1)]
+        self.columns = TransactionColumns.from_rows(self.rows)
+
+    def test_Dictionary_Encoding_And_Npz(self):
+        self.assertEqual(list(self.columns.dictionaries['automator']), ['linkaja', 'digipos'])
+        self.assertEqual(list(self.columns['automator']), [0, 0, 1, 0, 0])
+        self.assertEqual(self.columns['time'][0], int(datetime(2022, 1, 1, 10, 5).timestamp()))
+        self.assertEqual(list(self.columns['success']), [True, False, True, False, False])
+
+        buffer = io.BytesIO(self.columns.to_bytes('npz'))
+        loaded = TransactionColumns.from_npz(buffer)
+        self.assertEqual(len(loaded), 5)
+        self.assertEqual(list(loaded.decode('error')), ['', 'timeout', '', 'timeout', 'no stock'])
+        self.assertEqual(list(loaded['execution_duration']), [10, 30, 20, -1, -1])
+
+    def test_Reports(self):
+        hour = int(datetime(2022, 1, 1, 10).timestamp())
+        throughput = hourly_throughput(self.columns)
+        self.assertEqual([(t['hour'], t['count'], t['success_count']) for t in throughput], [(hour, 2, 1), (hour+3600, 3, 1)])
+        by_automator = hourly_throughput(self.columns, ['automator'])
+        self.assertEqual(sorted((t['automator'], t['hour'], t['count']) for t in by_automator),
+                         [('digipos', hour+3600, 1), ('linkaja', hour, 2), ('linkaja', hour+3600, 2)])
+
+        durations = {d['automator']: d for d in duration_percentiles(self.columns, q=(50, 100))}
+        self.assertEqual((durations['linkaja']['count'], durations['linkaja']['p50'], durations['linkaja']['p100']), (2, 20, 30))
+        self.assertEqual(durations['digipos']['count'], 1)
+
+        failures = failure_breakdown(self.columns)
+        self.assertEqual([(f['automator'], f['error'], f['count']) for f in failures], [('linkaja', 'timeout', 2), ('linkaja', 'no stock', 1)])
+        self.assertAlmostEqual(failures[0]['share'], 0.5)
+        self.assertEqual(failure_breakdown(TransactionColumns.from_rows(self.rows[:1])), [])
+        self.assertEqual(duration_percentiles(TransactionColumns.from_rows([])), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
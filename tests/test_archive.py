@@ -0,0 +1,75 @@
+import unittest
+
+from datetime import datetime
+import os
+import shutil
+import sqlite3
+import tempfile
+
+from archive import TransactionArchive, month_start
+from database import TransactionFilter, TransactionPager, ReadConnectionPool
+
+
+class TestTransactionArchive(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'database.db')
+        connection = sqlite3.connect(self.filename)
+        connection.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY, number TEXT, refID TEXT, time TEXT, error TEXT, automator TEXT)")
+        self.times = [datetime(2022, 1, 10), datetime(2022, 1, 20), datetime(2022, 2, 5), datetime(2022, 2, 28, 23), datetime(2022, 3, 1, 8), datetime(2022, 3, 2)]
+        connection.executemany("INSERT INTO transactions (number, refID, time, automator) VALUES (?, ?, ?, ?)", [('0811', 'REF', t, 'linkaja') for t in self.times])
+        connection.commit()
+        connection.close()
+        self.archive = TransactionArchive(self.filename, os.path.join(self.directory, 'archive'))
+        self.reader = ReadConnectionPool(self.filename)
+    
+    def tearDown(self):
+        self.reader.close()
+        [reader.close() for reader in self.archive.readers.values()]
+        shutil.rmtree(self.directory)
+    
+    def test_Month_Start(self):
+        self.assertEqual(month_start(datetime(2022, 1, 15), 1), datetime(2021, 12, 1))
+        self.assertEqual(month_start(datetime(2022, 12, 15), -1), datetime(2023, 1, 1))
+    
+    def test_Rollover_And_Query(self):
+        TransactionArchive.BATCH_SIZE, batch_size = 1, TransactionArchive.BATCH_SIZE
+        try:
+            self.assertEqual(self.archive.rollover(datetime(2022, 3, 15)), 4)
+            self.assertEqual(self.archive.rollover(datetime(2022, 3, 15)), 0)
+        finally:
+            TransactionArchive.BATCH_SIZE = batch_size
+        self.assertEqual([m.strftime('%Y-%m') for m in self.archive.get_months()], ['2022-01', '2022-02'])
+        self.assertEqual([row['id'] for row in self.reader.select("SELECT id FROM transactions")], [5, 6])
+        
+        self.assertEqual(len(self.archive.get_partitions()), 2)
+        self.assertEqual(len(self.archive.get_partitions(start=datetime(2022, 2, 10).timestamp())), 1)
+        self.assertEqual(len(self.archive.get_partitions(end=datetime(2022, 2, 1).timestamp())), 1)
+        self.assertEqual(len(self.archive.get_partitions(start=datetime(2022, 3, 1).timestamp())), 0)
+        
+        pager = TransactionPager(self.reader, order_by='time', descending=True, partitions=self.archive.get_partitions())
+        ids, cursor = [], None
+        while True:
+            rows, cursor = pager.page(cursor, 4)
+            ids.extend(row['id'] for row in rows)
+            if cursor is None:
+                break
+        self.assertEqual(ids, [6, 5, 4, 3, 2, 1])
+        start = datetime(2022, 1, 15).timestamp()
+        filters = TransactionFilter(start=start, end=datetime(2022, 3, 1, 12).timestamp())
+        self.assertEqual([row['id'] for row in TransactionPager(self.reader, filters, partitions=self.archive.get_partitions(start)).iterate()], [2, 3, 4, 5])
+    
+    def test_Find_Archived(self):
+        self.archive.rollover(datetime(2022, 3, 15))
+        self.assertIs(self.archive.get_partition(datetime(2022, 2, 14)), self.archive.get_partitions(start=datetime(2022, 2, 10).timestamp())[0])
+        self.assertIsNone(self.archive.get_partition(datetime(2022, 3, 1)))
+        self.assertEqual(self.archive.find(3), self.archive.get_partition_filename(datetime(2022, 2, 1)))
+        self.assertIsNone(self.archive.find(5)) # still in the transactions table
+    
+    def test_Newest_Transaction_Stays(self):
+        self.assertEqual(self.archive.rollover(datetime(2022, 6, 1)), 5)
+        self.assertEqual([row['id'] for row in self.reader.select("SELECT id FROM transactions")], [6])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+
+import os
+import tempfile
+import time
+
+from cluster import ClusterCoordinator
+from server.server_manager import ServerManager
+
+
+class _Server:
+    SERVER_NAME = 'test'
+    ENABLED = True
+    
+    def __init__(self, request_out, credentials):
+        self.stop = False
+    
+    def run(self):
+        while not self.stop:
+            time.sleep(0.01)
+
+
+class TestClusterCoordinator(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.node_a = ClusterCoordinator(self.filename, 'a')
+        self.node_b = ClusterCoordinator(self.filename, 'b')
+    
+    def tearDown(self):
+        self.node_a.connection.close()
+        self.node_b.connection.close()
+        os.remove(self.filename)
+    
+    def test_Dedup_And_Claim_Once(self):
+        work_id = self.node_a.submit('0811|linkaja|TN5', 'linkaja', '', {'number': '0811'})
+        self.assertIsNotNone(work_id)
+        self.assertIsNone(self.node_b.submit('0811|linkaja|TN5', 'linkaja', '', {'number': '0811'})) # active on another node
+        self.assertEqual(self.node_b.get_active_state(['0811|linkaja|TN5']), 'queued')
+        self.assertIsNone(self.node_b.claim(['digipos'], [])) # no capable device
+        self.assertEqual(self.node_b.claim(['linkaja'], []), (work_id, 'a', {'number': '0811'}))
+        self.assertIsNone(self.node_a.claim(['linkaja'], []))
+        self.node_b.set_state(work_id, 'done')
+        self.assertIsNone(self.node_a.get_active_state(['0811|linkaja|TN5']))
+        self.assertIsNotNone(self.node_a.submit('0811|linkaja|TN5', 'linkaja', '', {})) # may be bought again once done
+    
+    def test_Pinned_Device(self):
+        self.node_a.submit('k', 'linkaja', 'serial_a', {})
+        self.assertIsNone(self.node_b.claim(['linkaja'], ['serial_b']))
+        self.assertIsNotNone(self.node_a.claim(['linkaja'], ['serial_a']))
+    
+    def test_Leases(self):
+        self.assertTrue(self.node_a.acquire_lease('server:jabber'))
+        self.assertFalse(self.node_b.acquire_lease('server:jabber'))
+        self.assertTrue(self.node_a.acquire_lease('server:jabber')) # renewal
+        self.node_a.release_lease('server:jabber')
+        self.assertTrue(self.node_b.acquire_lease('server:jabber'))
+    
+    def test_Restart_Server_Holding_The_Lease(self):
+        servers = ServerManager.SERVERS
+        ServerManager.SERVERS, ServerManager.CREDENTIALS['test'] = [_Server], []
+        self.addCleanup(setattr, ServerManager, 'SERVERS', servers)
+        self.addCleanup(ServerManager.CREDENTIALS.pop, 'test')
+        manager_a, manager_b = ServerManager(None, self.node_a), ServerManager(None, self.node_b)
+        manager_a.elect()
+        manager_b.elect()
+        self.assertEqual((manager_a.leading, manager_b.leading), ({'test'}, set()))
+        self.assertFalse(manager_b.restart_server('test')) # the server runs on node a only
+        self.assertFalse(manager_b.runner_threads['test'].is_alive())
+        server = manager_a.servers['test']
+        self.assertTrue(manager_a.restart_server('test'))
+        self.assertIsNot(manager_a.servers['test'], server)
+        manager_a.stop = True
+    
+    def test_Dead_Node_Recovery(self):
+        claimed_id = self.node_a.submit('claimed', 'linkaja', '', {})
+        executing_id = self.node_a.submit('executing', 'linkaja', '', {})
+        self.node_b.heartbeat()
+        self.node_b.claim(['linkaja'], [])
+        self.node_b.claim(['linkaja'], [])
+        self.node_b.set_state(executing_id, 'executing')
+        self.node_b.execute("UPDATE nodes SET heartbeat=? WHERE node_id='b'", (time.time() - ClusterCoordinator.NODE_TIMEOUT - 1,))
+        self.assertEqual(self.node_a.reap(), [(executing_id, 'a')]) # at most once, not retried
+        self.assertEqual(self.node_a.get_active_state(['claimed']), 'queued') # never started, safe to retry
+        self.assertIsNone(self.node_a.get_active_state(['executing']))
+        self.assertEqual(self.node_a.claim(['linkaja'], [])[0], claimed_id)
+    
+    def test_Messages(self):
+        self.node_b.post(1, 'a', 'reply', {'message': 'done'})
+        self.assertEqual(self.node_a.fetch(), [(1, 'reply', {'message': 'done'})])
+        self.assertEqual(self.node_a.fetch(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
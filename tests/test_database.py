@@ -1,68 +1,148 @@
-import unittest
-
-import secrets
-import os
-import tempfile
-from datetime import datetime
-
-from database import SynapsisDB, Transaction, User
-
-
-class TestDatabase(unittest.TestCase):
-    def setUp(self):
-        self.db_name = tempfile.gettempdir()+secrets.token_hex(4)+'.test.db'
-        self.db = SynapsisDB(self.db_name)
-    
-    def test_DB_Constraints(self):
-        self.assertRaises(KeyError, self.db.insert, User())
-        self.assertRaises(KeyError, self.db.insert, User(server=''))
-        self.assertRaises(KeyError, self.db.insert, User(identifier=''))
-        
-        self.assertRaises(KeyError, self.db.insert, Transaction(number=''))
-        self.assertRaises(KeyError, self.db.insert, Transaction(product_spec=''))
-        self.assertRaises(KeyError, self.db.insert, Transaction(refID=''))
-        self.assertRaises(KeyError, self.db.insert, Transaction(time=0))
-        self.assertRaises(KeyError, self.db.insert, Transaction(number='', product_spec=''))
-        self.assertRaises(KeyError, self.db.insert, Transaction(number='', time=''))
-        self.assertRaises(KeyError, self.db.insert, Transaction(number='', product_spec='', time=''))
-        self.assertRaises(KeyError, self.db.insert, Transaction(product_spec='', refID='', time=''))
-    
-    def test_DB_Behaviour(self):
-        self.assertEqual(User.DB_MANAGER, self.db)
-        # Inserts
-        data = [
-            User(server='test_server', identifier='user1@test.com'), # 0
-            User(server='test_server', identifier='user2@test.com'), # 1
-            Transaction(number='081081081081', product_spec='prod1', refID=secrets.token_hex(6), time=datetime.now()), # 2
-            Transaction(number='081437574563', product_spec='prod2', refID=secrets.token_hex(6), time=datetime.now()), # 3
-            Transaction(number='081123211111', product_spec='prod3', refID=secrets.token_hex(6), time=datetime.now().timestamp()), # 4
-            Transaction(number='081111111111', product_spec='prod2', refID=secrets.token_hex(6), time=datetime.now().timestamp()), # 5
-            Transaction(number='081222222222', product_spec='prod3', refID=secrets.token_hex(6), time=datetime.now()), # 6
-            Transaction(number='081333333333', product_spec='prod2', refID=secrets.token_hex(6), time=datetime.now().timestamp()) # 7
-        ]
-        self.db.insert_many(data)
-        
-        # Counts
-        self.assertEqual(list(User.get(User.server=='test_server')).__len__(), 2)
-        self.assertEqual(list(Transaction.get(Transaction.product_spec=='prod1')).__len__(), 1)
-        self.assertEqual(list(Transaction.get(Transaction.product_spec=='prod2')).__len__(), 3)
-        self.assertEqual(list(Transaction.get(Transaction.product_spec=='prod3')).__len__(), 2)
-        
-        self.assertEqual(list(User.get(User.server=='test_server', limit=1))[0].identifier, 'user1@test.com')
-        self.assertEqual(list(User.get(User.server=='test_server', limit=(1,1)))[0].identifier, 'user2@test.com')
-        
-        self.assertEqual(list(Transaction.get(Transaction.product_spec=='prod1'))[0].number, '081081081081')
-        self.assertEqual(list(Transaction.get(Transaction.number=='081437574563'))[0].product_spec, 'prod2')
-        self.assertEqual(list(Transaction.get(Transaction.number=='081123211111'))[0].product_spec, 'prod3')
-        
-        # can not to a to_dict comparison, because in data, the objects doesn't have ids and their data types haven't been converted yet.
-        self.assertIn(data[4].number, [t.number for t in list(Transaction.get(Transaction.time<=data[6].time, Transaction.time>=data[3].time))])
-        self.assertIn(data[5].number, [t.number for t in list(Transaction.get(Transaction.time<=data[6].time, Transaction.time>=data[3].time))])
-    
-    def tearDown(self):
-        self.db.drop_model(Transaction)
-        self.db.drop_model(User)
-        self.db.connection.close()
-        if hasattr(self.db.cursor, 'proxy_connection'):
-            self.db.cursor.blocking_proxy('connection.close')
-        os.remove(self.db_name)
+import unittest
+
+import secrets
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+
+from database import ReadConnectionPool, SynapsisDB, Transaction, TransactionFilter, TransactionPager, User
+
+
+class TestDatabase(unittest.TestCase):
+    def setUp(self):
+        self.db_name = tempfile.gettempdir()+secrets.token_hex(4)+'.test.db'
+        self.db = SynapsisDB(self.db_name)
+    
+    def test_DB_Constraints(self):
+        self.assertRaises(KeyError, self.db.insert, User())
+        self.assertRaises(KeyError, self.db.insert, User(server=''))
+        self.assertRaises(KeyError, self.db.insert, User(identifier=''))
+        
+        self.assertRaises(KeyError, self.db.insert, Transaction(number=''))
+        self.assertRaises(KeyError, self.db.insert, Transaction(product_spec=''))
+        self.assertRaises(KeyError, self.db.insert, Transaction(refID=''))
+        self.assertRaises(KeyError, self.db.insert, Transaction(time=0))
+        self.assertRaises(KeyError, self.db.insert, Transaction(number='', product_spec=''))
+        self.assertRaises(KeyError, self.db.insert, Transaction(number='', time=''))
+        self.assertRaises(KeyError, self.db.insert, Transaction(number='', product_spec='', time=''))
+        self.assertRaises(KeyError, self.db.insert, Transaction(product_spec='', refID='', time=''))
+    
+    def test_DB_Behaviour(self):
+        self.assertEqual(User.DB_MANAGER, self.db)
+        # Inserts
+        data = [
+            User(server='test_server', identifier='user1@test.com'), # 0
+            User(server='test_server', identifier='user2@test.com'), # 1
+            Transaction(number='081081081081', product_spec='prod1', refID=secrets.token_hex(6), time=datetime.now()), # 2
+            Transaction(number='081437574563', product_spec='prod2', refID=secrets.token_hex(6), time=datetime.now()), # 3
+            Transaction(number='081123211111', product_spec='prod3', refID=secrets.token_hex(6), time=datetime.now().timestamp()), # 4
+            Transaction(number='081111111111', product_spec='prod2', refID=secrets.token_hex(6), time=datetime.now().timestamp()), # 5
+            Transaction(number='081222222222', product_spec='prod3', refID=secrets.token_hex(6), time=datetime.now()), # 6
+            Transaction(number='081333333333', product_spec='prod2', refID=secrets.token_hex(6), time=datetime.now().timestamp()) # 7
+        ]
+        self.db.insert_many(data)
+        
+        # Counts
+        self.assertEqual(list(User.get(User.server=='test_server')).__len__(), 2)
+        self.assertEqual(list(Transaction.get(Transaction.product_spec=='prod1')).__len__(), 1)
+        self.assertEqual(list(Transaction.get(Transaction.product_spec=='prod2')).__len__(), 3)
+        self.assertEqual(list(Transaction.get(Transaction.product_spec=='prod3')).__len__(), 2)
+        
+        self.assertEqual(list(User.get(User.server=='test_server', limit=1))[0].identifier, 'user1@test.com')
+        self.assertEqual(list(User.get(User.server=='test_server', limit=(1,1)))[0].identifier, 'user2@test.com')
+        
+        self.assertEqual(list(Transaction.get(Transaction.product_spec=='prod1'))[0].number, '081081081081')
+        self.assertEqual(list(Transaction.get(Transaction.number=='081437574563'))[0].product_spec, 'prod2')
+        self.assertEqual(list(Transaction.get(Transaction.number=='081123211111'))[0].product_spec, 'prod3')
+        
+        # can not to a to_dict comparison, because in data, the objects doesn't have ids and their data types haven't been converted yet.
+        self.assertIn(data[4].number, [t.number for t in list(Transaction.get(Transaction.time<=data[6].time, Transaction.time>=data[3].time))])
+        self.assertIn(data[5].number, [t.number for t in list(Transaction.get(Transaction.time<=data[6].time, Transaction.time>=data[3].time))])
+    
+    def tearDown(self):
+        self.db.drop_model(Transaction)
+        self.db.drop_model(User)
+        self.db.connection.close()
+        if hasattr(self.db.cursor, 'proxy_connection'):
+            self.db.cursor.blocking_proxy('connection.close')
+        os.remove(self.db_name)
+
+
+class TestReadConnectionPool(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.writer = sqlite3.connect(self.filename, isolation_level=None)
+        self.writer.execute("PRAGMA journal_mode = WAL")
+        self.writer.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY, number TEXT, time TEXT)")
+        self.writer.execute("INSERT INTO transactions (number, time) VALUES (?, ?)", ('0811', datetime(2022, 1, 2, 3, 4, 5)))
+        self.pool = ReadConnectionPool(self.filename)
+    
+    def tearDown(self):
+        self.pool.close()
+        self.writer.close()
+        os.remove(self.filename)
+    
+    def test_Reads_During_Write_Transaction(self):
+        self.writer.execute("BEGIN IMMEDIATE")
+        self.writer.execute("INSERT INTO transactions (number, time) VALUES (?, ?)", ('0812', datetime.now()))
+        rows = self.pool.select("SELECT * FROM transactions WHERE number = ?", ('0811',)) # does not wait for the writer
+        self.writer.execute("COMMIT")
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(Transaction.from_row(rows[0]).time, datetime(2022, 1, 2, 3, 4, 5))
+        self.assertEqual(len(self.pool.select("SELECT * FROM transactions")), 2)
+    
+    def test_Read_Only_And_Timed(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            self.pool.select("DELETE FROM transactions")
+        self.pool.select("SELECT 1")
+        info = self.pool.get_info()
+        self.assertEqual(info['queries'], 2)
+        self.assertEqual(info['opened'], 1)
+        self.assertEqual(info['idle'], 1)
+
+
+class TestTransactionPager(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        connection = sqlite3.connect(self.filename)
+        connection.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY, number TEXT, refID TEXT, time TEXT, error TEXT, automator TEXT)")
+        self.rows = [('08{}'.format(i % 3), 'REF{}'.format(i), datetime(2022, 1, 1+i % 2, 0, 0, i), None if i % 4 else 'failed', 'linkaja' if i % 2 else 'digipos') for i in range(25)]
+        connection.executemany("INSERT INTO transactions (number, refID, time, error, automator) VALUES (?, ?, ?, ?, ?)", self.rows)
+        connection.commit()
+        connection.close()
+        self.pool = ReadConnectionPool(self.filename)
+    
+    def tearDown(self):
+        self.pool.close()
+        os.remove(self.filename)
+    
+    def test_Pages_Cover_Every_Row_Once(self):
+        for order_by in ['id', 'time']:
+            for descending in [False, True]:
+                pager = TransactionPager(self.pool, order_by=order_by, descending=descending)
+                ids, cursor = [], None
+                while True:
+                    rows, cursor = pager.page(cursor, 7)
+                    ids.extend(row['id'] for row in rows)
+                    if cursor is None:
+                        break
+                self.assertEqual(sorted(ids), list(range(1, 26)))
+                self.assertEqual(len(set(ids)), 25)
+                if order_by == 'id':
+                    self.assertEqual(ids, sorted(ids, reverse=descending))
+    
+    def test_Filters(self):
+        filters = TransactionFilter(start=datetime(2022, 1, 2).timestamp(), automator='linkaja', success=True)
+        rows = list(TransactionPager(self.pool, filters).iterate(batch_size=4))
+        expected = [i+1 for i, row in enumerate(self.rows) if row[2] >= datetime(2022, 1, 2) and row[4] == 'linkaja' and row[3] is None]
+        self.assertEqual([row['id'] for row in rows], expected)
+        self.assertEqual([row['id'] for row in TransactionPager(self.pool, TransactionFilter(number='081')).iterate()], [i+1 for i in range(25) if i % 3 == 1])
+    
+    def test_Invalid_Cursor(self):
+        with self.assertRaises(ValueError):
+            TransactionPager(self.pool, order_by='time').page('12')
+        with self.assertRaises(ValueError):
+            TransactionPager(self.pool, order_by='number')
@@ -0,0 +1,100 @@
+import unittest
+
+from threading import Event, Thread
+import time
+
+from automators.device_registry import DeviceEntry, DeviceRegistry, DeviceState
+from automators.utils.exception import UnauthorizedError
+
+
+class _Device:
+    def __init__(self, serial):
+        self.serial = serial
+
+
+class TestDeviceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.settings = DeviceRegistry.EVICT_OFFLINE_AFTER, DeviceRegistry.INITIALIZING_TIMEOUT
+        self.constructed = []
+        self.registry = DeviceRegistry(self.factory)
+
+    def tearDown(self):
+        DeviceRegistry.EVICT_OFFLINE_AFTER, DeviceRegistry.INITIALIZING_TIMEOUT = self.settings
+
+    def factory(self, serial):
+        self.constructed.append(serial)
+        if serial.startswith('unauthorized'):
+            raise UnauthorizedError('Connection to device {} is not authorized.'.format(serial))
+        if serial.startswith('broken'):
+            raise RuntimeError('boom')
+        return _Device(serial)
+
+    def state(self, serial):
+        return self.registry.get_entry(serial).state
+
+    def test_State_Transitions(self):
+        device = self.registry.get_or_create('a')
+        self.assertEqual((self.state('a'), self.registry.get_entry('a').connections), (DeviceState.READY, 1))
+        self.registry.set_state('a', DeviceState.RUNNING)
+        self.registry.sync(['b'])
+        self.assertEqual(self.state('a'), DeviceState.OFFLINE)
+        self.assertIs(self.registry.get_or_create('a'), device) # kept across reconnects
+        self.assertEqual((self.state('a'), self.registry.get_entry('a').connections), (DeviceState.READY, 2))
+        self.assertEqual(self.constructed, ['a'])
+
+        self.assertRaises(UnauthorizedError, self.registry.get_or_create, 'unauthorized')
+        self.assertEqual(self.state('unauthorized'), DeviceState.UNAUTHORIZED)
+        self.assertRaises(RuntimeError, self.registry.get_or_create, 'broken')
+        self.assertEqual((self.state('broken'), self.registry.get_entry('broken').error), (DeviceState.FAILED, 'RuntimeError: boom'))
+        self.assertIsNone(self.registry.get('broken'))
+        self.assertEqual(sorted(info['serial'] for info in self.registry.get_info()), ['a', 'broken', 'unauthorized'])
+
+    def test_Eviction(self):
+        DeviceRegistry.EVICT_OFFLINE_AFTER = 60
+        self.registry.get_or_create('a')
+        self.registry.get_or_create('b')
+        self.registry.sync(['b'])
+        self.registry.sync(['b'])
+        self.assertEqual(self.state('a'), DeviceState.OFFLINE) # not offline for long enough
+        self.registry.get_entry('a').last_seen -= 61
+        self.registry.get_entry('b').last_seen -= 61
+        self.registry.sync(['b'])
+        self.assertIsNone(self.registry.get_entry('a'))
+        self.assertEqual(self.state('b'), DeviceState.READY)
+
+        DeviceRegistry.EVICT_OFFLINE_AFTER = 0 # never evicts
+        self.registry.sync([])
+        self.registry.get_entry('b').last_seen -= 10**9
+        self.registry.sync([])
+        self.assertEqual(self.state('b'), DeviceState.OFFLINE)
+
+    def test_Stuck_Initializing(self):
+        started, release = Event(), Event()
+        def hang(serial):
+            started.set()
+            release.wait(5)
+            return _Device(serial)
+        self.registry.factory = hang
+        thread = Thread(target=self.registry.get_or_create, args=('slow',), daemon=True)
+        thread.start()
+        self.assertTrue(started.wait(5))
+        self.registry.sync([])
+        self.assertEqual(self.state('slow'), DeviceState.INITIALIZING) # still being constructed
+
+        DeviceRegistry.INITIALIZING_TIMEOUT = 0
+        time.sleep(0.01)
+        self.registry.sync([])
+        self.assertEqual(self.state('slow'), DeviceState.FAILED)
+        self.assertIn('did not finish', self.registry.get_entry('slow').error)
+        release.set()
+        thread.join(5)
+        self.assertEqual(self.state('slow'), DeviceState.READY)
+
+        with self.registry.lock: # a construction which was abandoned, e.g: its thread died
+            self.registry.entries['abandoned'] = DeviceEntry('abandoned')
+        self.registry.sync([])
+        self.assertEqual(self.state('abandoned'), DeviceState.OFFLINE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+
+from threading import Event
+import time
+
+from automators.device_supervisor import DeviceSupervisor
+
+
+class _Device:
+    def __init__(self, serial):
+        self.serial = serial
+        self.is_offline = False
+        self.on_signal = lambda:None
+
+
+class TestDeviceSupervisor(unittest.TestCase):
+    def setUp(self):
+        self.changed = Event()
+        self.supervisor = DeviceSupervisor(on_change=self.changed.set)
+        self.supervisor.start()
+    
+    def tearDown(self):
+        self.supervisor.stop = True
+        self.supervisor.wake()
+    
+    def reap(self, serial):
+        self.assertTrue(self.changed.wait(5))
+        self.changed.clear()
+        return self.supervisor.get_info()[serial]
+    
+    def test_Backoff(self):
+        device = _Device('a')
+        def fail(device):
+            raise RuntimeError('boom')
+        self.assertTrue(self.supervisor.spawn(device, fail))
+        self.assertFalse(self.supervisor.spawn(device, fail)) # running or backed off
+        info = self.reap('a')
+        self.assertFalse(info['running'])
+        self.assertEqual(info['failures'], 1)
+        self.assertGreater(info['backoff'], 0)
+        self.assertFalse(self.supervisor.can_start('a'))
+        self.supervisor.records['a'].next_start = time.time()
+        self.assertTrue(self.supervisor.spawn(device, fail))
+        info = self.reap('a')
+        self.assertEqual(info['failures'], 2)
+        self.assertGreater(info['backoff'], DeviceSupervisor.BACKOFF_BASE)
+        self.supervisor.reset('a')
+        self.assertTrue(self.supervisor.can_start('a'))
+    
+    def test_Clean_Exit(self):
+        device = _Device('b')
+        self.assertTrue(self.supervisor.spawn(device, lambda device:None))
+        info = self.reap('b')
+        self.assertEqual(info['failures'], 0)
+        self.assertTrue(self.supervisor.can_start('b'))
+    
+    def test_Quick_Offline_Is_A_Failure(self):
+        device = _Device('c')
+        def go_offline(device):
+            device.is_offline = True
+        self.assertTrue(self.supervisor.spawn(device, go_offline))
+        info = self.reap('c')
+        self.assertEqual(info['failures'], 1)
+        self.assertEqual(info['last_error'], 'offline')
+
+
+if __name__ == '__main__':
+    unittest.main()
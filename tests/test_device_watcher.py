@@ -0,0 +1,98 @@
+import unittest
+
+import socket
+from threading import Event, Thread
+import time
+
+from automators.device_watcher import DeviceWatcher
+
+
+class _AdbServer:
+    """Speaks just enough of the ADB server protocol for host:track-devices."""
+    def __init__(self):
+        self.socket = socket.socket()
+        self.socket.bind(('127.0.0.1', 0))
+        self.socket.listen(1)
+        self.port = self.socket.getsockname()[1]
+        self.connection = None
+        self.accepted = Event()
+        Thread(target=self.accept, daemon=True).start()
+
+    def accept(self):
+        self.connection, _ = self.socket.accept()
+        length = int(self.connection.recv(4), 16)
+        assert self.connection.recv(length) == b'host:track-devices'
+        self.connection.sendall(b'OKAY')
+        self.accepted.set()
+
+    def send_devices(self, devices):
+        output = ''.join('{}\t{}\n'.format(serial, status) for serial, status in devices.items()).encode('utf-8')
+        self.connection.sendall('{:04x}'.format(len(output)).encode('utf-8') + output)
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+        self.socket.close()
+
+
+class TestDeviceWatcher(unittest.TestCase):
+    def setUp(self):
+        self.settings = DeviceWatcher.DEBOUNCE, DeviceWatcher.STOP_CHECK_INTERVAL, DeviceWatcher.RECONNECT_DELAY
+        DeviceWatcher.DEBOUNCE, DeviceWatcher.STOP_CHECK_INTERVAL, DeviceWatcher.RECONNECT_DELAY = 0.05, 0.1, 0.1
+        self.events = []
+        self.changed = Event()
+        self.server = None
+        self.watcher = DeviceWatcher('127.0.0.1', 5037, on_attach=lambda serial: self.record(serial, True), 
+                                     on_detach=lambda serial: self.record(serial, False))
+
+    def tearDown(self):
+        self.watcher.stop = True
+        if self.server is not None:
+            self.server.close()
+        DeviceWatcher.DEBOUNCE, DeviceWatcher.STOP_CHECK_INTERVAL, DeviceWatcher.RECONNECT_DELAY = self.settings
+
+    def record(self, serial, attached):
+        self.events.append((serial, attached))
+        self.changed.set()
+
+    def wait_events(self, count):
+        deadline = time.time() + 5
+        while len(self.events) < count and time.time() < deadline:
+            self.changed.wait(0.1)
+            self.changed.clear()
+        return self.events
+
+    def test_Debounce(self):
+        self.watcher.handle_event('a', True)
+        self.watcher.handle_event('a', False) # flapped back before settling
+        self.watcher.handle_event('b', True)
+        self.watcher.handle_event('b', False)
+        self.watcher.handle_event('b', True)
+        self.assertEqual(self.wait_events(1), [('b', True)])
+        time.sleep(DeviceWatcher.DEBOUNCE*3)
+        self.assertEqual(self.events, [('b', True)])
+        self.assertEqual(self.watcher.states, {'b': True})
+
+    def test_Callback_Exception(self):
+        self.watcher.on_attach = lambda serial: 1/0
+        self.watcher.settle('a', True) # logged, not raised
+        self.assertEqual(self.watcher.states, {'a': True})
+
+    def test_Track_Devices_And_Stop_While_Idle(self):
+        self.server = _AdbServer()
+        self.watcher.port = self.server.port
+        self.watcher.start()
+        self.assertTrue(self.server.accepted.wait(5))
+        self.assertTrue(self.watcher.connected.wait(5))
+        self.server.send_devices({'a': 'device', 'b': 'unauthorized'})
+        self.assertEqual(self.wait_events(1), [('a', True)])
+        self.server.send_devices({'b': 'device'})
+        self.assertEqual(sorted(self.wait_events(3)), [('a', False), ('a', True), ('b', True)])
+
+        self.watcher.stop = True # no device changes from here on
+        self.watcher.thread.join(DeviceWatcher.STOP_CHECK_INTERVAL*10)
+        self.assertFalse(self.watcher.thread.is_alive())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import unittest
+
+from queue import Empty
+import time
+
+from data_structs import FairQueue
+
+
+class _ServerRequest:
+    def __init__(self, user_identifier):
+        self.user_identifier = user_identifier
+
+
+class _Request:
+    def __init__(self, user_identifier, number, deadline=None):
+        self.server_request = _ServerRequest(user_identifier)
+        self.number = number
+        self.deadline = deadline
+
+
+class TestFairQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = FairQueue()
+    
+    def put_many(self, user_identifier, count):
+        for i in range(count):
+            self.queue.put(_Request(user_identifier, i))
+    
+    def get_users(self, count):
+        users = []
+        for _ in range(count):
+            request = self.queue.get(block=False)
+            self.queue.done(request)
+            users.append(request.server_request.user_identifier)
+        return users
+    
+    def test_Round_Robin(self):
+        self.put_many('flood', 100)
+        self.put_many('user', 2)
+        self.assertEqual(self.get_users(4), ['flood', 'user', 'flood', 'user'])
+        self.assertEqual(len(self.queue.queue), 98)
+    
+    def test_Weights_And_Priorities(self):
+        self.queue.set_policy('heavy', weight=2)
+        self.queue.set_policy('urgent', priority=1)
+        self.put_many('heavy', 4)
+        self.put_many('light', 2)
+        self.assertEqual(self.get_users(3), ['heavy', 'light', 'heavy'])
+        self.put_many('urgent', 1)
+        self.assertEqual(self.get_users(1), ['urgent'])
+        self.assertEqual([req.server_request.user_identifier for req in self.queue.queue], ['heavy', 'light', 'heavy'])
+    
+    def test_In_Flight_Limit(self):
+        self.queue.set_policy('limited', max_in_flight=1)
+        self.put_many('limited', 2)
+        request = self.queue.get(block=False)
+        self.assertEqual(self.queue.qsize(), 0)
+        self.assertRaises(Empty, self.queue.get, block=False)
+        self.queue.done(request)
+        self.assertEqual(self.queue.qsize(), 1)
+        self.assertEqual(self.queue.get(block=False).number, 1)
+    
+    def test_Get_Matching(self):
+        self.put_many('a', 2)
+        self.put_many('b', 2)
+        request = self.queue.get_matching(lambda req: req.server_request.user_identifier == 'b', block=False)
+        self.assertEqual(request.server_request.user_identifier, 'b')
+        self.assertRaises(Empty, self.queue.get_matching, lambda req: False, block=False)
+        self.assertEqual(len(self.queue.queue), 3)
+    
+    def test_Put_Front(self):
+        self.put_many('a', 2)
+        request = self.queue.get(block=False)
+        self.queue.done(request)
+        self.queue.put_front(request)
+        self.assertEqual([req.number for req in self.queue.queue], [0, 1])
+    
+    def test_Expiry(self):
+        expired = []
+        self.queue.expire_callback = expired.append
+        self.queue.put(_Request('a', 0, deadline=time.time()-1))
+        self.queue.put(_Request('a', 1))
+        self.queue.put(_Request('b', 0, deadline=time.time()-1))
+        self.assertEqual(self.queue.get(block=False).number, 1)
+        self.assertEqual(len(expired), 2)
+        self.assertEqual(len(self.queue.queue), 0)
+    
+    def test_Expiry_While_Waiting(self):
+        expired = []
+        self.queue.expire_callback = expired.append
+        self.queue.set_policy('limited', max_in_flight=1)
+        self.queue.put(_Request('limited', 0))
+        self.queue.put(_Request('limited', 1, deadline=time.time()+0.2))
+        self.queue.put(_Request('other', 0, deadline=time.time()+60))
+        self.queue.done(self.queue.get_matching(lambda req: req.server_request.user_identifier == 'other', block=False))
+        self.assertEqual(len(self.queue.deadline_entries), 1) # the dispatched item's deadline is untracked
+        self.queue.get(block=False) # 'limited' is at its in-flight limit now
+        self.assertRaises(Empty, self.queue.get, timeout=1) # wakes up for the deadline, though nothing is dispatchable
+        self.assertEqual([req.number for req in expired], [1])
+        self.assertEqual(len(self.queue.queue), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+
+from datetime import datetime
+import os
+import pickle
+import shutil
+import tempfile
+
+from automators.result import Result
+from history import RECORD_HEADER, HistoryLog, convert_pickles
+from importer import find_pickles
+
+
+class TestHistoryLog(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'history.log')
+        self.log = HistoryLog(self.filename)
+    
+    def tearDown(self):
+        self.log.close()
+        shutil.rmtree(self.directory)
+    
+    def append_results(self, count):
+        for i in range(count):
+            self.log.append({'number': '081{}'.format(i % 3), 'product_spec': 'TN5', 'automator': 'linkaja', 'refID': 'REF{}'.format(i), 
+                             'time': datetime(2022, 1, 1+i).timestamp(), 'description': None, 'error': None, 'execution_duration': i})
+    
+    def test_Append_And_Read(self):
+        self.append_results(10)
+        self.assertEqual(len(self.log), 10)
+        self.assertEqual(self.log.get(4)['refID'], 'REF4')
+        self.assertEqual([r['refID'] for r in self.log.scan(datetime(2022, 1, 3).timestamp(), datetime(2022, 1, 6).timestamp())], ['REF2', 'REF3', 'REF4'])
+        self.assertEqual([r['refID'] for r in self.log.find('0811')], ['REF1', 'REF4', 'REF7'])
+        
+        self.log.close()
+        self.log = HistoryLog(self.filename) # reopened from the index
+        self.assertEqual(len(self.log), 10)
+        self.assertEqual([r['refID'] for r in self.log.find('0811')], ['REF1', 'REF4', 'REF7'])
+    
+    def test_Find_Long_Numbers(self):
+        for number in ['1234567890123456789', '1234567890123456000', '1234567890123456']:
+            self.log.append({'number': number, 'refID': 'REF' + number[-3:], 'time': datetime(2022, 1, 1).timestamp()})
+        self.assertEqual([r['refID'] for r in self.log.find('1234567890123456789')], ['REF789']) # the index only tells the first 16 bytes apart
+        self.assertEqual([r['refID'] for r in self.log.find('1234567890123456')], ['REF456'])
+    
+    def test_Recovery(self):
+        self.append_results(5)
+        self.log.close()
+        with open(self.filename + '.idx', 'r+b') as f: # the last two entries never made it, the last one partially
+            f.truncate(os.path.getsize(self.filename + '.idx') - 30)
+        with open(self.filename, 'ab') as f: # torn record
+            f.write(b'\x10\x00\x00\x00\x00\x00')
+        self.log = HistoryLog(self.filename)
+        self.assertEqual(len(self.log), 5)
+        self.assertEqual([r['refID'] for r in self.log.scan()], ['REF{}'.format(i) for i in range(5)])
+        self.append_results(1)
+        self.assertEqual(self.log.get(5)['refID'], 'REF0')
+    
+    def test_Indexed_Torn_Record(self):
+        for cut in [4, RECORD_HEADER.size + 5]: # inside the header, inside the payload
+            self.append_results(5)
+            offset = self.log.offsets[-1]
+            self.log.close()
+            with open(self.filename, 'r+b') as f: # the index entry was written, the record only partially
+                f.truncate(offset + cut)
+            self.log = HistoryLog(self.filename)
+            self.assertEqual(len(self.log), 4)
+            self.assertEqual(os.path.getsize(self.filename), offset)
+            self.assertEqual([r['refID'] for r in self.log.scan()], ['REF{}'.format(i) for i in range(4)])
+            self.assertEqual([r['refID'] for r in self.log.find('0811')], ['REF1'])
+            self.append_results(1)
+            self.assertEqual(self.log.get(4)['refID'], 'REF0')
+            self.log.close()
+            os.remove(self.filename)
+            os.remove(self.filename + '.idx')
+            self.log = HistoryLog(self.filename)
+    
+    def test_Convert_Pickles(self):
+        for month in [2, 1]:
+            results = [Result('0811', 'TN5', refID='REF{}{}'.format(month, i), time=datetime(2022, month, 1+i), automator='digipos', execution_duration=i) for i in range(3)]
+            with open(os.path.join(self.directory, datetime(2022, month, 1).strftime('Hist_%b_%Y.pick')), 'wb') as f:
+                pickle.dump(results, f)
+        filenames = find_pickles(os.path.join(self.directory, 'Hist.pick'))
+        self.assertEqual([os.path.basename(filename) for filename in filenames], ['Hist_Jan_2022.pick', 'Hist_Feb_2022.pick'])
+        self.assertEqual(convert_pickles(self.log, filenames), 6)
+        self.assertEqual([r['refID'] for r in self.log.find('0811')], ['REF10', 'REF11', 'REF12', 'REF20', 'REF21', 'REF22'])
+        self.assertEqual(self.log.get(5)['time'], datetime(2022, 2, 3).timestamp())
+        self.assertEqual(self.log.get(5)['device'], '')
+
+
+if __name__ == '__main__':
+    unittest.main()
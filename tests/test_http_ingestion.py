@@ -0,0 +1,117 @@
+import unittest
+
+import base64
+from queue import Queue
+from threading import Thread
+import time
+
+from server.base import Credentials
+from server.http_ingestion import HTTPIngestionClient, HTTPIngestionServer
+
+
+def consume(queue: Queue):
+    """Admits every request with a pin, like RequestMiddleware would."""
+    while True:
+        request = queue.get()
+        if request is None:
+            return
+        if request.request.count('.') < 2:
+            request.notify('invalid')
+        else:
+            request.reply('ok')
+            request.notify('enqueued')
+
+
+class TestHTTPIngestionServer(unittest.TestCase):
+    def setUp(self):
+        self.queue = Queue()
+        self.server = HTTPIngestionServer(self.queue, [Credentials('user', 'secret')])
+        self.consumer = Thread(target=consume, args=(self.queue,), daemon=True)
+        self.consumer.start()
+
+    def tearDown(self):
+        self.queue.put(None)
+        self.server.stop = True
+        self.server.callback_executor.shutdown()
+
+    def finish(self, ticket_id, status='success'):
+        self.server.notify(status, {'ticket': ticket_id}, result={'refID': 'REF'})
+
+    def test_Authentication_And_Callbacks(self):
+        header = lambda credentials: 'Basic ' + base64.b64encode(credentials.encode('utf-8')).decode('ascii')
+        self.assertEqual(self.server.authenticate(header('user:secret')), 'user')
+        for authorization in [None, header('user:wrong'), header('nobody:secret'), 'Basic !!!', 'Bearer token']:
+            self.assertIsNone(self.server.authenticate(authorization))
+        self.assertTrue(self.server.is_valid_callback(None))
+        self.assertTrue(self.server.is_valid_callback('http://127.0.0.1:9000/hook'))
+        self.assertFalse(self.server.is_valid_callback('http://example.com/hook'))
+        self.assertFalse(self.server.is_valid_callback('file:///etc/passwd'))
+
+    def test_Batch_Admission(self):
+        results = self.server.submit_batch('user', ['L10.0812.1234', 'bad'])
+        self.assertEqual([(r['index'], r['status'], r['accepted']) for r in results], [(0, 'enqueued', True), (1, 'invalid', False)])
+        self.assertEqual(results[0]['replies'], ['ok'])
+        self.assertTrue(results[1]['finished'])
+        self.assertIsNone(self.server.get_ticket('other', results[0]['ticket']))
+
+    def test_Poll_Cursor_And_Purge(self):
+        tickets = [r['ticket'] for r in self.server.submit_batch('user', ['L10.0812.1', 'L10.0813.1'])]
+        self.assertEqual(self.server.poll_results('user'), {'cursor': 0, 'results': []})
+        self.finish(tickets[0])
+        polled = self.server.poll_results('user')
+        self.assertEqual((polled['cursor'], [r['ticket'] for r in polled['results']]), (1, tickets[:1]))
+
+        self.finish(tickets[0], 'failed') # finishing twice does not log it twice
+        self.assertEqual(self.server.poll_results('user', 1)['results'], [])
+        Thread(target=lambda: (time.sleep(0.1), self.finish(tickets[1])), daemon=True).start()
+        polled = self.server.poll_results('user', 1, wait=5)
+        self.assertEqual((polled['cursor'], [r['ticket'] for r in polled['results']]), (2, tickets[1:]))
+
+        self.server.get_ticket('user', tickets[0]).updated -= HTTPIngestionServer.RESULT_RETENTION + 1
+        self.server.purge_tickets()
+        self.assertIsNone(self.server.get_ticket('user', tickets[0]))
+        self.assertEqual(self.server.poll_results('user', 1)['results'][0]['ticket'], tickets[1])
+        self.assertEqual(self.server.poll_results('user', 2), {'cursor': 2, 'results': []})
+
+    def test_Lost_Ticket_Finishes(self):
+        delivered = []
+        self.server.deliver_callback = delivered.append
+        ticket_id = self.server.submit_batch('user', ['L10.0812.1'], callback_url='http://127.0.0.1:9000/hook')[0]['ticket']
+        self.server.notify('lost', {'ticket': ticket_id}) # its cluster node died while executing it
+        self.server.notify('lost', {'ticket': ticket_id})
+        self.assertEqual([r['ticket'] for r in self.server.poll_results('user')['results']], [ticket_id])
+        self.server.callback_executor.shutdown()
+        self.assertEqual([ticket.id for ticket in delivered], [ticket_id]) # called back once
+        self.server.get_ticket('user', ticket_id).updated -= HTTPIngestionServer.RESULT_RETENTION + 1
+        self.server.purge_tickets()
+        self.assertIsNone(self.server.get_ticket('user', ticket_id))
+    
+    def test_HTTP_Endpoints(self):
+        port, keep_alive = HTTPIngestionServer.PORT, HTTPIngestionServer.KEEP_ALIVE_SLEEP_DURATION
+        HTTPIngestionServer.PORT, HTTPIngestionServer.KEEP_ALIVE_SLEEP_DURATION = 0, 0.1
+        try:
+            Thread(target=self.server.run, daemon=True).start()
+            for _ in range(50):
+                if self.server.http_server is not None:
+                    break
+                time.sleep(0.05)
+        finally:
+            HTTPIngestionServer.PORT, HTTPIngestionServer.KEEP_ALIVE_SLEEP_DURATION = port, keep_alive
+        url = 'http://127.0.0.1:{}'.format(self.server.http_server.server_address[1])
+
+        client = HTTPIngestionClient(url, 'user', 'secret', timeout=10)
+        results = client.submit(['L10.0812.1234'])
+        self.assertEqual(results[0]['status'], 'enqueued')
+        self.finish(results[0]['ticket'])
+        self.assertEqual(client.get_ticket(results[0]['ticket'])['status'], 'success')
+        self.assertEqual(client.poll(0)['cursor'], 1)
+        with self.assertRaises(Exception) as context:
+            HTTPIngestionClient(url, 'user', 'wrong', timeout=10).poll(0)
+        self.assertEqual(getattr(context.exception, 'code', None), 401)
+        with self.assertRaises(Exception) as context:
+            client.submit(['L10.0812.1234'], callback_url='http://example.com/hook')
+        self.assertEqual(getattr(context.exception, 'code', None), 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+from datetime import datetime
+import io
+import json
+import os
+import sqlite3
+import tempfile
+
+from importer import Importer, JsonStream, infer_automators
+from rollups import TransactionRollups
+
+
+class TestJsonStream(unittest.TestCase):
+    def test_Walk(self):
+        data = {'transactions': {'Hist_Jan_2022.pick': [{'number': '0811', 'time': 1641000000.5}, {'number': '0812', 'refID': None}], 'empty': []}, 
+                'users': [{'server': 'jabber', 'identifier': 'a@b'}, 123456789, "text"], 'version': 2}
+        JsonStream.CHUNK_SIZE, chunk_size = 7, JsonStream.CHUNK_SIZE # splits values and numbers across chunks
+        try:
+            items = list(JsonStream(io.StringIO(json.dumps(data, indent=2))).walk())
+        finally:
+            JsonStream.CHUNK_SIZE = chunk_size
+        self.assertEqual(items, [(('transactions', 'Hist_Jan_2022.pick'), {'number': '0811', 'time': 1641000000.5}), (('transactions', 'Hist_Jan_2022.pick'), {'number': '0812', 'refID': None}), 
+                                 (('users',), {'server': 'jabber', 'identifier': 'a@b'}), (('users',), 123456789), (('users',), "text")])
+
+
+class TestInferAutomators(unittest.TestCase):
+    def test_Neighbours(self):
+        ref_ids = ['8123', '?', '9123', '?', 'GUI1', '?', '?', '0123', '?']
+        records = [{'refID': ref_id} for ref_id in ref_ids]
+        self.assertEqual([r['automator'] for r in infer_automators(records)], 
+                         ['linkaja', 'linkaja', 'linkaja', '', 'digipos', 'digipos', '', 'mitra_tokopedia', 'mitra_tokopedia'])
+        self.assertEqual([r['automator'] for r in infer_automators([{'refID': '?'}, {'refID': '?'}, {'refID': '?', 'automator': 'digipos'}])], ['', '', 'digipos'])
+
+
+class TestImporter(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        connection = sqlite3.connect(self.filename)
+        connection.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY, number TEXT NOT NULL, product_spec TEXT NOT NULL, refID TEXT NOT NULL, time TEXT NOT NULL, "
+                           "description TEXT, error TEXT, automator TEXT NOT NULL, execution_duration INTEGER NOT NULL, device TEXT NOT NULL)")
+        connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, server TEXT NOT NULL, identifier TEXT NOT NULL)")
+        connection.commit()
+        connection.close()
+        self.importer = Importer(self.filename, progress=lambda *args: None)
+        Importer.CHUNK_SIZE, self.chunk_size = 3, Importer.CHUNK_SIZE
+    
+    def tearDown(self):
+        Importer.CHUNK_SIZE = self.chunk_size
+        self.importer.close()
+        os.remove(self.filename)
+    
+    def records(self, fail_at=None):
+        for i in range(10):
+            if i == fail_at:
+                raise KeyboardInterrupt
+            yield {'number': '08{}'.format(i), 'product_spec': 'TN5', 'refID': '8{}'.format(i), 'time': datetime(2022, 1, 1+i).timestamp(), 'execution_duration': i}
+    
+    def test_Resume(self):
+        with self.assertRaises(KeyboardInterrupt):
+            self.importer.import_transactions('history', self.records(fail_at=7))
+        self.assertEqual(self.importer.get_position('history'), (6, False))
+        self.assertEqual(self.importer.import_transactions('history', self.records()), 4)
+        self.assertEqual(self.importer.import_transactions('history', self.records()), 0) # finished
+        rows = self.importer.connection.execute("SELECT number, automator, device FROM transactions ORDER BY id").fetchall()
+        self.assertEqual([row[0] for row in rows], ['08{}'.format(i) for i in range(10)])
+        self.assertEqual(rows[0][1:], ('linkaja', ''))
+    
+    def test_Rebuild_Rollups(self):
+        self.importer.import_transactions('history', self.records())
+        self.assertEqual(self.importer.rebuild_rollups(), 10)
+        rollups = TransactionRollups(self.filename)
+        try:
+            stats = rollups.get_stats(['automator'], start_day='2022-01-01')
+        finally:
+            rollups.connection.close()
+        self.assertEqual([(s['automator'], s['count'], s['duration_sum']) for s in stats], [('linkaja', 10, 45)])
+    
+    def test_Users_Deduplicated(self):
+        users = [{'server': 'jabber', 'identifier': 'a@b'}, {'server': 'jabber', 'identifier': 'c@d'}, {'server': 'jabber', 'identifier': 'a@b'}]
+        self.assertEqual(self.importer.import_users('users', users), 3)
+        self.assertEqual(self.importer.connection.execute("SELECT count(*) FROM users").fetchone()[0], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import unittest
+
+from datetime import datetime
+
+from admission import AdmissionController
+from data_structs import CallbackableQueue, InteractibleRequest
+from database import Transaction
+from middlewares import RequestMiddleware
+from routing import ProductRouter
+from server.request import Request as ServerRequest
+
+
+class _DeviceClass:
+    DEFAULT_AUTOMATOR = 'linkaja'
+
+
+class _DeviceManager:
+    DEVICE_CLS = _DeviceClass
+
+    def __init__(self):
+        self.current_requests = []
+        self.quarantined_requests = []
+
+    def estimate_wait(self, automator_name, depth):
+        return 0
+
+
+class _Server:
+    SERVER_NAME = 'test'
+
+    def __init__(self):
+        self.replies = []
+        self.notifications = []
+
+    def reply(self, message, interaction_data):
+        self.replies.append(message)
+
+    def notify(self, status, interaction_data, **details):
+        self.notifications.append((status, details))
+
+
+class _RequestMiddleware(RequestMiddleware):
+    """Users and today's transactions are kept in memory instead of the database."""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.users = {'user'}
+        self.transactions = []
+        self.looked_up = []
+
+    def check_user(self, req):
+        return [req.user_identifier] if req.user_identifier in self.users else None
+
+    def get_todays_transactions(self, number):
+        self.looked_up.append(number)
+        return [t for t in self.transactions if t.number == number]
+
+
+class TestRequestMiddleware(unittest.TestCase):
+    def setUp(self):
+        self.device_manager = _DeviceManager()
+        self.out_queue = CallbackableQueue()
+        self.middleware = _RequestMiddleware(self.device_manager, CallbackableQueue(), self.out_queue)
+        self.server = _Server()
+
+    def make_request(self, message, user_identifier='user'):
+        return ServerRequest(self.server, message, user_identifier, {})
+
+    def test_Check_Duplicates(self):
+        self.out_queue.put(InteractibleRequest('0811', '10', 'linkaja'))
+        self.device_manager.current_requests.append(InteractibleRequest('0812', '10', 'linkaja'))
+        self.device_manager.quarantined_requests.append(InteractibleRequest('0816', '10', 'linkaja'))
+        self.middleware.transactions = [Transaction(number='0813', product_spec='10', automator='linkaja', refID='REF', time=datetime.now(), error=None),
+                                        Transaction(number='0814', product_spec='10', automator='linkaja', refID=None, time=datetime.now(), error='failed')]
+        requests = [InteractibleRequest(number, '10', 'linkaja') for number in ['0811', '0812', '0813', '0814', '0814', '0815', '0816']]
+        results = self.middleware.check_duplicates(requests)
+        self.assertEqual([status for status, _ in results], ['in_queue', 'in_process', 'in_cached_result', 'no_duplicates', 'in_queue', 'no_duplicates', 'in_process'])
+        self.assertEqual(results[2][1].refID, 'REF')
+        self.assertEqual(sorted(self.middleware.looked_up), ['0811', '0812', '0813', '0814', '0815', '0816']) # only the numbers of the message, once each
+
+    def test_Check_Duplicate_Equivalents(self):
+        equivalents = ProductRouter.EQUIVALENTS
+        ProductRouter.EQUIVALENTS = {'TN5': {'linkaja': 'TN5', 'digipos': 'PUL5'}}
+        self.addCleanup(setattr, ProductRouter, 'EQUIVALENTS', equivalents)
+        self.middleware.transactions = [Transaction(number='0811', product_spec='PUL5', automator='digipos', refID='REF', time=datetime.now(), error=None),
+                                        Transaction(number='0811', product_spec='TN10', automator='linkaja', refID='REF', time=datetime.now(), error=None)]
+        status, transaction = self.middleware.check_duplicate(InteractibleRequest('0811', 'TN5', 'linkaja'))
+        self.assertEqual((status, transaction.automator), ('in_cached_result', 'digipos')) # sold by an equivalent automator
+        self.assertEqual(self.middleware.looked_up, ['0811']) # a single query for every equivalent
+        self.assertEqual(self.middleware.check_duplicate(InteractibleRequest('0811', 'TN7', 'linkaja'))[0], 'no_duplicates')
+        self.out_queue.put(InteractibleRequest('0812', 'PUL5', 'digipos'))
+        self.assertEqual(self.middleware.check_duplicate(InteractibleRequest('0812', 'TN5', 'linkaja'))[0], 'in_queue')
+
+    def test_Handle_Bulk_Request(self):
+        self.out_queue.put(InteractibleRequest('0811', '10', 'linkaja'))
+        message = 'L10.0811.1234\nL10.0812.1234\nL10.0812.1234\ninvalid\nL10.08a.1234'
+        lines = self.middleware.split_requests(message)
+        self.middleware.handle_bulk_request(self.make_request(message), lines)
+        status, details = self.server.notifications[-1]
+        self.assertEqual(status, 'bulk_enqueued')
+        self.assertEqual([len(details[k]) for k in ['enqueued', 'duplicates', 'invalid', 'rejected']], [1, 2, 2, 0])
+        self.assertEqual(details['invalid'], ['invalid', 'L10.08a.1234'])
+        self.assertEqual(self.out_queue.qsize(), 2)
+        self.assertTrue(self.out_queue.queue[-1].silent_progress)
+        self.assertEqual(len(self.server.replies), 1) # a single consolidated acknowledgement
+
+        self.middleware.handle_bulk_request(self.make_request(message, 'stranger'), lines)
+        self.assertEqual(self.server.notifications[-1][0], 'not_registered')
+        self.assertEqual(self.out_queue.qsize(), 2)
+
+    def test_Admission_After_Validation(self):
+        limits = AdmissionController.USER_RATE, AdmissionController.USER_BURST
+        AdmissionController.USER_RATE, AdmissionController.USER_BURST = 0.001, 2 # read as user buckets are made
+        self.addCleanup(setattr, AdmissionController, 'USER_BURST', limits[1])
+        self.addCleanup(setattr, AdmissionController, 'USER_RATE', limits[0])
+        self.middleware.handle_request(self.make_request('invalid'))
+        self.middleware.handle_request(self.make_request('L10.0811.1234', 'stranger'))
+        self.assertEqual([status for status, _ in self.server.notifications], ['invalid', 'not_registered']) # neither took a token
+
+        message = '\n'.join('L10.081{}.1234'.format(i) for i in range(4)) + '\ninvalid'
+        self.middleware.handle_bulk_request(self.make_request(message), self.middleware.split_requests(message))
+        status, details = self.server.notifications[-1]
+        self.assertEqual([len(details[k]) for k in ['enqueued', 'duplicates', 'invalid', 'rejected']], [2, 0, 1, 2])
+        self.middleware.handle_request(self.make_request('L10.0819.1234'))
+        self.assertEqual(self.server.notifications[-1][0], 'busy')
+        self.assertEqual(self.out_queue.qsize(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
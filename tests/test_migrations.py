@@ -0,0 +1,65 @@
+import unittest
+
+import os
+import sqlite3
+import tempfile
+
+from database import Index, User
+import migrations
+
+
+class FakeMissing:
+    __TABLE_NAME__ = 'missing'
+    __INDEXES__ = [Index('missing_x', ('x',))]
+
+
+class TestMigrations(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        connection = sqlite3.connect(self.filename)
+        connection.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, server TEXT, identifier TEXT)")
+        connection.commit()
+        connection.close()
+    
+    def tearDown(self):
+        os.remove(self.filename)
+    
+    def query(self, sql):
+        connection = sqlite3.connect(self.filename)
+        try:
+            return connection.execute(sql).fetchall()
+        finally:
+            connection.close()
+    
+    def test_Migrate_Records_Version_And_Builds_Indexes(self):
+        version = migrations.migrate(self.filename, [User, FakeMissing])
+        self.assertEqual(version, migrations.MIGRATIONS[-1].version)
+        self.assertEqual(self.query("PRAGMA user_version")[0][0], version)
+        columns = [row[1] for row in self.query("PRAGMA table_info(users)")]
+        self.assertTrue({'weight', 'priority', 'max_in_flight'}.issubset(columns))
+        indexes = [row[0] for row in self.query("SELECT name FROM sqlite_master WHERE type='index'")]
+        self.assertIn('users_server_identifier', indexes)
+        self.assertNotIn('missing_x', indexes)
+    
+    def test_Migrate_Is_Idempotent(self):
+        version = migrations.migrate(self.filename, [User])
+        self.assertEqual(migrations.migrate(self.filename, [User]), version)
+    
+    def test_Failed_Migration_Rolls_Back(self):
+        def broken(connection):
+            connection.execute("ALTER TABLE users ADD COLUMN broken INTEGER")
+            raise RuntimeError("broken")
+        version = migrations.MIGRATIONS[-1].version + 1
+        migrations.MIGRATIONS.append(migrations.Migration(version, "Broken.", broken))
+        try:
+            with self.assertRaises(RuntimeError):
+                migrations.migrate(self.filename, [])
+        finally:
+            migrations.MIGRATIONS.pop()
+        self.assertEqual(self.query("PRAGMA user_version")[0][0], version - 1)
+        self.assertNotIn('broken', [row[1] for row in self.query("PRAGMA table_info(users)")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+from unittest.mock import patch
+
+from automators.device import Device
+from automators.plugabble_device import PluggableDevice
+from automators.plugins.base import AutomatorPlugin
+
+
+class _Plugin(AutomatorPlugin):
+    PACKAGE = 'com.example.test'
+    NAME = 'test'
+
+
+class _OtherPlugin(AutomatorPlugin):
+    PACKAGE = 'com.example.other'
+    NAME = 'other'
+
+
+class _U2Device:
+    def __init__(self):
+        self.packages = [_Plugin.PACKAGE]
+        self.listed = 0
+
+    def app_list(self):
+        self.listed += 1
+        return list(self.packages)
+
+
+class _Device(PluggableDevice):
+    PLUGINS = {'test': _Plugin, 'other': _OtherPlugin}
+
+    def __init__(self, *args, **kwargs):
+        self.fingerprint = '1'
+        super().__init__(*args, **kwargs)
+
+    def shell(self, cmd):
+        if self.fingerprint is None:
+            raise PermissionError("stat: /data/app: Permission denied")
+        return self.fingerprint + '\n'
+
+
+def _device_init(self, client, serial):
+    """Stands in for Device.__init__, which connects to the device."""
+    self.client, self.serial = client, serial
+    self.u2_device = _U2Device()
+
+
+class TestPluggableDevice(unittest.TestCase):
+    def setUp(self):
+        with patch.object(Device, '__init__', _device_init):
+            self.device = _Device(None, 'a')
+        self.u2_device = self.device.u2_device
+
+    def expire(self):
+        self.device.package_inventory_time -= _Device.PACKAGE_INVENTORY_TTL + 1
+
+    def test_Inventory_Cached_Until_Fingerprint_Changes(self):
+        self.assertEqual(list(self.device.plugins), ['test'])
+        self.assertEqual(self.device.package_fingerprint, '1')
+        self.u2_device.packages.append(_OtherPlugin.PACKAGE)
+        plugin = self.device.plugins['test']
+        self.device.refresh_plugins()
+        self.assertEqual((list(self.device.plugins), self.u2_device.listed), (['test'], 1)) # same fingerprint, cached
+
+        self.device.fingerprint = '2'
+        self.device.refresh_plugins()
+        self.assertEqual((sorted(self.device.plugins), self.u2_device.listed), (['other', 'test'], 2))
+        self.assertIs(self.device.plugins['test'], plugin) # existing plugins are kept
+
+        self.device.invalidate_package_inventory()
+        self.device.get_installed_packages()
+        self.assertEqual(self.u2_device.listed, 3)
+
+    def test_Inventory_TTL(self):
+        self.device.get_installed_packages()
+        self.assertEqual(self.u2_device.listed, 1)
+        self.expire()
+        self.u2_device.packages.remove(_Plugin.PACKAGE)
+        self.device.refresh_plugins()
+        self.assertEqual((self.device.plugins, self.u2_device.listed), ({}, 2))
+
+    def test_Permission_Denied_Fallback(self):
+        self.device.fingerprint = None
+        self.assertEqual(self.device.get_package_fingerprint(), '')
+        self.device.get_installed_packages() # the fingerprint went from '1' to ''
+        self.assertEqual(self.u2_device.listed, 2)
+        self.u2_device.packages.append(_OtherPlugin.PACKAGE)
+        self.device.refresh_plugins()
+        self.assertEqual((list(self.device.plugins), self.u2_device.listed), (['test'], 2)) # only the TTL applies
+        self.expire()
+        self.device.refresh_plugins()
+        self.assertEqual((sorted(self.device.plugins), self.u2_device.listed), (['other', 'test'], 3))
+
+
+if __name__ == '__main__':
+    unittest.main()
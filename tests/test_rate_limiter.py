@@ -0,0 +1,75 @@
+import unittest
+
+import time
+
+from automators.utils.rate_limiter import AIMDRateController, RateControllerRegistry, TokenBucket
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_Burst_And_Refund(self):
+        bucket = TokenBucket(rate=1, burst=2)
+        self.assertTrue(bucket.try_acquire())
+        self.assertTrue(bucket.try_acquire())
+        self.assertFalse(bucket.try_acquire())
+        bucket.refund()
+        self.assertTrue(bucket.try_acquire())
+        self.assertGreater(bucket.time_until_available(), 0)
+    
+    def test_Acquire_Up_To(self):
+        bucket = TokenBucket(rate=0.001, burst=3)
+        self.assertEqual(bucket.try_acquire_up_to(5), 3)
+        self.assertEqual(bucket.try_acquire_up_to(5), 0)
+        bucket.refund(2)
+        self.assertEqual(bucket.try_acquire_up_to(1), 1)
+        self.assertEqual(TokenBucket(rate=0).try_acquire_up_to(5), 5)
+    
+    def test_Disabled(self):
+        bucket = TokenBucket(rate=0)
+        self.assertTrue(all([bucket.try_acquire() for _ in range(100)]))
+        self.assertEqual(bucket.time_until_available(), 0)
+
+
+class TestAIMDRateController(unittest.TestCase):
+    def setUp(self):
+        AIMDRateController.ENABLED = True # disabled by default
+        self.controller = AIMDRateController()
+    
+    def tearDown(self):
+        AIMDRateController.ENABLED = False
+    
+    def test_Additive_Increase(self):
+        rate = self.controller.rate
+        self.controller.on_success()
+        self.assertAlmostEqual(self.controller.rate, min(rate + AIMDRateController.ADDITIVE_INCREASE, AIMDRateController.MAX_RATE))
+        for _ in range(1000):
+            self.controller.on_success()
+        self.assertEqual(self.controller.rate, AIMDRateController.MAX_RATE)
+    
+    def test_Multiplicative_Decrease(self):
+        rate = self.controller.rate
+        self.controller.on_busy()
+        self.assertAlmostEqual(self.controller.rate, max(rate * AIMDRateController.MULTIPLICATIVE_DECREASE, AIMDRateController.MIN_RATE))
+        self.assertFalse(self.controller.try_acquire()) # saved up tokens are taken away
+        self.assertFalse(self.controller.is_available())
+        self.assertGreater(self.controller.time_until_available(), 0)
+        self.controller.on_busy() # within the cooldown, a storm only counts once
+        self.assertAlmostEqual(self.controller.rate, max(rate * AIMDRateController.MULTIPLICATIVE_DECREASE, AIMDRateController.MIN_RATE))
+        self.controller.last_decrease = time.monotonic() - AIMDRateController.DECREASE_COOLDOWN
+        self.controller.on_busy()
+        self.assertLess(self.controller.rate, rate * AIMDRateController.MULTIPLICATIVE_DECREASE)
+    
+    def test_Disabled(self):
+        AIMDRateController.ENABLED = False
+        self.controller.on_busy()
+        self.assertTrue(all([self.controller.try_acquire() for _ in range(10)]))
+        self.assertTrue(self.controller.is_available())
+    
+    def test_Registry(self):
+        registry = RateControllerRegistry()
+        self.assertIs(registry.get('linkaja', 'a'), registry.get('linkaja', 'a'))
+        self.assertIsNot(registry.get('linkaja', 'a'), registry.get('linkaja', 'b'))
+        self.assertEqual(len(registry.get_info()), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
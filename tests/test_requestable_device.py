@@ -0,0 +1,144 @@
+import unittest
+
+from datetime import datetime
+from queue import Empty, Queue
+from unittest.mock import patch
+
+from automators.device import Device
+from automators.plugins.base import AutomatorPlugin
+from automators.request import Request
+from automators.requestable_device import RequestableDevice
+from automators.result import Result
+from automators.utils.rate_limiter import AIMDRateController
+from data_structs import FairQueue
+
+
+class _Translator:
+    def __call__(self, key, **kwargs):
+        return key
+
+
+class _Plugin(AutomatorPlugin):
+    PACKAGE = 'com.example.test'
+    NAME = 'test'
+    TRANSLATOR = _Translator()
+
+
+class _U2Device:
+    def __init__(self):
+        self.packages = [_Plugin.PACKAGE]
+
+    def app_list(self):
+        return list(self.packages)
+
+
+class _Device(RequestableDevice):
+    PLUGINS = {'test': _Plugin}
+    DEFAULT_AUTOMATOR = 'test'
+    MAX_ATTEMPTS = 2
+
+    def shell(self, cmd):
+        return ''
+
+    def wakeUp(self):
+        pass
+
+    def sleep(self):
+        pass
+
+
+def _device_init(self, client, serial):
+    """Stands in for Device.__init__, which connects to the device."""
+    self.client, self.serial = client, serial
+    self.u2_device = _U2Device()
+    self.processing_request = False
+    self.state = ''
+
+
+def make_device(serial='a', **kwargs):
+    with patch.object(Device, '__init__', _device_init):
+        return _Device(None, serial, **kwargs)
+
+
+class TestRequestableDevice(unittest.TestCase):
+    def setUp(self):
+        self.request_queue, self.results_queue, self.quarantine_queue = Queue(), Queue(), Queue()
+        self.device = make_device(request_queue=self.request_queue, results_queue=self.results_queue, quarantine_queue=self.quarantine_queue)
+
+    def test_Requeue_And_Quarantine(self):
+        request = Request('0811', '10', 'test')
+        request.record_error('a', 'timeout')
+        self.device.requeue(request)
+        self.assertIs(self.request_queue.get_nowait(), request)
+
+        request.record_error('a', 'timeout')
+        self.device.requeue(request)
+        self.assertIs(self.quarantine_queue.get_nowait(), request)
+        self.assertTrue(self.request_queue.empty())
+        self.assertTrue(self.results_queue.empty()) # no result until the request is discarded
+
+        result = _Device.make_quarantined_result(request)
+        self.assertFalse(result.success)
+        self.assertEqual((result.error, result.description, result.extra['quarantined']), ('request_quarantined', 'timeout', True))
+
+    def test_Fail_Over(self):
+        request = Request('0811', '10', 'test')
+        request.alternatives = [('other', '10B')]
+        self.assertTrue(self.device.should_fail_over(self.make_result(request, 'server_busy_error')))
+        self.assertFalse(self.device.should_fail_over(self.make_result(request, 'wrong_pin')))
+        self.assertFalse(self.device.should_fail_over(self.make_result(request, None)))
+        self.assertFalse(self.device.should_fail_over(self.make_result(Request('0811', '10', 'unknown'), 'server_busy_error')))
+
+        request.excluded_device = 'a'
+        self.assertTrue(self.device.fail_over(request))
+        self.assertEqual((request.automator, request.product_spec, request.excluded_device, request.alternatives), ('other', '10B', '', []))
+        self.assertIs(self.request_queue.get_nowait(), request)
+        self.assertFalse(self.device.fail_over(request))
+        self.assertTrue(self.request_queue.empty())
+
+    def test_Dispatch_Slot_Taken_After_The_Pop(self):
+        AIMDRateController.ENABLED = True
+        self.addCleanup(setattr, AIMDRateController, 'ENABLED', False)
+        queue = FairQueue()
+        self.device.request_queue = queue
+        controller = self.device.plugins['test'].rate_controller
+        controller.bucket.tokens = 1
+        queue.put(Request('0811', '10', 'test'))
+        queue.put(Request('0812', '10', 'test'))
+        self.assertTrue(self.device.can_process(queue.queue[0]))
+        self.assertTrue(controller.is_available()) # can_process does not take the slot
+        self.assertEqual(self.device.get_request().number, '0811')
+        self.assertFalse(controller.is_available())
+        self.assertRaises(Empty, self.device.get_request) # skipped while the controller has no slot
+        self.assertEqual(len(queue.queue), 1)
+
+        controller.is_available = lambda: True # another device takes the slot between the check and the pop
+        self.addCleanup(delattr, controller, 'is_available')
+        controller.set_rate(AIMDRateController.MAX_RATE)
+        self.assertEqual(self.device.get_request().number, '0812') # waits for the next slot instead of putting it back
+    
+    def test_Stopped_While_Waiting_For_A_Slot(self):
+        AIMDRateController.ENABLED = True
+        self.addCleanup(setattr, AIMDRateController, 'ENABLED', False)
+        queue = FairQueue()
+        self.device.request_queue = queue
+        controller = self.device.plugins['test'].rate_controller
+        controller.bucket.tokens = 0
+        controller.is_available = lambda: True # another device took the slot can_process saw
+        self.addCleanup(delattr, controller, 'is_available')
+        queue.put(Request('0811', '10', 'test'))
+        queue.put(Request('0812', '10', 'test'))
+        self.device.stop_event.set()
+        self.assertRaises(Empty, self.device.get_request)
+        self.assertEqual([request.number for request in queue.scheduled_items()], ['0811', '0812']) # put back in front, for another device
+        self.assertEqual(queue.in_flight, {})
+    
+    @staticmethod
+    def make_result(request, error):
+        result = Result.from_request(request)
+        result.update(refID=None if error else 'REF', time=datetime.now(), error=error)
+        return result
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+
+from datetime import datetime, timedelta
+import os
+import shutil
+import sqlite3
+import tempfile
+from threading import Lock
+
+from retention import RetentionEngine, RetentionRule, enable_incremental_vacuum
+
+
+NOW = datetime(2022, 6, 15, 12)
+SCHEMA = "CREATE TABLE transactions (id INTEGER PRIMARY KEY, time TEXT, refID TEXT, error TEXT, description TEXT)"
+
+
+def insert(filename, rows):
+    connection = sqlite3.connect(filename)
+    connection.execute(SCHEMA.replace('CREATE TABLE', 'CREATE TABLE IF NOT EXISTS'))
+    connection.executemany("INSERT INTO transactions (time, refID, error, description) VALUES (?, ?, ?, ?)",
+                           [(time_.isoformat(' '), None if failed else 'REF', 'failed' if failed else None, 'x'*500) for time_, failed in rows])
+    connection.commit()
+    connection.close()
+
+
+class Archive:
+    def __init__(self, filenames):
+        self.filenames = filenames
+        self.lock = Lock()
+        self.readers = {}
+    
+    def get_filenames(self):
+        return [filename for filename in self.filenames if os.path.exists(filename)]
+
+
+class TestRetentionEngine(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'database.db')
+        self.rules, self.batch_size, self.batch_pause = RetentionEngine.RULES, RetentionEngine.BATCH_SIZE, RetentionEngine.BATCH_PAUSE
+        RetentionEngine.RULES = [RetentionRule('transactions', 30, 'failed'), RetentionRule('transactions', 365, 'success'),
+                                 RetentionRule('transaction_rollups', 10, time_column='day', archive=False)]
+        RetentionEngine.BATCH_SIZE, RetentionEngine.BATCH_PAUSE = 100, 0
+    
+    def tearDown(self):
+        RetentionEngine.RULES, RetentionEngine.BATCH_SIZE, RetentionEngine.BATCH_PAUSE = self.rules, self.batch_size, self.batch_pause
+        shutil.rmtree(self.directory)
+    
+    def count(self, filename, sql="SELECT count(*) FROM transactions"):
+        connection = sqlite3.connect(filename)
+        try:
+            return connection.execute(sql).fetchone()[0]
+        finally:
+            connection.close()
+    
+    def test_Batched_Deletes_And_Vacuum(self):
+        self.assertTrue(enable_incremental_vacuum(self.filename))
+        self.assertFalse(enable_incremental_vacuum(self.filename))
+        insert(self.filename, [(NOW - timedelta(days=60), i % 2 == 0) for i in range(1000)] + # old failures go, old successes stay
+                              [(NOW - timedelta(days=400), False)]*50 + [(NOW - timedelta(days=1), True)]*10)
+        connection = sqlite3.connect(self.filename)
+        connection.execute("CREATE TABLE transaction_rollups (day TEXT NOT NULL, hour INTEGER NOT NULL, count INTEGER, PRIMARY KEY (day, hour)) WITHOUT ROWID")
+        connection.executemany("INSERT INTO transaction_rollups VALUES (?, ?, 1)", [('2022-06-01', 1), ('2022-06-01', 2), ('2022-06-10', 1)])
+        connection.commit()
+        connection.close()
+    
+        engine = RetentionEngine(self.filename)
+        size = engine.get_info()['file_bytes']
+        report = engine.run_once(NOW)
+        self.assertEqual(report['database']['deleted'], {'transactions (failed) older than 30 days': 500, 'transactions (success) older than 365 days': 50,
+                                                         'transaction_rollups older than 10 days': 2})
+        self.assertEqual(self.count(self.filename), 510)
+        self.assertEqual(self.count(self.filename, "SELECT count(*) FROM transaction_rollups"), 1)
+        self.assertGreater(report['database']['reclaimed_bytes'], 0)
+        info = engine.get_info()
+        self.assertEqual((info['free_bytes'], info['file_bytes']), (0, size - report['database']['reclaimed_bytes']))
+        self.assertEqual(engine.run_once(NOW)['database']['deleted']['transactions (failed) older than 30 days'], 0)
+        self.assertEqual(engine.get_info()['totals']['deleted'], 552)
+    
+    def test_Archive_Partitions_And_Logs(self):
+        insert(self.filename, [(NOW, True)])
+        old, kept = os.path.join(self.directory, 'transactions_2021_01.db'), os.path.join(self.directory, 'transactions_2022_05.db')
+        insert(old, [(datetime(2021, 1, 2), False), (datetime(2021, 1, 3), True)])
+        insert(kept, [(datetime(2022, 5, 2), False), (datetime(2022, 5, 3), True)])
+        log_filename = os.path.join(self.directory, 'logs.log')
+        for name, age in [('logs.log', 100), ('logs.log.1', 1), ('logs.log.2', 100)]:
+            open(os.path.join(self.directory, name), 'w').close()
+            os.utime(os.path.join(self.directory, name), ((NOW - timedelta(days=age)).timestamp(),)*2)
+    
+        RetentionEngine.LOG_KEEP_DAYS, log_keep_days = 30, RetentionEngine.LOG_KEEP_DAYS
+        try:
+            report = RetentionEngine(self.filename, Archive([old, kept]), log_filename).run_once(NOW)
+        finally:
+            RetentionEngine.LOG_KEEP_DAYS = log_keep_days
+        self.assertTrue(report['archive'][old]['removed'])
+        self.assertFalse(os.path.exists(old))
+        self.assertEqual(self.count(kept), 1)
+        self.assertEqual(report['logs'], [os.path.join(self.directory, 'logs.log.2')])
+        self.assertTrue(os.path.exists(log_filename))
+
+
+if __name__ == '__main__':
+    unittest.main()
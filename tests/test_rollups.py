@@ -0,0 +1,91 @@
+import unittest
+
+from datetime import datetime
+import os
+import random
+import sqlite3
+import tempfile
+
+from rollups import DurationSketch, TransactionRollups
+
+
+class TestDurationSketch(unittest.TestCase):
+    def test_Quantiles_Within_Accuracy(self):
+        values = [random.randint(1, 600) for _ in range(5000)]
+        sketch = DurationSketch()
+        [sketch.add(value) for value in values]
+        values.sort()
+        for q in [0.5, 0.95]:
+            exact = values[int(q*(len(values)-1))]
+            self.assertLessEqual(abs(sketch.quantile(q) - exact), exact*DurationSketch.RELATIVE_ACCURACY + 1)
+    
+    def test_Merge(self):
+        a, b, both = DurationSketch(), DurationSketch(), DurationSketch()
+        for value in [0, 3, 10, 10, 40]:
+            a.add(value)
+            both.add(value)
+        for value in [5, 80, 0]:
+            b.add(value)
+            both.add(value)
+        self.assertEqual(DurationSketch.from_json(a.to_json()).merge(b).buckets, both.buckets)
+        self.assertEqual(DurationSketch().quantile(0.5), None)
+        self.assertEqual(both.quantile(0), 0)
+
+
+class TestTransactionRollups(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.rollups = TransactionRollups(self.filename)
+    
+    def tearDown(self):
+        self.rollups.connection.close()
+        os.remove(self.filename)
+    
+    def test_Incremental_Stats(self):
+        self.assertTrue(self.rollups.created)
+        self.rollups.record(datetime(2022, 1, 1, 10), 'linkaja', 'TN5', 'dev1', True, 10)
+        self.rollups.record(datetime(2022, 1, 1, 10), 'linkaja', 'TN5', 'dev1', False, 30)
+        self.rollups.flush()
+        self.rollups.record(datetime(2022, 1, 1, 11), 'linkaja', 'TN5', 'dev2', True, 20)
+        self.rollups.record(datetime(2022, 1, 2, 9), 'digipos', 'TN5', 'dev1', True, -1) # never ran
+    
+        self.assertEqual(self.rollups.get_stats(['automator']), []) # only the last DEFAULT_STATS_DAYS days by default
+        stats = self.rollups.get_stats(['automator'], start_day='2022-01-01')
+        self.assertEqual([s['automator'] for s in stats], ['digipos', 'linkaja'])
+        self.assertEqual((stats[0]['count'], stats[0]['duration_count'], stats[0]['duration_p50']), (1, 0, None))
+        linkaja = stats[1]
+        self.assertEqual((linkaja['count'], linkaja['success_count']), (3, 2))
+        self.assertEqual((linkaja['duration_sum'], linkaja['duration_min'], linkaja['duration_max'], linkaja['duration_average']), (60, 10, 30, 20))
+        self.assertAlmostEqual(linkaja['duration_p50'], 20, delta=1)
+    
+        hours = self.rollups.get_stats(['day', 'hour'], start_day='2022-01-01', end_day='2022-01-01', device='dev1')
+        self.assertEqual([(s['day'], s['hour'], s['count']) for s in hours], [('2022-01-01', 10, 2)])
+        self.assertEqual([s['count'] for s in self.rollups.get_stats([], end_day='2022-01-02')], [4])
+        self.assertEqual(self.rollups.get_stats([], end_day='2021-12-01'), [])
+        totals = self.rollups.get_stats(['device'], start_day='2022-01-01', percentiles=False)
+        self.assertEqual([(s['device'], s['count'], s['duration_max']) for s in totals], [('dev1', 3, 30), ('dev2', 1, 20)])
+        self.assertNotIn('duration_p50', totals[0])
+        with self.assertRaises(ValueError):
+            self.rollups.get_stats(['number'])
+    
+    def test_Rebuild(self):
+        connection = sqlite3.connect(self.filename)
+        connection.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY, time TEXT, automator TEXT, product_spec TEXT, device TEXT, refID TEXT, error TEXT, execution_duration INTEGER)")
+        connection.executemany("INSERT INTO transactions (time, automator, product_spec, device, refID, error, execution_duration) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               [(datetime(2022, 1, 1, 10, i).isoformat(' '), 'linkaja', 'TN5', 'dev1', 'REF', None if i % 2 else 'failed', i) for i in range(7)])
+        connection.commit()
+        connection.close()
+        self.rollups.record(datetime(2022, 1, 1, 10), 'linkaja', 'TN5', 'dev1', True, 10) # replaced by the rebuild
+        TransactionRollups.REBUILD_BATCH_SIZE, batch_size = 3, TransactionRollups.REBUILD_BATCH_SIZE
+        try:
+            self.assertEqual(self.rollups.rebuild(), 7)
+        finally:
+            TransactionRollups.REBUILD_BATCH_SIZE = batch_size
+        stats = self.rollups.get_stats(['day', 'hour'], start_day='2022-01-01')
+        self.assertEqual(len(stats), 1)
+        self.assertEqual((stats[0]['count'], stats[0]['success_count'], stats[0]['duration_sum'], stats[0]['duration_min'], stats[0]['duration_max']), (7, 3, 21, 0, 6))
+
+
+if __name__ == '__main__':
+    unittest.main()
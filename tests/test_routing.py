@@ -0,0 +1,88 @@
+import unittest
+
+import json
+import os
+import tempfile
+
+from routing import ProductRouter
+
+
+class _Device:
+    def __init__(self, automators, duration=10, busy=False):
+        self.plugins = automators
+        self.duration = duration
+        self.current_request = object() if busy else None
+
+    def get_average_execution_duration(self, automator_name, default):
+        return self.duration
+
+
+class _DeviceManager:
+    DEFAULT_EXECUTION_DURATION = 60
+
+    def __init__(self):
+        self.devices = []
+        self.failure_rates = {}
+
+    def get_capable_devices(self, automator_name):
+        return [d for d in self.devices if automator_name in d.plugins]
+
+    def get_failure_rate(self, automator_name):
+        return self.failure_rates.get(automator_name, 0)
+
+    def estimate_wait(self, automator_name, queue_depth):
+        return (queue_depth + 1) * 100
+
+
+class _Admission:
+    def __init__(self):
+        self.depths = {}
+
+    def get_queue_depth(self, automator_name):
+        return self.depths.get(automator_name, 0)
+
+
+class TestProductRouter(unittest.TestCase):
+    def setUp(self):
+        self.equivalents = ProductRouter.EQUIVALENTS
+        ProductRouter.EQUIVALENTS = {'TN5': {'linkaja': 'TN5', 'digipos': 'PUL5', 'mitra_tokopedia': 'TN5'}}
+        self.device_manager = _DeviceManager()
+        self.admission = _Admission()
+        self.router = ProductRouter(self.device_manager, self.admission)
+
+    def tearDown(self):
+        ProductRouter.EQUIVALENTS = self.equivalents
+
+    def test_Load_Equivalents(self):
+        fd, filename = tempfile.mkstemp(suffix='.json')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'tn5': {'LinkAja': 'tn5', 'Digipos': 'pul5'}}, f)
+        try:
+            self.assertEqual(ProductRouter.load_equivalents(filename), {'TN5': {'linkaja': 'TN5', 'digipos': 'PUL5'}})
+        finally:
+            os.remove(filename)
+        self.assertEqual(ProductRouter.load_equivalents(filename), {})
+
+    def test_Equivalents(self):
+        self.assertEqual(sorted(self.router.get_equivalents('digipos', 'pul5')), [('digipos', 'PUL5'), ('linkaja', 'TN5'), ('mitra_tokopedia', 'TN5')])
+        self.assertEqual(self.router.get_equivalents('digipos', 'TN5'), [('digipos', 'TN5')]) # not in a group, only itself
+        self.assertIsNone(self.router.route('TN10'))
+
+    def test_Route_By_Expected_Completion_Time(self):
+        self.device_manager.devices = [_Device(['linkaja'], duration=30), _Device(['digipos'], duration=10)]
+        self.assertEqual(self.router.route('tn5'), [('digipos', 'PUL5'), ('linkaja', 'TN5')]) # mitra_tokopedia has no devices
+        self.admission.depths['digipos'] = 1 # queued behind the only digipos device, waits estimate_wait
+        self.assertEqual(self.router.route('TN5')[0], ('linkaja', 'TN5'))
+
+        self.admission.depths = {}
+        self.device_manager.failure_rates['digipos'] = 0.9 # unavailable, the last alternative
+        self.assertEqual(self.router.route('TN5'), [('linkaja', 'TN5'), ('digipos', 'PUL5')])
+        self.device_manager.failure_rates = {'digipos': 0.5} # inflated to 20s, still faster than 30s
+        self.assertEqual(self.router.route('TN5')[0], ('digipos', 'PUL5'))
+
+        self.device_manager.devices = []
+        self.assertEqual(self.router.route('TN5'), list(ProductRouter.EQUIVALENTS['TN5'].items())) # waits in queue as is
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+
+import os
+import sqlite3
+import tempfile
+from unittest.mock import patch
+
+import search
+from search import TransactionSearch, create_search_index
+
+
+class Reader:
+    def __init__(self, filename):
+        self.connection = sqlite3.connect(filename)
+        self.connection.row_factory = sqlite3.Row
+    
+    def select(self, sql, params=()):
+        return [dict(row) for row in self.connection.execute(sql, params).fetchall()]
+
+
+class TestTransactionSearch(unittest.TestCase):
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        self.connection = sqlite3.connect(self.filename, isolation_level=None)
+        self.connection.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY, number TEXT, refID TEXT, description TEXT, error TEXT)")
+        self.connection.execute("INSERT INTO transactions (number, refID, description, error) VALUES ('081234567890', 'RANDOM123ABC', 'Pulsa 5k', NULL)")
+        self.assertTrue(create_search_index(self.connection))
+        self.assertFalse(create_search_index(self.connection))
+        self.connection.executemany("INSERT INTO transactions (number, refID, description, error) VALUES (?, ?, ?, ?)",
+                                    [('081299990000', '8800123', 'Pulsa 10k', None), ('085677778888', None, 'Data 5GB', 'Nomor 0812 salah')])
+        self.reader = Reader(self.filename)
+        self.search = TransactionSearch(self.reader)
+    
+    def tearDown(self):
+        self.reader.connection.close()
+        self.connection.close()
+        os.remove(self.filename)
+    
+    def test_Substring_Search_Ranked(self):
+        rows, next_offset = self.search.search('0812')
+        self.assertEqual([row['id'] for row in rows][:2], [2, 1]) # number matches outrank the error match
+        self.assertEqual(sorted(row['id'] for row in rows), [1, 2, 3])
+        self.assertIsNone(next_offset)
+        self.assertEqual([row['id'] for row in self.search.search('0812', ['error'])[0]], [3])
+        self.assertEqual([row['id'] for row in self.search.search('123abc')[0]], [1])
+    
+        rows, next_offset = self.search.search('0812', limit=2)
+        self.assertEqual((len(rows), next_offset), (2, 2))
+        self.assertEqual(len(self.search.search('0812', limit=2, offset=next_offset)[0]), 1)
+        for query in ['', '08', 'Pulsa 5']:
+            with self.assertRaises(ValueError):
+                self.search.search(query)
+    
+    def test_Index_Follows_Updates_And_Deletes(self):
+        self.connection.execute("UPDATE transactions SET refID = 'GUI999' WHERE id = 3")
+        self.connection.execute("DELETE FROM transactions WHERE id = 1")
+        self.assertEqual([row['id'] for row in self.search.search('GUI999')[0]], [3])
+        self.assertEqual(self.search.search('123ABC')[0], [])
+        self.assertEqual([row['id'] for row in self.search.lookup(number='081299990000')], [2])
+        self.assertEqual(self.connection.execute("INSERT INTO transactions_search (transactions_search) VALUES ('integrity-check')").fetchall(), [])
+    
+    def test_Without_Trigram_Or_FTS5(self):
+        self.connection.execute("DROP TABLE transactions_search")
+        with patch.object(sqlite3, 'sqlite_version_info', (3, 31, 1)):
+            self.assertTrue(create_search_index(self.connection))
+        self.assertIn('unicode61', self.connection.execute("SELECT sql FROM sqlite_master WHERE name='transactions_search'").fetchone()[0])
+        self.assertEqual(sorted(row['id'] for row in self.search.search('Pulsa')[0]), [1, 2]) # whole words only
+        self.assertEqual(self.search.search('uls')[0], [])
+        
+        self.connection.execute("DROP TABLE transactions_search")
+        with patch.object(search, 'has_fts5', lambda connection: False):
+            self.assertFalse(create_search_index(self.connection))
+        with self.assertRaises(ValueError):
+            self.search.search('Pulsa')
+
+
+if __name__ == '__main__':
+    unittest.main()
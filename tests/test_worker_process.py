@@ -0,0 +1,113 @@
+import unittest
+
+from queue import Queue
+from threading import Thread
+import time
+
+from automators.request import Request
+from automators.result import Result
+from automators.worker_process import RemoteRateControllerRegistry, WorkerProcessError, WorkerProcessPool, strip_request
+from tests.test_requestable_device import make_device
+
+
+class _Request(Request):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.server_request = lambda:None # unpicklable, like the server objects of InteractibleRequest
+
+
+class _Device:
+    """Module level, so spawned worker processes can import it."""
+    @classmethod
+    def configure(cls, config):
+        pass
+    
+    def __init__(self, client, serial, request_queue, results_queue):
+        self.serial = serial
+    
+    def processRequest(self, request):
+        if request.product_spec == 'offline':
+            raise RuntimeError("device '{}' is offline".format(self.serial))
+        if request.product_spec == 'error':
+            raise ValueError('bad product')
+        if request.product_spec == 'hang':
+            time.sleep(60)
+        result = Result.from_request(request)
+        result.update(refID=self.serial, description=request.number)
+        return result
+
+
+class _Outbox(list):
+    def put(self, item):
+        self.append(item)
+
+
+class TestWorkerProcess(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerProcessPool(_Device, {})
+    
+    def tearDown(self):
+        self.pool.stop()
+    
+    def test_Strip_Request(self):
+        request = _Request('0811', 'TN5', 'linkaja', deadline=123.0)
+        request.record_error('a', 'busy')
+        stripped = strip_request(request)
+        self.assertIs(type(stripped), Request)
+        self.assertEqual(stripped.dict, request.dict)
+        self.assertEqual((stripped.deadline, stripped.attempts), (123.0, 1))
+    
+    def test_Remote_Rate_Controller(self):
+        outbox = _Outbox()
+        controller = RemoteRateControllerRegistry(outbox).get('linkaja', 'acc')
+        self.assertTrue(controller.try_acquire())
+        controller.on_busy()
+        self.assertEqual(outbox, [('rate', 'linkaja', 'acc', 'on_busy')])
+    
+    def test_Process_Request(self):
+        process = self.pool.acquire('a', '127.0.0.1', 5037)
+        self.assertIs(self.pool.acquire('a', '127.0.0.1', 5037), process)
+        request = _Request('0811', 'TN5', 'linkaja')
+        result = process.process_request('a', request)
+        self.assertEqual((result.refID, result.description), ('a', '0811'))
+        self.assertIs(result.request, request)
+        with self.assertRaises(WorkerProcessError):
+            process.process_request('a', _Request('0811', 'error'))
+        with self.assertRaisesRegex(RuntimeError, 'offline'):
+            process.process_request('a', _Request('0811', 'offline'))
+    
+    def test_Killed_Process_Requeues(self):
+        request_queue = Queue()
+        device = make_device(request_queue=request_queue, results_queue=Queue(), quarantine_queue=Queue())
+        device.remote = self.pool.acquire('a', '127.0.0.1', 5037)
+        request = _Request('0811', 'hang', 'test')
+        request_queue.put(request)
+        runner = Thread(target=device.run, daemon=True)
+        runner.start()
+        for _ in range(100):
+            if device.current_request is request:
+                break
+            time.sleep(0.05)
+        self.assertIs(device.current_request, request)
+        device.remote.process.kill()
+        runner.join(10)
+        self.assertFalse(runner.is_alive()) # the device went offline
+        self.assertTrue(device.is_offline)
+        self.assertIs(request_queue.get(timeout=1), request)
+        self.assertEqual(request.attempts, 0) # an offline device does not count as an attempt
+    
+    def test_Grouping(self):
+        WorkerProcessPool.DEVICES_PER_PROCESS = 2
+        try:
+            self.assertIs(self.pool.acquire('a', '127.0.0.1', 5037), self.pool.acquire('b', '127.0.0.1', 5037))
+            self.assertIsNot(self.pool.acquire('a', '127.0.0.1', 5037), self.pool.acquire('c', '127.0.0.1', 5037))
+            process = self.pool.assignments['c']
+            self.pool.release('c')
+            process.process.join(5)
+            self.assertFalse(process.is_alive()) # stopped with its last device
+        finally:
+            WorkerProcessPool.DEVICES_PER_PROCESS = 1
+
+
+if __name__ == '__main__':
+    unittest.main()